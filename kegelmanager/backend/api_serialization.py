@@ -0,0 +1,307 @@
+"""
+Fast JSON serialization and response compression for the API.
+
+- FastJSONProvider replaces Flask's JSON provider, so every jsonify() call uses
+  orjson when it is installed and falls back to the standard json module
+  otherwise. The output format matches Flask's default provider (sorted keys,
+  HTTP dates for datetimes).
+- compress_response() negotiates brotli (if the brotli package is installed)
+  or gzip for responses above COMPRESSION_MIN_BYTES; streamed responses are
+  compressed chunk by chunk.
+- stream_json_array() streams large list endpoints item by item instead of
+  building the whole payload in memory.
+- Payload size (raw and sent) and encode time are recorded per endpoint and
+  exposed through get_payload_stats(). For streamed responses the encode time
+  is the time spent generating the stream.
+
+Optional dependencies: orjson, brotli.
+
+MAIN FUNCTIONS:
+- init_api_serialization(app): Install provider, compression and metrics
+- stream_json_array(items, serialize): Streamed JSON array response
+- get_payload_stats(): Per-endpoint size/time statistics
+"""
+
+import gzip
+import json
+import threading
+import time
+import zlib
+
+from flask import Response, g, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/plain', 'text/html', 'text/csv', 'application/x-ndjson')
+
+_stats_lock = threading.Lock()
+_payload_stats = {}   # endpoint -> counters
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when available."""
+
+    def dumps(self, obj, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            if orjson is not None and not kwargs:
+                try:
+                    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+                    if self.sort_keys:
+                        option |= orjson.OPT_SORT_KEYS
+                    return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+                except TypeError:
+                    # e.g. integers beyond 64 bit - use the standard encoder below
+                    pass
+            return super().dumps(obj, **kwargs)
+        finally:
+            _record_encode_time(time.perf_counter() - start_time)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps(obj), mimetype=self.mimetype)
+
+
+def _record_encode_time(seconds):
+    """Add encode time to the current request (outside a request it is ignored)."""
+    try:
+        g.json_encode_seconds = g.get('json_encode_seconds', 0.0) + seconds
+    except RuntimeError:
+        pass
+
+
+def _accepted_encoding():
+    """Pick the best supported encoding from Accept-Encoding."""
+    accept_encoding = request.headers.get('Accept-Encoding', '').lower()
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+
+def _close(chunks):
+    """Close a wrapped iterable so the cleanup of inner generators runs on disconnect."""
+    if hasattr(chunks, 'close'):
+        chunks.close()
+
+
+def _as_bytes(chunk):
+    return chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def _compress_stream(chunks, encoding):
+    """Compress an iterable of chunks on the fly."""
+    try:
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            for chunk in chunks:
+                data = compressor.process(_as_bytes(chunk))
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+            for chunk in chunks:
+                data = compressor.compress(_as_bytes(chunk))
+                if data:
+                    yield data
+            yield compressor.flush()
+    finally:
+        _close(chunks)
+
+
+def compress_response(response):
+    """after_request hook: compress large responses and record payload statistics."""
+    endpoint = request.endpoint or 'unknown'
+    encoding = None
+
+    compressible = (
+        response.status_code == 200
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and 'Content-Encoding' not in response.headers
+        and not response.direct_passthrough
+    )
+
+    if compressible:
+        encoding = _accepted_encoding()
+        response.vary.add('Accept-Encoding')
+
+    if response.is_streamed:
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            # e.g. server-sent events: leave the stream untouched
+            return response
+        chunks = response.response
+        counter = {'raw': 0, 'sent': 0}
+        chunks = _count_bytes(chunks, counter, 'raw')
+        if encoding:
+            chunks = _compress_stream(chunks, encoding)
+            response.headers['Content-Encoding'] = encoding
+            response.headers.pop('Content-Length', None)
+        response.response = _measure_stream(chunks, counter, endpoint, encoding)
+    else:
+        body = response.get_data()
+        raw_bytes = len(body)
+        if encoding and raw_bytes >= COMPRESSION_MIN_BYTES:
+            if encoding == 'br':
+                compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            else:
+                compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            response.set_data(compressed)
+            response.headers['Content-Encoding'] = encoding
+            # The body differs from the uncompressed representation
+            etag = response.headers.get('ETag')
+            if etag and not etag.startswith('W/'):
+                response.headers['ETag'] = f'W/{etag}'
+
+        _record_payload(endpoint, raw_bytes, len(response.get_data()),
+                        g.get('json_encode_seconds', 0.0), response.headers.get('Content-Encoding'), streamed=False)
+    return response
+
+
+def _count_bytes(chunks, counter, field):
+    """Pass chunks through while counting their size."""
+    try:
+        for chunk in chunks:
+            chunk = _as_bytes(chunk)
+            counter[field] += len(chunk)
+            yield chunk
+    finally:
+        _close(chunks)
+
+
+def _measure_stream(chunks, counter, endpoint, encoding):
+    """Pass chunks through and record size and generation time once the stream is done."""
+    start_time = time.perf_counter()
+    try:
+        for chunk in chunks:
+            chunk = _as_bytes(chunk)
+            counter['sent'] += len(chunk)
+            yield chunk
+    finally:
+        _close(chunks)
+    _record_payload(endpoint, counter['raw'], counter['sent'], time.perf_counter() - start_time,
+                    encoding, streamed=True)
+
+
+def _record_payload(endpoint, raw_bytes, sent_bytes, encode_seconds, encoding, streamed=False):
+    with _stats_lock:
+        stats = _payload_stats.setdefault(endpoint, {
+            'requests': 0,
+            'streamed': 0,
+            'compressed': 0,
+            'raw_bytes_total': 0,
+            'sent_bytes_total': 0,
+            'raw_bytes_max': 0,
+            'encode_ms_total': 0.0,
+            'encode_ms_max': 0.0
+        })
+        stats['requests'] += 1
+        if streamed:
+            stats['streamed'] += 1
+        stats['raw_bytes_total'] += raw_bytes
+        stats['sent_bytes_total'] += sent_bytes
+        stats['raw_bytes_max'] = max(stats['raw_bytes_max'], raw_bytes)
+        if encoding:
+            stats['compressed'] += 1
+        encode_ms = encode_seconds * 1000
+        stats['encode_ms_total'] += encode_ms
+        stats['encode_ms_max'] = max(stats['encode_ms_max'], encode_ms)
+
+
+def get_payload_stats():
+    """
+    Get payload size and encode time statistics per endpoint.
+
+    Returns:
+        dict: endpoint -> counters plus averages and compression ratio
+    """
+    with _stats_lock:
+        result = {}
+        for endpoint, stats in _payload_stats.items():
+            result[endpoint] = {
+                **stats,
+                'encode_ms_total': round(stats['encode_ms_total'], 2),
+                'encode_ms_max': round(stats['encode_ms_max'], 2),
+                'raw_bytes_avg': round(stats['raw_bytes_total'] / stats['requests']),
+                'encode_ms_avg': round(stats['encode_ms_total'] / stats['requests'], 3),
+                'compression_ratio': round(stats['sent_bytes_total'] / stats['raw_bytes_total'], 3)
+                if stats['raw_bytes_total'] else None
+            }
+        return {
+            'encoder': 'orjson' if orjson is not None else 'json',
+            'brotli_available': brotli is not None,
+            'compression_min_bytes': COMPRESSION_MIN_BYTES,
+            'endpoints': result
+        }
+
+
+def dumps(obj):
+    """Encode an object with the fast encoder (used for streamed output)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj,
+                default=DefaultJSONProvider.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+            ).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, default=DefaultJSONProvider.default)
+
+
+def stream_json_array(items, serialize=None, chunk_size=200):
+    """
+    Stream a JSON array without building the complete payload in memory.
+
+    Args:
+        items: Iterable of objects (e.g. a query with yield_per)
+        serialize: Function turning one item into a JSON-serializable value (default: identity)
+        chunk_size: Number of items encoded per chunk
+
+    Returns:
+        Response: Streamed application/json response
+    """
+    def generate():
+        yield '['
+        first = True
+        buffer = []
+        for item in items:
+            buffer.append(dumps(serialize(item) if serialize else item))
+            if len(buffer) >= chunk_size:
+                yield ('' if first else ',') + ','.join(buffer)
+                first = False
+                buffer = []
+        if buffer:
+            yield ('' if first else ',') + ','.join(buffer)
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def init_api_serialization(app):
+    """
+    Install the fast JSON provider and the compression/metrics hook on an app.
+
+    Args:
+        app: The Flask app
+    """
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+    print(f"API serialization: encoder={'orjson' if orjson is not None else 'json'}, "
+          f"compression={'br, gzip' if brotli is not None else 'gzip'}")
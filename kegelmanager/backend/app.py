@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, send_file, abort
+from flask import Flask, jsonify, request, send_file, abort, g
 from flask_cors import CORS
 from models import db, Player, Team, Club, League, Match, Season, Finance, UserLineup, LineupPosition, TransferOffer, TransferHistory, Cup, CupMatch, PlayerCupMatchPerformance, Message, GameSettings, NotificationSettings
 import os
@@ -6,9 +6,23 @@ import sys
 import subprocess
 from dotenv import load_dotenv
 import simulation
+from save_metadata import record_simulation
 import db_manager
 import auto_lineup
 import extend_existing_db
+import job_runner
+import save_registry
+import save_snapshots
+import season_archive
+import season_export
+from save_registry import uses_writer
+from storage_profiles import install_storage_profiles
+from response_cache import (cached_response, keeps_world_version, changes_world, bump_world_version, get_cache_stats,
+                            clear_response_cache)
+from api_serialization import init_api_serialization, stream_json_array, get_payload_stats
+from query_stats import init_query_stats, get_query_stats, reset_query_stats
+import metrics
+import profiling
 
 # Load environment variables
 load_dotenv()
@@ -27,6 +41,14 @@ def get_configured_database_path():
 
     print("=== DEBUG: Starte Datenbankauswahl ===")
 
+    # Explicit override for a single process (e.g. benchmark workers), takes precedence
+    override_path = os.environ.get("KEGELMANAGER_DB_PATH")
+    if override_path:
+        if not os.path.exists(override_path):
+            raise FileNotFoundError(f"Datenbank aus KEGELMANAGER_DB_PATH existiert nicht: {override_path}")
+        print(f"DEBUG: Verwende Datenbank aus KEGELMANAGER_DB_PATH: {override_path}")
+        return override_path
+
     # Try configuration file first
     if os.path.exists(db_config_file):
         print(f"DEBUG: Konfigurationsdatei gefunden: {db_config_file}")
@@ -95,13 +117,195 @@ app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{selected_db_path}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 CORS(app)
 
+# WAL journal and tuned pragmas for all SQLite connections (see storage_profiles.py)
+install_storage_profiles('interactive')
+
 # Initialize the database
 db.init_app(app)
 
+# Per-save engines: the active save can be switched at runtime (see save_registry.py)
+save_registry.init_save_registry(app, selected_db_path)
+
+# Fast JSON encoding, response compression and payload metrics
+init_api_serialization(app)
+
+# SQL query counter, slow-query log and N+1 detector
+init_query_stats(app)
+
+# Hot-path metrics (phase durations, match days) from progress events
+metrics.install_progress_metrics()
+
+# Profiling of requests and jobs flagged with "X-Profile: 1" or ?profile=1
+profiling.init_profiling(app)
+
+@app.after_request
+def bump_world_version_after_write(response):
+    """Successful write requests invalidate all cached GET responses (unless marked with keeps_world_version)."""
+    if changes_world(response):
+        bump_world_version(f"{request.method} {request.path}")
+    return response
+
+def memoize_in_context(key, loader):
+    """
+    Memoize a lookup for the current app context.
+
+    A normal request has its own app context, so the value lives for one request.
+    All sub-requests of /api/batch share one app context (and database session),
+    so repeated lookups like the current season run only once per batch.
+
+    Args:
+        key: Cache key of the lookup
+        loader: Function that performs the lookup
+
+    Returns:
+        The (possibly memoized) result of loader()
+    """
+    memo = g.setdefault('memo', {})
+    if key not in memo:
+        memo[key] = loader()
+    return memo[key]
+
+def get_current_season():
+    """Get the current season (memoized per request, see memoize_in_context)."""
+    return memoize_in_context('current_season', lambda: Season.query.filter_by(is_current=True).first())
+
+# Maximum number of sub-requests in one /api/batch call
+BATCH_MAX_REQUESTS = 50
+
+@app.route('/api/batch', methods=['POST'])
+@keeps_world_version
+def batch_requests():
+    """
+    Run several GET sub-requests in one round trip.
+
+    Request body:
+        {"requests": [{"id": "club", "path": "/api/clubs/1"},
+                      {"id": "unread", "path": "/api/messages/unread-count"}]}
+
+    The sub-requests are dispatched through the normal routing (including the
+    response cache) inside this request's app context, so they share one
+    database session with its identity map and the lookups memoized with
+    memoize_in_context(). Only GET sub-requests are allowed.
+
+    Returns:
+        {"responses": [{"id": ..., "status": 200, "body": {...}}, ...]} in request order
+    """
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get('requests')
+
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({"error": "'requests' muss eine nicht-leere Liste sein"}), 400
+    if len(sub_requests) > BATCH_MAX_REQUESTS:
+        return jsonify({"error": f"Maximal {BATCH_MAX_REQUESTS} Anfragen pro Batch erlaubt"}), 400
+
+    responses = []
+    for index, sub_request in enumerate(sub_requests):
+        if not isinstance(sub_request, dict):
+            sub_request = {'path': sub_request}
+        sub_id = sub_request.get('id', index)
+        path = sub_request.get('path')
+        method = (sub_request.get('method') or 'GET').upper()
+
+        if not isinstance(path, str) or not path.startswith('/api/') or path.split('?')[0].rstrip('/') == '/api/batch':
+            responses.append({"id": sub_id, "status": 400, "body": {"error": "Ungültiger Pfad"}})
+            continue
+        if method != 'GET':
+            responses.append({"id": sub_id, "status": 405, "body": {"error": "Nur GET-Anfragen sind im Batch erlaubt"}})
+            continue
+
+        with app.test_request_context(path, method='GET'):
+            try:
+                response = app.full_dispatch_request()
+                body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+                responses.append({"id": sub_id, "status": response.status_code, "body": body})
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error in batch sub-request {path}: {str(e)}")
+                responses.append({"id": sub_id, "status": 500, "body": {"error": str(e)}})
+
+    return jsonify({"responses": responses})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy"})
 
+@app.route('/api/debug/payload-stats', methods=['GET'])
+def debug_payload_stats():
+    """Payload size, compression ratio and JSON encode time per endpoint."""
+    return jsonify(get_payload_stats())
+
+@app.route('/api/debug/cache-stats', methods=['GET'])
+def debug_cache_stats():
+    """Hit rate, memory usage and per-endpoint counters of the response cache."""
+    return jsonify(get_cache_stats())
+
+@app.route('/api/debug/query-stats', methods=['GET', 'DELETE'])
+@keeps_world_version
+def debug_query_stats():
+    """Query count and SQL time per endpoint and simulation phase, slow queries and N+1 findings (DELETE resets)."""
+    if request.method == 'DELETE':
+        reset_query_stats()
+        return jsonify({"success": True})
+    return jsonify(get_query_stats())
+
+@app.route('/api/debug/metrics', methods=['GET'])
+def debug_metrics():
+    """Metrics registry in Prometheus text format (?format=json for a JSON snapshot)."""
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.get_metrics_snapshot())
+    return app.response_class(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/debug/profiles', methods=['GET'])
+def debug_list_profiles():
+    """List the stored profiles (newest first)."""
+    return jsonify(profiling.list_profiles())
+
+@app.route('/api/debug/profiles/<profile_id>', methods=['GET', 'DELETE'])
+@keeps_world_version
+def debug_get_profile(profile_id):
+    """
+    Serve a stored profile.
+
+    Query parameters:
+        format: 'pstats' (text report, default), 'collapsed' (flamegraph stacks),
+                'raw' (.prof file for snakeviz/pstats) or 'json' (metadata)
+        sort: pstats sort key (default: cumulative)
+        limit: Number of functions in the pstats report (default: 80)
+    """
+    if request.method == 'DELETE':
+        if not profiling.delete_profile(profile_id):
+            return jsonify({"error": "Profil nicht gefunden"}), 404
+        return jsonify({"success": True})
+
+    output_format = request.args.get('format', 'pstats')
+    if output_format == 'json':
+        content = profiling.get_profile_metadata(profile_id)
+        return jsonify(content) if content else (jsonify({"error": "Profil nicht gefunden"}), 404)
+    if output_format == 'raw':
+        path = profiling.get_profile_file(profile_id)
+        if not path:
+            return jsonify({"error": "Profil nicht gefunden"}), 404
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=f"{profile_id}.prof")
+
+    if output_format == 'collapsed':
+        content = profiling.read_collapsed_stacks(profile_id)
+    elif output_format == 'pstats':
+        try:
+            content = profiling.render_pstats(
+                profile_id,
+                sort=request.args.get('sort', 'cumulative'),
+                limit=request.args.get('limit', 80, type=int)
+            )
+        except KeyError:
+            return jsonify({"error": f"Unbekannter Sortierschlüssel: {request.args.get('sort')}"}), 400
+    else:
+        return jsonify({"error": f"Unbekanntes Format: {output_format}"}), 400
+
+    if content is None:
+        return jsonify({"error": "Profil nicht gefunden"}), 404
+    return app.response_class(content, mimetype='text/plain')
+
 @app.route('/api/debug/database', methods=['GET'])
 def debug_database():
     """Debug endpoint to show which database is actually being used."""
@@ -176,10 +380,11 @@ def global_search():
 # Club endpoints
 @app.route('/api/clubs', methods=['GET'])
 def get_clubs():
-    clubs = Club.query.all()
-    return jsonify([club.to_dict() for club in clubs])
+    clubs = Club.query.order_by(Club.id).yield_per(200)
+    return stream_json_array(clubs, lambda club: club.to_dict())
 
 @app.route('/api/clubs/<int:club_id>', methods=['GET'])
+@cached_response
 def get_club(club_id):
     club = Club.query.get_or_404(club_id)
     return jsonify(club.to_dict())
@@ -233,6 +438,7 @@ def get_teams():
     return jsonify([team.to_dict() for team in teams])
 
 @app.route('/api/teams/<int:team_id>', methods=['GET'])
+@cached_response
 def get_team(team_id):
     team = Team.query.get_or_404(team_id)
     return jsonify(team.to_dict())
@@ -388,7 +594,7 @@ def add_team_to_club(club_id):
     """Add a new team to a club for the next season (Cheat function)."""
     try:
         # Check if season is completed
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -602,11 +808,11 @@ def get_players():
     include_retired = request.args.get('include_retired', 'false').lower() == 'true'
 
     if include_retired:
-        players = Player.query.all()
+        players = Player.query
     else:
-        players = Player.query.filter_by(is_retired=False).all()
+        players = Player.query.filter_by(is_retired=False)
 
-    return jsonify([player.to_dict() for player in players])
+    return stream_json_array(players.order_by(Player.id).yield_per(500), lambda player: player.to_dict())
 
 @app.route('/api/players/<int:player_id>', methods=['GET'])
 def get_player(player_id):
@@ -624,7 +830,7 @@ def get_player_matches(player_id):
         player = Player.query.get_or_404(player_id)
 
         # Get current season
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -921,11 +1127,12 @@ def get_player_matches(player_id):
         return jsonify({"error": "Fehler beim Laden der Spieler-Spiele"}), 500
 
 @app.route('/api/players/<int:player_id>/history', methods=['GET'])
+@cached_response
 def get_player_history(player_id):
     """Get historical team assignments and league positions for a player across all seasons."""
     try:
-        from models import PlayerMatchPerformance, LeagueHistory, Season
-        from sqlalchemy import func, distinct
+        from models import PlayerMatchPerformance, LeagueHistory, Season, PlayerSeasonStats
+        from models import archived_stats_available, sum_performances, performance_statistics
 
         # Verify player exists
         player = Player.query.get_or_404(player_id)
@@ -940,23 +1147,26 @@ def get_player_history(player_id):
                 'history': []
             })
 
-        # Get all seasons where the player played
-        seasons_with_performances = db.session.query(
-            PlayerMatchPerformance.team_id,
-            Match.season_id,
-            func.count(PlayerMatchPerformance.id).label('appearances')
-        ).join(
+        # Get all performances of the player, grouped by team and season
+        player_performances = db.session.query(PlayerMatchPerformance, Match.season_id).join(
             Match, PlayerMatchPerformance.match_id == Match.id
         ).filter(
             PlayerMatchPerformance.player_id == player_id
-        ).group_by(
-            PlayerMatchPerformance.team_id,
-            Match.season_id
         ).all()
 
+        groups = {}
+        for performance, season_id in player_performances:
+            groups.setdefault((performance.team_id, season_id), ([], []))[0].append(performance)
+
+        # Seasons whose performances were moved into the archive
+        if archived_stats_available():
+            archived = PlayerSeasonStats.query.filter_by(player_id=player_id, competition='league').all()
+            for stats in archived:
+                groups.setdefault((stats.team_id, stats.season_id), ([], []))[1].append(stats)
+
         history_data = []
 
-        for team_id, season_id, appearances in seasons_with_performances:
+        for (team_id, season_id), (performances, archived_stats) in groups.items():
             # Get team information
             team = Team.query.get(team_id)
             if not team:
@@ -968,36 +1178,24 @@ def get_player_history(player_id):
                 continue
 
             # Calculate player statistics for this team/season combination
-            player_performances = PlayerMatchPerformance.query.join(
-                Match, PlayerMatchPerformance.match_id == Match.id
-            ).filter(
-                PlayerMatchPerformance.player_id == player_id,
-                PlayerMatchPerformance.team_id == team_id,
-                Match.season_id == season_id
-            ).all()
-
-            # Calculate statistics
-            home_performances = [p for p in player_performances if p.is_home_team]
-            away_performances = [p for p in player_performances if not p.is_home_team]
+            statistics = performance_statistics(sum_performances(performances, archived_stats))
+            appearances = statistics['total_matches']
 
-            # Calculate averages
-            avg_home_score = round(sum(p.total_score for p in home_performances) / len(home_performances), 1) if home_performances else 0
-            avg_away_score = round(sum(p.total_score for p in away_performances) / len(away_performances), 1) if away_performances else 0
-            avg_total_score = round(sum(p.total_score for p in player_performances) / len(player_performances), 1) if player_performances else 0
+            avg_home_score = statistics['avg_home_score']
+            avg_away_score = statistics['avg_away_score']
+            avg_total_score = statistics['avg_total_score']
 
-            # Calculate error averages
-            avg_home_errors = round(sum(p.fehler_count for p in home_performances) / len(home_performances), 1) if home_performances else 0
-            avg_away_errors = round(sum(p.fehler_count for p in away_performances) / len(away_performances), 1) if away_performances else 0
-            avg_total_errors = round(sum(p.fehler_count for p in player_performances) / len(player_performances), 1) if player_performances else 0
+            avg_home_errors = statistics['avg_home_fehler']
+            avg_away_errors = statistics['avg_away_fehler']
+            avg_total_errors = statistics['avg_total_fehler']
 
-            # Calculate Volle and Räumer averages
-            avg_home_volle = round(sum(p.volle_score for p in home_performances) / len(home_performances), 1) if home_performances else 0
-            avg_away_volle = round(sum(p.volle_score for p in away_performances) / len(away_performances), 1) if away_performances else 0
-            avg_total_volle = round(sum(p.volle_score for p in player_performances) / len(player_performances), 1) if player_performances else 0
+            avg_home_volle = statistics['avg_home_volle']
+            avg_away_volle = statistics['avg_away_volle']
+            avg_total_volle = statistics['avg_total_volle']
 
-            avg_home_raeumer = round(sum(p.raeumer_score for p in home_performances) / len(home_performances), 1) if home_performances else 0
-            avg_away_raeumer = round(sum(p.raeumer_score for p in away_performances) / len(away_performances), 1) if away_performances else 0
-            avg_total_raeumer = round(sum(p.raeumer_score for p in player_performances) / len(player_performances), 1) if player_performances else 0
+            avg_home_raeumer = statistics['avg_home_raeumer']
+            avg_away_raeumer = statistics['avg_away_raeumer']
+            avg_total_raeumer = statistics['avg_total_raeumer']
 
             # Get league history for this team and season
             league_history = LeagueHistory.query.filter_by(
@@ -1034,8 +1232,8 @@ def get_player_history(player_id):
                     'avg_home_raeumer': avg_home_raeumer,
                     'avg_away_raeumer': avg_away_raeumer,
                     'avg_total_raeumer': avg_total_raeumer,
-                    'home_matches': len(home_performances),
-                    'away_matches': len(away_performances)
+                    'home_matches': statistics['home_matches'],
+                    'away_matches': statistics['away_matches']
                 }
             else:
                 # Fallback if no league history exists yet (current season)
@@ -1067,8 +1265,8 @@ def get_player_history(player_id):
                     'avg_home_raeumer': avg_home_raeumer,
                     'avg_away_raeumer': avg_away_raeumer,
                     'avg_total_raeumer': avg_total_raeumer,
-                    'home_matches': len(home_performances),
-                    'away_matches': len(away_performances)
+                    'home_matches': statistics['home_matches'],
+                    'away_matches': statistics['away_matches']
                 }
 
             history_data.append(history_entry)
@@ -1266,7 +1464,7 @@ def update_player(player_id):
 @app.route('/api/leagues', methods=['GET'])
 def get_leagues():
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -1275,6 +1473,7 @@ def get_leagues():
     return jsonify([league.to_dict() for league in leagues])
 
 @app.route('/api/leagues/<int:league_id>', methods=['GET'])
+@cached_response
 def get_league(league_id):
     league = League.query.get_or_404(league_id)
     return jsonify(league.to_dict())
@@ -1431,9 +1630,11 @@ def get_match(match_id):
             # Convert CupMatch to Match-like format for compatibility
             cup_match_data = cup_match.to_dict()
 
-            # Load cup match performances
+            # Load cup match performances (archived seasons are read from the season archive)
             cup_performances = PlayerCupMatchPerformance.query.filter_by(cup_match_id=db_id).all()
             performances_data = [perf.to_dict() for perf in cup_performances]
+            if not performances_data and cup_match.is_played:
+                performances_data = season_archive.get_archived_performances(cup_match)
 
             # Stroh performances are now loaded automatically via _get_all_cup_performances
 
@@ -1483,84 +1684,12 @@ def get_match(match_id):
 # Helper function for auto-initialization
 def auto_initialize_cups(season_id):
     """Automatically initialize cups and generate fixtures for a season."""
-    from models import Cup, League
-
-    # Prüfe ob bereits Pokale für diese Saison existieren
-    existing_cups = Cup.query.filter_by(season_id=season_id).count()
-    if existing_cups > 0:
-        print(f"Cups already exist for season {season_id} ({existing_cups} cups found), skipping initialization")
-        return
-
-    created_cups = []
-
-    # Create DKBC-Pokal (for leagues without bundesland and landkreis)
-    dkbc_cup = Cup(
-        name="DKBC-Pokal",
-        cup_type="DKBC",
-        season_id=season_id
-    )
-    db.session.add(dkbc_cup)
-    created_cups.append(dkbc_cup)
-
-    # Get all unique bundesland values (excluding None and empty strings)
-    bundeslaender = db.session.query(League.bundesland).filter(
-        League.season_id == season_id,
-        League.bundesland.isnot(None),
-        League.bundesland != ''
-    ).distinct().all()
-
-    # Create Landespokal for each Bundesland
-    for (bundesland,) in bundeslaender:
-        landespokal = Cup(
-            name=f"{bundesland}-Pokal",
-            cup_type="Landespokal",
-            season_id=season_id,
-            bundesland=bundesland
-        )
-        db.session.add(landespokal)
-        created_cups.append(landespokal)
-
-    # Get all unique landkreis values (excluding None and empty strings)
-    landkreise = db.session.query(League.landkreis).filter(
-        League.season_id == season_id,
-        League.landkreis.isnot(None),
-        League.landkreis != ''
-    ).distinct().all()
-
-    # Create Kreispokal for each Landkreis
-    for (landkreis,) in landkreise:
-        # Get the bundesland for this landkreis
-        league_with_landkreis = League.query.filter_by(
-            season_id=season_id,
-            landkreis=landkreis
-        ).first()
+    from cup_engine import initialize_season_cups
 
-        if league_with_landkreis:
-            kreispokal = Cup(
-                name=f"Landkreis {landkreis}-Pokal",
-                cup_type="Kreispokal",
-                season_id=season_id,
-                bundesland=league_with_landkreis.bundesland,
-                landkreis=landkreis
-            )
-            db.session.add(kreispokal)
-            created_cups.append(kreispokal)
-
-    db.session.commit()
-
-    # Auto-generate fixtures for all created cups
-    for cup in created_cups:
-        eligible_teams = cup.get_eligible_teams()
-        if len(eligible_teams) >= 2:
-            try:
-                cup.generate_cup_fixtures()
-                print(f"Generated fixtures for {cup.name} with {len(eligible_teams)} teams")
-            except Exception as e:
-                print(f"Error generating fixtures for {cup.name}: {e}")
+    initialize_season_cups(season_id)
 
     # Note: Match dates will be set later after season calendar is created
     # This is handled in init_db.py after create_season_calendar()
-    print(f"Auto-initialized {len(created_cups)} cups for season {season_id}")
     print("Note: Match dates will be set after season calendar creation")
 
 
@@ -1586,7 +1715,7 @@ def fix_cup_dates():
 def get_cups():
     """Get all cups for the current season."""
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -1630,7 +1759,7 @@ def get_cup(cup_id):
 def get_cups_by_type(cup_type):
     """Get all cups of a specific type (DKBC, Landespokal, Kreispokal)."""
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -1681,7 +1810,7 @@ def advance_cup_round(cup_id):
 def get_cup_match_days():
     """Get all cup match days for the current season."""
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -1731,6 +1860,7 @@ def get_cup_match_days():
 
 
 @app.route('/api/cups/history', methods=['GET'])
+@cached_response
 def get_all_cups_history():
     """Get historical winners and finalists for all cups across all seasons."""
     try:
@@ -1754,6 +1884,7 @@ def get_all_cups_history():
 
 
 @app.route('/api/cups/history/<cup_type>', methods=['GET'])
+@cached_response
 def get_cups_history_by_type(cup_type):
     """Get historical winners and finalists for cups of a specific type."""
     try:
@@ -1784,6 +1915,7 @@ def get_cups_history_by_type(cup_type):
 
 
 @app.route('/api/cups/history/cup/<cup_name>', methods=['GET'])
+@cached_response
 def get_cup_history_by_name(cup_name):
     """Get historical winners and finalists for a specific cup across all seasons."""
     try:
@@ -1819,6 +1951,37 @@ def get_season(season_id):
     season = Season.query.get_or_404(season_id)
     return jsonify(season.to_dict())
 
+@app.route('/api/export/<dataset>', methods=['GET'])
+def export_season_data(dataset):
+    """
+    Stream a dataset of whole seasons as a file download (see season_export.py).
+
+    Query parameters: seasons ('current', 'all' or comma-separated IDs),
+    format ('csv', 'ndjson', 'columnar') and gzip (1 = compressed file).
+    """
+    from flask import Response, stream_with_context
+
+    export_format = request.args.get('format', 'csv')
+    compress = request.args.get('gzip', '0').lower() in ('1', 'true')
+    if dataset not in season_export.DATASETS:
+        return jsonify({"error": f"Unbekannter Datensatz: {dataset}",
+                        "datasets": list(season_export.DATASETS)}), 400
+    if export_format not in season_export.EXPORT_FORMATS:
+        return jsonify({"error": f"Unbekanntes Format: {export_format}",
+                        "formats": list(season_export.EXPORT_FORMATS)}), 400
+
+    try:
+        season_ids = season_export.resolve_season_ids(request.args.get('seasons', 'current'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chunks = season_export.export_dataset(dataset, season_ids, export_format, compress)
+    mimetype = 'application/gzip' if compress and export_format != 'columnar' else season_export.MIMETYPES[export_format]
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    filename = season_export.export_filename(dataset, season_ids, export_format, compress)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 # Simulation endpoints
 @app.route('/api/simulate/match', methods=['POST'])
 def simulate_match():
@@ -1840,7 +2003,7 @@ def simulate_match():
     from club_player_assignment import batch_assign_players_to_teams
 
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -1900,6 +2063,36 @@ def simulate_match():
 
     return jsonify(result)
 
+def wants_background_job(data=None):
+    """Check whether the client asked to run the request as a background job."""
+    if data and data.get('background'):
+        return True
+    return request.args.get('background', '').lower() in ('1', 'true', 'yes')
+
+def submit_background_job(job_type, params=None):
+    """Queue a background job and return the 202 response pointing to it."""
+    job = job_runner.submit_job(
+        job_type,
+        params,
+        app.config['SQLALCHEMY_DATABASE_URI'],
+        profile=profiling.wants_profile(request.get_json(silent=True))
+    )
+    response = jsonify({"job": job, "status_url": f"/api/jobs/{job['id']}"})
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job['id']}"
+    return response
+
+def background_job_conflict():
+    """Return a 409 response if a background job is working on the save, otherwise None."""
+    active_job = job_runner.get_active_job()
+    if active_job:
+        return jsonify({
+            "error": "Ein Hintergrund-Job läuft bereits",
+            "job": active_job,
+            "status_url": f"/api/jobs/{active_job['id']}"
+        }), 409
+    return None
+
 @app.route('/api/simulate/season', methods=['POST'])
 def simulate_season():
     data = request.json
@@ -1912,10 +2105,20 @@ def simulate_season():
     if not season_id:
         return jsonify({"error": "season_id is required"}), 400
 
+    conflict = background_job_conflict()
+    if conflict:
+        return conflict
+
     try:
         season = Season.query.get_or_404(season_id)
         print(f"DEBUG: Found season: {season.name} (ID: {season.id})")
 
+        if wants_background_job(data):
+            return submit_background_job('simulate_season', {
+                'season_id': season.id,
+                'create_new_season': create_new_season
+            })
+
         # Count matches before simulation
         played_matches_before = Match.query.filter_by(is_played=True).count()
         print(f"DEBUG: Played matches before simulation: {played_matches_before}")
@@ -1974,7 +2177,7 @@ def get_season_status_data(season):
 def get_season_status():
     """Get the status of the current season (completed or not)."""
     try:
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -2042,7 +2245,7 @@ def get_last_match_date():
         print("DEBUG: Getting last match date...")
 
         # Get current season
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             print("DEBUG: No current season found")
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
@@ -2105,8 +2308,12 @@ def get_last_match_date():
 @app.route('/api/season/transition', methods=['POST'])
 def transition_to_new_season():
     """Start a new season after the current one is completed."""
+    conflict = background_job_conflict()
+    if conflict:
+        return conflict
+
     try:
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -2134,6 +2341,9 @@ def transition_to_new_season():
                 "error": f"Die Saison ist noch nicht abgeschlossen. Noch {unplayed_league} Liga-Spiele und {unplayed_cup} Pokal-Spiele ausstehend."
             }), 400
 
+        if wants_background_job(request.get_json(silent=True)):
+            return submit_background_job('season_transition')
+
         # Process end of season and create new season
         print("Processing season transition...")
         simulation.process_end_of_season(current_season)
@@ -2158,9 +2368,13 @@ def transition_to_new_season():
 @app.route('/api/simulate/match_day', methods=['POST'])
 def simulate_match_day():
     """Simulate one match day for all leagues in a season using optimized methods."""
+    conflict = background_job_conflict()
+    if conflict:
+        return conflict
+
     try:
         # Finde die aktuelle Saison
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -2192,12 +2406,16 @@ def simulate_match_day():
         if leagues_fixed > 0:
             print(f"Fixed {leagues_fixed} leagues by generating missing fixtures")
 
+        if wants_background_job(request.get_json(silent=True)):
+            return submit_background_job('simulate_match_day')
+
         # Zähle die gespielten Spiele vor der Simulation
         played_matches_before = Match.query.filter_by(is_played=True).count()
         print(f"DEBUG: Anzahl gespielter Spiele VOR der Simulation: {played_matches_before}")
 
         # Simuliere einen Spieltag mit optimierter Version
         result = simulation.simulate_match_day(current_season)
+        record_simulation()
 
         # Zähle die gespielten Spiele nach der Simulation
         played_matches_after = Match.query.filter_by(is_played=True).count()
@@ -2212,6 +2430,87 @@ def simulate_match_day():
         traceback.print_exc()
         return jsonify({"error": f"Fehler bei der Simulation: {str(e)}"}), 500
 
+@app.route('/api/progress/stream', methods=['GET'])
+def progress_stream():
+    """
+    Server-sent events stream of simulation and season transition progress.
+
+    Streams the events of progress.py (match_day_start, phase_start/phase_end,
+    match_day_simulated, manager_results, standings_delta, transition_step,
+    job_state, ...) as they happen, both for synchronous requests and for
+    background jobs. Optional ?job_id=<id> restricts the stream to one job; that
+    stream ends after the job_state event of the finished job.
+    """
+    from flask import Response
+    import json
+    import queue
+    from progress import subscribe_progress, unsubscribe_progress
+
+    job_id = request.args.get('job_id')
+    heartbeat_seconds = 15
+    finished_states = (job_runner.COMPLETED, job_runner.FAILED, job_runner.CANCELLED)
+
+    if job_id and not job_runner.get_job(job_id, include_result=False):
+        return jsonify({"error": "Job nicht gefunden"}), 404
+
+    def generate():
+        subscriber = subscribe_progress()
+        try:
+            # Tell the client how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+
+            # Subscribed first, so a job finishing now is either seen here or in the queue
+            job = job_runner.get_job(job_id, include_result=False) if job_id else None
+            if job and job['state'] in finished_states:
+                payload = json.dumps({'job_id': job_id, 'state': job['state'], 'error': job['error']})
+                yield f"event: job_state\ndata: {payload}\n\n"
+                return
+
+            while True:
+                try:
+                    message = subscriber.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    # Comment line keeps proxies and the browser connection alive
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if job_id and message['data'].get('job_id') != job_id:
+                    continue
+
+                payload = json.dumps({**message['data'], 'timestamp': message['timestamp']}, default=str)
+                yield f"id: {message['id']}\nevent: {message['event']}\ndata: {payload}\n\n"
+
+                if job_id and message['event'] == 'job_state' and message['data'].get('state') in finished_states:
+                    return
+        finally:
+            unsubscribe_progress(subscriber)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List the background jobs of this server process (newest first)."""
+    return jsonify({"jobs": job_runner.list_jobs()})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll the state, progress and (once completed) the result of a background job."""
+    job = job_runner.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job nicht gefunden"}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued job, or stop a running one at its next safe checkpoint."""
+    job = job_runner.cancel_job(job_id)
+    if not job:
+        return jsonify({"error": "Job nicht gefunden"}), 404
+    return jsonify(job)
+
 # Initialize database
 @app.route('/api/init_db', methods=['POST'])
 def initialize_database():
@@ -2340,7 +2639,7 @@ def get_club_emblem(verein_id):
 @app.route('/api/debug/matches', methods=['GET'])
 def debug_matches():
     """Debug endpoint to check match data."""
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "No current season found"}), 404
 
@@ -2409,7 +2708,7 @@ def debug_balance_promotion_relegation():
     """Debug endpoint to manually trigger promotion/relegation balancing."""
     try:
         # Get current season
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -2433,16 +2732,20 @@ def debug_promotion_relegation_structure():
     """Debug endpoint to show the current promotion/relegation structure."""
     try:
         # Get current season
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
-        leagues = League.query.filter_by(season_id=current_season.id).order_by(League.level, League.name).all()
+        from league_graph import LeagueGraph
+        graph = LeagueGraph.load(current_season.id)
+        leagues = sorted(graph.leagues.values(), key=lambda l: (l.level, l.name))
 
         structure = []
         for league in leagues:
-            promotion_leagues = league.get_aufstieg_ligen()
-            relegation_leagues = league.get_abstieg_ligen()
+            promotion_ids = graph.get_promotion_targets(league.id)
+            relegation_ids = graph.get_relegation_targets(league.id)
+            promotion_leagues = [graph.leagues[i] for i in promotion_ids if i in graph.leagues]
+            relegation_leagues = [graph.leagues[i] for i in relegation_ids if i in graph.leagues]
 
             structure.append({
                 "id": league.id,
@@ -2453,8 +2756,8 @@ def debug_promotion_relegation_structure():
                 "altersklasse": league.altersklasse,
                 "anzahl_aufsteiger": league.anzahl_aufsteiger,
                 "anzahl_absteiger": league.anzahl_absteiger,
-                "aufstieg_liga_ids": league.get_aufstieg_liga_ids(),
-                "abstieg_liga_ids": league.get_abstieg_liga_ids(),
+                "aufstieg_liga_ids": promotion_ids,
+                "abstieg_liga_ids": relegation_ids,
                 "promotion_leagues": [{"id": l.id, "name": l.name, "level": l.level} for l in promotion_leagues],
                 "relegation_leagues": [{"id": l.id, "name": l.name, "level": l.level} for l in relegation_leagues]
             })
@@ -2475,7 +2778,7 @@ def debug_fix_league_distribution():
     """Debug endpoint to fix league distribution imbalances."""
     try:
         # Get current season
-        current_season = Season.query.filter_by(is_current=True).first()
+        current_season = get_current_season()
         if not current_season:
             return jsonify({"error": "Keine aktuelle Saison gefunden"}), 404
 
@@ -2603,6 +2906,7 @@ def ensure_home_team_lineup_exists_universal(match_id):
     return home_lineup is not None
 
 @app.route('/api/matches/<int:match_id>/available-players', methods=['GET'])
+@uses_writer
 def get_available_players_for_match(match_id):
     """Get available players for a match."""
     # Check if this is a cup match ID (>= 1,000,000)
@@ -2995,26 +3299,32 @@ def select_database():
     if not db_name:
         return jsonify({"success": False, "message": "Datenbankname ist erforderlich."}), 400
 
+    conflict = background_job_conflict()
+    if conflict:
+        return conflict
+
     result = db_manager.select_database(db_name)
 
     if result.get('success'):
-        # Wenn die Datenbankauswahl erfolgreich war, erzwinge einen Neustart
-        result['message'] += " Die Anwendung wird automatisch neu gestartet, um die neue Datenbank zu verwenden."
-        print(f"DEBUG: Datenbank erfolgreich ausgewählt: {result.get('db_path')}")
-
-        # Erzwinge einen Neustart durch eine kleine Änderung an dieser Datei
+        # Die Auswahl ist gespeichert (für den nächsten Start) - jetzt sofort umschalten
         try:
-            import time
-            current_file = __file__
-            with open(current_file, 'a') as f:
-                f.write(f"\n# Auto-reload trigger: {time.time()}")
-            print("DEBUG: Neustart-Trigger hinzugefügt - Server wird neu starten")
+            switch = save_registry.activate_save(app, result['db_path'])
         except Exception as e:
-            print(f"DEBUG: Fehler beim Hinzufügen des Neustart-Triggers: {str(e)}")
-            result['message'] += " Bitte starten Sie die Anwendung manuell neu."
+            print(f"Error switching database: {str(e)}")
+            return jsonify({"success": False, "message": f"Fehler beim Umschalten der Datenbank: {str(e)}"}), 500
+
+        result['message'] = f"Datenbank '{switch['name']}' ist jetzt aktiv."
+        result['switch_ms'] = switch['switch_ms']
 
     return jsonify(result)
 
+@app.route('/api/databases/engines', methods=['GET'])
+def get_database_engines():
+    """Get the open save engines of the save registry."""
+    stats = save_registry.get_registry_stats()
+    stats['active'] = os.path.basename(save_registry.get_active_save(app))
+    return jsonify(stats)
+
 @app.route('/api/databases/delete', methods=['POST'])
 def delete_database():
     """Delete a database."""
@@ -3024,11 +3334,126 @@ def delete_database():
     if not db_name:
         return jsonify({"success": False, "message": "Datenbankname ist erforderlich."}), 400
 
+    db_path = os.path.join(db_manager.get_database_dir(), db_name if db_name.endswith('.db') else f"{db_name}.db")
+    if os.path.abspath(db_path) == save_registry.get_active_save(app):
+        return jsonify({"success": False, "message": "Die aktive Datenbank kann nicht gelöscht werden."}), 409
+
+    # Release the pooled connections first (open files cannot be deleted on Windows)
+    save_registry.evict_save(db_path)
     result = db_manager.delete_database(db_name)
     return jsonify(result)
 
+def _save_path(db_name):
+    """Path of a save in the database directory, or of the active save if no name is given."""
+    if not db_name:
+        return save_registry.get_active_save(app)
+    return os.path.join(db_manager.get_database_dir(), db_name if db_name.endswith('.db') else f"{db_name}.db")
+
+@app.route('/api/databases/save-as', methods=['POST'])
+def save_database_as():
+    """Clone a save (default: the active save) into a new database."""
+    data = request.json or {}
+    target_name = data.get('name')
+
+    if not target_name:
+        return jsonify({"success": False, "message": "Datenbankname ist erforderlich."}), 400
+
+    source_path = _save_path(data.get('source'))
+    target_path = _save_path(target_name)
+
+    try:
+        result = save_snapshots.save_as(source_path, target_path)
+    except FileExistsError as e:
+        return jsonify({"success": False, "message": str(e)}), 409
+    except (FileNotFoundError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        print(f"Error cloning database: {str(e)}")
+        return jsonify({"success": False, "message": f"Fehler beim Kopieren der Datenbank: {str(e)}"}), 500
+
+    return jsonify({
+        "success": True,
+        "message": f"Datenbank '{os.path.basename(target_path)}' wurde erstellt.",
+        **result
+    })
+
+@app.route('/api/databases/checkpoints', methods=['GET'])
+def list_database_checkpoints():
+    """List the checkpoints of a save (default: the active save)."""
+    db_path = _save_path(request.args.get('name'))
+    return jsonify({
+        "save": os.path.basename(db_path),
+        "checkpoints": save_snapshots.list_checkpoints(db_path)
+    })
+
+@app.route('/api/databases/checkpoints', methods=['POST'])
+def create_database_checkpoint():
+    """Create a manual checkpoint of a save (default: the active save)."""
+    data = request.json or {}
+    db_path = _save_path(data.get('name'))
+
+    try:
+        checkpoint = save_snapshots.create_checkpoint(db_path, reason='manual', label=data.get('label'))
+    except FileNotFoundError as e:
+        return jsonify({"success": False, "message": str(e)}), 404
+    except Exception as e:
+        print(f"Error creating checkpoint: {str(e)}")
+        return jsonify({"success": False, "message": f"Fehler beim Erstellen des Checkpoints: {str(e)}"}), 500
+
+    return jsonify({"success": True, "checkpoint": checkpoint})
+
+@app.route('/api/databases/checkpoints/restore', methods=['POST'])
+def restore_database_checkpoint():
+    """Restore a save (default: the active save) from one of its checkpoints."""
+    data = request.json or {}
+    checkpoint_name = data.get('checkpoint')
+
+    if not checkpoint_name:
+        return jsonify({"success": False, "message": "Checkpoint ist erforderlich."}), 400
+
+    conflict = background_job_conflict()
+    if conflict:
+        return conflict
+
+    db_path = _save_path(data.get('name'))
+    try:
+        result = save_snapshots.restore_checkpoint(db_path, checkpoint_name)
+    except (FileNotFoundError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 404
+    except Exception as e:
+        print(f"Error restoring checkpoint: {str(e)}")
+        return jsonify({"success": False, "message": f"Fehler beim Wiederherstellen: {str(e)}"}), 500
+
+    if os.path.abspath(db_path) == save_registry.get_active_save(app):
+        # Cached responses and the world version belong to the replaced state
+        clear_response_cache()
+        bump_world_version(f"save restored from {checkpoint_name}")
+
+    return jsonify({
+        "success": True,
+        "message": f"Datenbank '{result['save']}' wurde aus '{checkpoint_name}' wiederhergestellt.",
+        **result
+    })
+
+@app.route('/api/databases/checkpoints/delete', methods=['POST'])
+def delete_database_checkpoint():
+    """Delete a checkpoint of a save (default: the active save)."""
+    data = request.json or {}
+    checkpoint_name = data.get('checkpoint')
+
+    if not checkpoint_name:
+        return jsonify({"success": False, "message": "Checkpoint ist erforderlich."}), 400
+
+    try:
+        save_snapshots.delete_checkpoint(_save_path(data.get('name')), checkpoint_name)
+    except (FileNotFoundError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 404
+
+    return jsonify({"success": True, "message": f"Checkpoint '{checkpoint_name}' wurde gelöscht."})
+
 # Transfer endpoints
 @app.route('/api/transfers', methods=['GET'])
+@uses_writer
 def get_transfers():
     """Get transfer data for the managed club."""
     managed_club_id = request.args.get('managed_club_id', type=int)
@@ -3037,7 +3462,7 @@ def get_transfers():
         return jsonify({"error": "managed_club_id parameter is required"}), 400
 
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         return jsonify({"error": "No current season found"}), 404
 
@@ -3097,7 +3522,7 @@ def is_cheat_mode_enabled():
 def execute_transfer(offer):
     """Execute a transfer by updating player club and creating transfer history."""
     # Get current season
-    current_season = Season.query.filter_by(is_current=True).first()
+    current_season = get_current_season()
     if not current_season:
         raise Exception("No current season found")
 
@@ -3385,6 +3810,7 @@ def get_unread_message_count():
 
 # Game Settings endpoints
 @app.route('/api/game-settings', methods=['GET'])
+@uses_writer
 def get_game_settings():
     """Get game settings (manager club, etc.)."""
     try:
@@ -3431,6 +3857,7 @@ def update_manager_club():
 
 # Notification Settings endpoints
 @app.route('/api/notification-settings', methods=['GET'])
+@uses_writer
 def get_notification_settings():
     """Get notification settings."""
     try:
@@ -3491,6 +3918,7 @@ def update_notification_settings():
 
 
 @app.route('/api/notification-settings/categories', methods=['GET'])
+@uses_writer
 def get_notification_categories():
     """Get available notification categories with descriptions."""
     try:
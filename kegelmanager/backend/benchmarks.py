@@ -0,0 +1,748 @@
+"""
+Benchmark suite for the simulation, season transition and API hot paths.
+
+The benchmarks run against synthetic worlds (world_generator.py) of several
+sizes. Every benchmark runs in its own process on a fresh copy of the world,
+so caches and earlier writes of one benchmark cannot influence the next. For
+each run the suite records:
+
+- seconds: Wall time of the measured call (setup is not included)
+- queries: Number of SQL statements of the measured call (query_stats.py)
+- peak_rss_mb: Peak resident memory of the benchmark process (including
+  imports and setup; not available on Windows without psutil)
+
+Results are compared against a stored baseline. A benchmark regresses when a
+value exceeds its baseline by more than the configured threshold (plus a small
+absolute tolerance against noise); the suite then exits with code 1.
+
+Usage:
+    python benchmarks.py --sizes small,medium --save-baseline
+    python benchmarks.py --sizes small,medium --threshold 0.2
+    python benchmarks.py --only simulate_match_day,api_players --repeat 3
+    python benchmarks.py --only world_build --sizes xlarge
+    python benchmarks.py --storage --sizes medium
+
+world_build generates the world of a size into an empty save; on the xlarge
+size it also checks that the world has at least 100k players.
+
+--storage measures the SQLite storage profiles (storage_profiles.py) instead:
+write throughput, read latency and read latency while another connection
+writes, compared with the legacy rollback journal.
+
+--performance-storage measures the classic and the compact performance
+tables (performance_storage.py) on the played worlds: bytes per row and
+bulk insert throughput.
+
+Generated worlds are cached in BENCHMARK_DIR (instance/benchmarks) together
+with the baseline file.
+
+MAIN FUNCTIONS:
+- run_benchmarks(sizes, names, repeat): Run the suite and return the results
+- compare_results(results, baseline, thresholds): Find regressions against a baseline
+- load_baseline(path) / save_baseline(path, results)
+- run_storage_benchmark(sizes): Throughput and latency per storage profile
+- run_performance_storage_benchmark(sizes): Bytes per row and insert throughput per performance format
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import db_manager
+from storage_profiles import PROFILES, apply_storage_profile, install_storage_profiles
+
+
+BENCHMARK_DIR = os.environ.get('BENCHMARK_DIR') or os.path.join(db_manager.get_database_dir(), 'benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# World sizes (parameters of world_generator.generate_world)
+WORLD_SIZES = {
+    'small': dict(levels=3, branching=2, teams_per_league=10, youth_levels=1),      # ~80 teams
+    'medium': dict(levels=5, branching=2, teams_per_league=10, youth_levels=2),     # ~340 teams
+    'large': dict(levels=6, branching=3, teams_per_league=10, youth_levels=2),      # ~3,700 teams
+    'xlarge': dict(levels=7, branching=3, teams_per_league=12),                     # ~13,000 teams, ~106k players
+}
+DEFAULT_SIZES = ('small', 'medium')
+WORLD_SEED = 42
+
+# Scale checked by world_build: the generated world must have at least this many players
+MIN_WORLD_PLAYERS = {
+    'xlarge': 100000
+}
+
+# Allowed relative increase per measured value before a benchmark counts as regressed
+DEFAULT_THRESHOLDS = {
+    'seconds': 0.20,
+    'queries': 0.10,
+    'peak_rss_mb': 0.25
+}
+
+# Absolute increases below these values are treated as noise
+MIN_DELTAS = {
+    'seconds': 0.05,
+    'queries': 5,
+    'peak_rss_mb': 10.0
+}
+
+# GET endpoints measured through the Flask test client ({league_id} etc. are
+# filled with IDs of the generated world)
+API_ENDPOINTS = {
+    'api_players': '/api/players',
+    'api_teams': '/api/teams',
+    'api_clubs': '/api/clubs',
+    'api_leagues': '/api/leagues',
+    'api_matches': '/api/matches',
+    'api_cups': '/api/cups',
+    'api_league_detail': '/api/leagues/{league_id}',
+    'api_club_detail': '/api/clubs/{club_id}',
+    'api_team_history': '/api/teams/{team_id}/history',
+}
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks (run inside the worker process, return the callable to measure)
+# ---------------------------------------------------------------------------
+
+def _current_season():
+    from models import Season
+    return Season.query.filter_by(is_current=True).first()
+
+
+def _setup_simulate_match_day():
+    from simulation import simulate_match_day
+    season = _current_season()
+    return lambda: simulate_match_day(season)
+
+
+def _setup_simulate_season():
+    from simulation import simulate_season
+    season = _current_season()
+    return lambda: simulate_season(season, create_new_season=False)
+
+
+def _setup_create_new_season():
+    from simulation import create_new_season
+    season = _current_season()
+    return lambda: create_new_season(season)
+
+
+def _setup_develop_all_players():
+    from player_development import develop_all_players
+    return develop_all_players
+
+
+def _setup_world_build(size, seed):
+    """Create the tables of the empty save; the world itself is generated in the measured call."""
+    from models import db
+    from storage_profiles import use_storage_profile
+    from world_generator import generate_world
+
+    db.create_all()
+
+    def build_world():
+        with use_storage_profile('bulk'):
+            summary = generate_world(seed=seed, **WORLD_SIZES[size])
+        if summary['players'] < MIN_WORLD_PLAYERS.get(size, 0):
+            raise RuntimeError(f"{size} world has only {summary['players']} players "
+                               f"(expected at least {MIN_WORLD_PLAYERS[size]})")
+        return summary
+
+    return build_world
+
+
+def _setup_batch_assign_players_to_teams():
+    """Prepare the availability of the first league match day like simulate_match_day does."""
+    from models import Match, Team
+    from performance_optimizations import batch_set_player_availability, CacheManager
+    from club_player_assignment import batch_assign_players_to_teams
+
+    season = _current_season()
+    matches = Match.query.filter_by(season_id=season.id, match_day=1).all()
+    team_ids = {team_id for match in matches for team_id in (match.home_team_id, match.away_team_id)}
+    teams = Team.query.filter(Team.id.in_(team_ids)).all()
+
+    clubs_with_matches = set()
+    teams_playing = {}
+    playing_teams_info = {}
+    for team in teams:
+        clubs_with_matches.add(team.club_id)
+        teams_playing[team.club_id] = teams_playing.get(team.club_id, 0) + 1
+        playing_teams_info.setdefault(team.club_id, []).append({
+            'id': team.id,
+            'name': team.name,
+            'league_level': team.league.level if team.league else 999
+        })
+    batch_set_player_availability(clubs_with_matches, teams_playing, playing_teams_info)
+
+    match_date = matches[0].match_date if matches else None
+    target_date = match_date.date() if hasattr(match_date, 'date') else match_date
+    return lambda: batch_assign_players_to_teams(clubs_with_matches, 1, season.id, CacheManager(),
+                                                 target_date=target_date)
+
+
+def _setup_api(path_template):
+    """Import the real app on the world copy and measure one cold GET request."""
+    from app import app
+    from models import League, Club, Team
+    from response_cache import clear_response_cache
+
+    with app.app_context():
+        ids = {
+            'league_id': League.query.order_by(League.level, League.id).first().id,
+            'club_id': Club.query.order_by(Club.id).first().id,
+            'team_id': Team.query.order_by(Team.id).first().id
+        }
+    path = path_template.format(**ids)
+    client = app.test_client()
+    clear_response_cache()
+
+    def request_endpoint():
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return len(response.get_data())
+
+    return request_endpoint
+
+
+BENCHMARKS = {
+    'simulate_match_day': {'setup': _setup_simulate_match_day},
+    'simulate_season': {'setup': _setup_simulate_season, 'saves_played_world': True},
+    'create_new_season': {'setup': _setup_create_new_season, 'world': 'played'},
+    'develop_all_players': {'setup': _setup_develop_all_players},
+    'batch_assign_players_to_teams': {'setup': _setup_batch_assign_players_to_teams},
+    'world_build': {'setup': _setup_world_build, 'world': 'empty'},
+}
+for _name, _path in API_ENDPOINTS.items():
+    BENCHMARKS[_name] = {'api_path': _path}
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB, or None if it cannot be determined."""
+    # Linux: ru_maxrss survives exec and would include the parent process, VmHWM does not
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory_info = psutil.Process().memory_info()
+        return round(getattr(memory_info, 'peak_wset', memory_info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def _benchmark_worker(name, db_path, results, verbose, size=None, seed=WORLD_SEED):
+    """Entry point of the benchmark process: set up, measure and report one benchmark."""
+    import numpy as np
+    from query_stats import install_query_events, start_collector, stop_collector
+
+    # Same random decisions in every run, so query counts are comparable
+    random.seed(WORLD_SEED)
+    np.random.seed(WORLD_SEED)
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    try:
+        with output:
+            spec = BENCHMARKS[name]
+            install_query_events()
+            install_storage_profiles('interactive')
+
+            if 'api_path' in spec:
+                os.environ['KEGELMANAGER_DB_PATH'] = db_path
+                measured = _setup_api(spec['api_path'])
+                context = contextlib.nullcontext()
+            else:
+                from flask import Flask
+                from models import db
+
+                worker_app = Flask(__name__)
+                worker_app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+                worker_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+                db.init_app(worker_app)
+                context = worker_app.app_context()
+
+            with context:
+                if spec.get('world') == 'empty':
+                    measured = spec['setup'](size, seed)
+                elif 'api_path' not in spec:
+                    measured = spec['setup']()
+
+                collector = start_collector('benchmark', name)
+                start_time = time.perf_counter()
+                measured()
+                seconds = time.perf_counter() - start_time
+                stop_collector(collector)
+
+                if 'api_path' not in spec:
+                    # Checkpoint the WAL into the world copy (reused as played world)
+                    db.session.remove()
+                    db.engine.dispose()
+
+        results.put({
+            'seconds': round(seconds, 4),
+            'queries': collector.count,
+            'peak_rss_mb': _peak_rss_mb()
+        })
+    except Exception as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _run_in_worker(name, db_path, verbose=False, size=None, seed=WORLD_SEED):
+    """Run one benchmark in a fresh process and return its measurement."""
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    process = ctx.Process(target=_benchmark_worker, args=(name, db_path, results, verbose, size, seed))
+    process.start()
+    process.join()
+    if results.empty():
+        return {'error': f"Benchmark process exited with code {process.exitcode}"}
+    return results.get()
+
+
+# ---------------------------------------------------------------------------
+# Worlds
+# ---------------------------------------------------------------------------
+
+def _world_path(size, seed, variant=None):
+    options = json.dumps(WORLD_SIZES[size], sort_keys=True)
+    digest = hashlib.sha1(f"{options}-{seed}".encode('utf-8')).hexdigest()[:8]
+    suffix = f"_{variant}" if variant else ''
+    return os.path.join(BENCHMARK_DIR, f"world_{size}_{seed}_{digest}{suffix}.db")
+
+
+def get_world(size, seed=WORLD_SEED, verbose=False):
+    """
+    Get the cached world of a size, generating it on first use.
+
+    Returns:
+        str: Path of the world database (never modified by benchmarks)
+    """
+    path = _world_path(size, seed)
+    if not os.path.exists(path):
+        from world_generator import create_world_database
+
+        print(f"Generating {size} benchmark world (seed {seed})...")
+        temp_path = path + '.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+        with output:
+            summary = create_world_database(temp_path, seed=seed, **WORLD_SIZES[size])
+        os.replace(temp_path, path)
+        print(f"  {summary['teams']} teams, {summary['players']} players, {summary['matches']} matches")
+    return path
+
+
+def get_played_world(size, seed=WORLD_SEED, verbose=False):
+    """Get the cached world with a completely simulated season (start of create_new_season)."""
+    path = _world_path(size, seed, 'played')
+    if not os.path.exists(path):
+        print(f"Simulating a season for the {size} benchmark world...")
+        _run_benchmark_on_copy('simulate_season', size, seed, verbose)
+        if not os.path.exists(path):
+            raise RuntimeError(f"Could not prepare the played {size} world")
+    return path
+
+
+def _run_benchmark_on_copy(name, size, seed, verbose=False):
+    spec = BENCHMARKS[name]
+    if spec.get('world') == 'empty':
+        with tempfile.TemporaryDirectory(prefix='kegelmanager_bench_') as directory:
+            return _run_in_worker(name, os.path.join(directory, 'world.db'), verbose, size, seed)
+
+    source = get_played_world(size, seed, verbose) if spec.get('world') == 'played' else get_world(size, seed, verbose)
+
+    with tempfile.TemporaryDirectory(prefix='kegelmanager_bench_') as directory:
+        db_path = os.path.join(directory, 'world.db')
+        shutil.copyfile(source, db_path)
+        measurement = _run_in_worker(name, db_path, verbose)
+
+        played_path = _world_path(size, seed, 'played')
+        if spec.get('saves_played_world') and 'error' not in measurement and not os.path.exists(played_path):
+            shutil.copyfile(db_path, played_path)
+    return measurement
+
+
+# ---------------------------------------------------------------------------
+# Suite, baseline and comparison
+# ---------------------------------------------------------------------------
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, repeat=1, seed=WORLD_SEED, verbose=False):
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes: World sizes (keys of WORLD_SIZES)
+        names: Benchmark names (default: all)
+        repeat: Runs per benchmark; the fastest run and the lowest memory peak are kept
+        seed: Seed of the generated worlds
+        verbose: Show the output of the benchmarked code
+
+    Returns:
+        dict: size -> benchmark name -> measurement
+    """
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    names = list(names or BENCHMARKS)
+    results = {}
+
+    for size in sizes:
+        results[size] = {}
+        for name in names:
+            runs = [_run_benchmark_on_copy(name, size, seed, verbose) for _ in range(max(1, repeat))]
+            errors = [run['error'] for run in runs if 'error' in run]
+            if errors:
+                measurement = {'error': errors[0]}
+                print(f"  {size:<7} {name:<32} ERROR {errors[0]}")
+            else:
+                memory_values = [run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None]
+                measurement = {
+                    'seconds': min(run['seconds'] for run in runs),
+                    'queries': runs[-1]['queries'],
+                    'peak_rss_mb': min(memory_values) if memory_values else None
+                }
+                print(f"  {size:<7} {name:<32} {measurement['seconds']:>9.3f} s "
+                      f"{measurement['queries']:>8} queries {measurement['peak_rss_mb'] or '-':>8} MB")
+            results[size][name] = measurement
+
+    return results
+
+
+def compare_results(results, baseline, thresholds=None):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Results of run_benchmarks()
+        baseline: Baseline results (same structure)
+        thresholds: Allowed relative increase per value (default: DEFAULT_THRESHOLDS)
+
+    Returns:
+        list: Regressions as dicts (size, benchmark, metric, baseline, current, change)
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    regressions = []
+
+    for size, benchmarks in results.items():
+        for name, current in benchmarks.items():
+            previous = baseline.get(size, {}).get(name)
+            if not previous or 'error' in previous or 'error' in current:
+                continue
+            for metric, threshold in thresholds.items():
+                old_value = previous.get(metric)
+                new_value = current.get(metric)
+                if old_value is None or new_value is None:
+                    continue
+                if new_value - old_value <= MIN_DELTAS[metric]:
+                    continue
+                if new_value > old_value * (1 + threshold):
+                    regressions.append({
+                        'size': size,
+                        'benchmark': name,
+                        'metric': metric,
+                        'baseline': old_value,
+                        'current': new_value,
+                        'change': round(new_value / old_value - 1, 3) if old_value else None
+                    })
+
+    return regressions
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    """Load the baseline results, or None if there is no baseline yet."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    """Store results as baseline, merged into an existing baseline file."""
+    merged = load_baseline(path) or {}
+    for size, benchmarks in results.items():
+        merged.setdefault(size, {}).update(
+            {name: measurement for name, measurement in benchmarks.items() if 'error' not in measurement}
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': merged
+        }, f, indent=2, sort_keys=True)
+    print(f"Baseline written to {path}")
+
+
+# ---------------------------------------------------------------------------
+# Storage profiles
+# ---------------------------------------------------------------------------
+
+# Reference without storage profile: rollback journal with SQLite defaults
+LEGACY_STORAGE = 'rollback'
+
+STORAGE_WRITE_TRANSACTIONS = 40
+STORAGE_ROWS_PER_TRANSACTION = 250
+STORAGE_READS = 400
+
+STORAGE_READ_QUERIES = (
+    ("SELECT * FROM player WHERE id = ?", 'player'),
+    ("SELECT * FROM match WHERE league_id = ? ORDER BY match_day", 'league'),
+    ("SELECT club_id, COUNT(*), AVG(strength) FROM player GROUP BY club_id", None),
+    ("SELECT t.id, COUNT(pt.player_id) FROM team t JOIN player_team pt ON pt.team_id = t.id GROUP BY t.id", None),
+)
+
+
+def _storage_connect(db_path, profile):
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    if profile == LEGACY_STORAGE:
+        connection.execute("PRAGMA journal_mode = DELETE")
+    else:
+        apply_storage_profile(connection, profile, include_base=True)
+    return connection
+
+
+def _write_transaction(connection, player_ids, value):
+    connection.execute("BEGIN IMMEDIATE")
+    connection.executemany(
+        "UPDATE player SET is_available_current_matchday = ? WHERE id = ?",
+        [(value, player_id) for player_id in player_ids]
+    )
+    connection.execute("COMMIT")
+
+
+def _read_latencies(connection, ids, count, rng):
+    latencies = []
+    for index in range(count):
+        statement, id_kind = STORAGE_READ_QUERIES[index % len(STORAGE_READ_QUERIES)]
+        parameters = (rng.choice(ids[id_kind]),) if id_kind else ()
+        start_time = time.perf_counter()
+        connection.execute(statement, parameters).fetchall()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+
+def _latency_summary(prefix, latencies):
+    ordered = sorted(latencies)
+    return {
+        f'{prefix}_p50_ms': round(statistics.median(ordered), 3),
+        f'{prefix}_p95_ms': round(ordered[int(len(ordered) * 0.95) - 1], 3),
+        f'{prefix}_max_ms': round(ordered[-1], 3)
+    }
+
+
+def _measure_storage_profile(db_path, profile):
+    """Write throughput and read latencies (idle and under write load) of one profile."""
+    rng = random.Random(WORLD_SEED)
+    # Readers use the profile; writers use it too, except for the read-only analytics profile
+    writer_profile = 'interactive' if profile == 'analytics' else profile
+    writer = _storage_connect(db_path, writer_profile)
+    reader = _storage_connect(db_path, profile)
+
+    ids = {
+        'player': [row[0] for row in writer.execute("SELECT id FROM player")],
+        'league': [row[0] for row in writer.execute("SELECT id FROM league")]
+    }
+    batches = [
+        rng.sample(ids['player'], min(STORAGE_ROWS_PER_TRANSACTION, len(ids['player'])))
+        for _ in range(STORAGE_WRITE_TRANSACTIONS)
+    ]
+
+    result = {}
+    if profile != 'analytics':
+        start_time = time.perf_counter()
+        for index, batch in enumerate(batches):
+            _write_transaction(writer, batch, index % 2)
+        seconds = time.perf_counter() - start_time
+        result['write_rows_per_s'] = round(sum(len(batch) for batch in batches) / seconds)
+        result['commit_ms_avg'] = round(seconds * 1000 / len(batches), 3)
+
+    # Warm up the page cache, then measure idle reads
+    _read_latencies(reader, ids, len(STORAGE_READ_QUERIES) * 5, rng)
+    result.update(_latency_summary('read', _read_latencies(reader, ids, STORAGE_READS, rng)))
+
+    # Reads while another connection keeps writing (UI during a simulation)
+    stop_event = threading.Event()
+
+    def keep_writing():
+        index = 0
+        while not stop_event.is_set():
+            _write_transaction(writer, batches[index % len(batches)], index % 2)
+            index += 1
+
+    write_thread = threading.Thread(target=keep_writing, daemon=True)
+    write_thread.start()
+    try:
+        result.update(_latency_summary('contended_read', _read_latencies(reader, ids, STORAGE_READS, rng)))
+    finally:
+        stop_event.set()
+        write_thread.join()
+        reader.close()
+        writer.close()
+    return result
+
+
+def run_storage_benchmark(sizes=DEFAULT_SIZES, profiles=None, seed=WORLD_SEED, verbose=False):
+    """
+    Measure the storage profiles on generated worlds.
+
+    Every profile runs on its own copy of the world (the journal mode is stored in the file).
+
+    Args:
+        sizes: World sizes (keys of WORLD_SIZES)
+        profiles: Profiles to measure (default: legacy rollback journal and all PROFILES)
+        seed: Seed of the generated worlds
+        verbose: Show the output of the world generator
+
+    Returns:
+        dict: size -> profile -> measurements
+    """
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    profiles = list(profiles or [LEGACY_STORAGE, *PROFILES])
+    results = {}
+
+    for size in sizes:
+        source = get_world(size, seed, verbose)
+        results[size] = {}
+        for profile in profiles:
+            with tempfile.TemporaryDirectory(prefix='kegelmanager_storage_') as directory:
+                db_path = os.path.join(directory, 'world.db')
+                shutil.copyfile(source, db_path)
+                measurement = _measure_storage_profile(db_path, profile)
+            results[size][profile] = measurement
+            write = measurement.get('write_rows_per_s')
+            print(f"  {size:<7} {profile:<12} "
+                  f"write {write if write is not None else '-':>8} rows/s  "
+                  f"read p50/p95 {measurement['read_p50_ms']:.3f}/{measurement['read_p95_ms']:.3f} ms  "
+                  f"under write load p50/p95/max {measurement['contended_read_p50_ms']:.3f}/"
+                  f"{measurement['contended_read_p95_ms']:.3f}/{measurement['contended_read_max_ms']:.3f} ms")
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Performance storage formats
+# ---------------------------------------------------------------------------
+
+PERFORMANCE_INSERT_ROWS = 20000
+
+
+def run_performance_storage_benchmark(sizes=DEFAULT_SIZES, seed=WORLD_SEED, verbose=False):
+    """
+    Measure the classic and the compact performance tables on the played worlds.
+
+    Returns:
+        dict: size -> storage format -> measurements (see measure_performance_storage)
+    """
+    from performance_storage import measure_performance_storage
+
+    os.makedirs(BENCHMARK_DIR, exist_ok=True)
+    results = {}
+    for size in sizes:
+        source = get_played_world(size, seed, verbose)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+        with output:
+            results[size] = measure_performance_storage(source, PERFORMANCE_INSERT_ROWS)
+        for storage, measurement in results[size].items():
+            print(f"  {size:<7} {storage:<8} {measurement['rows']:>8} rows  "
+                  f"{measurement['bytes_per_row']} bytes/row (+{measurement['index_bytes_per_row']} index)  "
+                  f"file {measurement['file_bytes'] / 1048576:.1f} MB  "
+                  f"insert {measurement.get('insert_rows_per_s', '-')} rows/s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Kegelmanager benchmark suite.")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help=f"World sizes ({', '.join(WORLD_SIZES)})")
+    parser.add_argument('--only', help=f"Comma-separated benchmarks ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per benchmark (fastest run counts)")
+    parser.add_argument('--seed', type=int, default=WORLD_SEED)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store the results as new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLDS['seconds'],
+                        help="Allowed relative wall time increase (0.2 = 20%%)")
+    parser.add_argument('--query-threshold', type=float, default=DEFAULT_THRESHOLDS['queries'])
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_THRESHOLDS['peak_rss_mb'])
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show the output of the benchmarked code")
+    parser.add_argument('--storage', action='store_true', help="Measure the SQLite storage profiles instead")
+    parser.add_argument('--performance-storage', action='store_true',
+                        help="Measure the classic and compact performance tables instead")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    names = [name.strip() for name in args.only.split(',')] if args.only else None
+    unknown = [size for size in sizes if size not in WORLD_SIZES] + [name for name in names or [] if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown sizes/benchmarks: {', '.join(unknown)}")
+
+    if args.storage or args.performance_storage:
+        run_storage = run_performance_storage_benchmark if args.performance_storage else run_storage_benchmark
+        storage_results = run_storage(sizes, seed=args.seed, verbose=args.verbose)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(storage_results, f, indent=2, sort_keys=True)
+        return 0
+
+    results = run_benchmarks(sizes, names, args.repeat, args.seed, args.verbose)
+    failed = [f"{size}/{name}" for size, benchmarks in results.items()
+              for name, measurement in benchmarks.items() if 'error' in measurement]
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}")
+    else:
+        regressions = compare_results(results, baseline, {
+            'seconds': args.threshold,
+            'queries': args.query_threshold,
+            'peak_rss_mb': args.memory_threshold
+        })
+        for regression in regressions:
+            print(f"REGRESSION {regression['size']}/{regression['benchmark']} {regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']} (+{regression['change']:.0%})")
+        if not regressions:
+            print("No regressions against the baseline")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+
+    if failed:
+        print(f"Failed benchmarks: {', '.join(failed)}")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,10 @@ import os
 from typing import Any, Dict, Optional
 
 
+# Marks keys that are not in the configuration
+_MISSING = object()
+
+
 class GameConfig:
     """
     Game configuration manager.
@@ -19,6 +23,7 @@ class GameConfig:
     
     _instance = None
     _config = None
+    _values = {}  # key_path -> resolved value (or _MISSING), reset when the config is (re)loaded
     
     def __new__(cls):
         """Singleton pattern to ensure only one config instance exists."""
@@ -43,6 +48,7 @@ class GameConfig:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             config_path = os.path.join(script_dir, 'game_config.json')
         
+        self._values = {}
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 self._config = json.load(f)
@@ -83,16 +89,19 @@ class GameConfig:
         if self._config is None:
             self.load_config()
         
-        keys = key_path.split('.')
-        value = self._config
-        
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
+        # Hot paths (e.g. player generation) read the same keys hundreds of thousands of times
+        value = self._values.get(key_path)
+        if value is None:
+            value = self._config
+            for key in key_path.split('.'):
+                if isinstance(value, dict) and key in value:
+                    value = value[key]
+                else:
+                    value = _MISSING
+                    break
+            self._values[key_path] = value
         
-        return value
+        return default if value is _MISSING else value
     
     def get_section(self, section: str) -> Dict:
         """
@@ -0,0 +1,509 @@
+"""
+Set-based cup engine for the bowling simulation.
+
+Instead of processing one cup at a time (COUNT query, loading matches, one
+Team.query.get per winner, one CupMatch insert per pairing), this module
+handles all cups of a season together:
+
+- one grouped query finds every cup whose current round is complete
+- one join collects the winners of those rounds
+- the next-round pairings are drawn in memory
+- all new CupMatch rows are written with a single bulk insert
+
+The same approach is used at season setup: eligible teams for all cups are
+resolved with one query, brackets and byes are computed in memory and all
+first-round matches are bulk-inserted.
+
+MAIN FUNCTIONS:
+- initialize_season_cups(season_id): Create all cups of a season with their first round
+- reschedule_cup_match_days(season_id): Map all cup rounds onto the season calendar
+- advance_cup_rounds(season_id, cup_ids=None): Advance all cups with a completed round
+- load_cup_calendar(season_id): Cached CUP_DAY numbers and dates for a season
+- compute_cup_match_day(...): Pure version of Cup.calculate_cup_match_day
+"""
+
+import math
+import random
+from sqlalchemy import text
+from models import db, Cup, CupMatch, League, SeasonCalendar, Team
+
+
+# Offset per cup type so that different cup types start on different CUP_DAYs
+CUP_TYPE_DAY_OFFSETS = {
+    "DKBC": 0,         # DKBC-Pokal startet bei den ersten CUP_DAYs
+    "Landespokal": 1,  # Landespokal startet einen CUP_DAY später
+    "Kreispokal": 2    # Kreispokal startet zwei CUP_DAYs später
+}
+
+
+def load_cup_calendar(season_id):
+    """
+    Load the CUP_DAYs of a season with a single query.
+
+    Args:
+        season_id: The season ID
+
+    Returns:
+        tuple: (ordered list of cup match day numbers, dict cup match day -> calendar date)
+    """
+    rows = db.session.query(
+        SeasonCalendar.match_day_number,
+        SeasonCalendar.calendar_date
+    ).filter(
+        SeasonCalendar.season_id == season_id,
+        SeasonCalendar.day_type == 'CUP_DAY',
+        SeasonCalendar.match_day_number.isnot(None)
+    ).order_by(SeasonCalendar.id).all()
+
+    cup_days = [row.match_day_number for row in rows]
+    cup_day_to_date = {row.match_day_number: row.calendar_date for row in rows}
+    return cup_days, cup_day_to_date
+
+
+def compute_cup_match_day(cup_type, cup_id, round_number, total_rounds, cup_days):
+    """
+    Calculate the cup match day for a round without touching the database.
+
+    Args:
+        cup_type: "DKBC", "Landespokal" or "Kreispokal"
+        cup_id: The cup ID (used to spread several cups of the same type)
+        round_number: The round to schedule
+        total_rounds: Total number of rounds of the cup
+        cup_days: Ordered list of available cup match day numbers
+
+    Returns:
+        int: The cup match day number (falls back to round_number without cup days)
+    """
+    if not cup_days:
+        return round_number
+
+    # Zusätzlicher Offset basierend auf der Cup-ID für mehrere Pokale desselben Typs
+    total_offset = CUP_TYPE_DAY_OFFSETS.get(cup_type, 0) + (cup_id % 3) * 3
+
+    if total_rounds == 1:
+        return cup_days[total_offset % len(cup_days)]
+
+    return cup_days[(round_number - 1 + total_offset) % len(cup_days)]
+
+
+def get_cup_eligibility_key(bundesland, landkreis):
+    """
+    Get the cup a team is eligible for, based on its league's region.
+
+    Mirrors Cup.get_eligible_teams: leagues with a Landkreis play the Kreispokal,
+    leagues with only a Bundesland the Landespokal, all others the DKBC-Pokal.
+
+    Returns:
+        tuple: (cup_type, region) where region is the Landkreis, Bundesland or None
+    """
+    if landkreis:
+        return ("Kreispokal", landkreis)
+    if bundesland:
+        return ("Landespokal", bundesland)
+    return ("DKBC", None)
+
+
+def resolve_eligible_teams(season_id):
+    """
+    Resolve the eligible teams of all cups of a season with a single query.
+
+    Args:
+        season_id: The season ID
+
+    Returns:
+        dict: (cup_type, region) -> list of team IDs
+    """
+    rows = db.session.query(
+        Team.id,
+        League.bundesland,
+        League.landkreis
+    ).join(
+        League, Team.league_id == League.id
+    ).filter(
+        League.season_id == season_id
+    ).order_by(Team.id).all()
+
+    eligible = {}
+    for team_id, bundesland, landkreis in rows:
+        key = get_cup_eligibility_key(bundesland, landkreis)
+        eligible.setdefault(key, []).append(team_id)
+
+    return eligible
+
+
+def build_first_round(team_ids):
+    """
+    Draw the first round of a knockout cup, including byes.
+
+    The number of byes fills the field up to the next power of two, so that
+    from the second round on every round has an even number of teams.
+
+    Args:
+        team_ids: List of eligible team IDs
+
+    Returns:
+        tuple: (total_rounds, list of (home_team_id, away_team_id), list of bye team IDs)
+    """
+    next_power_of_2 = 2 ** math.ceil(math.log2(len(team_ids)))
+    total_rounds = int(math.log2(next_power_of_2))
+
+    teams = list(team_ids)
+    random.shuffle(teams)
+
+    num_byes = next_power_of_2 - len(teams)
+    num_first_round_matches = (len(teams) - num_byes) // 2
+    playing = num_first_round_matches * 2
+
+    pairings = [(teams[i], teams[i + 1]) for i in range(0, playing, 2)]
+    byes = teams[playing:]
+    return total_rounds, pairings, byes
+
+
+def create_first_round_fixtures(cups, eligible_by_cup, cup_days):
+    """
+    Create the first round of several cups and bulk-insert all matches.
+
+    Args:
+        cups: Cup objects that already have an ID
+        eligible_by_cup: dict cup_id -> list of eligible team IDs
+        cup_days: Ordered list of cup match day numbers (may be empty)
+
+    Returns:
+        int: Number of CupMatch rows created (byes included)
+    """
+    rows = []
+
+    for cup in cups:
+        team_ids = eligible_by_cup.get(cup.id, [])
+        if len(team_ids) < 2:
+            continue
+
+        total_rounds, pairings, byes = build_first_round(team_ids)
+        round_name = cup.get_round_name(1, total_rounds)
+        cup_match_day = compute_cup_match_day(cup.cup_type, cup.id, 1, total_rounds, cup_days)
+
+        print(f"Cup {cup.name}: {len(team_ids)} Teams, {len(byes)} Freilose, {len(pairings)} Spiele in Runde 1")
+
+        for home_team_id, away_team_id in pairings:
+            rows.append({
+                'cup_id': cup.id,
+                'home_team_id': home_team_id,
+                'away_team_id': away_team_id,
+                'round_name': round_name,
+                'round_number': 1,
+                'cup_match_day': cup_match_day,
+                'is_played': False
+            })
+
+        # Freilose werden als bereits gewonnene Spiele ohne Gegner angelegt
+        for team_id in byes:
+            rows.append({
+                'cup_id': cup.id,
+                'home_team_id': team_id,
+                'away_team_id': None,
+                'round_name': round_name,
+                'round_number': 1,
+                'cup_match_day': cup_match_day,
+                'is_played': True,
+                'winner_team_id': team_id,
+                'home_score': 0,
+                'away_score': 0
+            })
+
+        cup.total_rounds = total_rounds
+        cup.current_round = round_name
+        cup.current_round_number = 1
+
+    if rows:
+        db.session.bulk_insert_mappings(CupMatch, rows)
+
+    return len(rows)
+
+
+def initialize_season_cups(season_id):
+    """
+    Create all cups of a season and generate their first round in one pass.
+
+    Creates the DKBC-Pokal, one Landespokal per Bundesland and one Kreispokal
+    per Landkreis. Does nothing if the season already has cups.
+
+    Args:
+        season_id: The season ID
+
+    Returns:
+        list: The created Cup objects
+    """
+    existing_cups = Cup.query.filter_by(season_id=season_id).count()
+    if existing_cups > 0:
+        print(f"Cups already exist for season {season_id} ({existing_cups} cups found), skipping initialization")
+        return []
+
+    try:
+        league_regions = db.session.query(
+            League.bundesland,
+            League.landkreis
+        ).filter(
+            League.season_id == season_id
+        ).order_by(League.id).all()
+
+        # Regionen in der Reihenfolge ihres ersten Auftretens sammeln
+        bundeslaender = []
+        landkreis_to_bundesland = {}
+        for bundesland, landkreis in league_regions:
+            if bundesland and bundesland not in bundeslaender:
+                bundeslaender.append(bundesland)
+            if landkreis and landkreis not in landkreis_to_bundesland:
+                landkreis_to_bundesland[landkreis] = bundesland
+
+        created_cups = [Cup(name="DKBC-Pokal", cup_type="DKBC", season_id=season_id)]
+        for bundesland in bundeslaender:
+            created_cups.append(Cup(
+                name=f"{bundesland}-Pokal",
+                cup_type="Landespokal",
+                season_id=season_id,
+                bundesland=bundesland
+            ))
+        for landkreis, bundesland in landkreis_to_bundesland.items():
+            created_cups.append(Cup(
+                name=f"Landkreis {landkreis}-Pokal",
+                cup_type="Kreispokal",
+                season_id=season_id,
+                bundesland=bundesland,
+                landkreis=landkreis
+            ))
+
+        db.session.add_all(created_cups)
+        db.session.flush()  # Cup-IDs werden für die Spieltagsverteilung benötigt
+
+        eligible = resolve_eligible_teams(season_id)
+        eligible_by_cup = {
+            cup.id: eligible.get((cup.cup_type, cup.landkreis if cup.cup_type == "Kreispokal" else cup.bundesland), [])
+            for cup in created_cups
+        }
+
+        cup_days, _ = load_cup_calendar(season_id)
+        matches_created = create_first_round_fixtures(created_cups, eligible_by_cup, cup_days)
+
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error initializing cups: {str(e)}")
+        raise
+
+    print(f"Auto-initialized {len(created_cups)} cups for season {season_id} with {matches_created} first-round matches")
+    return created_cups
+
+
+def reschedule_cup_match_days(season_id):
+    """
+    Recalculate the cup match day of every cup match of a season.
+
+    Used once the season calendar exists. The CUP_DAY list is loaded once and
+    all changed matches are written with one bulk update.
+
+    Args:
+        season_id: The season ID
+
+    Returns:
+        int: Number of cup matches whose match day changed
+    """
+    cup_days, _ = load_cup_calendar(season_id)
+
+    rows = db.session.query(
+        CupMatch.id,
+        CupMatch.round_number,
+        CupMatch.cup_match_day,
+        Cup.id,
+        Cup.cup_type,
+        Cup.total_rounds
+    ).join(
+        Cup, CupMatch.cup_id == Cup.id
+    ).filter(
+        Cup.season_id == season_id
+    ).all()
+
+    updates = []
+    for match_id, round_number, cup_match_day, cup_id, cup_type, total_rounds in rows:
+        new_cup_match_day = compute_cup_match_day(cup_type, cup_id, round_number, total_rounds, cup_days)
+        if new_cup_match_day != cup_match_day:
+            updates.append({'id': match_id, 'cup_match_day': new_cup_match_day})
+
+    try:
+        if updates:
+            db.session.bulk_update_mappings(CupMatch, updates)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error rescheduling cup match days: {str(e)}")
+        raise
+
+    print(f"Rescheduled {len(updates)} of {len(rows)} cup matches onto the season calendar")
+    return len(updates)
+
+
+def find_completed_cup_rounds(season_id, cup_ids=None):
+    """
+    Find all active cups whose current round has been fully played.
+
+    Args:
+        season_id: The season ID
+        cup_ids: Optional iterable restricting the check to these cups
+
+    Returns:
+        list: IDs of cups whose current round is complete
+    """
+    query = """
+        SELECT c.id
+        FROM cup c
+        JOIN cup_match cm
+            ON cm.cup_id = c.id
+            AND cm.round_number = c.current_round_number
+        WHERE c.season_id = :season_id
+            AND c.is_active = 1
+        GROUP BY c.id
+        HAVING COUNT(cm.id) > 0
+            AND SUM(CASE WHEN cm.is_played = 1 THEN 1 ELSE 0 END) = COUNT(cm.id)
+    """
+    rows = db.session.execute(text(query), {"season_id": season_id}).fetchall()
+    completed = [row[0] for row in rows]
+
+    if cup_ids is not None:
+        wanted = set(cup_ids)
+        completed = [cup_id for cup_id in completed if cup_id in wanted]
+
+    return completed
+
+
+def collect_round_winners(cup_ids):
+    """
+    Collect the winners of the current round of the given cups with one join.
+
+    Args:
+        cup_ids: IDs of cups whose current round is complete
+
+    Returns:
+        dict: cup_id -> list of winner team IDs (byes included)
+    """
+    winners = {cup_id: [] for cup_id in cup_ids}
+    if not cup_ids:
+        return winners
+
+    rows = db.session.query(
+        CupMatch.cup_id,
+        CupMatch.winner_team_id
+    ).join(
+        Cup, CupMatch.cup_id == Cup.id
+    ).filter(
+        Cup.id.in_(cup_ids),
+        CupMatch.round_number == Cup.current_round_number,
+        CupMatch.is_played == True,
+        CupMatch.winner_team_id.isnot(None)
+    ).order_by(CupMatch.cup_id, CupMatch.id).all()
+
+    for cup_id, winner_team_id in rows:
+        winners[cup_id].append(winner_team_id)
+
+    return winners
+
+
+def draw_pairings(team_ids):
+    """
+    Shuffle the teams and pair them up for the next round.
+
+    Args:
+        team_ids: List of team IDs that advanced
+
+    Returns:
+        list: List of (home_team_id, away_team_id) tuples
+    """
+    teams = list(team_ids)
+
+    # Nach der ersten Runde sollte die Anzahl immer gerade sein
+    if len(teams) % 2 != 0:
+        teams = teams[:-1]
+
+    random.shuffle(teams)
+    return [(teams[i], teams[i + 1]) for i in range(0, len(teams) - 1, 2)]
+
+
+def advance_cup_rounds(season_id, cup_ids=None):
+    """
+    Advance every cup of a season whose current round is complete.
+
+    Finished finals deactivate their cup. All other completed cups get their
+    next round drawn in memory and inserted with one bulk insert.
+
+    Args:
+        season_id: The season ID
+        cup_ids: Optional iterable restricting advancement to these cups
+
+    Returns:
+        dict: {'advanced': [cup IDs], 'finished': [cup IDs], 'matches_created': int}
+    """
+    summary = {'advanced': [], 'finished': [], 'matches_created': 0}
+
+    completed_ids = find_completed_cup_rounds(season_id, cup_ids)
+    if not completed_ids:
+        return summary
+
+    try:
+        cups = Cup.query.filter(Cup.id.in_(completed_ids)).all()
+
+        # Finals that are done end the cup; the rest need winners for the next round
+        advancing_cups = []
+        for cup in cups:
+            if cup.current_round_number >= cup.total_rounds:
+                cup.is_active = False
+                summary['finished'].append(cup.id)
+            else:
+                advancing_cups.append(cup)
+
+        winners_by_cup = collect_round_winners([cup.id for cup in advancing_cups])
+        cup_days, cup_day_to_date = load_cup_calendar(season_id)
+
+        new_matches = []
+        for cup in advancing_cups:
+            pairings = draw_pairings(winners_by_cup.get(cup.id, []))
+            if not pairings:
+                print(f"ERROR: Cup {cup.name} - No teams for next round!")
+                continue
+
+            next_round_number = cup.current_round_number + 1
+            next_round_name = cup.get_round_name(next_round_number, cup.total_rounds)
+            cup_match_day = compute_cup_match_day(
+                cup.cup_type, cup.id, next_round_number, cup.total_rounds, cup_days
+            )
+
+            for home_team_id, away_team_id in pairings:
+                new_matches.append({
+                    'cup_id': cup.id,
+                    'home_team_id': home_team_id,
+                    'away_team_id': away_team_id,
+                    'round_name': next_round_name,
+                    'round_number': next_round_number,
+                    'cup_match_day': cup_match_day,
+                    'match_date': cup_day_to_date.get(cup_match_day),
+                    'is_played': False
+                })
+
+            cup.current_round = next_round_name
+            cup.current_round_number = next_round_number
+            summary['advanced'].append(cup.id)
+
+        if new_matches:
+            db.session.bulk_insert_mappings(CupMatch, new_matches)
+        summary['matches_created'] = len(new_matches)
+
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error advancing cup rounds: {str(e)}")
+        raise
+
+    if summary['advanced'] or summary['finished']:
+        print(f"Cup advancement: {len(summary['advanced'])} cups advanced, "
+              f"{len(summary['finished'])} cups finished, {summary['matches_created']} matches created")
+
+    return summary
@@ -4,6 +4,7 @@ import glob
 import shutil
 from datetime import datetime
 from flask import current_app
+import save_metadata
 
 def get_database_dir():
     """Get the directory where databases are stored."""
@@ -35,26 +36,9 @@ def list_databases():
         # Get database size in MB
         size_mb = round(stats.st_size / (1024 * 1024), 2)
 
-        # Try to get some basic info from the database
+        # Season and counts come from the metadata sidecar, the save is only opened if it changed
         try:
-            conn = sqlite3.connect(db_file)
-            cursor = conn.cursor()
-
-            # Get season info
-            cursor.execute("SELECT name FROM season WHERE is_current = 1")
-            season_row = cursor.fetchone()
-            current_season = season_row[0] if season_row else "Unbekannt"
-
-            # Get club count
-            cursor.execute("SELECT COUNT(*) FROM club")
-            club_count = cursor.fetchone()[0]
-
-            # Get player count
-            cursor.execute("SELECT COUNT(*) FROM player")
-            player_count = cursor.fetchone()[0]
-
-            conn.close()
-
+            metadata = save_metadata.get_save_metadata(db_file)
             status = "OK"
         except Exception as e:
             # Don't hide database errors with fallback values
@@ -66,9 +50,10 @@ def list_databases():
             "created": created,
             "modified": modified,
             "size_mb": size_mb,
-            "current_season": current_season,
-            "club_count": club_count,
-            "player_count": player_count,
+            "current_season": metadata['current_season'],
+            "club_count": metadata['club_count'],
+            "player_count": metadata['player_count'],
+            "last_simulated": metadata['last_simulated'],
             "status": status
         })
 
@@ -202,9 +187,13 @@ def delete_database(db_name):
     if not os.path.exists(db_path):
         return {"success": False, "message": f"Datenbank '{db_name}' existiert nicht."}
 
-    # Delete the database file
+    # Delete the database file (and the WAL files of an unclean shutdown)
     try:
         os.remove(db_path)
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        save_metadata.delete_save_metadata(db_path)
         return {"success": True, "message": f"Datenbank '{db_name}' wurde gelöscht."}
     except Exception as e:
         return {"success": False, "message": f"Fehler beim Löschen der Datenbank: {str(e)}"}
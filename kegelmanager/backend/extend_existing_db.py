@@ -962,20 +962,8 @@ def supplement_missing_data(analysis):
                 # Neuberechnung der Pokal-Spieltage nach Erstellung des Saisonkalenders
                 print("Neuberechnung der Pokal-Spieltage...")
                 try:
-                    from models import Cup, CupMatch
-                    cups = Cup.query.filter_by(season_id=season.id).all()
-
-                    for cup in cups:
-                        print(f"Neuberechnung der Spieltage für {cup.name}...")
-                        cup_matches = CupMatch.query.filter_by(cup_id=cup.id).all()
-
-                        for match in cup_matches:
-                            # Neuberechnung des Pokal-Spieltags mit der neuen Logik
-                            new_cup_match_day = cup.calculate_cup_match_day(match.round_number, cup.total_rounds)
-                            if new_cup_match_day != match.cup_match_day:
-                                match.cup_match_day = new_cup_match_day
-
-                        db.session.commit()
+                    from cup_engine import reschedule_cup_match_days
+                    reschedule_cup_match_days(season.id)
 
                     print("Pokal-Spieltage erfolgreich neuberechnet!")
                 except Exception as e:
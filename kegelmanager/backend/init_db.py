@@ -785,21 +785,8 @@ def create_sample_data(custom_app=None):
         # Recalculate cup match days now that season calendar exists
         print("Recalculating cup match days...")
         try:
-            from models import Cup, CupMatch
-            cups = Cup.query.filter_by(season_id=season.id).all()
-
-            for cup in cups:
-                print(f"Recalculating match days for {cup.name}...")
-                cup_matches = CupMatch.query.filter_by(cup_id=cup.id).all()
-
-                for match in cup_matches:
-                    # Recalculate cup match day using the new logic
-                    new_cup_match_day = cup.calculate_cup_match_day(match.round_number, cup.total_rounds)
-                    if new_cup_match_day != match.cup_match_day:
-
-                        match.cup_match_day = new_cup_match_day
-
-                db.session.commit()
+            from cup_engine import reschedule_cup_match_days
+            reschedule_cup_match_days(season.id)
 
         except Exception as e:
             print(f"Error recalculating cup match days: {str(e)}")
@@ -0,0 +1,446 @@
+"""
+Background jobs for long-running simulation and season transition work.
+
+Simulating a season or running create_new_season can take minutes and holds the
+SQLite write lock the whole time. Instead of running inside the Flask request,
+such work is submitted as a job and executed in a dedicated worker process with
+its own Flask app context. The HTTP layer only keeps the job records and stays
+responsive.
+
+Jobs run one at a time (SQLite has a single writer anyway); further jobs wait in
+a queue. The worker sends progress events (see progress.py) back through a
+multiprocessing queue, a dispatcher thread in the web process updates the job
+record that /api/jobs/<id> returns.
+
+Cancellation is cooperative: queued jobs are dropped immediately, running jobs
+stop at the next safe checkpoint (after a match day has been committed). A
+season transition, once started, always runs to the end so the save is never
+left half-transitioned.
+
+MAIN FUNCTIONS:
+- submit_job(job_type, params, database_uri): Queue a job and return its record
+- get_job(job_id) / list_jobs(): Job records for polling
+- cancel_job(job_id): Request cancellation
+- get_active_job(): The queued or running job, if any
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import deque, OrderedDict
+from datetime import datetime
+from progress import publish_progress
+from response_cache import bump_world_version
+from query_stats import record_phase_summary
+import metrics
+
+
+JOB_TYPES = ('simulate_match_day', 'simulate_season', 'season_transition')
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Progress events after which a running job may be cancelled safely
+CANCELLABLE_EVENTS = ('match_day_simulated', 'season_progress')
+
+# Progress events after which the worker has committed changes to the save
+WORLD_CHANGING_EVENTS = ('match_day_simulated', 'phase_end')
+
+# Number of finished jobs kept for polling
+MAX_FINISHED_JOBS = 50
+
+_jobs = OrderedDict()      # job_id -> job record
+_pending = deque()         # job_ids waiting for the worker
+_cancel_events = {}        # job_id -> multiprocessing.Event
+_lock = threading.Lock()
+_dispatcher = None
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+def _job_simulate_match_day():
+    """Simulate the next match day of the current season."""
+    import simulation
+    from models import Season
+    from save_metadata import record_simulation
+
+    season = Season.query.filter_by(is_current=True).first()
+    if not season:
+        raise ValueError("Keine aktuelle Saison gefunden")
+    result = simulation.simulate_match_day(season)
+    record_simulation()
+    return result
+
+
+def _job_simulate_season(season_id, create_new_season=True):
+    """Simulate all remaining match days of a season."""
+    import simulation
+    from models import db, Season
+
+    season = db.session.get(Season, season_id)
+    if not season:
+        raise ValueError(f"Saison {season_id} nicht gefunden")
+    return simulation.simulate_season(season, create_new_season=create_new_season)
+
+
+def _job_season_transition():
+    """Process the end of the current season and create the next one."""
+    import simulation
+    from models import Season
+
+    current_season = Season.query.filter_by(is_current=True).first()
+    if not current_season:
+        raise ValueError("Keine aktuelle Saison gefunden")
+
+    simulation.process_end_of_season(current_season)
+
+    new_season = Season.query.filter_by(is_current=True).first()
+    if not new_season or new_season.id == current_season.id:
+        raise RuntimeError("Fehler beim Erstellen der neuen Saison")
+
+    return {
+        "success": True,
+        "message": "Saisonwechsel erfolgreich durchgeführt",
+        "old_season": current_season.name,
+        "new_season": new_season.name,
+        "new_season_id": new_season.id
+    }
+
+
+JOB_HANDLERS = {
+    'simulate_match_day': _job_simulate_match_day,
+    'simulate_season': _job_simulate_season,
+    'season_transition': _job_season_transition
+}
+
+
+def _worker_main(job_id, job_type, params, database_uri, events, cancel_event, profile=False):
+    """
+    Entry point of the worker process: run one job in its own app context.
+
+    Args:
+        job_id: The job ID
+        job_type: One of JOB_TYPES
+        params: Keyword arguments for the job handler
+        database_uri: SQLAlchemy URI of the save to work on
+        events: multiprocessing.Queue for ('progress'|'completed'|'failed'|'cancelled', payload)
+        cancel_event: multiprocessing.Event set when cancellation is requested
+        profile: Record a profile of the job (see profiling.py)
+    """
+    from flask import Flask
+    from models import db
+    from progress import ProgressCancelled, add_progress_listener
+    from query_stats import install_phase_tracking, get_last_phase_summary
+    from profiling import Profiler
+    from storage_profiles import install_storage_profiles
+
+    # Same pragmas as the web process; the simulation itself switches to the bulk profile
+    install_storage_profiles('interactive')
+
+    worker_app = Flask(__name__)
+    worker_app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    worker_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(worker_app)
+
+    # Registered before forward_progress, so phase query counts are ready at phase_end
+    install_phase_tracking()
+    metrics.install_progress_metrics()
+
+    def forward_progress(event, data):
+        if event == 'phase_end':
+            data = {**data, 'query_stats': get_last_phase_summary(data.get('phase'))}
+        events.put(('progress', {'event': event, **data}))
+        if cancel_event.is_set() and event in CANCELLABLE_EVENTS:
+            raise ProgressCancelled()
+
+    with worker_app.app_context():
+        add_progress_listener(forward_progress)
+        profiler = Profiler(f"job {job_type}", kind='job').start() if profile else None
+        try:
+            if cancel_event.is_set():
+                raise ProgressCancelled()
+            result = JOB_HANDLERS[job_type](**params)
+            outcome = ('completed', result)
+        except ProgressCancelled:
+            db.session.rollback()
+            print(f"Job {job_id} cancelled")
+            outcome = ('cancelled', None)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job {job_id} failed: {str(e)}")
+            traceback.print_exc()
+            outcome = ('failed', str(e))
+
+        if profiler:
+            profile_id = profiler.stop(job_id=job_id, job_type=job_type, outcome=outcome[0])
+            events.put(('progress', {'event': 'profile_saved', 'profile_id': profile_id}))
+
+        # Closing the connections checkpoints the WAL of the worker into the save
+        db.session.remove()
+        db.engine.dispose()
+        events.put(outcome)
+
+
+# ---------------------------------------------------------------------------
+# Web process: job records and dispatcher
+# ---------------------------------------------------------------------------
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _update_job(job_id, **fields):
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job:
+            return
+        job.update(fields)
+        state = job['state']
+
+    if 'state' in fields:
+        publish_progress('job_state', {'job_id': job_id, 'state': state, 'error': fields.get('error')})
+
+
+def _apply_progress(job_id, payload):
+    """Fold a progress event into the job's progress summary."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job:
+            return
+        progress = job['progress']
+        event = payload.get('event')
+
+        if event == 'match_day_simulated':
+            progress['match_days_done'] = progress.get('match_days_done', 0) + 1
+            progress['matches_simulated'] = progress.get('matches_simulated', 0) + payload.get('matches_simulated', 0)
+            progress['last_match_day'] = payload.get('match_day')
+        elif event == 'season_progress':
+            progress['match_days_total'] = payload.get('match_days_total')
+        elif event == 'transition_step':
+            progress['transition_step'] = payload.get('step')
+            progress['transition_total_steps'] = payload.get('total_steps')
+            progress['transition_step_name'] = payload.get('name')
+        elif event == 'profile_saved':
+            job['profile_id'] = payload.get('profile_id')
+
+        progress['last_event'] = event
+        progress['updated_at'] = _now()
+
+    # Metrics of the worker's phases and match days are kept in the web process
+    metrics.record_progress_event(event, payload)
+
+    query_summary = payload.pop('query_stats', None)
+    if event == 'phase_end' and query_summary:
+        record_phase_summary(payload.get('phase'), query_summary)
+
+    # The worker committed changes: invalidate the response cache of the web process
+    if event in WORLD_CHANGING_EVENTS:
+        bump_world_version(f"job {job_id}: {event}")
+
+    # Forward the worker's event to the progress stream of the web process
+    data = {key: value for key, value in payload.items() if key != 'event'}
+    publish_progress(event, {**data, 'job_id': job_id})
+
+
+def _run_next_job(ctx):
+    """Start the next pending job and wait until its worker has finished."""
+    with _lock:
+        if not _pending:
+            return False
+        job_id = _pending.popleft()
+        job = _jobs[job_id]
+        job_type, params, database_uri, profile = job['type'], job['params'], job['database_uri'], job['profile']
+        cancel_event = _cancel_events[job_id]
+
+    _update_job(job_id, state=RUNNING, started_at=_now())
+
+    events = ctx.Queue()
+    process = ctx.Process(
+        target=_worker_main,
+        args=(job_id, job_type, params, database_uri, events, cancel_event, profile),
+        name=f"kegelmanager-job-{job_id}",
+        daemon=True
+    )
+    process.start()
+    print(f"Job {job_id} ({job_type}) started in worker process {process.pid}")
+
+    outcome = None
+    while outcome is None:
+        try:
+            kind, payload = events.get(timeout=0.5)
+        except queue.Empty:
+            if not process.is_alive():
+                outcome = (FAILED, None, f"Worker process exited with code {process.exitcode}")
+            continue
+
+        if kind == 'progress':
+            _apply_progress(job_id, payload)
+        elif kind == 'completed':
+            outcome = (COMPLETED, payload, None)
+        elif kind == 'cancelled':
+            outcome = (CANCELLED, None, None)
+        else:
+            outcome = (FAILED, None, payload)
+
+    process.join(timeout=10)
+    bump_world_version(f"job {job_id} finished")
+    state, result, error = outcome
+    _update_job(job_id, state=state, result=result, error=error, finished_at=_now())
+    with _lock:
+        _cancel_events.pop(job_id, None)
+    print(f"Job {job_id} ({job_type}) {state}")
+    return True
+
+
+def _dispatch_loop():
+    """Run pending jobs one after another; exits when the queue is empty."""
+    global _dispatcher
+    ctx = multiprocessing.get_context('spawn')
+    while True:
+        try:
+            started = _run_next_job(ctx)
+        except Exception as e:
+            print(f"Error in job dispatcher: {str(e)}")
+            traceback.print_exc()
+            time.sleep(1)
+            started = True
+
+        if not started:
+            with _lock:
+                if not _pending:
+                    _dispatcher = None
+                    return
+
+
+def _prune_finished_jobs():
+    """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS (caller holds _lock)."""
+    finished = [job_id for job_id, job in _jobs.items() if job['state'] in (COMPLETED, FAILED, CANCELLED)]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def _public_job(job, include_result=True):
+    """Copy of a job record without internal fields."""
+    data = {key: value for key, value in job.items() if key != 'database_uri'}
+    data['progress'] = dict(job['progress'])
+    if not include_result:
+        data.pop('result', None)
+    return data
+
+
+def submit_job(job_type, params=None, database_uri=None, profile=False):
+    """
+    Queue a job for the background worker.
+
+    Args:
+        job_type: One of JOB_TYPES
+        params: Keyword arguments for the job handler
+        database_uri: SQLAlchemy URI of the save to work on
+        profile: Record a profile of the job (its ID is stored as profile_id)
+
+    Returns:
+        dict: The job record
+    """
+    global _dispatcher
+
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+    if not database_uri:
+        raise ValueError("database_uri is required")
+
+    job_id = uuid.uuid4().hex[:12]
+    job = {
+        'id': job_id,
+        'type': job_type,
+        'params': params or {},
+        'database_uri': database_uri,
+        'state': QUEUED,
+        'progress': {},
+        'result': None,
+        'error': None,
+        'cancel_requested': False,
+        'profile': bool(profile),
+        'profile_id': None,
+        'created_at': _now(),
+        'started_at': None,
+        'finished_at': None
+    }
+
+    with _lock:
+        _prune_finished_jobs()
+        _jobs[job_id] = job
+        _cancel_events[job_id] = multiprocessing.get_context('spawn').Event()
+        _pending.append(job_id)
+        if _dispatcher is None:
+            _dispatcher = threading.Thread(target=_dispatch_loop, name="kegelmanager-job-dispatcher", daemon=True)
+            _dispatcher.start()
+
+        print(f"Job {job_id} ({job_type}) queued")
+        return _public_job(job)
+
+
+def get_job(job_id, include_result=True):
+    """Get the record of a job, or None if it is unknown."""
+    with _lock:
+        job = _jobs.get(job_id)
+        return _public_job(job, include_result) if job else None
+
+
+def list_jobs():
+    """Get the records of all known jobs (without results), newest first."""
+    with _lock:
+        return [_public_job(job, include_result=False) for job in reversed(_jobs.values())]
+
+
+def get_active_job():
+    """Get the queued or running job, if any."""
+    with _lock:
+        for job in _jobs.values():
+            if job['state'] in (QUEUED, RUNNING):
+                return _public_job(job, include_result=False)
+    return None
+
+
+def cancel_job(job_id):
+    """
+    Request cancellation of a job.
+
+    Queued jobs are cancelled immediately, running jobs stop at their next
+    safe checkpoint.
+
+    Args:
+        job_id: The job ID
+
+    Returns:
+        dict: The updated job record, or None if the job is unknown
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job:
+            return None
+
+        dropped = job['state'] == QUEUED
+        if dropped:
+            if job_id in _pending:
+                _pending.remove(job_id)
+            _cancel_events.pop(job_id, None)
+            job.update(state=CANCELLED, cancel_requested=True, finished_at=_now())
+        elif job['state'] == RUNNING:
+            job['cancel_requested'] = True
+            cancel_event = _cancel_events.get(job_id)
+            if cancel_event:
+                cancel_event.set()
+
+        record = _public_job(job, include_result=False)
+
+    if dropped:
+        publish_progress('job_state', {'job_id': job_id, 'state': CANCELLED, 'error': None})
+    return record
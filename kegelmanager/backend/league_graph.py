@@ -0,0 +1,220 @@
+"""
+Promotion/relegation graph of the leagues of a season.
+
+The league structure is stored as an adjacency table (LeagueLink: from_league,
+to_league, direction) and loaded into a LeagueGraph with indexed lookups, so
+balancing and season transitions never have to parse the semicolon strings in
+League.aufstieg_liga_id / League.abstieg_liga_id again.
+
+The semicolon columns are kept as a denormalized mirror for the frontend and
+for saves created before the graph existed: the first time the graph of such
+a season is loaded, it is built from those strings once.
+
+MAIN FUNCTIONS:
+- LeagueGraph.load(season_id): Load (and if necessary build) the graph of a season
+- copy_league_graph(old_graph, new_season_id, old_to_new_mapping): Bulk copy into a new season
+- sync_legacy_columns(graph): Write the graph back into the semicolon columns
+"""
+
+from collections import defaultdict
+from models import db, League, LeagueLink, parse_league_id_list
+
+
+PROMOTION = 'promotion'
+RELEGATION = 'relegation'
+
+# Databases (engine URLs) already checked for the league_link table
+_checked_databases = set()
+
+
+def ensure_league_link_table():
+    """Create the league_link table in older saves that do not have it yet."""
+    database_url = str(db.engine.url)
+    if database_url in _checked_databases:
+        return
+
+    inspector = db.inspect(db.engine)
+    if 'league_link' not in inspector.get_table_names():
+        print("LeagueLink table does not exist yet. Creating it...")
+        LeagueLink.__table__.create(db.engine)
+
+    _checked_databases.add(database_url)
+
+
+class LeagueGraph:
+    """In-memory promotion/relegation graph of one season."""
+
+    def __init__(self, season_id, leagues, links):
+        """
+        Build the indexes of the graph.
+
+        Args:
+            season_id: The season ID
+            leagues: League objects of the season
+            links: Iterable of (from_league_id, to_league_id, direction) tuples
+        """
+        self.season_id = season_id
+        self.leagues = {league.id: league for league in leagues}
+        self.promotion_targets = defaultdict(list)   # from_league_id -> [to_league_id]
+        self.relegation_targets = defaultdict(list)  # from_league_id -> [to_league_id]
+        self.feeding_leagues = defaultdict(list)     # to_league_id -> [from_league_id] (promotion links)
+
+        for from_league_id, to_league_id, direction in links:
+            if direction == PROMOTION:
+                self.promotion_targets[from_league_id].append(to_league_id)
+                self.feeding_leagues[to_league_id].append(from_league_id)
+            elif direction == RELEGATION:
+                self.relegation_targets[from_league_id].append(to_league_id)
+
+        levels = [league.level for league in leagues]
+        self.top_level = min(levels) if levels else None
+        self.bottom_level = max(levels) if levels else None
+
+    @classmethod
+    def load(cls, season_id):
+        """
+        Load the graph of a season with two queries.
+
+        Seasons without any links are built from the legacy semicolon columns first.
+
+        Args:
+            season_id: The season ID
+
+        Returns:
+            LeagueGraph: The graph of the season
+        """
+        ensure_league_link_table()
+
+        leagues = League.query.filter_by(season_id=season_id).order_by(League.level, League.id).all()
+        links = db.session.query(
+            LeagueLink.from_league_id,
+            LeagueLink.to_league_id,
+            LeagueLink.direction
+        ).filter(
+            LeagueLink.season_id == season_id
+        ).order_by(LeagueLink.id).all()
+
+        if not links:
+            links = build_links_from_legacy_columns(season_id, leagues)
+
+        return cls(season_id, leagues, links)
+
+    def get_promotion_targets(self, league_id):
+        """Get the IDs of the leagues promoted teams of a league move to."""
+        return self.promotion_targets.get(league_id, [])
+
+    def get_relegation_targets(self, league_id):
+        """Get the IDs of the leagues relegated teams of a league move to."""
+        return self.relegation_targets.get(league_id, [])
+
+    def get_feeding_leagues(self, league_id):
+        """Get the league objects whose promoted teams move into this league."""
+        return [self.leagues[from_id] for from_id in self.feeding_leagues.get(league_id, [])
+                if from_id in self.leagues]
+
+    def leagues_by_level(self):
+        """Group the leagues of the season by level."""
+        grouped = defaultdict(list)
+        for league in self.leagues.values():
+            grouped[league.level].append(league)
+        return grouped
+
+
+def build_links_from_legacy_columns(season_id, leagues):
+    """
+    Parse the semicolon columns of a season once and store them as LeagueLinks.
+
+    Only targets that are leagues of the same season are kept.
+
+    Args:
+        season_id: The season ID
+        leagues: League objects of the season
+
+    Returns:
+        list: The created (from_league_id, to_league_id, direction) tuples
+    """
+    season_league_ids = {league.id for league in leagues}
+    links = []
+    seen = set()
+
+    for league in leagues:
+        for direction, value, field_name in (
+            (PROMOTION, league.aufstieg_liga_id, 'aufstieg_liga_id'),
+            (RELEGATION, league.abstieg_liga_id, 'abstieg_liga_id')
+        ):
+            for target_id in parse_league_id_list(value, field_name):
+                key = (league.id, target_id, direction)
+                if target_id in season_league_ids and key not in seen:
+                    seen.add(key)
+                    links.append(key)
+
+    if links:
+        db.session.bulk_insert_mappings(LeagueLink, [
+            {
+                'season_id': season_id,
+                'from_league_id': from_league_id,
+                'to_league_id': to_league_id,
+                'direction': direction
+            }
+            for from_league_id, to_league_id, direction in links
+        ])
+        db.session.commit()
+        print(f"Built league graph for season {season_id} from legacy columns: {len(links)} links")
+
+    return links
+
+
+def copy_league_graph(old_graph, new_season_id, old_to_new_mapping):
+    """
+    Carry the league graph of a season into the next season with one bulk insert.
+
+    Args:
+        old_graph: The LeagueGraph of the season to copy from
+        new_season_id: The season ID to copy into
+        old_to_new_mapping: Mapping from old league IDs to new league IDs
+
+    Returns:
+        LeagueGraph: The graph of the new season
+    """
+    new_links = []
+    for targets, direction in ((old_graph.promotion_targets, PROMOTION),
+                               (old_graph.relegation_targets, RELEGATION)):
+        for from_league_id, to_league_ids in targets.items():
+            new_from_id = old_to_new_mapping.get(from_league_id)
+            if new_from_id is None:
+                continue
+            for to_league_id in to_league_ids:
+                new_to_id = old_to_new_mapping.get(to_league_id)
+                if new_to_id is None:
+                    print(f"WARNING: Could not map {direction} league ID {to_league_id} for league {from_league_id}")
+                    continue
+                new_links.append({
+                    'season_id': new_season_id,
+                    'from_league_id': new_from_id,
+                    'to_league_id': new_to_id,
+                    'direction': direction
+                })
+
+    if new_links:
+        db.session.bulk_insert_mappings(LeagueLink, new_links)
+        db.session.commit()
+
+    print(f"Copied {len(new_links)} league links into season {new_season_id}")
+    return LeagueGraph.load(new_season_id)
+
+
+def sync_legacy_columns(graph):
+    """
+    Write the graph back into League.aufstieg_liga_id / abstieg_liga_id.
+
+    Args:
+        graph: The LeagueGraph whose leagues should be updated
+    """
+    for league_id, league in graph.leagues.items():
+        promotion_ids = graph.get_promotion_targets(league_id)
+        relegation_ids = graph.get_relegation_targets(league_id)
+        league.aufstieg_liga_id = ';'.join(map(str, promotion_ids)) if promotion_ids else None
+        league.abstieg_liga_id = ';'.join(map(str, relegation_ids)) if relegation_ids else None
+
+    db.session.commit()
+
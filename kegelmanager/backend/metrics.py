@@ -0,0 +1,282 @@
+"""
+Metrics registry for the simulation hot paths.
+
+A small in-process registry of counters and histograms (timers are histograms
+of seconds). Recording a value is a dict lookup plus a few additions under a
+lock, cheap enough for per-function timing of the match day pipeline.
+
+Where the values come from:
+- @timed(name) / time_block(name): Decorator and context manager for code blocks
+- performance_optimizations.performance_monitor: Per-function durations
+- record_progress_event(): Phase durations (phase_end events of progress.py),
+  match days and simulated matches. Registered as a progress listener in the
+  web process; the job runner feeds the events of its worker processes in.
+
+The registry is exported in Prometheus text format (render_prometheus) for
+/api/debug/metrics and can be dumped to a JSON file (dump_metrics_json), e.g.
+after a season run, to compare runs over time.
+
+MAIN FUNCTIONS:
+- increment(name, value, **labels) / observe(name, value, **labels)
+- timed(name, **labels) / time_block(name, **labels)
+- install_progress_metrics(): Record phase durations from progress events
+- render_prometheus() / get_metrics_snapshot() / dump_metrics_json(path)
+- reset_metrics()
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from progress import add_progress_listener
+
+
+# Default histogram buckets in seconds (upper bounds)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+METRIC_PREFIX = 'kegelmanager_'
+
+_lock = threading.Lock()
+_definitions = {}   # name -> {'type', 'help', 'buckets'}
+_values = {}        # (name, labels tuple) -> float (counter) or histogram dict
+_progress_installed = False
+
+
+def register_counter(name, help_text):
+    """Declare a counter with its help text."""
+    _definitions[name] = {'type': 'counter', 'help': help_text, 'buckets': None}
+
+
+def register_histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    """Declare a histogram with its help text and bucket upper bounds."""
+    _definitions[name] = {'type': 'histogram', 'help': help_text, 'buckets': tuple(buckets)}
+
+
+register_counter('match_days_simulated_total', 'Simulated match days')
+register_counter('matches_simulated_total', 'Simulated league and cup matches')
+register_counter('seasons_created_total', 'Completed season transitions')
+register_histogram('phase_duration_seconds', 'Duration of simulation and season transition phases')
+register_histogram('function_duration_seconds', 'Duration of monitored functions')
+register_histogram('match_day_duration_seconds', 'Duration of a complete match day simulation')
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+def increment(name, value=1, **labels):
+    """
+    Increase a counter.
+
+    Args:
+        name: Metric name (without prefix)
+        value: Amount to add
+        **labels: Label values
+    """
+    key = _key(name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """
+    Add a value (seconds for timers) to a histogram.
+
+    Args:
+        name: Metric name (without prefix)
+        value: Observed value
+        **labels: Label values
+    """
+    key = _key(name, labels)
+    with _lock:
+        histogram = _values.get(key)
+        if histogram is None:
+            definition = _definitions.get(name)
+            if definition is None:
+                definition = _definitions[name] = {'type': 'histogram', 'help': name, 'buckets': DEFAULT_BUCKETS}
+            histogram = _values[key] = {
+                'buckets': definition['buckets'],
+                'counts': [0] * len(definition['buckets']),
+                'count': 0,
+                'sum': 0.0,
+                'max': 0.0
+            }
+        index = bisect.bisect_left(histogram['buckets'], value)
+        if index < len(histogram['counts']):
+            histogram['counts'][index] += 1
+        histogram['count'] += 1
+        histogram['sum'] += value
+        if value > histogram['max']:
+            histogram['max'] = value
+
+
+class time_block:
+    """Context manager that observes the duration of its block in a histogram."""
+
+    __slots__ = ('name', 'labels', 'start_time')
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start_time, **self.labels)
+        return False
+
+
+def timed(name, **labels):
+    """Decorator that observes the duration of every call in a histogram."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start_time, **labels)
+        return wrapper
+    return decorator
+
+
+def record_progress_event(event, data):
+    """
+    Turn a progress event into metrics.
+
+    Used as progress listener and by the job runner for events of worker processes.
+
+    Args:
+        event: Name of the progress event
+        data: Event payload
+    """
+    if event == 'phase_end' and data.get('duration_ms') is not None:
+        observe('phase_duration_seconds', data['duration_ms'] / 1000, phase=data.get('phase'))
+    elif event == 'match_day_simulated':
+        increment('match_days_simulated_total', day_type=data.get('day_type'))
+        increment('matches_simulated_total', data.get('matches_simulated', 0))
+        if data.get('duration_ms') is not None:
+            observe('match_day_duration_seconds', data['duration_ms'] / 1000)
+    elif event == 'season_created':
+        increment('seasons_created_total')
+
+
+def install_progress_metrics():
+    """Register record_progress_event as progress listener (idempotent)."""
+    global _progress_installed
+    if not _progress_installed:
+        add_progress_listener(record_progress_event)
+        _progress_installed = True
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra) if extra else [])
+    if not items:
+        return ''
+    escaped = []
+    for label, value in items:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{label}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    """
+    Render the registry in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics text
+    """
+    with _lock:
+        by_name = {}
+        for (name, labels), value in _values.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            definition = _definitions.get(name, {'type': 'counter', 'help': name})
+            full_name = METRIC_PREFIX + name
+            lines.append(f"# HELP {full_name} {definition['help']}")
+            lines.append(f"# TYPE {full_name} {definition['type']}")
+
+            for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                if definition['type'] != 'histogram':
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_number(value)}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(value['buckets'], value['counts']):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', _format_number(float(bound)))])} {cumulative}")
+                lines.append(f"{full_name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {value['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def get_metrics_snapshot():
+    """
+    Get the registry as JSON-serializable dict.
+
+    Returns:
+        dict: metric name -> list of {'labels', 'value'} (counters) or
+              {'labels', 'count', 'sum', 'avg', 'max'} (histograms)
+    """
+    with _lock:
+        snapshot = {}
+        for (name, labels), value in sorted(_values.items(), key=lambda item: (item[0][0], item[0][1])):
+            entry = {'labels': dict(labels)}
+            if isinstance(value, dict):
+                entry.update({
+                    'count': value['count'],
+                    'sum': round(value['sum'], 6),
+                    'avg': round(value['sum'] / value['count'], 6) if value['count'] else 0.0,
+                    'max': round(value['max'], 6)
+                })
+            else:
+                entry['value'] = value
+            snapshot.setdefault(name, []).append(entry)
+        return snapshot
+
+
+def dump_metrics_json(path, extra=None):
+    """
+    Write the current metrics to a JSON file.
+
+    Args:
+        path: Target file (directories are created)
+        extra: Optional dict stored alongside, e.g. season and world size
+
+    Returns:
+        str: The path written
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    data = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'extra': extra or {},
+        'metrics': get_metrics_snapshot()
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    print(f"Metrics written to {path}")
+    return path
+
+
+def reset_metrics():
+    """Drop all recorded values (definitions are kept)."""
+    with _lock:
+        _values.clear()
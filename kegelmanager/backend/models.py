@@ -1,8 +1,30 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from sqlalchemy import text
 
-db = SQLAlchemy()
+from save_registry import get_bound_engine
+
+
+class SaveAwareSQLAlchemy(SQLAlchemy):
+    """SQLAlchemy extension whose default engine follows the active save (see save_registry.py)."""
+
+    @property
+    def engines(self):
+        engines = super().engines
+        engine = get_bound_engine(current_app._get_current_object())
+        if engine is None or engines.get(None) is engine:
+            return engines
+        return {**engines, None: engine}
+
+    @property
+    def engine(self):
+        # DDL and schema inspection always go to the writer, also in read-only requests
+        engine = get_bound_engine(current_app._get_current_object(), role='write')
+        return engine if engine is not None else super().engine
+
+
+db = SaveAwareSQLAlchemy()
 
 # Constants for ID ranges
 CUP_MATCH_ID_OFFSET = 1000000  # Cup match IDs start at 1,000,000
@@ -80,74 +102,12 @@ class Player(db.Model):
     performances = db.relationship('PlayerMatchPerformance', back_populates='player')
 
     def calculate_stats(self):
-        """Calculate player statistics based on played matches."""
-        # Get all performances for this player
-        performances = self.performances
-
-        # Initialize statistics
-        home_performances = [p for p in performances if p.is_home_team]
-        away_performances = [p for p in performances if not p.is_home_team]
-
-        total_matches = len(performances)
-        home_matches = len(home_performances)
-        away_matches = len(away_performances)
-
-        # Initialize statistics
-        total_score = sum(p.total_score for p in performances) if performances else 0
-        home_score = sum(p.total_score for p in home_performances) if home_performances else 0
-        away_score = sum(p.total_score for p in away_performances) if away_performances else 0
+        """Calculate player statistics based on played matches (including archived seasons)."""
+        archived_stats = []
+        if archived_stats_available():
+            archived_stats = PlayerSeasonStats.query.filter_by(player_id=self.id, competition='league').all()
 
-        total_volle = sum(p.volle_score for p in performances) if performances else 0
-        home_volle = sum(p.volle_score for p in home_performances) if home_performances else 0
-        away_volle = sum(p.volle_score for p in away_performances) if away_performances else 0
-
-        total_raeumer = sum(p.raeumer_score for p in performances) if performances else 0
-        home_raeumer = sum(p.raeumer_score for p in home_performances) if home_performances else 0
-        away_raeumer = sum(p.raeumer_score for p in away_performances) if away_performances else 0
-
-        total_fehler = sum(p.fehler_count for p in performances) if performances else 0
-        home_fehler = sum(p.fehler_count for p in home_performances) if home_performances else 0
-        away_fehler = sum(p.fehler_count for p in away_performances) if away_performances else 0
-
-        # Calculate match points won percentage
-        total_mp_won = sum(1 for p in performances if p.match_points > 0) if performances else 0
-        mp_win_percentage = (total_mp_won / total_matches * 100) if total_matches > 0 else 0
-
-        # Calculate averages
-        avg_total_score = total_score / total_matches if total_matches > 0 else 0
-        avg_home_score = home_score / home_matches if home_matches > 0 else 0
-        avg_away_score = away_score / away_matches if away_matches > 0 else 0
-
-        avg_total_volle = total_volle / total_matches if total_matches > 0 else 0
-        avg_home_volle = home_volle / home_matches if home_matches > 0 else 0
-        avg_away_volle = away_volle / away_matches if away_matches > 0 else 0
-
-        avg_total_raeumer = total_raeumer / total_matches if total_matches > 0 else 0
-        avg_home_raeumer = home_raeumer / home_matches if home_matches > 0 else 0
-        avg_away_raeumer = away_raeumer / away_matches if away_matches > 0 else 0
-
-        avg_total_fehler = total_fehler / total_matches if total_matches > 0 else 0
-        avg_home_fehler = home_fehler / home_matches if home_matches > 0 else 0
-        avg_away_fehler = away_fehler / away_matches if away_matches > 0 else 0
-
-        return {
-            'total_matches': total_matches,
-            'home_matches': home_matches,
-            'away_matches': away_matches,
-            'avg_total_score': round(avg_total_score, 1),
-            'avg_home_score': round(avg_home_score, 1),
-            'avg_away_score': round(avg_away_score, 1),
-            'avg_total_volle': round(avg_total_volle, 1),
-            'avg_home_volle': round(avg_home_volle, 1),
-            'avg_away_volle': round(avg_away_volle, 1),
-            'avg_total_raeumer': round(avg_total_raeumer, 1),
-            'avg_home_raeumer': round(avg_home_raeumer, 1),
-            'avg_away_raeumer': round(avg_away_raeumer, 1),
-            'avg_total_fehler': round(avg_total_fehler, 1),
-            'avg_home_fehler': round(avg_home_fehler, 1),
-            'avg_away_fehler': round(avg_away_fehler, 1),
-            'mp_win_percentage': round(mp_win_percentage, 1)
-        }
+        return performance_statistics(sum_performances(self.performances, archived_stats))
 
     def calculate_team_specific_stats(self, team_id, season_id=None):
         """Calculate player statistics for a specific team.
@@ -167,70 +127,15 @@ class Player(db.Model):
         else:
             performances = [p for p in self.performances if p.team_id == team_id]
 
-        # Initialize statistics
-        home_performances = [p for p in performances if p.is_home_team]
-        away_performances = [p for p in performances if not p.is_home_team]
-
-        total_matches = len(performances)
-        home_matches = len(home_performances)
-        away_matches = len(away_performances)
-
-        # Initialize statistics
-        total_score = sum(p.total_score for p in performances) if performances else 0
-        home_score = sum(p.total_score for p in home_performances) if home_performances else 0
-        away_score = sum(p.total_score for p in away_performances) if away_performances else 0
-
-        total_volle = sum(p.volle_score for p in performances) if performances else 0
-        home_volle = sum(p.volle_score for p in home_performances) if home_performances else 0
-        away_volle = sum(p.volle_score for p in away_performances) if away_performances else 0
-
-        total_raeumer = sum(p.raeumer_score for p in performances) if performances else 0
-        home_raeumer = sum(p.raeumer_score for p in home_performances) if home_performances else 0
-        away_raeumer = sum(p.raeumer_score for p in away_performances) if away_performances else 0
-
-        total_fehler = sum(p.fehler_count for p in performances) if performances else 0
-        home_fehler = sum(p.fehler_count for p in home_performances) if home_performances else 0
-        away_fehler = sum(p.fehler_count for p in away_performances) if away_performances else 0
-
-        # Calculate match points won percentage
-        total_mp_won = sum(1 for p in performances if p.match_points > 0) if performances else 0
-        mp_win_percentage = (total_mp_won / total_matches * 100) if total_matches > 0 else 0
-
-        # Calculate averages
-        avg_total_score = total_score / total_matches if total_matches > 0 else 0
-        avg_home_score = home_score / home_matches if home_matches > 0 else 0
-        avg_away_score = away_score / away_matches if away_matches > 0 else 0
-
-        avg_total_volle = total_volle / total_matches if total_matches > 0 else 0
-        avg_home_volle = home_volle / home_matches if home_matches > 0 else 0
-        avg_away_volle = away_volle / away_matches if away_matches > 0 else 0
+        # Seasons whose performances were moved into the archive
+        archived_stats = []
+        if archived_stats_available():
+            query = PlayerSeasonStats.query.filter_by(player_id=self.id, team_id=team_id, competition='league')
+            if season_id:
+                query = query.filter_by(season_id=season_id)
+            archived_stats = query.all()
 
-        avg_total_raeumer = total_raeumer / total_matches if total_matches > 0 else 0
-        avg_home_raeumer = home_raeumer / home_matches if home_matches > 0 else 0
-        avg_away_raeumer = away_raeumer / away_matches if away_matches > 0 else 0
-
-        avg_total_fehler = total_fehler / total_matches if total_matches > 0 else 0
-        avg_home_fehler = home_fehler / home_matches if home_matches > 0 else 0
-        avg_away_fehler = away_fehler / away_matches if away_matches > 0 else 0
-
-        return {
-            'total_matches': total_matches,
-            'home_matches': home_matches,
-            'away_matches': away_matches,
-            'avg_total_score': round(avg_total_score, 1),
-            'avg_home_score': round(avg_home_score, 1),
-            'avg_away_score': round(avg_away_score, 1),
-            'avg_total_volle': round(avg_total_volle, 1),
-            'avg_home_volle': round(avg_home_volle, 1),
-            'avg_away_volle': round(avg_away_volle, 1),
-            'avg_total_raeumer': round(avg_total_raeumer, 1),
-            'avg_home_raeumer': round(avg_home_raeumer, 1),
-            'avg_away_raeumer': round(avg_away_raeumer, 1),
-            'avg_total_fehler': round(avg_total_fehler, 1),
-            'avg_home_fehler': round(avg_home_fehler, 1),
-            'avg_away_fehler': round(avg_away_fehler, 1),
-            'mp_win_percentage': round(mp_win_percentage, 1)
-        }
+        return performance_statistics(sum_performances(performances, archived_stats))
 
     def to_dict(self):
         # Determine the team/club name to display
@@ -323,6 +228,11 @@ class Team(db.Model):
         # Get all player IDs who have played for this team
         player_ids = set(perf.player_id for perf in performances)
 
+        # Including players of archived seasons
+        if archived_stats_available():
+            archived = db.session.query(PlayerSeasonStats.player_id).filter_by(team_id=self.id, competition='league').distinct()
+            player_ids.update(player_id for player_id, in archived)
+
         # Get all regular player IDs
         regular_player_ids = set(player.id for player in self.players)
 
@@ -1076,6 +986,21 @@ class Club(db.Model):
             'lane_records': lane_records
         }
 
+def parse_league_id_list(value, field_name='liga_id'):
+    """Parse a semicolon-separated list of league IDs (e.g. "12;13.0") into integers."""
+    if not value:
+        return []
+    ids = []
+    for id_str in value.split(';'):
+        id_str = id_str.strip()
+        if id_str:
+            try:
+                # Convert float strings (like "1.0") to int
+                ids.append(int(float(id_str)))
+            except (ValueError, TypeError):
+                print(f"WARNING: Could not convert '{id_str}' to integer in {field_name}")
+    return ids
+
 class League(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -1112,33 +1037,11 @@ class League(db.Model):
 
     def get_aufstieg_liga_ids(self):
         """Get list of promotion league IDs from semicolon-separated string."""
-        if not self.aufstieg_liga_id:
-            return []
-        ids = []
-        for id_str in self.aufstieg_liga_id.split(';'):
-            id_str = id_str.strip()
-            if id_str:
-                try:
-                    # Convert float strings (like "1.0") to int
-                    ids.append(int(float(id_str)))
-                except (ValueError, TypeError):
-                    print(f"WARNING: Could not convert '{id_str}' to integer in aufstieg_liga_id")
-        return ids
+        return parse_league_id_list(self.aufstieg_liga_id, 'aufstieg_liga_id')
 
     def get_abstieg_liga_ids(self):
         """Get list of relegation league IDs from semicolon-separated string."""
-        if not self.abstieg_liga_id:
-            return []
-        ids = []
-        for id_str in self.abstieg_liga_id.split(';'):
-            id_str = id_str.strip()
-            if id_str:
-                try:
-                    # Convert float strings (like "1.0") to int
-                    ids.append(int(float(id_str)))
-                except (ValueError, TypeError):
-                    print(f"WARNING: Could not convert '{id_str}' to integer in abstieg_liga_id")
-        return ids
+        return parse_league_id_list(self.abstieg_liga_id, 'abstieg_liga_id')
 
     def get_aufstieg_ligen(self):
         """Get list of promotion league objects."""
@@ -1212,69 +1115,41 @@ class League(db.Model):
         match_ids = [match.id for match in matches]
         performances = PlayerMatchPerformance.query.filter(PlayerMatchPerformance.match_id.in_(match_ids)).all()
 
-        # Group performances by player
+        # Group performances by player (archived seasons contribute their summaries)
         player_performances = {}
         for perf in performances:
-            if perf.player_id not in player_performances:
-                player_performances[perf.player_id] = []
-            player_performances[perf.player_id].append(perf)
+            player_performances.setdefault(perf.player_id, ([], []))[0].append(perf)
+        if archived_stats_available():
+            for stats in PlayerSeasonStats.query.filter_by(league_id=self.id, competition='league').all():
+                player_performances.setdefault(stats.player_id, ([], []))[1].append(stats)
 
         # Calculate statistics for each player
         player_stats = []
-        for player_id, perfs in player_performances.items():
+        for player_id, (perfs, archived_stats) in player_performances.items():
             player = Player.query.get(player_id)
             if not player:
                 continue
 
             # Get team name
-            team = Team.query.get(perfs[0].team_id)
+            team = Team.query.get(perfs[0].team_id if perfs else archived_stats[0].team_id)
             team_name = team.name if team else "Unknown"
 
             # Calculate statistics
-            total_matches = len(perfs)
-            total_score = sum(p.total_score for p in perfs)
-            avg_score = total_score / total_matches if total_matches > 0 else 0
-
-            # Calculate Volle and Räumer averages
-            total_volle = sum(p.volle_score for p in perfs if p.volle_score is not None)
-            total_raeumer = sum(p.raeumer_score for p in perfs if p.raeumer_score is not None)
-            avg_volle = total_volle / total_matches if total_matches > 0 else 0
-            avg_raeumer = total_raeumer / total_matches if total_matches > 0 else 0
-
-            # Calculate error average
-            total_fehler = sum(p.fehler_count for p in perfs if p.fehler_count is not None)
-            avg_fehler = total_fehler / total_matches if total_matches > 0 else 0
-
-            # Calculate home/away averages
-            home_perfs = [p for p in perfs if p.is_home_team]
-            away_perfs = [p for p in perfs if not p.is_home_team]
-
-            home_matches = len(home_perfs)
-            away_matches = len(away_perfs)
-
-            home_score = sum(p.total_score for p in home_perfs)
-            away_score = sum(p.total_score for p in away_perfs)
-
-            avg_home_score = home_score / home_matches if home_matches > 0 else 0
-            avg_away_score = away_score / away_matches if away_matches > 0 else 0
-
-            # Calculate match points won percentage
-            mp_won = sum(1 for p in perfs if p.match_points > 0)
-            mp_win_percentage = (mp_won / total_matches * 100) if total_matches > 0 else 0
+            stats = performance_statistics(sum_performances(perfs, archived_stats))
 
             player_stats.append({
                 'player_id': player_id,
                 'player_name': player.name,
                 'team_id': team.id if team else None,
                 'team_name': team_name,
-                'matches': total_matches,
-                'avg_score': round(avg_score, 1),
-                'avg_volle': round(avg_volle, 1),
-                'avg_raeumer': round(avg_raeumer, 1),
-                'avg_fehler': round(avg_fehler, 1),
-                'avg_home_score': round(avg_home_score, 1),
-                'avg_away_score': round(avg_away_score, 1),
-                'mp_win_percentage': round(mp_win_percentage, 1)
+                'matches': stats['total_matches'],
+                'avg_score': stats['avg_total_score'],
+                'avg_volle': stats['avg_total_volle'],
+                'avg_raeumer': stats['avg_total_raeumer'],
+                'avg_fehler': stats['avg_total_fehler'],
+                'avg_home_score': stats['avg_home_score'],
+                'avg_away_score': stats['avg_away_score'],
+                'mp_win_percentage': stats['mp_win_percentage']
             })
 
         return player_stats
@@ -1376,6 +1251,34 @@ class League(db.Model):
             }
         }
 
+class LeagueLink(db.Model):
+    """
+    Auf- und Abstiegsbeziehung zwischen zwei Ligen (Kante im Ligagraphen).
+
+    direction = 'promotion': Aufsteiger aus from_league gehen in to_league
+    direction = 'relegation': Absteiger aus from_league gehen in to_league
+    """
+    __tablename__ = 'league_link'
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False, index=True)
+    from_league_id = db.Column(db.Integer, db.ForeignKey('league.id'), nullable=False, index=True)
+    to_league_id = db.Column(db.Integer, db.ForeignKey('league.id'), nullable=False, index=True)
+    direction = db.Column(db.String(20), nullable=False)  # 'promotion' oder 'relegation'
+
+    __table_args__ = (
+        db.UniqueConstraint('from_league_id', 'to_league_id', 'direction', name='uq_league_link'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'season_id': self.season_id,
+            'from_league_id': self.from_league_id,
+            'to_league_id': self.to_league_id,
+            'direction': self.direction
+        }
+
 class Match(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     home_team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False, index=True)
@@ -1439,6 +1342,10 @@ class Match(db.Model):
     def _get_all_performances(self):
         """Get all performances including Stroh players."""
         performances = [perf.to_dict() for perf in self.performances] if self.is_played else []
+        if self.is_played and not performances:
+            # Performances of archived seasons are read from the season archive
+            from season_archive import get_archived_performances
+            performances = get_archived_performances(self)
 
         # Add Stroh performances if they exist
         if self.stroh_performances:
@@ -1595,271 +1502,33 @@ class Cup(db.Model):
 
     def generate_cup_fixtures(self):
         """Generiert die Pokalspiele für alle Runden mit korrekter Freilos-Logik."""
-        import random
-        import math
+        from cup_engine import load_cup_calendar, create_first_round_fixtures
 
-        eligible_teams = self.get_eligible_teams()
-        if len(eligible_teams) < 2:
+        eligible_team_ids = [team.id for team in self.get_eligible_teams()]
+        if len(eligible_team_ids) < 2:
             return
 
-        # Berechne die nächsthöhere 2er-Potenz für die zweite Runde
-        next_power_of_2 = 2 ** math.ceil(math.log2(len(eligible_teams)))
-
-        # Berechne die Gesamtanzahl der Runden basierend auf der nächsthöheren 2er-Potenz
-        total_rounds = int(math.log2(next_power_of_2))
-        self.total_rounds = total_rounds
-
-        # Mische die Teams zufällig
-        teams = eligible_teams.copy()
-        random.shuffle(teams)
-
-        # Berechne Anzahl der Freilose und Spiele in der ersten Runde
-        num_byes = next_power_of_2 - len(eligible_teams)
-        num_first_round_matches = (len(eligible_teams) - num_byes) // 2
-
-        print(f"Cup {self.name}: {len(eligible_teams)} Teams, {num_byes} Freilose, {num_first_round_matches} Spiele in Runde 1")
-
-        # Teams für die erste Runde (die spielen müssen)
-        teams_to_play = teams[:num_first_round_matches * 2]
-
-        # Teams mit Freilosen (kommen direkt in die zweite Runde)
-        teams_with_byes = teams[num_first_round_matches * 2:]
-
-        # Erstelle Spiele für die erste Runde
-        for i in range(0, len(teams_to_play), 2):
-            if i + 1 < len(teams_to_play):
-                home_team = teams_to_play[i]
-                away_team = teams_to_play[i + 1]
-
-                cup_match_day = self.calculate_cup_match_day(1, total_rounds)
-                print(f"POKAL: Creating match {home_team.name} vs {away_team.name} for match day {cup_match_day}")
-
-                cup_match = CupMatch(
-                    cup_id=self.id,
-                    home_team_id=home_team.id,
-                    away_team_id=away_team.id,
-                    round_name=self.get_round_name(1, total_rounds),
-                    round_number=1,
-                    cup_match_day=cup_match_day
-                )
-                db.session.add(cup_match)
-
-        # Speichere Teams mit Freilosen für die nächste Runde
-        # Diese werden in advance_to_next_round() berücksichtigt
-        for team in teams_with_byes:
-            # Erstelle einen "Dummy"-Match für Teams mit Freilosen
-            # Diese werden als bereits "gewonnen" markiert
-            cup_match_day = self.calculate_cup_match_day(1, total_rounds)
-            print(f"POKAL: Creating bye match for {team.name} for match day {cup_match_day}")
-
-            bye_match = CupMatch(
-                cup_id=self.id,
-                home_team_id=team.id,
-                away_team_id=None,  # Kein Gegner = Freilos
-                round_name=self.get_round_name(1, total_rounds),
-                round_number=1,
-                cup_match_day=cup_match_day,
-                is_played=True,  # Freilos ist automatisch "gespielt"
-                winner_team_id=team.id,  # Team gewinnt automatisch
-                home_score=0,
-                away_score=0
-            )
-            db.session.add(bye_match)
-
-        # Aktualisiere Cup-Status
-        self.current_round = self.get_round_name(1, total_rounds)
-        self.current_round_number = 1
+        cup_days, _ = load_cup_calendar(self.season_id)
+        create_first_round_fixtures([self], {self.id: eligible_team_ids}, cup_days)
 
         db.session.commit()
 
     def calculate_cup_match_day(self, round_number, total_rounds):
         """Berechnet den Pokalspieltag basierend auf der Rundennummer und verfügbaren CUP_DAYs."""
-        from sqlalchemy import func
-
-        # Hole alle verfügbaren CUP_DAYs aus dem Saisonkalender
-        cup_days = db.session.query(SeasonCalendar.match_day_number).filter_by(
-            season_id=self.season_id,
-            day_type='CUP_DAY'
-        ).order_by(SeasonCalendar.id).all()
-
-        if not cup_days:
-            print(f"POKAL: Cup {self.name} - No CUP_DAYs found in calendar, using fallback")
-            # Fallback: Verwende einfache Berechnung
-            return round_number
-
-        available_cup_days = [day[0] for day in cup_days if day[0] is not None]
-        print(f"POKAL: Cup {self.name} - Available cup days: {available_cup_days}")
+        from cup_engine import load_cup_calendar, compute_cup_match_day
 
+        available_cup_days, _ = load_cup_calendar(self.season_id)
         if not available_cup_days:
-            print(f"POKAL: Cup {self.name} - No valid cup days found, using fallback")
-            return round_number
-
-        # Berechne einen Offset basierend auf dem Pokal-Typ und der ID
-        # um verschiedene Pokale auf verschiedene CUP_DAYs zu verteilen
-        cup_offset = 0
-        if self.cup_type == "DKBC":
-            cup_offset = 0  # DKBC-Pokal startet bei den ersten CUP_DAYs
-        elif self.cup_type == "Landespokal":
-            cup_offset = 1  # Landespokal startet einen CUP_DAY später
-        elif self.cup_type == "Kreispokal":
-            cup_offset = 2  # Kreispokal startet zwei CUP_DAYs später
-
-        # Zusätzlicher Offset basierend auf der Cup-ID für mehrere Pokale desselben Typs
-        additional_offset = (self.id % 3) * 3  # Verteile mehrere Pokale desselben Typs
-
-        total_offset = cup_offset + additional_offset
-
-        # Verwende die verfügbaren CUP_DAYs für die Verteilung
-        if total_rounds == 1:
-            # Bei nur einer Runde, verwende den entsprechenden CUP_DAY basierend auf dem Offset
-            day_index = total_offset % len(available_cup_days)
-            cup_match_day = available_cup_days[day_index]
-            print(f"POKAL: Cup {self.name} - Single round, using cup day {cup_match_day} (offset: {total_offset})")
-            return cup_match_day
-
-        # Bei mehreren Runden, verteile gleichmäßig über die verfügbaren CUP_DAYs
-        day_index = (round_number - 1 + total_offset) % len(available_cup_days)
-        cup_match_day = available_cup_days[day_index]
-        print(f"POKAL: Cup {self.name} - Round {round_number}/{total_rounds}, using cup day {cup_match_day} (offset: {total_offset})")
+            print(f"POKAL: Cup {self.name} - No CUP_DAYs found in calendar, using fallback")
 
-        return cup_match_day
+        return compute_cup_match_day(self.cup_type, self.id, round_number, total_rounds, available_cup_days)
 
     def advance_to_next_round(self):
         """Lässt Teams zur nächsten Runde aufsteigen basierend auf den Ergebnissen."""
-        print(f"DEBUG: Checking advancement for Cup {self.name}, current round {self.current_round_number}")
-
-        current_round_matches = CupMatch.query.filter_by(
-            cup_id=self.id,
-            round_number=self.current_round_number,
-            is_played=True
-        ).all()
-
-        # Prüfe, ob alle Spiele der aktuellen Runde gespielt wurden
-        total_current_round_matches = CupMatch.query.filter_by(
-            cup_id=self.id,
-            round_number=self.current_round_number
-        ).count()
-
-        print(f"DEBUG: Cup {self.name} - Played matches: {len(current_round_matches)}, Total matches: {total_current_round_matches}")
-
-        if len(current_round_matches) < total_current_round_matches:
-            print(f"DEBUG: Cup {self.name} - Not all matches played yet, cannot advance")
-            return False  # Noch nicht alle Spiele gespielt
-
-        # Wenn wir im Finale sind, ist der Pokal beendet
-        if self.current_round_number >= self.total_rounds:
-            print(f"DEBUG: Cup {self.name} - Final round completed, cup finished")
-            self.is_active = False
-            db.session.commit()
-            return True
-
-        # Sammle alle Gewinner für die nächste Runde (inklusive Freilose)
-        winners = []
-        matches_without_winner = []
-        for match in current_round_matches:
-            if match.winner_team_id:
-                winners.append(Team.query.get(match.winner_team_id))
-            else:
-                matches_without_winner.append(match.id)
-
-        print(f"DEBUG: Cup {self.name}: {len(winners)} Gewinner aus Runde {self.current_round_number}")
-        if matches_without_winner:
-            print(f"DEBUG: Cup {self.name}: Matches without winner: {matches_without_winner}")
-
-        # Alle Teams für die nächste Runde sind die Gewinner
-        # (Freilose wurden bereits in der ersten Runde als "gewonnene" Matches erstellt)
-        all_next_round_teams = winners
-
-        # Prüfe, ob wir eine 2er-Potenz haben (sollte nach der ersten Runde immer der Fall sein)
-        if len(all_next_round_teams) % 2 != 0:
-            print(f"WARNUNG: Ungerade Anzahl Teams ({len(all_next_round_teams)}) in Runde {self.current_round_number + 1}")
-            # Entferne das letzte Team (bekommt Freilos)
-            all_next_round_teams = all_next_round_teams[:-1]
-
-        if len(all_next_round_teams) == 0:
-            print(f"ERROR: Cup {self.name} - No teams for next round!")
-            return False
-
-        # Erstelle Spiele für die nächste Runde
-        next_round_number = self.current_round_number + 1
-        next_round_name = self.get_round_name(next_round_number, self.total_rounds)
-
-        print(f"DEBUG: Cup {self.name} - Creating {len(all_next_round_teams)//2} matches for round {next_round_number} ({next_round_name})")
-
-        # Mische die Teams für faire Paarungen
-        import random
-        random.shuffle(all_next_round_teams)
-
-        matches_created = 0
-        for i in range(0, len(all_next_round_teams), 2):
-            if i + 1 < len(all_next_round_teams):
-                home_team = all_next_round_teams[i]
-                away_team = all_next_round_teams[i + 1]
-
-                cup_match_day = self.calculate_cup_match_day(next_round_number, self.total_rounds)
-                print(f"DEBUG: Creating match {home_team.name} vs {away_team.name} for match day {cup_match_day}")
-
-                cup_match = CupMatch(
-                    cup_id=self.id,
-                    home_team_id=home_team.id,
-                    away_team_id=away_team.id,
-                    round_name=next_round_name,
-                    round_number=next_round_number,
-                    cup_match_day=cup_match_day
-                )
-                db.session.add(cup_match)
-                matches_created += 1
-
-        # Aktualisiere Cup-Status
-        self.current_round = next_round_name
-        self.current_round_number = next_round_number
-
-        print(f"DEBUG: Cup {self.name} - Advanced to round {next_round_number}, created {matches_created} matches")
-
-        db.session.commit()
-
-        # Setze Datumszuweisung nur für die neu erstellten Spiele dieser Runde
-        try:
-            # Hole alle neu erstellten Spiele dieser Runde (ohne Datum)
-            new_cup_matches = CupMatch.query.filter_by(
-                cup_id=self.id,
-                round_number=next_round_number,
-                match_date=None
-            ).all()
-
-            if new_cup_matches:
-                print(f"DEBUG: Setting dates for {len(new_cup_matches)} new cup matches in round {next_round_number}")
-
-                # Hole die verfügbaren CUP_DAYs aus dem Saisonkalender
-                cup_calendar_days = SeasonCalendar.query.filter_by(
-                    season_id=self.season_id,
-                    day_type='CUP_DAY'
-                ).filter(
-                    SeasonCalendar.match_day_number.isnot(None)
-                ).order_by(SeasonCalendar.id).all()
-
-                # Erstelle Mapping von cup_match_day zu Datum
-                cup_match_day_to_date = {}
-                for calendar_day in cup_calendar_days:
-                    if calendar_day.match_day_number:
-                        cup_match_day_to_date[calendar_day.match_day_number] = calendar_day.calendar_date
-
-                # Setze Daten nur für die neuen Spiele
-                for cup_match in new_cup_matches:
-                    if cup_match.cup_match_day and cup_match.cup_match_day in cup_match_day_to_date:
-                        cup_match.match_date = cup_match_day_to_date[cup_match.cup_match_day]
-                        print(f"DEBUG: Set date for new cup match {cup_match.id}: {cup_match.match_date}")
-
-                db.session.commit()
-                print(f"DEBUG: Successfully set dates for {len(new_cup_matches)} new cup matches")
-            else:
-                print(f"DEBUG: No new cup matches without dates found for round {next_round_number}")
-
-        except Exception as e:
-            print(f"ERROR: Failed to set dates for new cup matches: {e}")
-            # Don't raise the exception - cup advancement should still work
+        from cup_engine import advance_cup_rounds
 
-        return True
+        summary = advance_cup_rounds(self.season_id, cup_ids=[self.id])
+        return self.id in summary['advanced'] or self.id in summary['finished']
 
     def to_dict(self):
         return {
@@ -1967,6 +1636,10 @@ class CupMatch(db.Model):
         if self.is_played:
             cup_performances = PlayerCupMatchPerformance.query.filter_by(cup_match_id=self.id).all()
             performances = [perf.to_dict() for perf in cup_performances]
+            if not performances:
+                # Performances of archived seasons are read from the season archive
+                from season_archive import get_archived_performances
+                performances = get_archived_performances(self)
 
         # Add Stroh performances if they exist
         if self.stroh_performances:
@@ -2014,6 +1687,11 @@ class LeagueHistory(db.Model):
     # Relationships
     season = db.relationship('Season', backref='league_histories')
 
+    # Ein Eintrag pro Team und Saison, auch wenn ein Saisonwechsel wiederholt wird
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'team_id', name='uq_league_history_season_team'),
+    )
+
     def to_dict(self):
         emblem_url = None
         if self.verein_id:
@@ -2573,6 +2251,13 @@ class LaneRecord(db.Model):
                     if cup_performance and cup_performance.team:
                         played_for_team_id = cup_performance.team_id
                         played_for_team_name = cup_performance.team.name
+                    elif not cup_performance:
+                        # Record of an archived season
+                        from season_archive import find_archived_performance
+                        archived = find_archived_performance(self.player_id, self.match_id)
+                        if archived:
+                            played_for_team_id = archived['team_id']
+                            played_for_team_name = archived['team_name']
 
             result['played_for_team_id'] = played_for_team_id
             result['played_for_team_name'] = played_for_team_name
@@ -2830,6 +2515,162 @@ class PlayerCupMatchPerformance(db.Model):
         }
 
 
+class PerformanceArchive(db.Model):
+    """
+    Archivierte Spielerleistungen einer abgeschlossenen Saison.
+
+    Eine Zeile pro Saison und Liga (bzw. Pokal); die Leistungen sind
+    spaltenweise als komprimiertes NumPy-Archiv gespeichert (season_archive.py).
+    """
+    __tablename__ = 'performance_archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False, index=True)
+    competition = db.Column(db.String(10), nullable=False)  # 'league' oder 'cup'
+    group_id = db.Column(db.Integer, nullable=False)  # league_id bzw. cup_id
+    row_count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'competition', 'group_id', name='uq_performance_archive_group'),
+    )
+
+
+class PlayerSeasonStats(db.Model):
+    """
+    Summen der archivierten Leistungen eines Spielers pro Saison, Team und Liga/Pokal.
+
+    Ersetzt die archivierten Zeilen von PlayerMatchPerformance und
+    PlayerCupMatchPerformance in allen Statistiken (siehe sum_performances).
+    """
+    __tablename__ = 'player_season_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False, index=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False, index=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False, index=True)
+    competition = db.Column(db.String(10), nullable=False)  # 'league' oder 'cup'
+    league_id = db.Column(db.Integer, index=True)  # Bei Ligaspielen
+    cup_id = db.Column(db.Integer)  # Bei Pokalspielen
+
+    home_matches = db.Column(db.Integer, default=0)
+    away_matches = db.Column(db.Integer, default=0)
+    home_total_score = db.Column(db.Integer, default=0)
+    away_total_score = db.Column(db.Integer, default=0)
+    home_volle_score = db.Column(db.Integer, default=0)
+    away_volle_score = db.Column(db.Integer, default=0)
+    home_raeumer_score = db.Column(db.Integer, default=0)
+    away_raeumer_score = db.Column(db.Integer, default=0)
+    home_fehler_count = db.Column(db.Integer, default=0)
+    away_fehler_count = db.Column(db.Integer, default=0)
+    home_mp_won = db.Column(db.Integer, default=0)  # Spiele mit gewonnenem Mannschaftspunkt
+    away_mp_won = db.Column(db.Integer, default=0)
+    set_points = db.Column(db.Float, default=0.0)
+    match_points = db.Column(db.Integer, default=0)
+
+
+class TransitionJournal(db.Model):
+    """
+    Abgeschlossene Schritte der Saisonsimulation und des Saisonwechsels.
+
+    Ein Eintrag pro Saison und Schritt (Spieltag bzw. Schritt des Saisonwechsels)
+    mit den Parametern, die ein fortgesetzter Lauf braucht (transition_journal.py).
+    """
+    __tablename__ = 'transition_journal'
+
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False, index=True)
+    step = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text)  # JSON
+    completed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('season_id', 'step', name='uq_transition_journal_step'),
+    )
+
+
+# Summed per side by sum_performances()
+PERFORMANCE_SUM_FIELDS = ('total_score', 'volle_score', 'raeumer_score', 'fehler_count')
+
+# Saves (engine URL, world version) known to have no archive tables yet
+_archive_checks = {}
+
+
+def archived_stats_available():
+    """Check whether the current save has the season archive tables (created by the first archive run)."""
+    from response_cache import get_world_version
+
+    database_url = str(db.engine.url)
+    checked = _archive_checks.get(database_url)
+    if checked is True or checked == get_world_version():
+        return checked is True
+
+    available = PlayerSeasonStats.__tablename__ in db.inspect(db.engine).get_table_names()
+    # A missing table is checked again after the next change of the world
+    _archive_checks[database_url] = True if available else get_world_version()
+    return available
+
+
+def sum_performances(performances, archived_stats=()):
+    """
+    Add up performances and archived season summaries, split into home and away.
+
+    Args:
+        performances: PlayerMatchPerformance/PlayerCupMatchPerformance objects (hot rows)
+        archived_stats: PlayerSeasonStats objects of archived seasons
+
+    Returns:
+        dict: {'home': totals, 'away': totals} with matches, total_score, volle_score,
+              raeumer_score, fehler_count and mp_won
+    """
+    totals = {side: dict.fromkeys(('matches', 'mp_won') + PERFORMANCE_SUM_FIELDS, 0) for side in ('home', 'away')}
+
+    for performance in performances:
+        side = totals['home' if performance.is_home_team else 'away']
+        side['matches'] += 1
+        for field in PERFORMANCE_SUM_FIELDS:
+            side[field] += getattr(performance, field) or 0
+        if performance.match_points and performance.match_points > 0:
+            side['mp_won'] += 1
+
+    for stats in archived_stats:
+        for side_name, side in totals.items():
+            side['matches'] += getattr(stats, f'{side_name}_matches') or 0
+            side['mp_won'] += getattr(stats, f'{side_name}_mp_won') or 0
+            for field in PERFORMANCE_SUM_FIELDS:
+                side[field] += getattr(stats, f'{side_name}_{field}') or 0
+
+    return totals
+
+
+def performance_statistics(totals):
+    """
+    Turn the totals of sum_performances() into the statistics shown in the UI.
+
+    Returns:
+        dict: Match counts, averages (total, home, away) and match point win percentage
+    """
+    home, away = totals['home'], totals['away']
+    total_matches = home['matches'] + away['matches']
+
+    def average(value, matches):
+        return round(value / matches, 1) if matches > 0 else 0
+
+    statistics = {
+        'total_matches': total_matches,
+        'home_matches': home['matches'],
+        'away_matches': away['matches']
+    }
+    for field, name in (('total_score', 'score'), ('volle_score', 'volle'),
+                        ('raeumer_score', 'raeumer'), ('fehler_count', 'fehler')):
+        statistics[f'avg_total_{name}'] = average(home[field] + away[field], total_matches)
+        statistics[f'avg_home_{name}'] = average(home[field], home['matches'])
+        statistics[f'avg_away_{name}'] = average(away[field], away['matches'])
+    statistics['mp_win_percentage'] = round((home['mp_won'] + away['mp_won']) / total_matches * 100, 1) if total_matches > 0 else 0
+    return statistics
+
+
 class Message(db.Model):
     """Model for in-game messages/notifications."""
     id = db.Column(db.Integer, primary_key=True)
@@ -5,8 +5,25 @@ This module contains optimized functions to improve the performance of match day
 """
 
 from models import db, Player, Match, PlayerMatchPerformance, Team
+from performance_storage import insert_performances, storage_table
 from sqlalchemy import text
+from functools import wraps
 import time
+import metrics
+
+
+def performance_monitor(func):
+    """Decorator to record the duration of every call in the metrics registry."""
+    function_name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe('function_duration_seconds', time.perf_counter() - start_time, function=function_name)
+    return wrapper
 
 
 def determine_player_availability(club_id, teams_playing):
@@ -35,6 +52,9 @@ def determine_player_availability(club_id, teams_playing):
 def create_performance_indexes():
     """Create database indexes to improve query performance."""
     try:
+        # Compact saves keep the performances in a table behind a view
+        performance_table = storage_table('player_match_performance')
+
         # Create composite indexes for frequently used query combinations
         indexes = [
             # Player queries for availability and club assignment
@@ -44,8 +64,8 @@ def create_performance_indexes():
             "CREATE INDEX IF NOT EXISTS idx_match_league_season_played ON match(league_id, season_id, is_played, match_day)",
 
             # Performance queries
-            "CREATE INDEX IF NOT EXISTS idx_performance_player_match ON player_match_performance(player_id, match_id)",
-            "CREATE INDEX IF NOT EXISTS idx_performance_match_team ON player_match_performance(match_id, team_id, is_home_team)",
+            f"CREATE INDEX IF NOT EXISTS idx_performance_player_match ON {performance_table}(player_id, match_id)",
+            f"CREATE INDEX IF NOT EXISTS idx_performance_match_team ON {performance_table}(match_id, team_id, is_home_team)",
         ]
 
         for index_sql in indexes:
@@ -58,6 +78,7 @@ def create_performance_indexes():
         print(f"Error creating indexes: {str(e)}")
 
 
+@performance_monitor
 def bulk_reset_player_flags(current_match_day=None, day_type=None):
     """
     Optimized bulk reset of player flags using raw SQL.
@@ -67,8 +88,6 @@ def bulk_reset_player_flags(current_match_day=None, day_type=None):
         day_type: The type of day ('LEAGUE_DAY' or 'CUP_DAY') - affects reset logic
     """
     try:
-        start_time = time.time()
-
         # Reset availability flags
         result1 = db.session.execute(
             text("UPDATE player SET is_available_current_matchday = 1")
@@ -106,6 +125,7 @@ def bulk_reset_player_flags(current_match_day=None, day_type=None):
 # Removed duplicate function - use determine_player_availability() instead
 
 
+@performance_monitor
 def batch_create_performances(performances_data):
     """
     Batch create player performances for league matches using bulk insert.
@@ -117,16 +137,15 @@ def batch_create_performances(performances_data):
         return
 
     try:
-        start_time = time.time()
-
-        # Use bulk insert for better performance
-        db.session.bulk_insert_mappings(PlayerMatchPerformance, performances_data)
+        # Bulk insert in the storage format of the save (performance_storage.py)
+        insert_performances(PlayerMatchPerformance, performances_data)
 
     except Exception as e:
         print(f"Error in batch create league performances: {str(e)}")
         raise
 
 
+@performance_monitor
 def batch_create_cup_performances(performances_data):
     """
     Batch create player performances for cup matches using bulk insert.
@@ -139,10 +158,8 @@ def batch_create_cup_performances(performances_data):
 
     try:
         from models import PlayerCupMatchPerformance
-        start_time = time.time()
-
-        # Use bulk insert for better performance
-        db.session.bulk_insert_mappings(PlayerCupMatchPerformance, performances_data)
+        # Bulk insert in the storage format of the save (performance_storage.py)
+        insert_performances(PlayerCupMatchPerformance, performances_data)
 
     except Exception as e:
         print(f"Error in batch create cup performances: {str(e)}")
@@ -161,8 +178,6 @@ def optimized_match_queries(season_id, match_day):
         List of match data with preloaded team and club information
     """
     try:
-        start_time = time.time()
-
         # Single query to get all match data with joins
         query = text("""
             SELECT
@@ -208,8 +223,6 @@ def get_club_player_stats(club_id):
         Dictionary mapping player_id to player stats
     """
     try:
-        start_time = time.time()
-
         # Single query to get all needed player data
         from simulation import PLAYER_RATING_SQL
         query = text(f"""
@@ -245,15 +258,6 @@ def get_club_player_stats(club_id):
         raise
 
 
-def performance_monitor(func):
-    """Decorator to monitor function performance."""
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        return result
-    return wrapper
-
-
 class CacheManager:
     """Advanced caching system for simulation data."""
 
@@ -340,6 +344,7 @@ class CacheManager:
         self.lane_quality_cache.clear()
 
 
+@performance_monitor
 def batch_set_player_availability(clubs_with_matches, teams_playing, playing_teams_info=None):
     """
     Optimized batch setting of player availability for multiple clubs.
@@ -355,7 +360,6 @@ def batch_set_player_availability(clubs_with_matches, teams_playing, playing_tea
                            (with team_id and league_level)
     """
     try:
-        start_time = time.time()
         import random
 
 
@@ -0,0 +1,563 @@
+"""
+Optional compact storage format for the player performance tables.
+
+PlayerMatchPerformance and PlayerCupMatchPerformance get ~12 rows per match
+and are the largest tables of a save. In the classic format every row stores
+four lane scores, the total, Volle and Räumer, Fehler, set and match points
+and two timestamps in separate columns. The compact format stores per row:
+
+- lane_scores: The four lane scores packed into one integer (LANE_BITS bits
+  per lane, lane 1 in the lowest bits; LANE_NULL marks a missing lane)
+- volle_score, fehler_count, match_points
+- set_half_points: Set points times two (integer instead of an 8 byte REAL)
+
+total_score (sum of the lanes) and raeumer_score (total - Volle) are derived
+on read, the timestamps are not stored (the match date is the date of a
+performance).
+
+The compact rows live in <table>_packed. A view with the old table name
+exposes the classic columns and INSTEAD OF triggers translate inserts,
+updates and deletes, so the models, their to_dict(), raw SQL statistics and
+the season archive work unchanged on both formats. Bulk inserts of the
+simulation (insert_performances) write packed rows directly; performances
+added with the ORM get their ID assigned before the INSERT (SQLite does not
+report the row ID of rows inserted by a trigger). Stored performances are
+changed with UPDATE statements (query.update(), SQL); changing a loaded
+object and committing fails on compact tables, because SQLite reports no
+changed rows for a view.
+
+A conversion is lossless or does not happen: rows whose total is not the sum
+of their lanes (or whose Räumer are not total - Volle, or whose set points
+are no multiple of 0.5) are reported and nothing is changed; the triggers
+reject such rows later on.
+
+Convert a save while it is not open in the app:
+    python performance_storage.py path/to/save.db --compact
+    python performance_storage.py path/to/save.db --classic
+    python performance_storage.py path/to/save.db --status
+
+Bytes per row and insert throughput of both formats are measured with
+"python benchmarks.py --performance-storage".
+
+MAIN FUNCTIONS:
+- get_performance_storage(table): Format of a performance table in the current database
+- storage_table(table): Table that physically holds the rows (for indexes)
+- insert_performances(model, performances): Bulk insert in the format of the table
+- convert_performance_storage(db_path, storage): Convert a save to the compact or classic format
+- pack_lane_scores(lanes) / unpack_lane_scores(packed): Lane score packing
+- measure_performance_storage(db_path, rows): Bytes per row and insert throughput
+"""
+
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from models import db, PlayerMatchPerformance, PlayerCupMatchPerformance
+
+
+CLASSIC = 'classic'
+COMPACT = 'compact'
+
+# Performance tables and the column of their match
+PERFORMANCE_TABLES = {
+    'player_match_performance': 'match_id',
+    'player_cup_match_performance': 'cup_match_id',
+}
+
+PACKED_SUFFIX = '_packed'
+
+# A lane has 30 throws of at most 9 pins: 270 fits into 10 bits
+LANE_BITS = 10
+LANE_COUNT = 4
+LANE_NULL = (1 << LANE_BITS) - 1
+
+# Databases (engine URLs) -> tables stored in the compact format
+_compact_tables = {}
+
+
+def pack_lane_scores(lanes):
+    """
+    Pack four lane scores into one integer.
+
+    Args:
+        lanes: The four lane scores (None for a missing lane)
+
+    Returns:
+        int: The packed scores, None if all lanes are missing
+
+    Raises:
+        ValueError: If a lane score does not fit into LANE_BITS bits
+    """
+    if all(lane is None for lane in lanes):
+        return None
+    packed = 0
+    for index, lane in enumerate(lanes):
+        if lane is None:
+            lane = LANE_NULL
+        elif not 0 <= lane < LANE_NULL:
+            raise ValueError(f"Lane score {lane} cannot be packed")
+        packed |= int(lane) << (index * LANE_BITS)
+    return packed
+
+
+def unpack_lane_scores(packed):
+    """
+    Unpack the four lane scores of pack_lane_scores().
+
+    Returns:
+        list: The four lane scores (None for missing lanes)
+    """
+    if packed is None:
+        return [None] * LANE_COUNT
+    lanes = []
+    for index in range(LANE_COUNT):
+        lane = (packed >> (index * LANE_BITS)) & LANE_NULL
+        lanes.append(None if lane == LANE_NULL else lane)
+    return lanes
+
+
+def _packed_table(table):
+    return table + PACKED_SUFFIX
+
+
+def _lane_sql(column, index):
+    return f"NULLIF(({column} >> {index * LANE_BITS}) & {LANE_NULL}, {LANE_NULL})"
+
+
+def _pack_sql(lanes):
+    """SQL expression packing four lane score expressions (see pack_lane_scores)."""
+    parts = ' | '.join(f"(COALESCE({lane}, {LANE_NULL}) << {index * LANE_BITS})" for index, lane in enumerate(lanes))
+    return f"CASE WHEN COALESCE({', '.join(lanes)}) IS NULL THEN NULL ELSE {parts} END"
+
+
+def _lossless_violation_sql(prefix):
+    """
+    SQL condition for classic rows that cannot be stored in the compact format.
+
+    Args:
+        prefix: Column prefix ('NEW.' in triggers, '' in queries)
+    """
+    lanes = [f"{prefix}lane{number}_score" for number in range(1, LANE_COUNT + 1)]
+    total = ' + '.join(lanes)
+    return (
+        f"({' OR '.join(f'{lane} NOT BETWEEN 0 AND {LANE_NULL - 1}' for lane in lanes)})"
+        f" OR ({prefix}total_score IS NOT NULL AND {prefix}total_score IS NOT ({total}))"
+        f" OR ({prefix}raeumer_score IS NOT NULL AND {prefix}raeumer_score IS NOT ({total}) - {prefix}volle_score)"
+        f" OR ({prefix}set_points IS NOT NULL AND {prefix}set_points * 2 != CAST({prefix}set_points * 2 AS INTEGER))"
+    )
+
+
+def _compact_schema(table, match_column):
+    """DDL of the packed table, the view and its triggers."""
+    packed = _packed_table(table)
+    lanes = [_lane_sql('lane_scores', index) for index in range(LANE_COUNT)]
+    total = ' + '.join(lanes)
+    new_lanes = [f"NEW.lane{number}_score" for number in range(1, LANE_COUNT + 1)]
+    values = (f"NEW.player_id, NEW.{match_column}, NEW.team_id, NEW.is_home_team, NEW.position_number, "
+              f"NEW.is_substitute, {_pack_sql(new_lanes)}, NEW.volle_score, NEW.fehler_count, "
+              f"CAST(NEW.set_points * 2 AS INTEGER), NEW.match_points")
+    reject = (f"SELECT RAISE(ABORT, 'Performance cannot be stored in the compact format') "
+              f"WHERE {_lossless_violation_sql('NEW.')};")
+
+    return [
+        f"""CREATE TABLE {packed} (
+            id INTEGER PRIMARY KEY,
+            player_id INTEGER NOT NULL REFERENCES player (id),
+            {match_column} INTEGER NOT NULL REFERENCES {match_column[:-len('_id')]} (id),
+            team_id INTEGER NOT NULL REFERENCES team (id),
+            is_home_team BOOLEAN NOT NULL,
+            position_number INTEGER NOT NULL,
+            is_substitute BOOLEAN,
+            lane_scores INTEGER,
+            volle_score INTEGER,
+            fehler_count INTEGER,
+            set_half_points INTEGER,
+            match_points INTEGER
+        )""",
+        f"""CREATE VIEW {table} AS SELECT
+            id, player_id, {match_column}, team_id, is_home_team, position_number, is_substitute,
+            {', '.join(f'{lane} AS lane{index + 1}_score' for index, lane in enumerate(lanes))},
+            {total} AS total_score,
+            volle_score,
+            {total} - volle_score AS raeumer_score,
+            fehler_count,
+            set_half_points / 2.0 AS set_points,
+            match_points,
+            NULL AS created_at,
+            NULL AS updated_at
+        FROM {packed}""",
+        f"""CREATE TRIGGER {table}_insert INSTEAD OF INSERT ON {table}
+        BEGIN
+            {reject}
+            INSERT INTO {packed} (id, player_id, {match_column}, team_id, is_home_team, position_number,
+                                  is_substitute, lane_scores, volle_score, fehler_count, set_half_points, match_points)
+            VALUES (NEW.id, {values});
+        END""",
+        f"""CREATE TRIGGER {table}_update INSTEAD OF UPDATE ON {table}
+        BEGIN
+            {reject}
+            UPDATE {packed} SET (id, player_id, {match_column}, team_id, is_home_team, position_number,
+                                 is_substitute, lane_scores, volle_score, fehler_count, set_half_points, match_points)
+                = (NEW.id, {values})
+            WHERE id = OLD.id;
+        END""",
+        f"""CREATE TRIGGER {table}_delete INSTEAD OF DELETE ON {table}
+        BEGIN
+            DELETE FROM {packed} WHERE id = OLD.id;
+        END""",
+    ]
+
+
+def _read_storage(connection, table):
+    row = connection.execute(
+        "SELECT type FROM sqlite_master WHERE name = ?", (table,)
+    ).fetchone()
+    if row is None:
+        return None
+    return COMPACT if row[0] == 'view' else CLASSIC
+
+
+def _get_compact_tables(connection):
+    database_url = str(connection.engine.url)
+    compact = _compact_tables.get(database_url)
+    if compact is None:
+        rows = connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'view' AND name IN ({})".format(
+                ', '.join(f"'{name}'" for name in PERFORMANCE_TABLES))
+        ))
+        compact = {name for (name,) in rows}
+        _compact_tables[database_url] = compact
+    return compact
+
+
+def get_performance_storage(table='player_match_performance'):
+    """
+    Get the storage format of a performance table in the current database.
+
+    Returns:
+        str: COMPACT or CLASSIC
+    """
+    return COMPACT if table in _get_compact_tables(db.session.connection()) else CLASSIC
+
+
+def storage_table(table='player_match_performance'):
+    """Table that physically holds the rows of a performance table (indexes go there)."""
+    return _packed_table(table) if get_performance_storage(table) == COMPACT else table
+
+
+@event.listens_for(PlayerMatchPerformance, 'before_insert')
+@event.listens_for(PlayerCupMatchPerformance, 'before_insert')
+def _assign_compact_id(mapper, connection, target):
+    """
+    Give performances added with the ORM their ID before the INSERT into a compact view.
+
+    SQLite does not report the row ID of rows inserted by an INSTEAD OF trigger,
+    so the ORM would not know the ID of the new row.
+    """
+    table = mapper.local_table.name
+    if target.id is not None or table not in _get_compact_tables(connection):
+        return
+    # Rows of the same flush are inserted after all IDs were assigned
+    assigned = connection.info.setdefault('compact_performance_ids', {})
+    stored_max = connection.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {_packed_table(table)}")).scalar()
+    target.id = max(stored_max, assigned.get(table, 0)) + 1
+    assigned[table] = target.id
+
+
+def _compact_row(performance, match_column):
+    lanes = [performance.get(f'lane{number}_score') for number in range(1, LANE_COUNT + 1)]
+    packed = pack_lane_scores(lanes)
+    total_score = performance.get('total_score')
+    volle_score = performance.get('volle_score')
+    raeumer_score = performance.get('raeumer_score')
+    set_points = performance.get('set_points', 0.0)
+
+    derived_total = None if None in lanes else sum(lanes)
+    if total_score is not None and total_score != derived_total:
+        raise ValueError(f"total_score {total_score} is not the sum of the lanes {lanes}")
+    if raeumer_score is not None and (derived_total is None or volle_score is None
+                                      or raeumer_score != derived_total - volle_score):
+        raise ValueError(f"raeumer_score {raeumer_score} is not total - volle_score")
+    set_half_points = None
+    if set_points is not None:
+        set_half_points = int(set_points * 2)
+        if set_half_points != set_points * 2:
+            raise ValueError(f"set_points {set_points} is no multiple of 0.5")
+
+    return {
+        'player_id': performance['player_id'],
+        'match_id': performance[match_column],
+        'team_id': performance['team_id'],
+        'is_home_team': performance['is_home_team'],
+        'position_number': performance['position_number'],
+        'is_substitute': performance.get('is_substitute', False),
+        'lane_scores': packed,
+        'volle_score': volle_score,
+        'fehler_count': performance.get('fehler_count'),
+        'set_half_points': set_half_points,
+        'match_points': performance.get('match_points', 0)
+    }
+
+
+def insert_performances(model, performances):
+    """
+    Bulk insert performances in the storage format of the model's table.
+
+    Classic tables get one timestamp per batch instead of a datetime.utcnow()
+    default per row; compact tables get packed rows without the view's triggers.
+    Nothing is committed here. The performance dictionaries are not modified.
+
+    Args:
+        model: PlayerMatchPerformance or PlayerCupMatchPerformance
+        performances: List of dictionaries with performance data
+
+    Raises:
+        ValueError: If a performance cannot be stored in the compact format
+    """
+    if not performances:
+        return
+
+    table = model.__tablename__
+    if get_performance_storage(table) == CLASSIC:
+        timestamp = datetime.utcnow()
+        db.session.bulk_insert_mappings(model, [
+            dict(performance, created_at=timestamp, updated_at=timestamp) for performance in performances
+        ])
+        return
+
+    match_column = PERFORMANCE_TABLES[table]
+    rows = [_compact_row(performance, match_column) for performance in performances]
+    db.session.execute(text(
+        f"INSERT INTO {_packed_table(table)} (player_id, {match_column}, team_id, is_home_team, position_number, "
+        f"is_substitute, lane_scores, volle_score, fehler_count, set_half_points, match_points) "
+        f"VALUES (:player_id, :match_id, :team_id, :is_home_team, :position_number, :is_substitute, "
+        f":lane_scores, :volle_score, :fehler_count, :set_half_points, :match_points)"
+    ), rows)
+
+
+def _dependent_objects(connection, table):
+    """Indexes and triggers of a table as (type, name, sql), without automatic indexes."""
+    return connection.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+        "AND sql IS NOT NULL ORDER BY type, name", (table,)
+    ).fetchall()
+
+
+def _recreate_objects(connection, objects, source, target):
+    """Create indexes and triggers of one table on another one; those that do not fit are skipped."""
+    pattern = re.compile(rf'\bON\s+"?{re.escape(source)}"?(?=[\s(])', re.IGNORECASE)
+    for object_type, name, sql in objects:
+        try:
+            connection.execute(pattern.sub(f'ON {target}', sql, count=1))
+        except sqlite3.OperationalError as e:
+            print(f"Skipping {object_type} {name} on {target}: {str(e)}")
+
+
+def _to_compact(connection, table, match_column):
+    packed = _packed_table(table)
+    violations = connection.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE {_lossless_violation_sql('')}"
+    ).fetchone()[0]
+    if violations:
+        raise ValueError(f"{violations} rows of {table} cannot be stored in the compact format")
+
+    objects = _dependent_objects(connection, table)
+    schema = _compact_schema(table, match_column)
+    connection.execute(schema[0])
+    lanes = [f"lane{number}_score" for number in range(1, LANE_COUNT + 1)]
+    connection.execute(
+        f"INSERT INTO {packed} SELECT id, player_id, {match_column}, team_id, is_home_team, position_number, "
+        f"is_substitute, {_pack_sql(lanes)}, volle_score, fehler_count, CAST(set_points * 2 AS INTEGER), "
+        f"match_points FROM {table} ORDER BY id"
+    )
+    connection.execute(f"DROP TABLE {table}")
+    for statement in schema[1:]:
+        connection.execute(statement)
+    _recreate_objects(connection, objects, table, packed)
+
+
+def _to_classic(connection, table, match_column):
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateTable
+
+    model = PlayerMatchPerformance if table == PlayerMatchPerformance.__tablename__ else PlayerCupMatchPerformance
+    packed = _packed_table(table)
+    objects = _dependent_objects(connection, packed)
+
+    # The triggers of the view are dropped with it
+    connection.execute(f"DROP VIEW {table}")
+    connection.execute(str(CreateTable(model.__table__).compile(dialect=sqlite.dialect())))
+    lanes = [_lane_sql('lane_scores', index) for index in range(LANE_COUNT)]
+    total = ' + '.join(lanes)
+    connection.execute(
+        f"INSERT INTO {table} (id, player_id, {match_column}, team_id, is_home_team, position_number, is_substitute, "
+        f"lane1_score, lane2_score, lane3_score, lane4_score, total_score, volle_score, raeumer_score, fehler_count, "
+        f"set_points, match_points) "
+        f"SELECT id, player_id, {match_column}, team_id, is_home_team, position_number, is_substitute, "
+        f"{', '.join(lanes)}, {total}, volle_score, {total} - volle_score, fehler_count, set_half_points / 2.0, "
+        f"match_points FROM {packed} ORDER BY id"
+    )
+    connection.execute(f"DROP TABLE {packed}")
+    _recreate_objects(connection, objects, packed, table)
+
+
+def convert_performance_storage(db_path, storage, vacuum=True):
+    """
+    Convert the performance tables of a save to the compact or the classic format.
+
+    Both tables are converted in one transaction; tables already in the
+    requested format are left alone. The save must not be open in the app.
+
+    Args:
+        db_path: Path of the save
+        storage: COMPACT or CLASSIC
+        vacuum: Shrink the file afterwards (the old rows leave free pages behind)
+
+    Returns:
+        list: Names of the converted tables
+
+    Raises:
+        ValueError: If a row cannot be stored in the compact format (nothing is changed)
+    """
+    if storage not in (COMPACT, CLASSIC):
+        raise ValueError(f"Unknown performance storage: {storage}")
+
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    converted = []
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        for table, match_column in PERFORMANCE_TABLES.items():
+            current = _read_storage(connection, table)
+            if current is None or current == storage:
+                continue
+            print(f"Converting {table} to the {storage} format...")
+            if storage == COMPACT:
+                _to_compact(connection, table, match_column)
+            else:
+                _to_classic(connection, table, match_column)
+            converted.append(table)
+        connection.execute("COMMIT")
+    except Exception as e:
+        connection.execute("ROLLBACK")
+        print(f"Error converting the performance storage: {str(e)}")
+        raise
+    else:
+        if converted and vacuum:
+            connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+    # Other app contexts of this process detect the new format again
+    _compact_tables.clear()
+    return converted
+
+
+def _table_bytes(connection, table):
+    """Bytes of a table's b-tree and of its indexes (dbstat)."""
+    names = [table] + [name for (name,) in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))]
+    sizes = dict(connection.execute(
+        f"SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ({', '.join('?' * len(names))}) GROUP BY name", names))
+    return sizes.get(table, 0), sum(size for name, size in sizes.items() if name != table)
+
+
+def _measure_storage(db_path, rows):
+    from flask import Flask
+
+    connection = sqlite3.connect(db_path)
+    # Both formats without free pages
+    connection.execute("VACUUM")
+    table = PlayerMatchPerformance.__tablename__
+    physical = _packed_table(table) if _read_storage(connection, table) == COMPACT else table
+    count = connection.execute(f"SELECT COUNT(*) FROM {physical}").fetchone()[0]
+    table_bytes, index_bytes = _table_bytes(connection, physical)
+    connection.close()
+    result = {
+        'rows': count,
+        'file_bytes': os.path.getsize(db_path),
+        'bytes_per_row': round(table_bytes / count, 1) if count else None,
+        'index_bytes_per_row': round(index_bytes / count, 1) if count else None,
+    }
+
+    measure_app = Flask(__name__)
+    measure_app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+    measure_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(measure_app)
+    with measure_app.app_context():
+        # Copies of the stored performances, inserted like the simulation does
+        performances = [
+            {key: value for key, value in performance.items() if key in (
+                'player_id', 'match_id', 'team_id', 'is_home_team', 'position_number', 'is_substitute',
+                'lane1_score', 'lane2_score', 'lane3_score', 'lane4_score', 'total_score', 'volle_score',
+                'raeumer_score', 'fehler_count', 'set_points', 'match_points')}
+            for performance in db.session.execute(
+                text(f"SELECT * FROM {table} ORDER BY id LIMIT :rows"), {'rows': rows}).mappings()
+        ]
+        if performances:
+            start_time = time.perf_counter()
+            insert_performances(PlayerMatchPerformance, performances)
+            db.session.commit()
+            seconds = time.perf_counter() - start_time
+            result['insert_rows_per_s'] = round(len(performances) / seconds)
+        db.session.remove()
+        db.engine.dispose()
+    return result
+
+
+def measure_performance_storage(db_path, rows=20000):
+    """
+    Measure bytes per performance row and bulk insert throughput of both formats.
+
+    Each format is measured on its own copy of the save; the save itself is not changed.
+
+    Args:
+        db_path: Path of a save with performances
+        rows: Performances inserted for the throughput measurement
+
+    Returns:
+        dict: storage format -> rows, file_bytes, bytes_per_row, index_bytes_per_row, insert_rows_per_s
+    """
+    results = {}
+    for storage in (CLASSIC, COMPACT):
+        with tempfile.TemporaryDirectory(prefix='kegelmanager_performance_storage_') as directory:
+            copy_path = os.path.join(directory, 'save.db')
+            shutil.copyfile(db_path, copy_path)
+            convert_performance_storage(copy_path, storage)
+            results[storage] = _measure_storage(copy_path, rows)
+    _compact_tables.clear()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert the performance tables of a save")
+    parser.add_argument('database', help="Path of the save")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--compact', action='store_true', help="Convert to the compact format")
+    group.add_argument('--classic', action='store_true', help="Convert back to the classic format")
+    group.add_argument('--status', action='store_true', help="Show the format of the performance tables")
+    group.add_argument('--measure', action='store_true', help="Measure both formats on copies of the save")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"Database not found: {args.database}")
+        sys.exit(1)
+
+    if args.status:
+        status_connection = sqlite3.connect(args.database)
+        for status_table in PERFORMANCE_TABLES:
+            print(f"{status_table}: {_read_storage(status_connection, status_table)}")
+        status_connection.close()
+    elif args.measure:
+        for measured_storage, measurement in measure_performance_storage(args.database).items():
+            print(f"{measured_storage:<8} {measurement}")
+    else:
+        convert_performance_storage(args.database, COMPACT if args.compact else CLASSIC)
@@ -0,0 +1,286 @@
+"""
+On-demand profiling of single requests and background jobs.
+
+A request is profiled when it carries the header "X-Profile: 1" or the query
+flag ?profile=1; a background job is profiled when it was submitted with the
+same flag (the profile is recorded in the worker process). Profiled code runs
+under cProfile and, in parallel, a stack sampler thread, so every profile can
+be read both ways:
+
+- pstats: cProfile statistics (function-level call counts and times)
+- collapsed: sampled call stacks in the collapsed format ("a;b;c count"),
+  ready for flamegraph.pl, speedscope or inferno
+
+Profiles are stored in PROFILE_DIR (default: instance/profiles) as
+<id>.prof, <id>.collapsed and <id>.json (metadata); only the newest
+MAX_PROFILES are kept.
+
+MAIN FUNCTIONS:
+- Profiler(name, kind).start() / .stop(**metadata): Profile a block of code
+- init_profiling(app): Request hooks for the header/query flag
+- wants_profile(): Check the current request for the profiling flag
+- list_profiles() / get_profile_metadata(profile_id) / delete_profile(profile_id)
+- render_pstats(profile_id) / read_collapsed_stacks(profile_id) / get_profile_file(profile_id)
+"""
+
+import cProfile
+import glob
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from flask import request
+
+import db_manager
+
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(db_manager.get_database_dir(), 'profiles')
+
+# Seconds between two stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Number of profiles kept on disk
+MAX_PROFILES = 50
+
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+_local = threading.local()
+
+
+class StackSampler(threading.Thread):
+    """Thread that periodically records the call stack of another thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(name=f"kegelmanager-profiler-{thread_id}", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1)
+
+
+class Profiler:
+    """cProfile plus stack sampling of the current thread."""
+
+    def __init__(self, name, kind='request'):
+        """
+        Args:
+            name: Description of the profiled work (e.g. "POST /api/simulate/match_day")
+            kind: 'request' or 'job'
+        """
+        self.name = name
+        self.kind = kind
+        self.profile = None
+        self.sampler = None
+        self.start_time = None
+
+    def start(self):
+        """Start profiling the current thread."""
+        self.start_time = time.perf_counter()
+        self.sampler = StackSampler(threading.get_ident())
+        self.sampler.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return self
+
+    def stop(self, save=True, **metadata):
+        """
+        Stop profiling and store the profile.
+
+        Args:
+            save: False to discard the profile
+            **metadata: Additional fields for the metadata file (e.g. status, job_id)
+
+        Returns:
+            str: The profile ID, or None if the profile was discarded
+        """
+        self.profile.disable()
+        self.sampler.stop()
+        duration_ms = round((time.perf_counter() - self.start_time) * 1000, 1)
+        if not save:
+            return None
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', self.name).strip('_')[:60]
+        profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{slug}_{uuid.uuid4().hex[:6]}"
+        base_path = os.path.join(PROFILE_DIR, profile_id)
+
+        self.profile.dump_stats(base_path + '.prof')
+        with open(base_path + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(base_path + '.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'id': profile_id,
+                'name': self.name,
+                'kind': self.kind,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'duration_ms': duration_ms,
+                'samples': self.sampler.samples,
+                'sample_interval_ms': SAMPLE_INTERVAL * 1000,
+                **metadata
+            }, f, indent=2)
+
+        _prune_profiles()
+        print(f"Profile {profile_id} saved ({duration_ms} ms, {self.sampler.samples} samples)")
+        return profile_id
+
+
+def _prune_profiles():
+    """Delete the oldest profiles beyond MAX_PROFILES."""
+    metadata_files = sorted(glob.glob(os.path.join(PROFILE_DIR, '*.json')))
+    for metadata_file in metadata_files[:max(0, len(metadata_files) - MAX_PROFILES)]:
+        delete_profile(os.path.basename(metadata_file)[:-len('.json')])
+
+
+def _profile_path(profile_id, extension):
+    if not profile_id or not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + extension)
+    return path if os.path.exists(path) else None
+
+
+def wants_profile(data=None):
+    """Check whether the current request asks for profiling (header, query flag or JSON body)."""
+    if data and data.get('profile'):
+        return True
+    flag = request.headers.get('X-Profile') or request.args.get('profile', '')
+    return flag.lower() in ('1', 'true', 'yes')
+
+
+def _start_request_profile():
+    # Nested profiling (e.g. sub-requests of /api/batch) would disturb the outer profiler
+    if not wants_profile() or getattr(_local, 'active', False):
+        return
+    _local.active = True
+    request.environ['profiling.profiler'] = Profiler(f"{request.method} {request.path}", kind='request').start()
+
+
+def _finish_request_profile(response):
+    profiler = request.environ.pop('profiling.profiler', None)
+    if profiler:
+        _local.active = False
+        profile_id = profiler.stop(method=request.method, path=request.full_path, status=response.status_code)
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+
+def _discard_request_profile(exc=None):
+    profiler = request.environ.pop('profiling.profiler', None)
+    if profiler:
+        _local.active = False
+        profiler.stop(save=False)
+
+
+def init_profiling(app):
+    """
+    Install the request hooks that profile flagged requests.
+
+    Args:
+        app: The Flask app
+    """
+    app.before_request(_start_request_profile)
+    app.after_request(_finish_request_profile)
+    app.teardown_request(_discard_request_profile)
+
+
+def list_profiles():
+    """
+    List the stored profiles, newest first.
+
+    Returns:
+        list: Metadata dicts of the profiles
+    """
+    profiles = []
+    for metadata_file in sorted(glob.glob(os.path.join(PROFILE_DIR, '*.json')), reverse=True):
+        try:
+            with open(metadata_file, encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error reading profile metadata {metadata_file}: {e}")
+    return profiles
+
+
+def get_profile_metadata(profile_id):
+    """Get the metadata of a profile, or None if it does not exist."""
+    path = _profile_path(profile_id, '.json')
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_profile_file(profile_id):
+    """Get the path of the raw cProfile file (.prof), or None."""
+    return _profile_path(profile_id, '.prof')
+
+
+def render_pstats(profile_id, sort='cumulative', limit=80):
+    """
+    Render the cProfile statistics of a profile as text.
+
+    Args:
+        profile_id: The profile ID
+        sort: pstats sort key (cumulative, tottime, calls, ...)
+        limit: Number of functions listed
+
+    Returns:
+        str: The pstats report, or None if the profile does not exist
+    """
+    path = _profile_path(profile_id, '.prof')
+    if not path:
+        return None
+    stream = io.StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def read_collapsed_stacks(profile_id):
+    """Get the sampled stacks of a profile in collapsed format, or None."""
+    path = _profile_path(profile_id, '.collapsed')
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def delete_profile(profile_id):
+    """
+    Delete all files of a profile.
+
+    Returns:
+        bool: True if anything was deleted
+    """
+    deleted = False
+    for extension in ('.prof', '.collapsed', '.json'):
+        path = _profile_path(profile_id, extension)
+        if path:
+            os.remove(path)
+            deleted = True
+    return deleted
@@ -0,0 +1,227 @@
+"""
+Progress reporting for long-running simulation and season transition work.
+
+Simulation code calls report_progress() at its checkpoints (match day finished,
+transition step started, ...) and wraps its phases in phase(name), a context
+manager and decorator that reports phase_start/phase_end events with timings.
+The phase_end event is also reported when the phase raises, so the consumers
+of the phase events - the phase durations of metrics.py and the per-phase
+query counters of query_stats.py - never see a phase that was left open.
+
+Events reach two kinds of consumers:
+- Listeners (add_progress_listener) are called synchronously, e.g. by the
+  background job runner. A listener may raise ProgressCancelled to abort the
+  running work at the next checkpoint; all other listener errors are printed
+  and ignored so that a broken listener never breaks a simulation.
+- Subscribers (subscribe_progress) get every event in their own bounded queue,
+  e.g. the server-sent events stream. Slow subscribers lose their oldest events.
+
+MAIN FUNCTIONS:
+- add_progress_listener(listener) / remove_progress_listener(listener)
+- subscribe_progress() / unsubscribe_progress(subscriber)
+- report_progress(event, **data): Send an event to all listeners and subscribers
+- publish_progress(event, data): Send an event to the subscribers only
+- phase(name, **data): Context manager/decorator for a timed phase
+- report_phase_start(name) / report_phase_end(name, start_time): The events of a phase
+"""
+
+import itertools
+import queue
+import threading
+import time
+from contextlib import ContextDecorator
+from datetime import datetime
+
+_listeners = []
+_subscribers = []
+_subscribers_lock = threading.Lock()
+_sequence = itertools.count(1)
+
+
+class ProgressCancelled(Exception):
+    """Raised by a progress listener to cancel the running work."""
+
+
+def add_progress_listener(listener):
+    """
+    Register a listener for progress events.
+
+    Args:
+        listener: Callable taking (event, data)
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_progress_listener(listener):
+    """Unregister a progress listener."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def subscribe_progress(max_events=1000):
+    """
+    Create a subscriber queue that receives every progress event.
+
+    Args:
+        max_events: Maximum number of buffered events before the oldest are dropped
+
+    Returns:
+        queue.Queue: Queue of event dicts (id, event, data, timestamp)
+    """
+    subscriber = queue.Queue(maxsize=max_events)
+    with _subscribers_lock:
+        _subscribers.append(subscriber)
+    return subscriber
+
+
+def unsubscribe_progress(subscriber):
+    """Remove a subscriber queue created by subscribe_progress()."""
+    with _subscribers_lock:
+        if subscriber in _subscribers:
+            _subscribers.remove(subscriber)
+
+
+def has_progress_consumers():
+    """Check whether anybody listens, so expensive event payloads can be skipped otherwise."""
+    return bool(_listeners or _subscribers)
+
+
+def publish_progress(event, data):
+    """
+    Send a progress event to all subscribers (not to the listeners).
+
+    Args:
+        event: Name of the event
+        data: Event payload (JSON-serializable dict)
+    """
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    if not subscribers:
+        return
+
+    message = {
+        'id': next(_sequence),
+        'event': event,
+        'data': data,
+        'timestamp': datetime.now().isoformat(timespec='milliseconds')
+    }
+    for subscriber in subscribers:
+        try:
+            subscriber.put_nowait(message)
+        except queue.Full:
+            # Drop the oldest event of a slow subscriber
+            try:
+                subscriber.get_nowait()
+                subscriber.put_nowait(message)
+            except (queue.Empty, queue.Full):
+                pass
+
+
+def report_progress(event, **data):
+    """
+    Send a progress event to all registered listeners and subscribers.
+
+    Args:
+        event: Name of the event (e.g. 'match_day_simulated', 'transition_step')
+        **data: Event payload (JSON-serializable values)
+    """
+    for listener in list(_listeners):
+        try:
+            listener(event, data)
+        except ProgressCancelled:
+            raise
+        except Exception as e:
+            print(f"Error in progress listener for event {event}: {e}")
+
+    publish_progress(event, data)
+
+
+def report_phase_start(name, **data):
+    """
+    Report the start of a phase of work.
+
+    Args:
+        name: Name of the phase (e.g. 'match_day.simulation', 'transition.aging')
+        **data: Additional payload
+
+    Returns:
+        float: Start time to pass to report_phase_end()
+    """
+    report_progress('phase_start', phase=name, **data)
+    return time.perf_counter()
+
+
+def report_phase_end(name, start_time, **data):
+    """
+    Report the end of a phase of work with its duration in milliseconds.
+
+    Args:
+        name: Name of the phase
+        start_time: Value returned by report_phase_start()
+        **data: Additional payload
+    """
+    report_progress(
+        'phase_end',
+        phase=name,
+        duration_ms=round((time.perf_counter() - start_time) * 1000, 1),
+        **data
+    )
+
+
+class phase(ContextDecorator):
+    """
+    Context manager and decorator for a timed phase of work.
+
+    Reports phase_start on entry and phase_end with the duration on exit. If
+    the phase raises, phase_end is still reported, with the exception's type
+    as 'error'. Payload for the phase_end event only known at the end of the
+    phase is added with update():
+
+        with phase('match_day.simulation', season_id=season.id) as simulation_phase:
+            results = ...
+            simulation_phase.update(matches=len(results))
+
+    Args:
+        name: Name of the phase (e.g. 'match_day.simulation', 'transition.aging')
+        **data: Payload of both events
+    """
+
+    def __init__(self, name, **data):
+        self.name = name
+        self.data = data
+        self.end_data = {}
+        self.start_time = None
+
+    def _recreate_cm(self):
+        # Every call of a decorated function is a phase of its own
+        return phase(self.name, **self.data)
+
+    def update(self, **data):
+        """Add payload to the phase_end event."""
+        self.end_data.update(data)
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        try:
+            report_phase_start(self.name, **self.data)
+        except ProgressCancelled:
+            # Listeners that already started the phase get its end
+            self._report_end(ProgressCancelled)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._report_end(exc_type)
+        return False
+
+    def _report_end(self, exc_type):
+        data = {**self.data, **self.end_data}
+        if exc_type is not None:
+            data['error'] = exc_type.__name__
+        try:
+            report_phase_end(self.name, self.start_time, **data)
+        except ProgressCancelled:
+            # A failing phase keeps its own exception
+            if exc_type is None:
+                raise
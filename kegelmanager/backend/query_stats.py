@@ -0,0 +1,313 @@
+"""
+SQL query instrumentation: query counter, slow-query log and N+1 detector.
+
+Built on SQLAlchemy engine events (registered once for every engine). Each
+executed statement is counted in all currently active collectors of the
+thread: one per HTTP request (see init_query_stats) and one per simulation
+phase (driven by the phase_start/phase_end events of progress.phase(), which
+also ends a phase that raised). Nested collectors
+are fine, e.g. the sub-requests of /api/batch also count for the batch.
+
+- Statements slower than SLOW_QUERY_MS are printed together with the calling
+  code location and kept in a short history.
+- Statements with the same shape (SQL text with IN-lists collapsed) that run
+  N_PLUS_ONE_THRESHOLD times or more inside one collector are flagged as a
+  likely N+1 pattern, again with the code location that issued them.
+
+Requests get X-Query-Count, X-Query-Time-Ms and X-Query-N-Plus-One headers
+(for streamed responses only the queries before the stream starts are
+counted). Aggregates per endpoint and per phase are returned by
+get_query_stats().
+
+MAIN FUNCTIONS:
+- init_query_stats(app): Install engine events, request hooks and the phase listener
+- get_query_stats(): Aggregated statistics, slow queries and N+1 findings
+- reset_query_stats(): Clear all aggregates
+- get_last_phase_summary(name) / record_phase_summary(name, summary): Phase stats across processes
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque, Counter
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from progress import add_progress_listener
+
+
+# Statements slower than this (milliseconds) are logged
+SLOW_QUERY_MS = 100.0
+
+# Number of identical statement shapes in one request/phase that counts as N+1
+N_PLUS_ONE_THRESHOLD = 10
+
+# Length of the histories returned by get_query_stats()
+MAX_SLOW_QUERIES = 100
+MAX_N_PLUS_ONE_FINDINGS = 100
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+_IN_LIST_PATTERN = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+_local = threading.local()
+_lock = threading.Lock()
+_installed = False
+_endpoint_stats = {}     # endpoint -> aggregated counters
+_phase_stats = {}        # phase name -> aggregated counters
+_slow_queries = deque(maxlen=MAX_SLOW_QUERIES)
+_n_plus_one = deque(maxlen=MAX_N_PLUS_ONE_FINDINGS)
+
+
+class QueryCollector:
+    """Query counters of one request or one phase."""
+
+    def __init__(self, kind, name):
+        self.kind = kind          # 'request' or 'phase'
+        self.name = name
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.flagged = {}         # shape -> code location
+
+    def add(self, shape, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[shape] += 1
+        if self.shapes[shape] == N_PLUS_ONE_THRESHOLD:
+            self.flagged[shape] = get_caller_location()
+
+    def summary(self):
+        """Counters of the collector as a JSON-serializable dict."""
+        return {
+            'queries': self.count,
+            'sql_ms': round(self.seconds * 1000, 2),
+            'n_plus_one': [
+                {'statement': shape[:300], 'count': self.shapes[shape], 'location': location}
+                for shape, location in self.flagged.items()
+            ]
+        }
+
+
+def _collectors():
+    stack = getattr(_local, 'collectors', None)
+    if stack is None:
+        stack = _local.collectors = []
+    return stack
+
+
+def statement_shape(statement):
+    """Normalize a statement so that repeated executions map to the same shape."""
+    shape = _WHITESPACE_PATTERN.sub(' ', statement).strip()
+    return _IN_LIST_PATTERN.sub('(?)', shape)
+
+
+def get_caller_location():
+    """Find the first stack frame in the backend code outside of this module."""
+    frame = sys._getframe(1)
+    while frame:
+        filename = frame.f_code.co_filename
+        if filename.startswith(BACKEND_DIR) and filename != _THIS_FILE:
+            return f"{os.path.basename(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_times')
+    if not start_times:
+        return
+    seconds = time.perf_counter() - start_times.pop()
+
+    collectors = _collectors()
+    if collectors:
+        shape = statement_shape(statement)
+        for collector in collectors:
+            collector.add(shape, seconds)
+
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        location = get_caller_location()
+        context_name = collectors[-1].name if collectors else None
+        print(f"SLOW QUERY ({seconds * 1000:.1f} ms) at {location} [{context_name}]: {statement[:200]}")
+        with _lock:
+            _slow_queries.append({
+                'statement': statement[:500],
+                'duration_ms': round(seconds * 1000, 2),
+                'location': location,
+                'context': context_name,
+                'timestamp': time.time()
+            })
+
+
+def install_query_events():
+    """Register the cursor events for all engines (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _installed = True
+
+
+def start_collector(kind, name):
+    """Start counting the queries of this thread into a new collector."""
+    collector = QueryCollector(kind, name)
+    _collectors().append(collector)
+    return collector
+
+
+def stop_collector(collector):
+    """Stop a collector and add its counters to the aggregates."""
+    stack = _collectors()
+    if collector in stack:
+        stack.remove(collector)
+    target = _endpoint_stats if collector.kind == 'request' else _phase_stats
+    _record(target, collector.kind, collector.name, collector.summary())
+
+
+def _record(target, kind, name, summary):
+    with _lock:
+        stats = target.setdefault(name, {
+            'count': 0,
+            'queries_total': 0,
+            'queries_max': 0,
+            'sql_ms_total': 0.0,
+            'sql_ms_max': 0.0,
+            'n_plus_one_count': 0
+        })
+        stats['count'] += 1
+        stats['queries_total'] += summary['queries']
+        stats['queries_max'] = max(stats['queries_max'], summary['queries'])
+        stats['sql_ms_total'] += summary['sql_ms']
+        stats['sql_ms_max'] = max(stats['sql_ms_max'], summary['sql_ms'])
+        stats['n_plus_one_count'] += len(summary['n_plus_one'])
+        for finding in summary['n_plus_one']:
+            _n_plus_one.append({kind: name, **finding, 'timestamp': time.time()})
+
+
+def _phase_listener(event_name, data):
+    """Progress listener: one collector per simulation phase."""
+    if event_name == 'phase_start':
+        start_collector('phase', data.get('phase'))
+    elif event_name == 'phase_end':
+        for collector in reversed(_collectors()):
+            if collector.kind == 'phase' and collector.name == data.get('phase'):
+                stop_collector(collector)
+                _local.last_phase = (collector.name, collector.summary())
+                break
+
+
+def get_last_phase_summary(name):
+    """
+    Get the counters of the phase that just ended on this thread.
+
+    Used by the background worker to send phase statistics to the web process.
+
+    Args:
+        name: Name of the phase
+
+    Returns:
+        dict or None: Summary as returned by QueryCollector.summary()
+    """
+    last_phase = getattr(_local, 'last_phase', None)
+    if last_phase and last_phase[0] == name:
+        return last_phase[1]
+    return None
+
+
+def record_phase_summary(name, summary):
+    """Add the counters of a phase that ran in another process to the aggregates."""
+    _record(_phase_stats, 'phase', name, summary)
+
+
+def install_phase_tracking():
+    """Count queries per simulation phase (also used in the worker process)."""
+    install_query_events()
+    add_progress_listener(_phase_listener)
+
+
+def _start_request_collector():
+    request.environ['query_stats.collector'] = start_collector('request', request.endpoint or 'unknown')
+
+
+def _finish_request_collector(response):
+    collector = request.environ.pop('query_stats.collector', None)
+    if collector:
+        stop_collector(collector)
+        response.headers['X-Query-Count'] = str(collector.count)
+        response.headers['X-Query-Time-Ms'] = f"{collector.seconds * 1000:.2f}"
+        response.headers['X-Query-N-Plus-One'] = str(len(collector.flagged))
+        if collector.flagged:
+            print(f"N+1 suspected in {collector.name}: "
+                  + "; ".join(f"{collector.shapes[shape]}x at {location}" for shape, location in collector.flagged.items()))
+    return response
+
+
+def _discard_request_collector(exc=None):
+    # Requests aborted before after_request must not leave their collector active
+    collector = request.environ.pop('query_stats.collector', None)
+    if collector:
+        stop_collector(collector)
+
+
+def init_query_stats(app):
+    """
+    Install the query instrumentation for an app.
+
+    Args:
+        app: The Flask app
+    """
+    install_phase_tracking()
+    app.before_request(_start_request_collector)
+    app.after_request(_finish_request_collector)
+    app.teardown_request(_discard_request_collector)
+
+
+def _with_averages(stats):
+    return {
+        name: {
+            **counters,
+            'sql_ms_total': round(counters['sql_ms_total'], 2),
+            'sql_ms_max': round(counters['sql_ms_max'], 2),
+            'queries_avg': round(counters['queries_total'] / counters['count'], 1),
+            'sql_ms_avg': round(counters['sql_ms_total'] / counters['count'], 2)
+        }
+        for name, counters in stats.items()
+    }
+
+
+def get_query_stats():
+    """
+    Get the aggregated query statistics.
+
+    Returns:
+        dict: Per-endpoint and per-phase counters, slow queries and N+1 findings
+    """
+    with _lock:
+        return {
+            'slow_query_ms': SLOW_QUERY_MS,
+            'n_plus_one_threshold': N_PLUS_ONE_THRESHOLD,
+            'endpoints': _with_averages(_endpoint_stats),
+            'phases': _with_averages(_phase_stats),
+            'slow_queries': list(_slow_queries),
+            'n_plus_one': list(_n_plus_one)
+        }
+
+
+def reset_query_stats():
+    """Clear all aggregates and histories."""
+    with _lock:
+        _endpoint_stats.clear()
+        _phase_stats.clear()
+        _slow_queries.clear()
+        _n_plus_one.clear()
@@ -0,0 +1,217 @@
+"""
+Versioned response cache for read-heavy GET endpoints.
+
+Most read endpoints (league tables, team/club details, histories) only change
+when a match day is simulated, a season transition runs or a write endpoint is
+called. Every one of those events bumps a global "world version"; cached
+responses are keyed by endpoint, URL arguments, query string, database and the
+world version, so a bump makes all older entries unreachable (they age out of
+the LRU).
+
+Responses carry an ETag derived from the cache key. A client that sends the
+current ETag in If-None-Match gets a 304 without the view being run at all.
+
+MAIN FUNCTIONS:
+- cached_response: Decorator for Flask GET views
+- keeps_world_version: Marks a non-GET view that does not change the world
+- changes_world(): Whether the current request invalidates the cached responses
+- bump_world_version(reason): Invalidate all cached responses
+- get_world_version(): Current world version
+- get_cache_stats() / clear_response_cache()
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+
+# Memory bounds of the LRU
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024
+
+_lock = threading.Lock()
+_world_version = 0
+_entries = OrderedDict()   # cache key -> (etag, body bytes, mimetype)
+_total_bytes = 0
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'not_modified': 0,
+    'stores': 0,
+    'evictions': 0,
+    'bumps': 0
+}
+_endpoint_stats = {}       # endpoint -> {'hits', 'misses', 'not_modified'}
+
+
+def get_world_version():
+    """Get the current world version."""
+    return _world_version
+
+
+def bump_world_version(reason=None):
+    """
+    Increase the world version, invalidating every cached response.
+
+    Args:
+        reason: Optional short description for debugging
+
+    Returns:
+        int: The new world version
+    """
+    global _world_version
+    with _lock:
+        _world_version += 1
+        _stats['bumps'] += 1
+        _stats['last_bump_reason'] = reason
+        return _world_version
+
+
+def clear_response_cache():
+    """Drop all cached responses (statistics are kept)."""
+    global _total_bytes
+    with _lock:
+        _entries.clear()
+        _total_bytes = 0
+
+
+def _count(endpoint, kind):
+    _stats[kind] += 1
+    endpoint_stats = _endpoint_stats.setdefault(endpoint, {'hits': 0, 'misses': 0, 'not_modified': 0})
+    endpoint_stats[kind] += 1
+
+
+def _make_key(kwargs):
+    """Build the cache key and its ETag for the current request."""
+    key = (
+        request.endpoint,
+        current_app.config.get('SQLALCHEMY_DATABASE_URI'),
+        tuple(sorted(kwargs.items())),
+        tuple(sorted(request.args.items(multi=True))),
+        _world_version
+    )
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+    return key, f'"{_world_version}-{digest}"'
+
+
+def _store(key, etag, body, mimetype):
+    """Insert a response into the LRU and evict the oldest entries beyond the bounds."""
+    global _total_bytes
+    if len(body) > MAX_BYTES:
+        return
+
+    with _lock:
+        old = _entries.pop(key, None)
+        if old:
+            _total_bytes -= len(old[1])
+        _entries[key] = (etag, body, mimetype)
+        _total_bytes += len(body)
+        _stats['stores'] += 1
+
+        while _entries and (len(_entries) > MAX_ENTRIES or _total_bytes > MAX_BYTES):
+            _, (_, evicted_body, _) = _entries.popitem(last=False)
+            _total_bytes -= len(evicted_body)
+            _stats['evictions'] += 1
+
+
+def _etag_matches(etag):
+    """Check If-None-Match of the current request against an ETag."""
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def _not_modified(etag):
+    response = make_response('', 304)
+    response.headers['ETag'] = etag
+    response.headers['X-Cache'] = 'NOT-MODIFIED'
+    return response
+
+
+def cached_response(view):
+    """
+    Cache successful JSON responses of a GET view per world version.
+
+    Only 200 responses are stored. The view is not called at all for cache
+    hits and for requests whose If-None-Match matches the current ETag.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        key, etag = _make_key(kwargs)
+        endpoint = request.endpoint
+
+        if _etag_matches(etag):
+            with _lock:
+                _count(endpoint, 'not_modified')
+            return _not_modified(etag)
+
+        with _lock:
+            entry = _entries.get(key)
+            if entry:
+                _entries.move_to_end(key)
+                _count(endpoint, 'hits')
+            else:
+                _count(endpoint, 'misses')
+
+        if entry:
+            cached_etag, body, mimetype = entry
+            response = current_app.response_class(body, status=200, mimetype=mimetype)
+            response.headers['ETag'] = cached_etag
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            _store(key, etag, response.get_data(), response.mimetype)
+            response.headers['ETag'] = etag
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
+
+
+def keeps_world_version(view):
+    """
+    Mark a POST/DELETE view that does not change the world (e.g. /api/batch,
+    which only runs GET sub-requests, or resetting debug statistics), so it
+    does not invalidate the cached responses.
+    """
+    view.keeps_world_version = True
+    return view
+
+
+def changes_world(response):
+    """Check whether a successful write request of the current request context invalidates the cache."""
+    if request.method not in ('POST', 'PUT', 'PATCH', 'DELETE') or response.status_code >= 400:
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    return not getattr(view, 'keeps_world_version', False)
+
+
+def get_cache_stats():
+    """
+    Get hit/miss statistics of the response cache.
+
+    Returns:
+        dict: Global counters, hit rate, memory usage and per-endpoint counters
+    """
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses'] + _stats['not_modified']
+        return {
+            **_stats,
+            'hit_rate': round((_stats['hits'] + _stats['not_modified']) / lookups, 4) if lookups else 0.0,
+            'world_version': _world_version,
+            'entries': len(_entries),
+            'bytes': _total_bytes,
+            'max_entries': MAX_ENTRIES,
+            'max_bytes': MAX_BYTES,
+            'endpoints': {endpoint: dict(counts) for endpoint, counts in _endpoint_stats.items()}
+        }
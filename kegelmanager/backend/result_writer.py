@@ -0,0 +1,108 @@
+"""
+Persistence of the details of a simulated match day.
+
+Everything a match day produces - scores, is_played, cup winners, player
+flags, the player performances and the lane records set on the day - is
+committed by the simulation in one transaction, together with the journal
+entry of the match day (transition_journal). A day is therefore either
+completely played or not at all.
+
+The lane records are checked in the same transaction. Checking them on a
+background thread while the next day is simulated (KEGELMANAGER_WRITE_BEHIND)
+did not make a season run faster: SQLite has a single writer, the next day
+starts with writes of its own (form, availability, player flags) and the
+check itself is one query per day. Measured with "python benchmarks.py
+--only simulate_season" the write-behind run took 18.5 s against 17.2 s
+(small world, best of 3) and 76-85 s against 67-83 s (medium world).
+
+MAIN FUNCTIONS:
+- write_match_day_details(...): Insert performances, check lane records and journal the day (caller commits)
+- collect_lane_records(results): Lane record candidates of a match day
+"""
+
+from progress import phase
+from transition_journal import record_step, match_day_step
+
+
+def collect_lane_records(results):
+    """
+    Get the lane record candidates of a match day with the ID of their match.
+
+    Args:
+        results: Match results (both league and cup matches)
+
+    Returns:
+        list: Lane record dicts (club_id, score, player_id or team_id, match_id)
+    """
+    return [
+        dict(record, match_id=result['match_id'])
+        for result in results
+        if result.get('match_id')
+        for record in result.get('lane_records', [])
+    ]
+
+
+def write_match_day_details(results, all_performances, next_match_day, calendar_date=None, season_id=None):
+    """
+    Insert the performances of a match day, check its lane records and journal it.
+
+    The match results must already be in the session; nothing is committed
+    here, the caller commits everything in one transaction. The performance
+    dictionaries are not modified, they are also part of the results returned
+    to the caller.
+
+    Args:
+        results: Match results (both league and cup matches)
+        all_performances: All player performances (dicts with match_id)
+        next_match_day: The simulated match day
+        calendar_date: The calendar date of the match day
+        season_id: Season of the match day, journaled if given
+
+    Returns:
+        str: The journal step of the match day
+    """
+    from performance_optimizations import batch_create_performances, batch_create_cup_performances
+    from simulation import process_lane_records_batch
+
+    # The results know which of their matches are cup matches
+    cup_match_ids = set()
+    league_match_ids = set()
+    for result in results:
+        match_id = result.get('match_id')
+        if match_id:
+            (cup_match_ids if result.get('is_cup_match', False) else league_match_ids).add(match_id)
+
+    league_performances = []
+    cup_performances = []
+    for performance in all_performances:
+        if not isinstance(performance, dict):
+            performance = performance.__dict__
+        match_id = performance.get('match_id')
+        if not (match_id and performance.get('player_id') and performance.get('team_id')):
+            continue
+
+        if match_id in cup_match_ids:
+            cup_performance = dict(performance)
+            cup_performance['cup_match_id'] = cup_performance.pop('match_id')
+            cup_performances.append(cup_performance)
+        elif match_id in league_match_ids:
+            league_performances.append(performance)
+
+    # Create performances in their respective tables
+    if league_performances:
+        batch_create_performances(league_performances)
+
+    if cup_performances:
+        batch_create_cup_performances(cup_performances)
+
+    new_lane_records = 0
+    lane_records = collect_lane_records(results)
+    if lane_records:
+        with phase('match_day.lane_records', records=len(lane_records)):
+            new_lane_records = process_lane_records_batch(lane_records)
+
+    step = match_day_step(next_match_day, calendar_date)
+    if season_id is not None:
+        record_step(season_id, step, matches=len(results),
+                    performances=len(league_performances) + len(cup_performances), new_lane_records=new_lane_records)
+    return step
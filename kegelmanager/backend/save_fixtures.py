@@ -0,0 +1,142 @@
+"""
+Temporary saves for the test scripts.
+
+Every test that needs a database works on a save of its own in a temporary
+directory: a SQLite file with the current schema, opened by a minimal Flask
+app (no routes) that shares the db object of models.py. The connections of a
+save are always released when its app context ends, so the temporary
+directory can be removed and a save can be copied, converted or switched to
+by the code under test.
+
+MAIN FUNCTIONS:
+- create_test_app(db_path): Minimal Flask app on a save file
+- open_save(app): App context that releases the save's connections on exit
+- create_save(db_path, season_name, clubs, players): New save file with a current season
+- temporary_save(name): App context on a new save in a temporary directory
+- import_app(db_path): The API app of app.py, switched to a save
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date
+
+from flask import Flask
+from sqlalchemy import text
+
+from models import db, Season, Club, Player
+
+
+def create_test_app(db_path):
+    """
+    Create a minimal Flask app on a save file.
+
+    Args:
+        db_path: Path of the save (created on the first write if it does not exist)
+
+    Returns:
+        Flask: The app, registered with the db object of models.py
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.abspath(db_path)}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+@contextmanager
+def open_save(app):
+    """
+    App context on the save of an app.
+
+    The session is removed and the engine disposed on exit, so no connection
+    keeps the file open.
+    """
+    with app.app_context():
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.engine.dispose()
+
+
+def create_save(db_path, season_name='Season 2025', clubs=0, players=0):
+    """
+    Create a save file with the current schema in WAL mode.
+
+    Args:
+        db_path: Path of the new save
+        season_name: Name of the current season (None for a save without season)
+        clubs: Number of clubs
+        players: Number of players, spread over the clubs
+
+    Returns:
+        str: db_path
+    """
+    with open_save(create_test_app(db_path)):
+        db.session.execute(text("PRAGMA journal_mode = WAL"))
+        db.create_all()
+
+        if season_name:
+            db.session.add(Season(name=season_name, start_date=date(2025, 8, 1), end_date=date(2026, 5, 31),
+                                  is_current=True))
+
+        club_rows = [Club(name=f'Verein {i}') for i in range(clubs)]
+        db.session.add_all(club_rows)
+        db.session.flush()
+
+        db.session.add_all([
+            Player(name=f'Spieler {i}', age=20 + i % 15, strength=i % 100, talent=5,
+                   club_id=club_rows[i % clubs].id if clubs else None)
+            for i in range(players)
+        ])
+        db.session.commit()
+    return db_path
+
+
+@contextmanager
+def temporary_save(name='save.db'):
+    """
+    Open a new, empty save (all tables created) in a temporary directory.
+
+    Usage:
+        with temporary_save('archive.db') as (app, db_path):
+            ... test code in the app context of the save ...
+
+    Args:
+        name: File name of the save
+
+    Yields:
+        tuple: (app, db_path)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, name)
+        app = create_test_app(db_path)
+        with open_save(app):
+            db.create_all()
+            yield app, db_path
+
+
+def import_app(db_path):
+    """
+    Get the API app of app.py with a save as its active save.
+
+    app.py opens its configured save when it is imported. The first import is
+    pointed to db_path through KEGELMANAGER_DB_PATH, so the tests never touch
+    selected_db.txt; later calls switch the app to their save at runtime.
+
+    Args:
+        db_path: Path of the save
+
+    Returns:
+        Flask: The app of app.py
+    """
+    import save_registry
+
+    if 'app' not in sys.modules:
+        os.environ['KEGELMANAGER_DB_PATH'] = os.path.abspath(db_path)
+    import app as api
+
+    save_registry.activate_save(api.app, db_path)
+    return api.app
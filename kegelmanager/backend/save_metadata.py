@@ -0,0 +1,165 @@
+"""
+Cached metadata of the saves for the main menu.
+
+Every save gets a sidecar file '<save>.meta.json' with its current season,
+club and player count and the time of its last simulation. The
+sidecar also stores a signature of the save files (size and modification
+time of the database and its WAL file), so the saves list only opens a save
+again when it was changed by something that did not update the sidecar (e.g.
+an edit in the UI or an external tool).
+
+The simulation refreshes the sidecar of the save it works on once per run -
+after a single simulated match day, a season run or a season transition
+(record_simulation) - so listing the saves after playing does not open any
+database. The match days inside a season run do not refresh it: each one
+would open the save once more on the simulation's critical path, and the
+next commit changes the WAL file and so the signature anyway.
+
+MAIN FUNCTIONS:
+- get_save_metadata(db_path): Metadata of a save, re-validated only if the save changed
+- refresh_save_metadata(db_path, simulated): Read the metadata from the save and store it
+- record_simulation(): Refresh the metadata of the save of the current app context
+- delete_save_metadata(db_path): Remove the sidecar of a save
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+
+METADATA_SUFFIX = '.meta.json'
+
+# Increase when the stored fields change, older sidecars are re-validated
+METADATA_VERSION = 1
+
+
+def get_metadata_path(db_path):
+    """Get the path of the sidecar file of a save."""
+    return f"{db_path}{METADATA_SUFFIX}"
+
+
+def _file_signature(db_path):
+    """Size and modification time of the save and its WAL file."""
+    signature = []
+    for path in (db_path, f"{db_path}-wal"):
+        try:
+            stats = os.stat(path)
+            signature.append([stats.st_size, stats.st_mtime_ns])
+        except FileNotFoundError:
+            signature.append(None)
+    return signature
+
+
+def _load_sidecar(db_path):
+    try:
+        with open(get_metadata_path(db_path), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if metadata.get('version') != METADATA_VERSION:
+        return None
+    return metadata
+
+
+def _write_sidecar(db_path, metadata):
+    metadata_path = get_metadata_path(db_path)
+    temp_path = f"{metadata_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, metadata_path)
+
+
+def _read_save_stats(db_path):
+    """Read season, club count and player count from a save."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM season WHERE is_current = 1")
+        season_row = cursor.fetchone()
+
+        cursor.execute("SELECT COUNT(*) FROM club")
+        club_count = cursor.fetchone()[0]
+
+        cursor.execute("SELECT COUNT(*) FROM player")
+        player_count = cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        'current_season': season_row[0] if season_row else "Unbekannt",
+        'club_count': club_count,
+        'player_count': player_count
+    }
+
+
+def refresh_save_metadata(db_path, simulated=False):
+    """
+    Read the metadata from a save and store it in its sidecar.
+
+    Args:
+        db_path: Path of the save
+        simulated: Set the time of the last simulation to now
+
+    Returns:
+        dict: The stored metadata
+    """
+    db_path = os.path.abspath(db_path)
+    previous = _load_sidecar(db_path) or {}
+    stats = _read_save_stats(db_path)
+
+    # Taken after reading: closing the last connection of a save checkpoints its WAL file
+    metadata = {
+        'version': METADATA_VERSION,
+        'signature': _file_signature(db_path),
+        **stats,
+        'last_simulated': (datetime.now().strftime('%Y-%m-%d %H:%M:%S') if simulated
+                           else previous.get('last_simulated'))
+    }
+    _write_sidecar(db_path, metadata)
+    return metadata
+
+
+def get_save_metadata(db_path):
+    """
+    Get the metadata of a save.
+
+    The sidecar is used as long as the save files are unchanged; otherwise
+    the save is read again and the sidecar updated.
+
+    Args:
+        db_path: Path of the save
+
+    Returns:
+        dict: current_season, club_count, player_count, last_simulated
+    """
+    db_path = os.path.abspath(db_path)
+    metadata = _load_sidecar(db_path)
+    if metadata is None or metadata.get('signature') != _file_signature(db_path):
+        metadata = refresh_save_metadata(db_path)
+    return metadata
+
+
+def record_simulation():
+    """
+    Refresh the metadata of the save of the current app context after a simulation run.
+
+    Errors are printed and ignored: the metadata is only a cache.
+    """
+    from models import db
+    db_path = db.engine.url.database
+    if not db_path or db_path == ':memory:' or not os.path.exists(db_path):
+        return
+
+    try:
+        refresh_save_metadata(db_path, simulated=True)
+    except Exception as e:
+        print(f"Warning: Could not update the save metadata: {str(e)}")
+
+
+def delete_save_metadata(db_path):
+    """Remove the sidecar of a save (e.g. when the save is deleted)."""
+    metadata_path = get_metadata_path(db_path)
+    if os.path.exists(metadata_path):
+        os.remove(metadata_path)
@@ -0,0 +1,323 @@
+"""
+Runtime switching between save databases without restarting the backend.
+
+Every save (SQLite file) gets its own SQLAlchemy engine, created on first use
+and kept in an LRU registry. Switching the active save only swaps the engine
+the app routes to, which takes a few milliseconds; the engines of recently
+used saves stay open, idle ones are disposed (LRU, see MAX_OPEN_SAVES and
+IDLE_SECONDS). The pragmas of the connections come from storage_profiles.py.
+
+Read/write split: every save has a writer engine and a reader engine. Reader
+connections are read-only (analytics storage profile, query_only) and run
+each request in one WAL read transaction, so a page sees the last committed
+state as one consistent snapshot while a simulation keeps writing. GET and
+HEAD requests use the reader unless their view is marked with @uses_writer
+(or their blueprint is routed to the writer with set_blueprint_role); all
+other requests and code outside of requests use the writer. db.engine
+(DDL, inspection) always returns the writer. Concurrent reading and writing
+needs the WAL journal of storage_profiles.py.
+
+Binding: models.db routes db.session and db.engine through get_bound_engine().
+The engines are pinned to the app context on first use, so a request that is
+running while the save is switched finishes on the save it started with
+(sub-requests of /api/batch share the pin of their batch). Apps that were not
+registered with init_save_registry (worker processes, create_new_database)
+keep their normal Flask-SQLAlchemy engine.
+
+MAIN FUNCTIONS:
+- init_save_registry(app, db_path): Register the app and its initial save
+- activate_save(app, db_path): Switch the active save of the app
+- get_bound_engine(app, role): Engine of the current app context (used by models.db)
+- uses_writer(view) / uses_reader(view): Route a view to the writer or reader engine
+- set_blueprint_role(app, blueprint_name, role): Route all views of a blueprint
+- evict_save(db_path): Dispose the engine of a save (e.g. before deleting the file)
+- get_registry_stats(): Open engines and switch timings
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+from storage_profiles import pinned_connection_class
+
+
+# Number of save engines kept open (the active one is never evicted)
+MAX_OPEN_SAVES = 4
+
+# Engines of inactive saves unused for this long are disposed
+IDLE_SECONDS = 600
+
+# Seconds a connection waits for a lock held by another connection
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
+
+_lock = threading.RLock()
+_engines = OrderedDict()   # absolute db path -> {'engine', 'reader', 'created_at', 'last_used', 'uses'}
+_switch_stats = {'switches': 0, 'last_switch_ms': None, 'evictions': 0}
+
+EXTENSION_KEY = 'save_registry'
+
+# Methods routed to the reader engine by default
+READ_METHODS = ('GET', 'HEAD')
+WRITE = 'write'
+READ = 'read'
+
+
+def _create_engine(db_path):
+    return create_engine(
+        f'sqlite:///{db_path}',
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=False,
+        connect_args={'check_same_thread': False, 'timeout': SQLITE_BUSY_TIMEOUT_SECONDS}
+    )
+
+
+def _begin_read_transaction(connection):
+    # pysqlite does not start transactions for SELECTs; without BEGIN every
+    # statement would see a different state while a simulation commits
+    connection.exec_driver_sql("BEGIN")
+
+
+def _create_reader_engine(db_path):
+    engine = create_engine(
+        f'sqlite:///{db_path}',
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=False,
+        connect_args={
+            'check_same_thread': False,
+            'timeout': SQLITE_BUSY_TIMEOUT_SECONDS,
+            'isolation_level': None,
+            'factory': pinned_connection_class('analytics')
+        }
+    )
+    event.listen(engine, 'begin', _begin_read_transaction)
+    return engine
+
+
+def get_engine(db_path, role=WRITE):
+    """
+    Get the writer or reader engine of a save, creating it on first use.
+
+    Args:
+        db_path: Path of the save database
+        role: WRITE or READ
+
+    Returns:
+        Engine: The SQLAlchemy engine of the save
+    """
+    db_path = os.path.abspath(db_path)
+    with _lock:
+        entry = _engines.get(db_path)
+        if entry is None:
+            entry = _engines[db_path] = {
+                'engine': _create_engine(db_path),
+                'reader': None,
+                'created_at': time.time(),
+                'last_used': time.time(),
+                'uses': 0
+            }
+        _engines.move_to_end(db_path)
+        entry['last_used'] = time.time()
+        entry['uses'] += 1
+        if role == READ:
+            if entry['reader'] is None:
+                entry['reader'] = _create_reader_engine(db_path)
+            return entry['reader']
+        return entry['engine']
+
+
+def _dispose_entry(entry):
+    entry['engine'].dispose()
+    if entry['reader'] is not None:
+        entry['reader'].dispose()
+
+
+def _evict_idle(active_paths):
+    """Dispose least recently used engines beyond MAX_OPEN_SAVES and idle engines."""
+    now = time.time()
+    with _lock:
+        for db_path in list(_engines):
+            if db_path in active_paths:
+                continue
+            too_many = len(_engines) > MAX_OPEN_SAVES
+            idle = now - _engines[db_path]['last_used'] > IDLE_SECONDS
+            if too_many or idle:
+                _dispose_entry(_engines.pop(db_path))
+                _switch_stats['evictions'] += 1
+                print(f"Save engine evicted: {os.path.basename(db_path)}")
+
+
+def evict_save(db_path):
+    """
+    Dispose the engine of a save.
+
+    Args:
+        db_path: Path of the save database
+
+    Returns:
+        bool: True if an engine was open
+    """
+    with _lock:
+        entry = _engines.pop(os.path.abspath(db_path), None)
+    if entry:
+        _dispose_entry(entry)
+        return True
+    return False
+
+
+def init_save_registry(app, db_path):
+    """
+    Route the database access of an app through the save registry.
+
+    Args:
+        app: The Flask app
+        db_path: Path of the save to start with
+    """
+    get_engine(db_path)
+    app.extensions[EXTENSION_KEY] = {'active_path': os.path.abspath(db_path), 'blueprint_roles': {}}
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.abspath(db_path)}'
+    app.before_request(_route_request)
+
+
+def uses_writer(view):
+    """Route a view to the writer engine (e.g. GET endpoints that create default rows)."""
+    view.db_role = WRITE
+    return view
+
+
+def uses_reader(view):
+    """Route a view to the read-only engine, whatever its HTTP method."""
+    view.db_role = READ
+    return view
+
+
+def set_blueprint_role(app, blueprint_name, role):
+    """Route all views of a blueprint to the writer (WRITE) or reader (READ) engine."""
+    app.extensions[EXTENSION_KEY]['blueprint_roles'][blueprint_name] = role
+
+
+def _route_request():
+    """before_request hook: choose the engine role of the request."""
+    from flask import current_app
+
+    state = current_app.extensions[EXTENSION_KEY]
+    view = current_app.view_functions.get(request.endpoint)
+    role = getattr(view, 'db_role', None) or state['blueprint_roles'].get(request.blueprint)
+    if role is None:
+        role = READ if request.method in READ_METHODS else WRITE
+    g._db_role = role
+
+
+def get_active_save(app):
+    """Get the path of the active save of an app, or None if the app is not registered."""
+    state = app.extensions.get(EXTENSION_KEY)
+    return state['active_path'] if state else None
+
+
+def get_bound_engine(app, role=None):
+    """
+    Get the engine the current app context is bound to.
+
+    Args:
+        app: The current Flask app
+        role: WRITE or READ (default: the role of the current request, WRITE outside of requests)
+
+    Returns:
+        Engine or None: None if the app does not use the save registry
+    """
+    state = app.extensions.get(EXTENSION_KEY)
+    if state is None:
+        return None
+    role = role or g.get('_db_role', WRITE)
+    pinned = g.get('_save_engines')
+    if pinned is None:
+        pinned = g._save_engines = {'path': state['active_path']}
+    engine = pinned.get(role)
+    if engine is None:
+        engine = pinned[role] = get_engine(pinned['path'], role)
+    return engine
+
+
+def activate_save(app, db_path):
+    """
+    Switch the active save of an app.
+
+    New app contexts (requests) use the new save immediately; running requests
+    finish on the save they started with.
+
+    Args:
+        app: The Flask app (registered with init_save_registry)
+        db_path: Path of the save to activate
+
+    Returns:
+        dict: Name, path and switch time of the save
+    """
+    start_time = time.perf_counter()
+    db_path = os.path.abspath(db_path)
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Datenbank existiert nicht: {db_path}")
+
+    engine = get_engine(db_path)
+    # Open (and check) a connection now, so the first request after the switch does not pay for it
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    state = app.extensions[EXTENSION_KEY]
+    previous_path = state['active_path']
+    state['active_path'] = db_path
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+
+    # Cached responses belong to the previous save
+    from response_cache import clear_response_cache, bump_world_version
+    clear_response_cache()
+    bump_world_version(f"save switched to {os.path.basename(db_path)}")
+
+    _evict_idle({db_path})
+
+    duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
+    with _lock:
+        _switch_stats['switches'] += 1
+        _switch_stats['last_switch_ms'] = duration_ms
+    print(f"Save switched: {os.path.basename(previous_path)} -> {os.path.basename(db_path)} ({duration_ms} ms)")
+
+    return {
+        'name': os.path.basename(db_path),
+        'path': db_path,
+        'previous': os.path.basename(previous_path),
+        'switch_ms': duration_ms
+    }
+
+
+def get_registry_stats():
+    """
+    Get the open save engines and switch statistics.
+
+    Returns:
+        dict: Engines (most recently used last) with pool status, switch counters
+    """
+    now = time.time()
+    with _lock:
+        return {
+            'max_open_saves': MAX_OPEN_SAVES,
+            'idle_seconds': IDLE_SECONDS,
+            'engines': [
+                {
+                    'name': os.path.basename(db_path),
+                    'path': db_path,
+                    'uses': entry['uses'],
+                    'idle_seconds': round(now - entry['last_used'], 1),
+                    'pool': entry['engine'].pool.status(),
+                    'reader_pool': entry['reader'].pool.status() if entry['reader'] is not None else None
+                }
+                for db_path, entry in _engines.items()
+            ],
+            **_switch_stats
+        }
@@ -0,0 +1,395 @@
+"""
+Save cloning, checkpoints and restore with the SQLite online backup API.
+
+All copies are made with sqlite3.Connection.backup() instead of copying the
+file: the backup reads a consistent state of the save (including the pages
+that are still in the WAL file) while the app keeps using it, and copies it
+in steps of BACKUP_PAGES_PER_STEP pages. Between the steps the read lock is
+released, so the live engines are never blocked, and every step reports a
+'backup_progress' event (progress.py). A copy is written to a temporary file
+first and only renamed when it is complete.
+
+If another connection commits to the save during a step-wise copy, SQLite
+restarts the copy. After BACKUP_MAX_RESTARTS restarts the copy is finished
+in one step (one read transaction, which does not block writers in WAL mode).
+
+Checkpoints of a save are stored next to it in checkpoints/<save name>/, each
+with a JSON file holding its metadata. A checkpoint is created automatically
+before every season transition (reason 'pre_transition'); only the newest
+MAX_AUTO_CHECKPOINTS automatic checkpoints of a save are kept, manual
+checkpoints are kept until they are deleted. Restoring a checkpoint writes it
+back into the save in one write transaction, so readers see either the old or
+the restored state; the current state is checkpointed first ('pre_restore').
+
+MAIN FUNCTIONS:
+- backup_database(source_path, target_path): Copy a save with the backup API
+- save_as(source_path, target_path): Clone a save ("save as")
+- create_checkpoint(db_path, reason, label): Checkpoint a save
+- create_transition_checkpoint(): Automatic checkpoint of the current save before a season transition
+- list_checkpoints(db_path): Checkpoints of a save, newest first
+- restore_checkpoint(db_path, checkpoint_name): Restore a save from a checkpoint
+- delete_checkpoint(db_path, checkpoint_name): Delete a checkpoint
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from progress import report_progress
+
+
+# Pages copied per backup step (4 MB with the default page size of 4 KB)
+BACKUP_PAGES_PER_STEP = 1024
+
+# Step-wise copies restarted this often (by commits of other connections) are finished in one step
+BACKUP_MAX_RESTARTS = 3
+
+# Seconds a backup waits for a lock held by another connection
+BACKUP_BUSY_TIMEOUT_SECONDS = 30
+
+# Automatic checkpoints kept per save (manual checkpoints are not counted)
+MAX_AUTO_CHECKPOINTS = 3
+
+# Create a checkpoint before every season transition
+AUTO_CHECKPOINTS_ENABLED = os.environ.get('KEGELMANAGER_AUTO_CHECKPOINTS', '1') != '0'
+
+CHECKPOINT_DIR_NAME = 'checkpoints'
+AUTO_REASONS = ('pre_transition', 'pre_restore')
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _remove_database_files(path):
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _run_backup(source, target, pages, operation, name):
+    """Run one backup from source to target, reporting every step."""
+    state = {'restarts': 0, 'last_remaining': None, 'steps': 0}
+
+    def on_step(status, remaining, total):
+        if state['last_remaining'] is not None and remaining > state['last_remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > BACKUP_MAX_RESTARTS:
+                raise _TooManyRestarts()
+        state['last_remaining'] = remaining
+        state['steps'] += 1
+        report_progress(
+            'backup_progress',
+            operation=operation,
+            name=name,
+            remaining_pages=remaining,
+            total_pages=total,
+            percent=round(100.0 * (total - remaining) / total, 1) if total else 100.0
+        )
+
+    source.backup(target, pages=pages, progress=on_step)
+    return state
+
+
+def backup_database(source_path, target_path, pages_per_step=None, operation='backup'):
+    """
+    Copy a SQLite database with the online backup API.
+
+    The copy is written to '<target>.partial' and renamed to target_path when
+    it is complete; an existing target is replaced.
+
+    Args:
+        source_path: Path of the database to copy (may be in use)
+        target_path: Path of the copy
+        pages_per_step: Pages per backup step (default: BACKUP_PAGES_PER_STEP, -1 = one step)
+        operation: Name of the operation in the progress events
+
+    Returns:
+        dict: Pages, steps, restarts, size and duration of the copy
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Datenbank existiert nicht: {source_path}")
+
+    pages_per_step = pages_per_step or BACKUP_PAGES_PER_STEP
+    start_time = time.perf_counter()
+    partial_path = f"{target_path}.partial"
+    _remove_database_files(partial_path)
+
+    source = sqlite3.connect(source_path, timeout=BACKUP_BUSY_TIMEOUT_SECONDS)
+    target = sqlite3.connect(partial_path)
+    try:
+        # The copy is only used once it is complete, a crash just leaves a partial file behind
+        target.execute("PRAGMA synchronous = OFF")
+        name = os.path.basename(target_path)
+        try:
+            state = _run_backup(source, target, pages_per_step, operation, name)
+        except _TooManyRestarts:
+            print(f"Backup of {os.path.basename(source_path)} restarted too often, copying in one step")
+            state = _run_backup(source, target, -1, operation, name)
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        # Fold a WAL file of the copy back into the database file before renaming it
+        target.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except BaseException:
+        target.close()
+        source.close()
+        _remove_database_files(partial_path)
+        raise
+    target.close()
+    source.close()
+
+    _remove_database_files(target_path)
+    os.replace(partial_path, target_path)
+
+    duration = time.perf_counter() - start_time
+    return {
+        'source': os.path.abspath(source_path),
+        'target': os.path.abspath(target_path),
+        'pages': page_count,
+        'steps': state['steps'],
+        'restarts': state['restarts'],
+        'size_mb': round(os.path.getsize(target_path) / (1024 * 1024), 2),
+        'duration_seconds': round(duration, 3)
+    }
+
+
+def save_as(source_path, target_path, overwrite=False):
+    """
+    Clone a save into a new database file ("save as").
+
+    Args:
+        source_path: Path of the save to clone (may be the active save)
+        target_path: Path of the new save
+        overwrite: Replace an existing file at target_path
+
+    Returns:
+        dict: Result of backup_database()
+    """
+    if os.path.abspath(source_path) == os.path.abspath(target_path):
+        raise ValueError("Quelle und Ziel sind dieselbe Datenbank")
+    if os.path.exists(target_path) and not overwrite:
+        raise FileExistsError(f"Datenbank existiert bereits: {os.path.basename(target_path)}")
+
+    result = backup_database(source_path, target_path, operation='save_as')
+    print(f"Save cloned: {os.path.basename(source_path)} -> {os.path.basename(target_path)} "
+          f"({result['size_mb']} MB in {result['duration_seconds']} s)")
+    return result
+
+
+def get_checkpoint_dir(db_path):
+    """Get the directory holding the checkpoints of a save."""
+    db_path = os.path.abspath(db_path)
+    save_name = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(db_path), CHECKPOINT_DIR_NAME, save_name)
+
+
+def _checkpoint_path(db_path, checkpoint_name):
+    # Only plain file names, checkpoints never leave their directory
+    if os.path.basename(checkpoint_name) != checkpoint_name or not checkpoint_name.endswith('.db'):
+        raise ValueError(f"Ungültiger Checkpoint-Name: {checkpoint_name}")
+    path = os.path.join(get_checkpoint_dir(db_path), checkpoint_name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Checkpoint existiert nicht: {checkpoint_name}")
+    return path
+
+
+def _current_season_name(db_path):
+    try:
+        connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = connection.execute("SELECT name FROM season WHERE is_current = 1").fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+    except sqlite3.Error:
+        return None
+
+
+def create_checkpoint(db_path, reason='manual', label=None):
+    """
+    Create a checkpoint of a save.
+
+    Args:
+        db_path: Path of the save
+        reason: Why the checkpoint is created ('manual', 'pre_transition', 'pre_restore')
+        label: Optional description shown in the UI
+
+    Returns:
+        dict: Metadata of the checkpoint
+    """
+    db_path = os.path.abspath(db_path)
+    checkpoint_dir = get_checkpoint_dir(db_path)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    created_at = datetime.now()
+    checkpoint_name = f"{created_at.strftime('%Y%m%d_%H%M%S_%f')}_{reason}.db"
+    checkpoint_path = os.path.join(checkpoint_dir, checkpoint_name)
+
+    result = backup_database(db_path, checkpoint_path, operation='checkpoint')
+
+    metadata = {
+        'name': checkpoint_name,
+        'save': os.path.basename(db_path),
+        'reason': reason,
+        'label': label,
+        'season': _current_season_name(checkpoint_path),
+        'created': created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'size_mb': result['size_mb'],
+        'duration_seconds': result['duration_seconds']
+    }
+    with open(f"{checkpoint_path}.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print(f"Checkpoint created: {os.path.basename(db_path)} -> {checkpoint_name} "
+          f"({result['size_mb']} MB in {result['duration_seconds']} s)")
+
+    if reason in AUTO_REASONS:
+        prune_checkpoints(db_path)
+
+    return metadata
+
+
+def create_transition_checkpoint():
+    """
+    Checkpoint the save of the current app context before a season transition.
+
+    Does nothing if automatic checkpoints are disabled or the save is not a
+    database file. Errors are printed and ignored: a failed checkpoint must not
+    stop the season transition.
+
+    Returns:
+        dict or None: Metadata of the checkpoint
+    """
+    if not AUTO_CHECKPOINTS_ENABLED:
+        return None
+
+    from models import db
+    db_path = db.engine.url.database
+    if not db_path or db_path == ':memory:' or not os.path.exists(db_path):
+        return None
+
+    try:
+        return create_checkpoint(db_path, reason='pre_transition')
+    except Exception as e:
+        print(f"Warning: Could not create checkpoint before the season transition: {str(e)}")
+        return None
+
+
+def list_checkpoints(db_path):
+    """
+    List the checkpoints of a save.
+
+    Args:
+        db_path: Path of the save
+
+    Returns:
+        list: Metadata of the checkpoints, newest first
+    """
+    checkpoint_dir = get_checkpoint_dir(db_path)
+    if not os.path.isdir(checkpoint_dir):
+        return []
+
+    checkpoints = []
+    for file_name in os.listdir(checkpoint_dir):
+        if not file_name.endswith('.db'):
+            continue
+        metadata_path = os.path.join(checkpoint_dir, f"{file_name}.json")
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        else:
+            # Checkpoint copied in by hand
+            stats = os.stat(os.path.join(checkpoint_dir, file_name))
+            metadata = {
+                'name': file_name,
+                'save': os.path.basename(db_path),
+                'reason': 'manual',
+                'label': None,
+                'season': None,
+                'created': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+                'size_mb': round(stats.st_size / (1024 * 1024), 2)
+            }
+        checkpoints.append(metadata)
+
+    checkpoints.sort(key=lambda checkpoint: checkpoint['name'], reverse=True)
+    return checkpoints
+
+
+def delete_checkpoint(db_path, checkpoint_name):
+    """
+    Delete a checkpoint of a save.
+
+    Args:
+        db_path: Path of the save
+        checkpoint_name: File name of the checkpoint
+    """
+    checkpoint_path = _checkpoint_path(db_path, checkpoint_name)
+    _remove_database_files(checkpoint_path)
+    if os.path.exists(f"{checkpoint_path}.json"):
+        os.remove(f"{checkpoint_path}.json")
+
+
+def prune_checkpoints(db_path, keep=None):
+    """
+    Delete the oldest automatic checkpoints of a save.
+
+    Args:
+        db_path: Path of the save
+        keep: Number of automatic checkpoints to keep (default: MAX_AUTO_CHECKPOINTS)
+
+    Returns:
+        list: Names of the deleted checkpoints
+    """
+    keep = MAX_AUTO_CHECKPOINTS if keep is None else keep
+    automatic = [checkpoint for checkpoint in list_checkpoints(db_path) if checkpoint['reason'] in AUTO_REASONS]
+
+    deleted = []
+    for checkpoint in automatic[keep:]:
+        delete_checkpoint(db_path, checkpoint['name'])
+        deleted.append(checkpoint['name'])
+    if deleted:
+        print(f"Deleted {len(deleted)} old checkpoint(s) of {os.path.basename(db_path)}")
+    return deleted
+
+
+def restore_checkpoint(db_path, checkpoint_name, safety_checkpoint=True):
+    """
+    Restore a save from one of its checkpoints.
+
+    The checkpoint is written into the save with the backup API in one write
+    transaction: connections of the app keep working and see the restored
+    state after the restore. Callers should make sure no simulation is
+    writing to the save and clear cached responses afterwards.
+
+    Args:
+        db_path: Path of the save
+        checkpoint_name: File name of the checkpoint
+        safety_checkpoint: Checkpoint the current state first ('pre_restore')
+
+    Returns:
+        dict: Restored checkpoint, safety checkpoint and duration
+    """
+    db_path = os.path.abspath(db_path)
+    checkpoint_path = _checkpoint_path(db_path, checkpoint_name)
+    start_time = time.perf_counter()
+
+    safety = create_checkpoint(db_path, reason='pre_restore') if safety_checkpoint else None
+
+    source = sqlite3.connect(f"file:{checkpoint_path}?mode=ro", uri=True)
+    target = sqlite3.connect(db_path, timeout=BACKUP_BUSY_TIMEOUT_SECONDS)
+    try:
+        # The destination stays locked from the first to the last step, so readers never see a mix
+        _run_backup(source, target, BACKUP_PAGES_PER_STEP, 'restore', os.path.basename(db_path))
+    finally:
+        target.close()
+        source.close()
+
+    duration = round(time.perf_counter() - start_time, 3)
+    print(f"Save restored: {checkpoint_name} -> {os.path.basename(db_path)} ({duration} s)")
+    return {
+        'save': os.path.basename(db_path),
+        'checkpoint': checkpoint_name,
+        'safety_checkpoint': safety['name'] if safety else None,
+        'duration_seconds': duration
+    }
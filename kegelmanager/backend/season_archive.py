@@ -0,0 +1,388 @@
+"""
+Cold-season archive for player performances.
+
+PlayerMatchPerformance and PlayerCupMatchPerformance get ~12 rows per match
+and were never pruned, so every statistic scanned the performances of all
+seasons ever played. After a season transition the performances of completed
+seasons are moved out of these hot tables:
+
+- The rows are stored column by column as a compressed NumPy archive (.npz
+  in a BLOB), one PerformanceArchive row per season and league (or cup). The
+  archive lives in the save itself, so checkpoints and "save as" copies
+  (save_snapshots.py) contain it.
+- The aggregates the UI needs (per player, season, team and league/cup: home
+  and away matches, Holz, Volle, Räumer, Fehler, won match points) are stored
+  in PlayerSeasonStats. The statistics in models.py add them to the hot rows
+  (sum_performances), so career stats, player history, team and league
+  statistics stay complete.
+- Match detail reads archived performances transparently: Match.to_dict()
+  and CupMatch.to_dict() fall back to get_archived_performances(), which
+  decodes only the archive of the match's league or cup.
+
+The Match and CupMatch rows themselves stay (league history, lane records and
+cup history refer to them); the hot performance tables only hold the current
+season. Free pages of the deleted rows are reused by the next season.
+
+MAIN FUNCTIONS:
+- archive_completed_seasons(): Archive every completed season that still has hot performances
+- archive_season(season_id): Archive the performances of one season
+- get_archived_performances(match): Archived performances of a Match or CupMatch (to_dict format)
+- find_archived_performance(player_id, match_id): Archived performance of one player in one match
+- encode_performances(columns) / decode_performances(data): Columnar encoding
+"""
+
+import io
+import sys
+
+import numpy as np
+from sqlalchemy import case, func, insert, literal, null, select
+
+from models import (db, Season, Match, Cup, CupMatch, Player, Team, PlayerMatchPerformance,
+                    PlayerCupMatchPerformance, PerformanceArchive, PlayerSeasonStats, archived_stats_available)
+from storage_profiles import use_storage_profile
+from response_cache import bump_world_version
+
+
+LEAGUE = 'league'
+CUP = 'cup'
+
+# Archived columns and their storage types; None is stored as -1 (integers) or NaN
+ARCHIVE_COLUMNS = (
+    ('id', np.int32),
+    ('player_id', np.int32),
+    ('match_id', np.int32),
+    ('team_id', np.int32),
+    ('is_home_team', np.int8),
+    ('position_number', np.int8),
+    ('is_substitute', np.int8),
+    ('lane1_score', np.int16),
+    ('lane2_score', np.int16),
+    ('lane3_score', np.int16),
+    ('lane4_score', np.int16),
+    ('total_score', np.int16),
+    ('volle_score', np.int16),
+    ('raeumer_score', np.int16),
+    ('fehler_count', np.int16),
+    ('set_points', np.float32),
+    ('match_points', np.int8),
+)
+
+BOOLEAN_COLUMNS = ('is_home_team', 'is_substitute')
+
+# Rows fetched per batch while archiving
+ARCHIVE_BATCH_SIZE = 20000
+
+
+def _competition_config(competition):
+    """Model, match column, match model and group column of a competition."""
+    if competition == LEAGUE:
+        return PlayerMatchPerformance, PlayerMatchPerformance.match_id, Match, Match.league_id
+    return PlayerCupMatchPerformance, PlayerCupMatchPerformance.cup_match_id, CupMatch, CupMatch.cup_id
+
+
+def ensure_archive_tables():
+    """Create the archive tables in saves that do not have them yet."""
+    inspector = db.inspect(db.engine)
+    existing_tables = inspector.get_table_names()
+    for model in (PerformanceArchive, PlayerSeasonStats):
+        if model.__tablename__ not in existing_tables:
+            print(f"{model.__name__} table does not exist yet. Creating it...")
+            model.__table__.create(db.engine)
+
+
+def encode_performances(columns):
+    """
+    Encode performance columns as a compressed NumPy archive.
+
+    Args:
+        columns: dict column name -> list of values (see ARCHIVE_COLUMNS)
+
+    Returns:
+        bytes: The .npz data
+    """
+    arrays = {}
+    for name, dtype in ARCHIVE_COLUMNS:
+        values = columns[name]
+        if np.issubdtype(dtype, np.floating):
+            arrays[name] = np.array([np.nan if value is None else value for value in values], dtype=dtype)
+        else:
+            arrays[name] = np.array([-1 if value is None else int(value) for value in values], dtype=dtype)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_performances(data):
+    """
+    Decode a compressed NumPy archive into performance columns.
+
+    Returns:
+        dict: column name -> numpy array
+    """
+    with np.load(io.BytesIO(data)) as archive:
+        return {name: archive[name] for name, _ in ARCHIVE_COLUMNS}
+
+
+def _row_values(columns, index):
+    """Values of one archived row, with None for missing values."""
+    row = {}
+    for name, dtype in ARCHIVE_COLUMNS:
+        value = columns[name][index].item()
+        if np.issubdtype(dtype, np.floating):
+            row[name] = None if value != value else value
+        elif value == -1:
+            row[name] = None
+        else:
+            row[name] = bool(value) if name in BOOLEAN_COLUMNS else value
+    return row
+
+
+def _store_group(season_id, competition, group_id, columns):
+    """Write the archive of one league/cup, merging with an existing archive of the group."""
+    archive = PerformanceArchive.query.filter_by(season_id=season_id, competition=competition,
+                                                 group_id=group_id).first()
+    if archive is not None:
+        existing = decode_performances(archive.data)
+        existing_rows = [_row_values(existing, index) for index in range(archive.row_count)]
+        for name, _ in ARCHIVE_COLUMNS:
+            columns[name] = [row[name] for row in existing_rows] + columns[name]
+    else:
+        archive = PerformanceArchive(season_id=season_id, competition=competition, group_id=group_id)
+        db.session.add(archive)
+
+    archive.row_count = len(columns['id'])
+    archive.data = encode_performances(columns)
+
+
+def _archive_competition(season_id, competition):
+    """Move the hot performances of one competition of a season into the archive."""
+    model, match_column, match_model, group_column = _competition_config(competition)
+
+    match_ids = select(match_model.id).where(match_model.season_id == season_id) if competition == LEAGUE else \
+        select(CupMatch.id).join(Cup, CupMatch.cup_id == Cup.id).where(Cup.season_id == season_id)
+
+    # Summaries first, computed by SQLite from the hot rows
+    is_home = model.is_home_team
+    is_away = ~model.is_home_team
+
+    def side_sum(condition, value):
+        return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+    summary = select(
+        model.player_id,
+        literal(season_id),
+        model.team_id,
+        literal(competition),
+        group_column if competition == LEAGUE else null(),
+        group_column if competition == CUP else null(),
+        side_sum(is_home, 1), side_sum(is_away, 1),
+        side_sum(is_home, func.coalesce(model.total_score, 0)), side_sum(is_away, func.coalesce(model.total_score, 0)),
+        side_sum(is_home, func.coalesce(model.volle_score, 0)), side_sum(is_away, func.coalesce(model.volle_score, 0)),
+        side_sum(is_home, func.coalesce(model.raeumer_score, 0)), side_sum(is_away, func.coalesce(model.raeumer_score, 0)),
+        side_sum(is_home, func.coalesce(model.fehler_count, 0)), side_sum(is_away, func.coalesce(model.fehler_count, 0)),
+        side_sum(is_home & (model.match_points > 0), 1), side_sum(is_away & (model.match_points > 0), 1),
+        func.coalesce(func.sum(model.set_points), 0.0),
+        func.coalesce(func.sum(model.match_points), 0)
+    ).join(
+        match_model, match_column == match_model.id
+    ).where(
+        match_column.in_(match_ids)
+    ).group_by(model.player_id, model.team_id, group_column)
+
+    db.session.execute(insert(PlayerSeasonStats).from_select([
+        'player_id', 'season_id', 'team_id', 'competition', 'league_id', 'cup_id',
+        'home_matches', 'away_matches', 'home_total_score', 'away_total_score',
+        'home_volle_score', 'away_volle_score', 'home_raeumer_score', 'away_raeumer_score',
+        'home_fehler_count', 'away_fehler_count', 'home_mp_won', 'away_mp_won',
+        'set_points', 'match_points'
+    ], summary))
+
+    # Rows of one league/cup at a time into the columnar archive
+    archived_rows = 0
+    stored_columns = [getattr(model, name) if name != 'match_id' else match_column for name, _ in ARCHIVE_COLUMNS]
+    rows = db.session.execute(
+        select(group_column, *stored_columns)
+        .join(match_model, match_column == match_model.id)
+        .where(match_column.in_(match_ids))
+        .order_by(group_column, match_column, model.id)
+        .execution_options(yield_per=ARCHIVE_BATCH_SIZE)
+    )
+
+    current_group = None
+    columns = None
+    for row in rows:
+        group_id = row[0]
+        if group_id != current_group:
+            if columns is not None:
+                _store_group(season_id, competition, current_group, columns)
+            current_group = group_id
+            columns = {name: [] for name, _ in ARCHIVE_COLUMNS}
+        for (name, _), value in zip(ARCHIVE_COLUMNS, row[1:]):
+            columns[name].append(value)
+        archived_rows += 1
+    if columns is not None:
+        _store_group(season_id, competition, current_group, columns)
+
+    db.session.query(model).filter(match_column.in_(match_ids)).delete(synchronize_session=False)
+    return archived_rows
+
+
+@use_storage_profile('bulk')
+def archive_season(season_id):
+    """
+    Move the performances of a completed season into the archive.
+
+    Summaries, archive and deletion of the hot rows are committed together.
+
+    Args:
+        season_id: ID of the season (must not be the current season)
+
+    Returns:
+        dict: Number of archived league and cup performances
+    """
+    season = Season.query.get(season_id)
+    if season is None:
+        raise ValueError(f"Saison {season_id} existiert nicht")
+    if season.is_current:
+        raise ValueError("Die aktuelle Saison kann nicht archiviert werden")
+
+    ensure_archive_tables()
+    try:
+        result = {
+            'season_id': season_id,
+            'league_performances': _archive_competition(season_id, LEAGUE),
+            'cup_performances': _archive_competition(season_id, CUP)
+        }
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error archiving season {season_id}: {str(e)}")
+        raise
+    bump_world_version(f'{season.name} archived')
+
+    print(f"Archived {season.name}: {result['league_performances']} league and "
+          f"{result['cup_performances']} cup performances")
+    return result
+
+
+def _has_hot_performances(season_id):
+    league = db.session.query(PlayerMatchPerformance.id).join(
+        Match, PlayerMatchPerformance.match_id == Match.id
+    ).filter(Match.season_id == season_id).first()
+    if league:
+        return True
+    cup = db.session.query(PlayerCupMatchPerformance.id).join(
+        CupMatch, PlayerCupMatchPerformance.cup_match_id == CupMatch.id
+    ).join(Cup, CupMatch.cup_id == Cup.id).filter(Cup.season_id == season_id).first()
+    return cup is not None
+
+
+def archive_completed_seasons():
+    """
+    Archive every completed (not current) season that still has hot performances.
+
+    Called after each season transition; saves from before the archive catch
+    up with all their old seasons at once.
+
+    Returns:
+        list: Results of archive_season() for the archived seasons
+    """
+    results = []
+    for season in Season.query.filter_by(is_current=False).order_by(Season.id).all():
+        if _has_hot_performances(season.id):
+            results.append(archive_season(season.id))
+    return results
+
+
+def _performance_dicts(columns, indexes, competition):
+    """Build to_dict() style performance dicts for archived rows."""
+    rows = [_row_values(columns, index) for index in indexes]
+    player_names = dict(db.session.query(Player.id, Player.name).filter(
+        Player.id.in_({row['player_id'] for row in rows})).all()) if rows else {}
+    team_names = dict(db.session.query(Team.id, Team.name).filter(
+        Team.id.in_({row['team_id'] for row in rows})).all()) if rows else {}
+
+    performances = []
+    for row in rows:
+        performance = dict(row)
+        if competition == CUP:
+            performance['cup_match_id'] = performance.pop('match_id')
+        performance['player_name'] = player_names.get(row['player_id'], 'Unbekannt')
+        performance['team_name'] = team_names.get(row['team_id'], 'Unbekannt')
+        performances.append(performance)
+    return performances
+
+
+def _load_archive(competition, season_id, group_id):
+    if not archived_stats_available():
+        return None
+    archive = PerformanceArchive.query.filter_by(season_id=season_id, competition=competition,
+                                                 group_id=group_id).first()
+    return decode_performances(archive.data) if archive else None
+
+
+def get_archived_performances(match):
+    """
+    Get the archived performances of a match.
+
+    Args:
+        match: A Match or CupMatch object
+
+    Returns:
+        list: Performance dicts in the format of PlayerMatchPerformance.to_dict()
+              (PlayerCupMatchPerformance.to_dict() for cup matches); empty if the
+              season of the match is not archived
+    """
+    if isinstance(match, CupMatch):
+        competition, season_id, group_id = CUP, match.cup.season_id, match.cup_id
+    else:
+        competition, season_id, group_id = LEAGUE, match.season_id, match.league_id
+
+    columns = _load_archive(competition, season_id, group_id)
+    if columns is None:
+        return []
+    indexes = np.flatnonzero(columns['match_id'] == match.id)
+    return _performance_dicts(columns, indexes, competition)
+
+
+def find_archived_performance(player_id, match_id):
+    """
+    Find the archived performance of a player in a league match (or else a cup match).
+
+    Args:
+        player_id: The player ID
+        match_id: Database ID of the match
+
+    Returns:
+        dict or None: The performance in to_dict() format
+    """
+    for match in (Match.query.get(match_id), CupMatch.query.get(match_id)):
+        if match is None or not match.is_played:
+            continue
+        for performance in get_archived_performances(match):
+            if performance['player_id'] == player_id:
+                return performance
+    return None
+
+
+if __name__ == "__main__":
+    # Archive the completed seasons of an existing save:
+    #   python season_archive.py path/to/save.db
+    if len(sys.argv) != 2:
+        print("Usage: python season_archive.py <database path>")
+        sys.exit(1)
+
+    import os
+    from flask import Flask
+    from storage_profiles import install_storage_profiles
+
+    install_storage_profiles('interactive')
+    archive_app = Flask(__name__)
+    archive_app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.abspath(sys.argv[1])}"
+    archive_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(archive_app)
+    with archive_app.app_context():
+        archived = archive_completed_seasons()
+        print(f"{len(archived)} season(s) archived")
+        db.engine.dispose()
@@ -593,43 +593,32 @@ def set_all_match_dates_unified(season_id):
     updated_cup_matches = 0
 
     # Setze Daten für Ligaspiele - nur auf LEAGUE_DAY Termine und nur für ungespielte Spiele
-    from models import Match
-    league_matches = Match.query.filter_by(season_id=season_id, is_played=False).all()
-
-    for match in league_matches:
-        if match.match_day and match.match_day in league_match_day_to_date:
-            old_date = match.match_date
-            match.match_date = league_match_day_to_date[match.match_day]
-            updated_league_matches += 1
-            # Debug: Zeige die ersten 3 Updates
-            if updated_league_matches <= 3:
-                print(f"DEBUG: Updated league match {match.id}: {old_date} -> {match.match_date}")
-
-    # Zwischenspeichern für Liga-Spiele
-    db.session.flush()
-    print(f"DEBUG: Flushed {updated_league_matches} league match updates")
+    # Ein UPDATE pro Spieltag statt jedes Spiel einzeln über die ORM zu laden
+    from models import Match, Cup, CupMatch
+    match_table = Match.__table__
+    for match_day, match_datetime in sorted(league_match_day_to_date.items()):
+        result = db.session.execute(
+            match_table.update().where(
+                match_table.c.season_id == season_id,
+                match_table.c.is_played == False,
+                match_table.c.match_day == match_day
+            ).values(match_date=match_datetime)
+        )
+        updated_league_matches += result.rowcount
 
     # Setze Daten für Pokalspiele - nur auf CUP_DAY Termine und nur für ungespielte Spiele
-    from models import Cup, CupMatch
-    cups = Cup.query.filter_by(season_id=season_id).all()
-
-    for cup in cups:
-        cup_matches = CupMatch.query.filter_by(cup_id=cup.id, is_played=False).all()
-
-        for cup_match in cup_matches:
-            if cup_match.cup_match_day and cup_match.cup_match_day in cup_match_day_to_date:
-                old_date = cup_match.match_date
-                # Für Pokalspiele verwenden wir jetzt auch DateTime (wie Liga-Spiele)
-                calendar_datetime = cup_match_day_to_date[cup_match.cup_match_day]
-                cup_match.match_date = calendar_datetime
-                updated_cup_matches += 1
-                # Debug: Zeige die ersten 3 Updates
-                if updated_cup_matches <= 3:
-                    print(f"DEBUG: Updated cup match {cup_match.id}: {old_date} -> {cup_match.match_date}")
-
-    # Zwischenspeichern für Pokal-Spiele
-    db.session.flush()
-    print(f"DEBUG: Flushed {updated_cup_matches} cup match updates")
+    cup_match_table = CupMatch.__table__
+    season_cup_ids = db.session.query(Cup.id).filter(Cup.season_id == season_id).scalar_subquery()
+    for cup_match_day, match_datetime in sorted(cup_match_day_to_date.items()):
+        # Für Pokalspiele verwenden wir jetzt auch DateTime (wie Liga-Spiele)
+        result = db.session.execute(
+            cup_match_table.update().where(
+                cup_match_table.c.cup_id.in_(season_cup_ids),
+                cup_match_table.c.is_played == False,
+                cup_match_table.c.cup_match_day == cup_match_day
+            ).values(match_date=match_datetime)
+        )
+        updated_cup_matches += result.rowcount
 
     # Finaler Commit
     db.session.commit()
@@ -0,0 +1,574 @@
+"""
+Streaming bulk export of season data for analyses outside the game.
+
+Whole seasons are exported per dataset, without going through the JSON
+endpoints league by league:
+
+- matches: League matches with league, teams and results
+- cup_matches: Cup matches with cup, round, teams and results
+- performances: Player performances of the league matches
+- cup_performances: Player performances of the cup matches
+- standings: Final tables (LeagueHistory); live tables for the current season
+- player_history: Player snapshots at the end of a season (PlayerHistory)
+
+Rows are read with server-side cursors (yield_per) and written chunk by chunk
+(EXPORT_CHUNK_ROWS rows per chunk) through generators, so the memory use does
+not depend on the number of rows. Performances of archived seasons
+(season_archive.py) are decoded one league or cup at a time.
+
+Formats:
+- csv: Header line plus one line per row
+- ndjson: One JSON object per line
+- columnar: A .npz file (zip of .npy arrays, readable with numpy.load) with
+  one row group per chunk: member "<row group>/<column>.npy". Missing values
+  are -1 (integers, booleans), NaN (floats), NaT (dates) or '' (strings).
+  read_columnar() yields the row groups.
+
+With compress=True csv and ndjson are gzipped, columnar members are deflated.
+
+Usage:
+    python season_export.py path/to/save.db --seasons all --format csv --gzip --output-dir exports
+    GET /api/export/<dataset>?seasons=current|all|1,2&format=csv|ndjson|columnar&gzip=1
+
+MAIN FUNCTIONS:
+- resolve_season_ids(spec): Season IDs of 'current', 'all' or a comma-separated list
+- export_dataset(dataset, season_ids, export_format, compress): Generator of the file's bytes
+- export_filename(dataset, season_ids, export_format, compress): File name of an export
+- export_seasons(season_ids, output_dir, ...): Write the export files of several datasets
+- read_columnar(path): Row groups of a columnar export
+"""
+
+import csv
+import datetime
+import io
+import os
+import sys
+import time
+import zipfile
+import zlib
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from api_serialization import dumps
+from models import (db, Season, League, Team, Match, Cup, CupMatch, PlayerMatchPerformance,
+                    PlayerCupMatchPerformance, LeagueHistory, PlayerHistory, PerformanceArchive,
+                    archived_stats_available)
+
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'columnar')
+
+# Rows per chunk (read with one fetch, written as one block / row group)
+EXPORT_CHUNK_ROWS = 5000
+
+GZIP_LEVEL = 6
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'columnar': 'application/octet-stream',
+}
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'ndjson': 'ndjson',
+    'columnar': 'npz',
+}
+
+# Columns of a performance row (hot and archived)
+PERFORMANCE_COLUMNS = (
+    'player_id', 'team_id', 'is_home_team', 'position_number', 'is_substitute',
+    'lane1_score', 'lane2_score', 'lane3_score', 'lane4_score', 'total_score',
+    'volle_score', 'raeumer_score', 'fehler_count', 'set_points', 'match_points'
+)
+
+
+# ---------------------------------------------------------------------------
+# Datasets: statement (column names and types) and row chunks of one season
+# ---------------------------------------------------------------------------
+
+def _query_chunks(statement):
+    """
+    Rows of a statement in chunks, read with a server-side cursor.
+
+    Statements are ordered by the outer table of the join (e.g. the match), so
+    SQLite never has to sort the whole result before the first row.
+    """
+    # Core execution: plain rows, without the ORM's per-row processing
+    result = db.session.connection().execute(statement.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+    for partition in result.partitions():
+        yield partition
+
+
+def _matches(season_id):
+    home_team = aliased(Team)
+    away_team = aliased(Team)
+    statement = select(
+        Match.season_id, Match.league_id, League.name.label('league_name'), League.level.label('league_level'),
+        Match.id.label('match_id'), Match.match_day, Match.round, Match.match_date,
+        Match.home_team_id, home_team.name.label('home_team_name'),
+        Match.away_team_id, away_team.name.label('away_team_name'),
+        Match.home_score, Match.away_score, Match.home_match_points, Match.away_match_points, Match.is_played
+    ).join(League, League.id == Match.league_id).join(
+        home_team, home_team.id == Match.home_team_id
+    ).join(
+        away_team, away_team.id == Match.away_team_id
+    ).where(Match.season_id == season_id).order_by(Match.league_id, Match.match_day, Match.id)
+    return statement, _query_chunks(statement)
+
+
+def _cup_matches(season_id):
+    home_team = aliased(Team)
+    away_team = aliased(Team)
+    statement = select(
+        Cup.season_id, CupMatch.cup_id, Cup.name.label('cup_name'), Cup.cup_type,
+        CupMatch.id.label('cup_match_id'), CupMatch.round_number, CupMatch.round_name, CupMatch.cup_match_day,
+        CupMatch.match_date, CupMatch.home_team_id, home_team.name.label('home_team_name'),
+        CupMatch.away_team_id, away_team.name.label('away_team_name'),
+        CupMatch.home_score, CupMatch.away_score, CupMatch.home_set_points, CupMatch.away_set_points,
+        CupMatch.winner_team_id, CupMatch.is_played
+    ).join(Cup, Cup.id == CupMatch.cup_id).join(
+        home_team, home_team.id == CupMatch.home_team_id
+    ).outerjoin(
+        # Byes have no away team
+        away_team, away_team.id == CupMatch.away_team_id
+    ).where(Cup.season_id == season_id).order_by(CupMatch.cup_id, CupMatch.round_number, CupMatch.id)
+    return statement, _query_chunks(statement)
+
+
+def _archived_performance_chunks(season_id, competition, match_info):
+    """
+    Rows of the archived performances of a season, one league or cup at a time.
+
+    Args:
+        season_id: The season
+        competition: season_archive.LEAGUE or season_archive.CUP
+        match_info: Function group_id -> dict match_id -> match day (league) or round (cup)
+    """
+    from season_archive import decode_performances, BOOLEAN_COLUMNS
+
+    if not archived_stats_available():
+        return
+
+    archives = db.session.query(PerformanceArchive.id, PerformanceArchive.group_id).filter_by(
+        season_id=season_id, competition=competition
+    ).order_by(PerformanceArchive.group_id).all()
+
+    for archive_id, group_id in archives:
+        data = db.session.query(PerformanceArchive.data).filter_by(id=archive_id).scalar()
+        columns = decode_performances(data)
+        match_days = match_info(group_id)
+
+        values = []
+        for name in ('match_id',) + PERFORMANCE_COLUMNS:
+            column = columns[name]
+            if column.dtype.kind == 'f':
+                values.append([None if np.isnan(value) else value for value in column.tolist()])
+            elif name in BOOLEAN_COLUMNS:
+                values.append([None if value < 0 else bool(value) for value in column.tolist()])
+            else:
+                values.append([None if value < 0 else value for value in column.tolist()])
+
+        rows = [(season_id, group_id, match_id, match_days.get(match_id), *row) for match_id, *row in zip(*values)]
+        for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+            yield rows[start:start + EXPORT_CHUNK_ROWS]
+
+
+def _performances(season_id):
+    from season_archive import LEAGUE
+
+    statement = select(
+        Match.season_id, Match.league_id, Match.id.label('match_id'), Match.match_day,
+        *[getattr(PlayerMatchPerformance, name) for name in PERFORMANCE_COLUMNS]
+    ).join(Match, Match.id == PlayerMatchPerformance.match_id).where(
+        Match.season_id == season_id
+    ).order_by(Match.id, PlayerMatchPerformance.id)
+
+    def match_info(league_id):
+        return dict(db.session.query(Match.id, Match.match_day).filter_by(season_id=season_id, league_id=league_id))
+
+    def chunks():
+        yield from _query_chunks(statement)
+        yield from _archived_performance_chunks(season_id, LEAGUE, match_info)
+
+    return statement, chunks()
+
+
+def _cup_performances(season_id):
+    from season_archive import CUP
+
+    statement = select(
+        Cup.season_id, CupMatch.cup_id, CupMatch.id.label('cup_match_id'), CupMatch.round_number,
+        *[getattr(PlayerCupMatchPerformance, name) for name in PERFORMANCE_COLUMNS]
+    ).join(CupMatch, CupMatch.id == PlayerCupMatchPerformance.cup_match_id).join(
+        Cup, Cup.id == CupMatch.cup_id
+    ).where(Cup.season_id == season_id).order_by(CupMatch.id, PlayerCupMatchPerformance.id)
+
+    def match_info(cup_id):
+        return dict(db.session.query(CupMatch.id, CupMatch.round_number).filter_by(cup_id=cup_id))
+
+    def chunks():
+        yield from _query_chunks(statement)
+        yield from _archived_performance_chunks(season_id, CUP, match_info)
+
+    return statement, chunks()
+
+
+def _standings(season_id):
+    statement = select(
+        LeagueHistory.season_id, LeagueHistory.league_name, LeagueHistory.league_level, LeagueHistory.position,
+        LeagueHistory.team_id, LeagueHistory.team_name, LeagueHistory.club_id, LeagueHistory.club_name,
+        LeagueHistory.games_played, LeagueHistory.wins, LeagueHistory.draws, LeagueHistory.losses,
+        LeagueHistory.table_points, LeagueHistory.match_points_for, LeagueHistory.match_points_against,
+        LeagueHistory.pins_for, LeagueHistory.pins_against
+    ).where(LeagueHistory.season_id == season_id).order_by(
+        LeagueHistory.league_level, LeagueHistory.league_name, LeagueHistory.position)
+
+    def live_chunks():
+        # The tables of the current season are only saved at its end
+        from simulation import calculate_standings_for_leagues
+
+        leagues = League.query.filter_by(season_id=season_id).order_by(League.level, League.name).all()
+        standings = calculate_standings_for_leagues(leagues)
+        for league in leagues:
+            rows = []
+            for position, entry in enumerate(standings.get(league.id, []), start=1):
+                team = entry['team']
+                rows.append((
+                    season_id, league.name, league.level, position, team.id, team.name,
+                    team.club_id, team.club.name if team.club else None,
+                    entry['wins'] + entry['draws'] + entry['losses'], entry['wins'], entry['draws'], entry['losses'],
+                    entry['points'], entry['match_points_for'], entry['match_points_against'],
+                    entry['goals_for'], entry['goals_against']
+                ))
+            if rows:
+                yield rows
+
+    def chunks():
+        saved = LeagueHistory.query.filter_by(season_id=season_id).first() is not None
+        season = db.session.get(Season, season_id)
+        if not saved and season is not None and season.is_current:
+            yield from live_chunks()
+        else:
+            yield from _query_chunks(statement)
+
+    return statement, chunks()
+
+
+def _player_history(season_id):
+    statement = select(
+        *[column for column in PlayerHistory.__table__.columns if column.name != 'created_at']
+    ).where(PlayerHistory.season_id == season_id).order_by(PlayerHistory.player_id)
+    return statement, _query_chunks(statement)
+
+
+DATASETS = {
+    'matches': _matches,
+    'cup_matches': _cup_matches,
+    'performances': _performances,
+    'cup_performances': _cup_performances,
+    'standings': _standings,
+    'player_history': _player_history,
+}
+
+
+def _rechunk(chunks):
+    """Combine small chunks (e.g. one per league) into chunks of EXPORT_CHUNK_ROWS rows."""
+    pending = []
+    for chunk in chunks:
+        pending.extend(chunk)
+        while len(pending) >= EXPORT_CHUNK_ROWS:
+            yield pending[:EXPORT_CHUNK_ROWS]
+            pending = pending[EXPORT_CHUNK_ROWS:]
+    if pending:
+        yield pending
+
+
+def _column_types(statement):
+    """Names and Python types of the columns of a statement."""
+    return [(column.name, column.type.python_type) for column in statement.selected_columns]
+
+
+# ---------------------------------------------------------------------------
+# Formats
+# ---------------------------------------------------------------------------
+
+def _date_indexes(columns):
+    return [index for index, (_, python_type) in enumerate(columns)
+            if python_type in (datetime.datetime, datetime.date)]
+
+
+def _text_rows(chunk, date_indexes):
+    """Rows of a chunk with dates as ISO strings (csv, ndjson); unchanged without date columns."""
+    if not date_indexes:
+        return chunk
+    rows = []
+    for row in chunk:
+        row = list(row)
+        for index in date_indexes:
+            if row[index] is not None:
+                row[index] = row[index].isoformat()
+        rows.append(row)
+    return rows
+
+
+def _csv_chunks(columns, chunks, stats):
+    date_indexes = _date_indexes(columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([name for name, _ in columns])
+    for chunk in chunks:
+        writer.writerows(_text_rows(chunk, date_indexes))
+        stats['rows'] += len(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(columns, chunks, stats):
+    date_indexes = _date_indexes(columns)
+    names = [name for name, _ in columns]
+    for chunk in chunks:
+        lines = [dumps(dict(zip(names, row))) for row in _text_rows(chunk, date_indexes)]
+        stats['rows'] += len(chunk)
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _column_array(values, python_type):
+    """One column of a row group; missing values as -1, NaN, NaT or ''."""
+    if python_type is bool:
+        return np.array([-1 if value is None else int(value) for value in values], dtype=np.int8)
+    if python_type is int:
+        return np.array([-1 if value is None else value for value in values], dtype=np.int64)
+    if python_type is float:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if python_type in (datetime.datetime, datetime.date):
+        return np.array([np.datetime64('NaT') if value is None else np.datetime64(value, 's') for value in values],
+                        dtype='datetime64[s]')
+    return np.array(['' if value is None else str(value) for value in values], dtype=str)
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Unseekable file object collecting what the zip writer wrote since the last drain()."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _columnar_chunks(columns, chunks, stats, compress):
+    buffer = _StreamBuffer()
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(buffer, 'w', compression=compression, allowZip64=True) as archive:
+        for row_group, chunk in enumerate(chunks):
+            column_values = list(zip(*chunk)) if chunk else [()] * len(columns)
+            for (name, python_type), values in zip(columns, column_values):
+                with archive.open(f"{row_group:06d}/{name}.npy", 'w', force_zip64=True) as member:
+                    np.lib.format.write_array(member, _column_array(values, python_type), allow_pickle=False)
+            stats['rows'] += len(chunk)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def resolve_season_ids(spec='current'):
+    """
+    Get the season IDs of an export.
+
+    Args:
+        spec: 'current', 'all' or comma-separated season IDs
+
+    Returns:
+        list: Season IDs in ascending order
+
+    Raises:
+        ValueError: If the spec is invalid or names an unknown season
+    """
+    spec = (spec or 'current').strip().lower()
+    if spec == 'all':
+        return [season_id for (season_id,) in db.session.query(Season.id).order_by(Season.id)]
+    if spec == 'current':
+        season = Season.query.filter_by(is_current=True).first()
+        if season is None:
+            raise ValueError("Keine aktuelle Saison gefunden")
+        return [season.id]
+
+    try:
+        season_ids = sorted({int(part) for part in spec.split(',') if part.strip()})
+    except ValueError:
+        raise ValueError(f"Ungültige Saison-Angabe: {spec}")
+    known = {season_id for (season_id,) in db.session.query(Season.id).filter(Season.id.in_(season_ids))}
+    unknown = [season_id for season_id in season_ids if season_id not in known]
+    if unknown or not season_ids:
+        raise ValueError(f"Unbekannte Saison: {', '.join(map(str, unknown)) or spec}")
+    return season_ids
+
+
+def export_dataset(dataset, season_ids, export_format='csv', compress=False, stats=None):
+    """
+    Export one dataset of several seasons as a stream of bytes.
+
+    The rows are read lazily while the generator is consumed, so the caller
+    needs an app context (and a session) until the generator is exhausted.
+
+    Args:
+        dataset: Name of the dataset (key of DATASETS)
+        season_ids: Seasons to export, in this order
+        export_format: 'csv', 'ndjson' or 'columnar'
+        compress: gzip csv/ndjson, deflate the members of columnar files
+        stats: Optional dict; 'rows' is set to the number of exported rows
+
+    Returns:
+        generator: The bytes of the export file, chunk by chunk
+
+    Raises:
+        ValueError: For unknown datasets or formats
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    stats = stats if stats is not None else {}
+    stats['rows'] = 0
+    # All seasons share the statement's columns
+    columns = _column_types(DATASETS[dataset](season_ids[0] if season_ids else 0)[0])
+    chunks = _rechunk(chunk for season_id in season_ids for chunk in DATASETS[dataset](season_id)[1])
+
+    if export_format == 'columnar':
+        return _columnar_chunks(columns, chunks, stats, compress)
+
+    encoded = (_csv_chunks if export_format == 'csv' else _ndjson_chunks)(columns, chunks, stats)
+    return _gzip_chunks(encoded) if compress else encoded
+
+
+def export_filename(dataset, season_ids, export_format='csv', compress=False):
+    """File name of an export, e.g. performances_season_3-5.csv.gz."""
+    if len(season_ids) == 1:
+        seasons = f"season_{season_ids[0]}"
+    else:
+        seasons = f"seasons_{season_ids[0]}-{season_ids[-1]}"
+    suffix = '.gz' if compress and export_format != 'columnar' else ''
+    return f"{dataset}_{seasons}.{EXTENSIONS[export_format]}{suffix}"
+
+
+def export_seasons(season_ids, output_dir, datasets=None, export_format='csv', compress=False):
+    """
+    Write the export files of several datasets.
+
+    Args:
+        season_ids: Seasons to export
+        output_dir: Directory of the files (created if missing)
+        datasets: Names of the datasets (default: all)
+        export_format: 'csv', 'ndjson' or 'columnar'
+        compress: gzip csv/ndjson, deflate the members of columnar files
+
+    Returns:
+        list: Dicts with dataset, path, rows, bytes and seconds per file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summaries = []
+    for dataset in datasets or DATASETS:
+        start_time = time.time()
+        stats = {}
+        path = os.path.join(output_dir, export_filename(dataset, season_ids, export_format, compress))
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                for data in export_dataset(dataset, season_ids, export_format, compress, stats):
+                    f.write(data)
+            os.replace(temp_path, path)
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"Error exporting {dataset}: {str(e)}")
+            raise
+        summaries.append({
+            'dataset': dataset,
+            'path': path,
+            'rows': stats['rows'],
+            'bytes': os.path.getsize(path),
+            'seconds': round(time.time() - start_time, 2)
+        })
+        print(f"{dataset}: {stats['rows']} rows -> {path} ({summaries[-1]['bytes']} bytes, "
+              f"{summaries[-1]['seconds']}s)")
+    return summaries
+
+
+def read_columnar(path):
+    """
+    Read a columnar export row group by row group.
+
+    Args:
+        path: Path (or file object) of the .npz file
+
+    Yields:
+        dict: Column name -> numpy array of one row group
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        groups = {}
+        for member in archive.files:
+            row_group, name = member.split('/', 1)
+            groups.setdefault(row_group, []).append(name)
+        for row_group in sorted(groups):
+            yield {name: archive[f"{row_group}/{name}"] for name in groups[row_group]}
+
+
+if __name__ == "__main__":
+    import argparse
+    from flask import Flask
+    from storage_profiles import install_storage_profiles
+
+    parser = argparse.ArgumentParser(description="Export season data of a save")
+    parser.add_argument('database', help="Path of the save")
+    parser.add_argument('--seasons', default='current', help="'current', 'all' or comma-separated season IDs")
+    parser.add_argument('--datasets', help=f"Comma-separated datasets ({', '.join(DATASETS)}; default: all)")
+    parser.add_argument('--format', dest='export_format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--gzip', action='store_true', help="Compress the files")
+    parser.add_argument('--output-dir', default='exports', help="Directory of the export files")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"Database not found: {args.database}")
+        sys.exit(1)
+    selected = [name.strip() for name in args.datasets.split(',')] if args.datasets else list(DATASETS)
+    unknown_datasets = [name for name in selected if name not in DATASETS]
+    if unknown_datasets:
+        parser.error(f"Unknown datasets: {', '.join(unknown_datasets)}")
+
+    install_storage_profiles('analytics')
+    export_app = Flask(__name__)
+    export_app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.abspath(args.database)}"
+    export_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(export_app)
+    with export_app.app_context():
+        try:
+            export_season_ids = resolve_season_ids(args.seasons)
+        except ValueError as e:
+            print(str(e))
+            sys.exit(1)
+        export_seasons(export_season_ids, args.output_dir, selected, args.export_format, args.gzip)
+        db.engine.dispose()
@@ -1,14 +1,31 @@
 import numpy as np
+import os
 import random
 from datetime import datetime, timedelta, timezone
 from models import db, Match, Player, Team, League, Season, Message, GameSettings, Club
 from form_system import apply_form_to_strength, get_player_total_form_modifier
 from config.config import get_config
+from response_cache import bump_world_version
+from progress import report_progress, phase, has_progress_consumers
+from performance_optimizations import performance_monitor
+from storage_profiles import use_storage_profile
+from save_snapshots import create_transition_checkpoint
+from save_metadata import record_simulation
+from transition_journal import (ensure_journal_table, is_step_completed, get_step_params, record_step, run_step,
+                                is_transition_started, repair_interrupted_match_days)
+from result_writer import write_match_day_details
+import metrics
 
 # Central player rating formula for SQL queries
 PLAYER_RATING_SQL = "(strength * 0.5 + konstanz * 0.1 + drucksicherheit * 0.1 + volle * 0.15 + raeumer * 0.15)"
 
 
+def get_manager_club_id():
+    """Get the ID of the manager's club, or None if no manager club is set."""
+    settings = GameSettings.query.first()
+    return settings.manager_club_id if settings else None
+
+
 def create_retirement_message(player):
     """
     Erstellt eine Nachricht, wenn ein Spieler in den Ruhestand geht.
@@ -17,27 +34,39 @@ def create_retirement_message(player):
     Args:
         player: Der Spieler, der in den Ruhestand geht
     """
-    try:
-        # Get game settings to check if this player belongs to the manager's club
-        settings = GameSettings.query.first()
+    create_retirement_messages([player])
+
+
+def create_retirement_messages(retirees):
+    """
+    Erstellt die Ruhestands-Nachrichten für mehrere Spieler mit einem Bulk-Insert.
+    Nur für Spieler des Manager-Vereins.
+
+    Args:
+        retirees: Spieler (Objekte oder Zeilen mit id, name, age, club_id), die in den Ruhestand gehen
 
-        # Only create message if player belongs to the manager's club
-        if not settings or not settings.manager_club_id:
+    Returns:
+        int: Anzahl der erstellten Nachrichten
+    """
+    try:
+        # Only create messages for players of the manager's club
+        manager_club_id = get_manager_club_id()
+        if not manager_club_id:
             # No manager club set, don't create messages
-            return
+            return 0
 
-        if player.club_id != settings.manager_club_id:
-            # Player doesn't belong to manager's club, don't create message
-            return
+        manager_retirees = [player for player in retirees if player.club_id == manager_club_id]
+        if not manager_retirees:
+            return 0
 
         # Get the club name
-        club_name = player.club.name if player.club else "Unbekannter Verein"
+        club = Club.query.get(manager_club_id)
+        club_name = club.name if club else "Unbekannter Verein"
 
-        # Create the message
-        subject = f"Spieler {player.name} geht in den Ruhestand"
-
-        # Create HTML content with clickable player name
-        content = f"""Sehr geehrter Manager,
+        messages = []
+        for player in manager_retirees:
+            # Create HTML content with clickable player name
+            content = f"""Sehr geehrter Manager,
 
 wir möchten Sie darüber informieren, dass <a href="/players/{player.id}" class="player-link">{player.name}</a> seine aktive Karriere beendet hat.
 
@@ -48,22 +77,23 @@ Wir danken {player.name} für seinen Einsatz und wünschen ihm alles Gute für d
 Mit freundlichen Grüßen
 Die Geschäftsführung"""
 
-        # Create the message
-        message = Message(
-            subject=subject,
-            content=content,
-            message_type='info',
-            notification_category='player_retirement',
-            is_read=False,
-            related_club_id=player.club_id,
-            related_player_id=player.id
-        )
+            messages.append({
+                'subject': f"Spieler {player.name} geht in den Ruhestand",
+                'content': content,
+                'message_type': 'info',
+                'notification_category': 'player_retirement',
+                'is_read': False,
+                'related_club_id': player.club_id,
+                'related_player_id': player.id
+            })
 
-        db.session.add(message)
-        print(f"  Created retirement notification for {player.name} (Manager's club)")
+        db.session.bulk_insert_mappings(Message, messages)
+        print(f"  Created {len(messages)} retirement notifications (Manager's club)")
+        return len(messages)
 
     except Exception as e:
-        print(f"  Error creating retirement message for {player.name}: {e}")
+        print(f"  Error creating retirement messages: {e}")
+        return 0
 
 
 def create_new_player_message(player):
@@ -74,27 +104,39 @@ def create_new_player_message(player):
     Args:
         player: Der neu generierte Spieler
     """
-    try:
-        # Get game settings to check if this player belongs to the manager's club
-        settings = GameSettings.query.first()
+    create_new_player_messages([player])
 
-        # Only create message if player belongs to the manager's club
-        if not settings or not settings.manager_club_id:
+
+def create_new_player_messages(players):
+    """
+    Erstellt die Nachrichten für mehrere neu generierte Spieler mit einem Bulk-Insert.
+    Nur für Spieler des Manager-Vereins.
+
+    Args:
+        players: Die neu generierten Spieler (bereits geflusht, damit die IDs bekannt sind)
+
+    Returns:
+        int: Anzahl der erstellten Nachrichten
+    """
+    try:
+        # Only create messages for players of the manager's club
+        manager_club_id = get_manager_club_id()
+        if not manager_club_id:
             # No manager club set, don't create messages
-            return
+            return 0
 
-        if player.club_id != settings.manager_club_id:
-            # Player doesn't belong to manager's club, don't create message
-            return
+        manager_players = [player for player in players if player.club_id == manager_club_id]
+        if not manager_players:
+            return 0
 
         # Get the club name
-        club_name = player.club.name if player.club else "Unbekannter Verein"
-
-        # Create the message
-        subject = f"Neuer Spieler {player.name} ist dem Verein beigetreten"
+        club = Club.query.get(manager_club_id)
+        club_name = club.name if club else "Unbekannter Verein"
 
-        # Create HTML content with clickable player name
-        content = f"""Sehr geehrter Manager,
+        messages = []
+        for player in manager_players:
+            # Create HTML content with clickable player name
+            content = f"""Sehr geehrter Manager,
 
 wir freuen uns, Ihnen mitteilen zu können, dass <a href="/players/{player.id}" class="player-link">{player.name}</a> unserem Verein beigetreten ist!
 
@@ -105,22 +147,23 @@ Wir wünschen {player.name} viel Erfolg und eine erfolgreiche Karriere bei {club
 Mit freundlichen Grüßen
 Die Geschäftsführung"""
 
-        # Create the message
-        message = Message(
-            subject=subject,
-            content=content,
-            message_type='success',
-            notification_category='player_new',
-            is_read=False,
-            related_club_id=player.club_id,
-            related_player_id=player.id
-        )
+            messages.append({
+                'subject': f"Neuer Spieler {player.name} ist dem Verein beigetreten",
+                'content': content,
+                'message_type': 'success',
+                'notification_category': 'player_new',
+                'is_read': False,
+                'related_club_id': player.club_id,
+                'related_player_id': player.id
+            })
 
-        db.session.add(message)
-        print(f"  Created new player notification for {player.name} (Manager's club)")
+        db.session.bulk_insert_mappings(Message, messages)
+        print(f"  Created {len(messages)} new player notifications (Manager's club)")
+        return len(messages)
 
     except Exception as e:
-        print(f"  Error creating new player message for {player.name}: {e}")
+        print(f"  Error creating new player messages: {e}")
+        return 0
 
 
 def get_age_range_for_altersklasse(altersklasse):
@@ -327,99 +370,170 @@ def generate_replacement_player(club_id):
     Returns:
         Player: Der neu generierte Spieler (noch nicht in der Datenbank gespeichert)
     """
-    try:
-        # Get the club
-        club = Club.query.get(club_id)
-        if not club:
-            print(f"  Error: Club with ID {club_id} not found")
-            return None
-
-        # Find the youngest team (team with the youngest altersklasse)
-        youngest_team = None
-        youngest_rank = 999  # Start with a high number
-
-        from age_class_utils import get_age_class_rank
-
-        for team in club.teams:
-            if team.league and team.league.altersklasse:
-                rank = get_age_class_rank(team.league.altersklasse)
-                if rank < youngest_rank:
-                    youngest_rank = rank
-                    youngest_team = team
-
-        # Determine age based on youngest team's altersklasse
-        if youngest_team and youngest_team.league and youngest_team.league.altersklasse:
-            min_age, max_age = get_age_range_for_altersklasse(youngest_team.league.altersklasse)
-            age = random.randint(min_age, max_age)
-            print(f"  Generating player for {club.name} based on youngest team {youngest_team.name} (Altersklasse: {youngest_team.league.altersklasse})")
-        else:
-            # No youth teams found, generate a young adult player (17-18 years)
-            age = random.randint(17, 18)
-            print(f"  Generating young adult player for {club.name} (no youth teams found)")
-
-        # Find a representative team to base attributes on
-        # Prefer the youngest team, or use any team from the club
-        reference_team = youngest_team if youngest_team else (club.teams[0] if club.teams else None)
-
-        if not reference_team:
-            print(f"  Error: Club {club.name} has no teams")
-            return None
-
-        # Get league level and team strength
-        league_level = reference_team.league.level if reference_team.league else 10
-        team_staerke = reference_team.staerke if reference_team.staerke else 50
-
-        # Generate player attributes (with age for age-based strength calculation)
-        attributes = calculate_player_attribute_by_league_level(
-            league_level,
-            team_staerke,
-            age=age  # Pass age for age-based strength calculation
-        )
+    new_players = generate_replacement_players({club_id: 1})
+    return new_players[0] if new_players else None
 
-        # Generate player name
-        player_name = generate_player_name()
-
-        # Generate retirement age
-        retirement_age = generate_retirement_age()
-
-        # Calculate salary and contract end
-        salary = attributes['strength'] * 100  # Simple salary calculation
-        contract_end = datetime.now() + timedelta(days=365 * 3)  # 3-year contract
-
-        # Create the new player
-        new_player = Player(
-            name=player_name,
-            age=age,
-            strength=attributes['strength'],
-            talent=attributes['talent'],
-            position='Kegler',
-            salary=salary,
-            contract_end=contract_end.date(),
-            club_id=club_id,
-            ausdauer=attributes['ausdauer'],
-            konstanz=attributes['konstanz'],
-            drucksicherheit=attributes['drucksicherheit'],
-            volle=attributes['volle'],
-            raeumer=attributes['raeumer'],
-            sicherheit=attributes['sicherheit'],
-            auswaerts=attributes['auswaerts'],
-            start=attributes['start'],
-            mitte=attributes['mitte'],
-            schluss=attributes['schluss'],
-            retirement_age=retirement_age,
-            is_retired=False,
-            nationalitaet='Deutsch'
-        )
 
-        print(f"  Generated new player: {player_name} (Age: {age}, Strength: {attributes['strength']}) for {club.name}")
+def generate_replacement_players(replacements_per_club):
+    """
+    Generiert Ersatzspieler für mehrere Vereine auf einmal.
 
-        return new_player
+    Die Vereine werden mit ihren Mannschaften und Ligen in wenigen Queries geladen,
+    die jüngste Mannschaft wird pro Verein nur einmal bestimmt (siehe generate_replacement_player).
 
-    except Exception as e:
-        print(f"  Error generating replacement player for club {club_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    Args:
+        replacements_per_club: Dict club_id -> Anzahl der benötigten Ersatzspieler
+
+    Returns:
+        list: Die neu generierten Spieler (noch nicht in der Datenbank gespeichert)
+    """
+    from sqlalchemy.orm import selectinload
+    from age_class_utils import get_age_class_rank
+
+    if not replacements_per_club:
+        return []
+
+    clubs = Club.query.filter(Club.id.in_(list(replacements_per_club.keys()))).options(
+        selectinload(Club.teams).selectinload(Team.league)
+    ).all()
+    clubs_by_id = {club.id: club for club in clubs}
+
+    new_players = []
+    for club_id, count in replacements_per_club.items():
+        try:
+            club = clubs_by_id.get(club_id)
+            if not club:
+                print(f"  Error: Club with ID {club_id} not found")
+                continue
+
+            # Find the youngest team (team with the youngest altersklasse)
+            youngest_team = None
+            youngest_rank = 999  # Start with a high number
+            for team in club.teams:
+                if team.league and team.league.altersklasse:
+                    rank = get_age_class_rank(team.league.altersklasse)
+                    if rank < youngest_rank:
+                        youngest_rank = rank
+                        youngest_team = team
+
+            # Determine the age range based on youngest team's altersklasse
+            if youngest_team:
+                min_age, max_age = get_age_range_for_altersklasse(youngest_team.league.altersklasse)
+            else:
+                # No youth teams found, generate young adult players (17-18 years)
+                min_age, max_age = 17, 18
+
+            # Find a representative team to base attributes on
+            # Prefer the youngest team, or use any team from the club
+            reference_team = youngest_team if youngest_team else (club.teams[0] if club.teams else None)
+
+            if not reference_team:
+                print(f"  Error: Club {club.name} has no teams")
+                continue
+
+            # Get league level and team strength
+            league_level = reference_team.league.level if reference_team.league else 10
+            team_staerke = reference_team.staerke if reference_team.staerke else 50
+
+            for _ in range(count):
+                age = random.randint(min_age, max_age)
+
+                # Generate player attributes (with age for age-based strength calculation)
+                attributes = calculate_player_attribute_by_league_level(
+                    league_level,
+                    team_staerke,
+                    age=age  # Pass age for age-based strength calculation
+                )
+
+                # Calculate salary and contract end
+                salary = attributes['strength'] * 100  # Simple salary calculation
+                contract_end = datetime.now() + timedelta(days=365 * 3)  # 3-year contract
+
+                new_players.append(Player(
+                    name=generate_player_name(),
+                    age=age,
+                    strength=attributes['strength'],
+                    talent=attributes['talent'],
+                    position='Kegler',
+                    salary=salary,
+                    contract_end=contract_end.date(),
+                    club_id=club_id,
+                    ausdauer=attributes['ausdauer'],
+                    konstanz=attributes['konstanz'],
+                    drucksicherheit=attributes['drucksicherheit'],
+                    volle=attributes['volle'],
+                    raeumer=attributes['raeumer'],
+                    sicherheit=attributes['sicherheit'],
+                    auswaerts=attributes['auswaerts'],
+                    start=attributes['start'],
+                    mitte=attributes['mitte'],
+                    schluss=attributes['schluss'],
+                    retirement_age=generate_retirement_age(),
+                    is_retired=False,
+                    nationalitaet='Deutsch'
+                ))
+
+            print(f"  Generated {count} new player(s) aged {min_age}-{max_age} for {club.name}")
+
+        except Exception as e:
+            print(f"  Error generating replacement players for club {club_id}: {e}")
+            import traceback
+            traceback.print_exc()
+
+    return new_players
+
+
+def age_all_players():
+    """
+    Lässt alle aktiven Spieler mit einem einzigen UPDATE um ein Jahr altern.
+
+    Returns:
+        int: Anzahl der gealterten Spieler
+    """
+    from sqlalchemy import text
+
+    result = db.session.execute(text("""
+        UPDATE player SET age = age + 1
+        WHERE is_retired = 0 AND age IS NOT NULL
+    """))
+    db.session.commit()
+    return result.rowcount
+
+
+def retire_players(season_id):
+    """
+    Schickt alle Spieler, die ihr Ruhestandsalter erreicht haben, in den Ruhestand.
+
+    Ein UPDATE ... RETURNING markiert die Spieler, ein DELETE entfernt sie aus allen
+    Mannschaften. Die Vereinszugehörigkeit bleibt für die Historie erhalten.
+    Der Aufrufer committet (zusammen mit den Ruhestands-Nachrichten).
+
+    Args:
+        season_id: ID der Saison, in der die Spieler in den Ruhestand gehen
+
+    Returns:
+        list: Zeilen (id, name, age, club_id) der Spieler, die in den Ruhestand gegangen sind
+    """
+    from sqlalchemy import text
+
+    retirees = db.session.execute(text("""
+        UPDATE player SET is_retired = 1, retirement_season_id = :season_id
+        WHERE is_retired = 0
+          AND retirement_age IS NOT NULL AND retirement_age > 0
+          AND age >= retirement_age
+        RETURNING id, name, age, club_id
+    """), {"season_id": season_id}).fetchall()
+
+    if retirees:
+        # Remove the retired players from all teams
+        db.session.execute(text("""
+            DELETE FROM player_team
+            WHERE player_id IN (
+                SELECT id FROM player WHERE is_retired = 1 AND retirement_season_id = :season_id
+            )
+        """), {"season_id": season_id})
+
+    return retirees
 
 
 class SimplePlayer:
@@ -693,10 +807,17 @@ def get_player_attribute(player, attribute_name):
 
 
 
-def simulate_match_day(season):
+@performance_monitor
+@use_storage_profile('bulk')
+def simulate_match_day(season, repair_interrupted=True):
     """
     Optimized simulation of one match day for all leagues in a season.
 
+    Args:
+        season: The season to simulate
+        repair_interrupted: Complete match days an interrupted run left unfinished first
+                            (simulate_season does this once before its first match day)
+
     This function uses performance optimizations including:
     - Bulk database operations
     - Reduced query count
@@ -713,9 +834,17 @@ def simulate_match_day(season):
 
     start_time = time.time()
 
+    # Before any write: the match day is journaled with its results
+    ensure_journal_table()
+
+    # Calendar flags and cup rounds an interrupted run did not get to
+    if repair_interrupted:
+        repair_interrupted_match_days(season.id)
+
     # Update player form modifiers at the beginning of each match day
-    from form_system import update_all_players_form
-    updated_players = update_all_players_form()
+    with phase('match_day.form', season_id=season.id):
+        from form_system import update_all_players_form
+        updated_players = update_all_players_form()
 
     # Create performance indexes if they don't exist
     create_performance_indexes()
@@ -780,6 +909,16 @@ def simulate_match_day(season):
             'message': f'Keine Spiele für {day_type} am Datum {match_date} gefunden.'
         }
 
+    report_progress(
+        'match_day_start',
+        season_id=season.id,
+        match_day=next_calendar_day.match_day_number,
+        day_type=day_type,
+        match_date=match_date.isoformat() if match_date else None,
+        league_matches=len(matches_data),
+        cup_matches=len(cup_matches_data)
+    )
+
     # Step 4: Determine clubs and teams playing (from both league and cup matches)
     clubs_with_matches = set()
     teams_playing = {}
@@ -862,9 +1001,9 @@ def simulate_match_day(season):
 
     # Step 5: Batch set player availability for all clubs
     try:
-        availability_start = time.time()
-        from performance_optimizations import batch_set_player_availability
-        batch_set_player_availability(clubs_with_matches, teams_playing, playing_teams_info)
+        with phase('match_day.availability', season_id=season.id):
+            from performance_optimizations import batch_set_player_availability
+            batch_set_player_availability(clubs_with_matches, teams_playing, playing_teams_info)
 
     except Exception as e:
         db.session.rollback()
@@ -872,75 +1011,94 @@ def simulate_match_day(season):
         raise
 
     # Step 6: Batch assign players to teams for all clubs
-    assignment_start = time.time()
-    from club_player_assignment import batch_assign_players_to_teams
-    cache = CacheManager()
-
-    # Convert match_date to date if it's a datetime
-    target_date = match_date.date() if hasattr(match_date, 'date') else match_date
-
-    club_team_players = batch_assign_players_to_teams(
-        clubs_with_matches,
-        next_calendar_day.match_day_number,
-        season.id,
-        cache,
-        target_date=target_date
-    )
+    with phase('match_day.assignment', season_id=season.id):
+        from club_player_assignment import batch_assign_players_to_teams
+        cache = CacheManager()
+
+        # Convert match_date to date if it's a datetime
+        target_date = match_date.date() if hasattr(match_date, 'date') else match_date
+
+        club_team_players = batch_assign_players_to_teams(
+            clubs_with_matches,
+            next_calendar_day.match_day_number,
+            season.id,
+            cache,
+            target_date=target_date
+        )
 
-    # Step 6.5: Immediately update player flags to prevent multiple assignments
-    immediate_player_updates = []
-    for club_id, teams in club_team_players.items():
-        for team_id, players in teams.items():
-            for player in players:
-                # Skip Stroh players - they don't get saved to database
-                if isinstance(player, dict) and player.get('is_stroh', False):
-                    continue
-                player_id = player['id'] if isinstance(player, dict) else player.id
-                immediate_player_updates.append((player_id, True, next_calendar_day.match_day_number))
+        # Step 6.5: Immediately update player flags to prevent multiple assignments
+        immediate_player_updates = []
+        for club_id, teams in club_team_players.items():
+            for team_id, players in teams.items():
+                for player in players:
+                    # Skip Stroh players - they don't get saved to database
+                    if isinstance(player, dict) and player.get('is_stroh', False):
+                        continue
+                    player_id = player['id'] if isinstance(player, dict) else player.id
+                    immediate_player_updates.append((player_id, True, next_calendar_day.match_day_number))
 
-    if immediate_player_updates:
-        batch_update_player_flags(immediate_player_updates)
+        if immediate_player_updates:
+            batch_update_player_flags(immediate_player_updates)
 
     # Step 7: Simulate all matches in parallel (league and cup matches)
-    simulation_start = time.time()
+    with phase('match_day.simulation', season_id=season.id) as simulation_phase:
+        # Combine league and cup matches for simulation
+        all_matches_data = []
+        if matches_data:
+            all_matches_data.extend(matches_data)
+        if cup_matches_data:
+            all_matches_data.extend(cup_matches_data)
 
-    # Combine league and cup matches for simulation
-    all_matches_data = []
-    if matches_data:
-        all_matches_data.extend(matches_data)
-    if cup_matches_data:
-        all_matches_data.extend(cup_matches_data)
+        results, all_performances, all_player_updates, all_lane_records = simulate_matches_parallel(
+            all_matches_data,
+            club_team_players,
+            next_calendar_day.match_day_number,
+            cache
+        )
+        simulation_phase.update(matches=len(results))
 
-    results, all_performances, all_player_updates, all_lane_records = simulate_matches_parallel(
-        all_matches_data,
-        club_team_players,
-        next_calendar_day.match_day_number,
-        cache
-    )
+    # Standings of the manager club's leagues before the results are committed (for standings deltas)
+    standings_before = None
+    if matches_data and has_progress_consumers():
+        standings_before = get_manager_standings_snapshot(season.id)
 
     # Step 8: Batch commit all database changes
-    commit_start = time.time()
-    batch_commit_simulation_results(
-        matches_data,
-        cup_matches_data,
-        results,
-        all_performances,
-        all_player_updates,
-        all_lane_records,
-        next_calendar_day.match_day_number,
-        next_calendar_day.calendar_date  # Pass the correct calendar date
-    )
+    with phase('match_day.commit', season_id=season.id):
+        batch_commit_simulation_results(
+            matches_data,
+            cup_matches_data,
+            results,
+            all_performances,
+            all_player_updates,
+            all_lane_records,
+            next_calendar_day.match_day_number,
+            next_calendar_day.calendar_date,  # Pass the correct calendar date
+            season_id=season.id
+        )
 
     # Step 9: Check for completed cup rounds and advance if necessary
     if cup_matches_data:
-        try:
-            advance_completed_cup_rounds(season.id, next_calendar_day.match_day_number)
-        except Exception as e:
-            print(f"Error advancing cup rounds: {str(e)}")
+        with phase('match_day.cup_advancement', season_id=season.id):
+            try:
+                advance_completed_cup_rounds(season.id, next_calendar_day.match_day_number)
+            except Exception as e:
+                print(f"Error advancing cup rounds: {str(e)}")
 
     # Step 10: Mark calendar day as simulated
     mark_calendar_day_simulated(next_calendar_day.id)
 
+    if has_progress_consumers():
+        report_manager_progress(season.id, next_calendar_day.match_day_number, results, standings_before)
+
+    report_progress(
+        'match_day_simulated',
+        season_id=season.id,
+        match_day=next_calendar_day.match_day_number,
+        day_type=next_calendar_day.day_type,
+        matches_simulated=len(results),
+        duration_ms=round((time.time() - start_time) * 1000, 1)
+    )
+
     return {
         'season': season.name,
         'matches_simulated': len(results),
@@ -958,59 +1116,115 @@ def simulate_match_day(season):
 
 
 
-def advance_completed_cup_rounds(season_id, match_day):
-    """Check for completed cup rounds and advance to next round if all matches are played."""
-    from models import Cup, CupMatch
-    from sqlalchemy import text
+def get_manager_standings_snapshot(season_id):
+    """
+    Get position and points of every team in the leagues of the manager's club.
 
-    # Get all cups for this season
-    cups = Cup.query.filter_by(season_id=season_id, is_active=True).all()
+    Args:
+        season_id: The season ID
 
-    for cup in cups:
-        try:
-            # Check if any matches were played on this match day for this cup
-            played_matches_today = db.session.execute(
-                text("""
-                    SELECT COUNT(*)
-                    FROM cup_match cm
-                    WHERE cm.cup_id = :cup_id
-                        AND cm.cup_match_day = :match_day
-                        AND cm.is_played = 1
-                """),
-                {"cup_id": cup.id, "match_day": match_day}
-            ).scalar()
-
-            # Try to advance if matches were played today OR if all matches in current round are completed
-            # This handles cases where matches were played on previous days but advancement was missed
-            should_check_advancement = played_matches_today > 0
-
-            if not should_check_advancement:
-                # Check if all matches in current round are completed (fallback for missed advancements)
-                current_round_matches = CupMatch.query.filter_by(
-                    cup_id=cup.id,
-                    round_number=cup.current_round_number
-                ).all()
-
-                if current_round_matches:
-                    all_played = all(match.is_played for match in current_round_matches)
-                    if all_played:
-                        should_check_advancement = True
-
-            if should_check_advancement:
-                # Check if this cup can advance to the next round
-                # This will check ALL matches in the current round, not just today's
-                success = cup.advance_to_next_round()
+    Returns:
+        dict: team_id -> {'league_id', 'league_name', 'team_name', 'position', 'points'}
+    """
+    manager_club_id = get_manager_club_id()
+    if not manager_club_id:
+        return {}
+
+    leagues = League.query.join(Team, Team.league_id == League.id).filter(
+        Team.club_id == manager_club_id,
+        League.season_id == season_id
+    ).distinct().all()
+
+    league_names = {league.id: league.name for league in leagues}
+    snapshot = {}
+    for league_id, standings in calculate_standings_for_leagues(leagues).items():
+        league_name = league_names[league_id]
+        for position, entry in enumerate(standings, 1):
+            snapshot[entry['team'].id] = {
+                'league_id': league_id,
+                'league_name': league_name,
+                'team_name': entry['team'].name,
+                'position': position,
+                'points': entry['points']
+            }
+    return snapshot
+
+
+def report_manager_progress(season_id, match_day, results, standings_before=None):
+    """
+    Report the results of the manager club's teams and the standings deltas of their leagues.
 
-        except Exception as e:
-            print(f"Error advancing cup {cup.name}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+    Args:
+        season_id: The season ID
+        match_day: The match day that was simulated
+        results: Match results of the match day
+        standings_before: Snapshot from get_manager_standings_snapshot() taken before the commit
+    """
+    manager_club_id = get_manager_club_id()
+    if not manager_club_id:
+        return
+
+    manager_team_ids = {team_id for (team_id,) in db.session.query(Team.id).filter_by(club_id=manager_club_id)}
+    manager_results = [
+        {
+            'home_team_id': result.get('home_team_id'),
+            'away_team_id': result.get('away_team_id'),
+            'home_team_name': result.get('home_team_name'),
+            'away_team_name': result.get('away_team_name'),
+            'home_score': result.get('home_score'),
+            'away_score': result.get('away_score'),
+            'home_match_points': result.get('home_match_points'),
+            'away_match_points': result.get('away_match_points'),
+            'league_name': result.get('league_name'),
+            'is_cup_match': result.get('is_cup_match', False)
+        }
+        for result in results
+        if result.get('home_team_id') in manager_team_ids or result.get('away_team_id') in manager_team_ids
+    ]
+    if manager_results:
+        report_progress('manager_results', season_id=season_id, match_day=match_day, results=manager_results)
+
+    if standings_before is None:
+        return
+
+    deltas = []
+    for team_id, after in get_manager_standings_snapshot(season_id).items():
+        before = standings_before.get(team_id)
+        if not before:
             continue
+        deltas.append({
+            'team_id': team_id,
+            'team_name': after['team_name'],
+            'league_id': after['league_id'],
+            'league_name': after['league_name'],
+            'position': after['position'],
+            'position_change': before['position'] - after['position'],  # positive = moved up
+            'points': after['points'],
+            'points_change': after['points'] - before['points'],
+            'is_manager_team': team_id in manager_team_ids
+        })
+    if deltas:
+        report_progress('standings_delta', season_id=season_id, match_day=match_day, standings=deltas)
 
-    # Commit any changes made during cup advancement
-    db.session.commit()
 
+@performance_monitor
+def advance_completed_cup_rounds(season_id, match_day):
+    """
+    Check for completed cup rounds and advance to next round if all matches are played.
+
+    All cups of the season are checked together, so a round whose matches were
+    spread over earlier days is advanced as well.
+
+    Args:
+        season_id: The season ID
+        match_day: The cup match day that was just simulated
+    """
+    from cup_engine import advance_cup_rounds
+
+    return advance_cup_rounds(season_id)
 
+
+@performance_monitor
 def simulate_matches_parallel(matches_data, club_team_players, next_match_day, cache_manager):
     """
     Simulate matches in parallel for better performance.
@@ -1545,7 +1759,8 @@ def simulate_player_performance(player, position, lane_quality, team_advantage,
     }
 
 
-def batch_commit_simulation_results(matches_data, cup_matches_data, results, all_performances, all_player_updates, all_lane_records, next_match_day, calendar_date=None):
+@performance_monitor
+def batch_commit_simulation_results(matches_data, cup_matches_data, results, all_performances, all_player_updates, all_lane_records, next_match_day, calendar_date=None, season_id=None):
     """
     Batch commit all simulation results to the database.
 
@@ -1558,8 +1773,8 @@ def batch_commit_simulation_results(matches_data, cup_matches_data, results, all
         all_lane_records: All lane record checks
         next_match_day: The match day being simulated
         calendar_date: The correct calendar date for this match day
+        season_id: Season of the match day, journaled with the results if given
     """
-    from performance_optimizations import batch_create_performances, batch_create_cup_performances
     import time
 
     start_time = time.time()
@@ -1652,126 +1867,28 @@ def batch_commit_simulation_results(matches_data, cup_matches_data, results, all
 
                     league_match_updates[match_id] = update_data
 
-        # Batch update league matches
-        for match_id, updates in league_match_updates.items():
-            db.session.execute(
-                db.update(Match)
-                .where(Match.id == match_id)
-                .values(**updates)
-            )
+        # Update all matches by primary key (executemany per set of columns)
+        if league_match_updates:
+            db.session.execute(db.update(Match), [
+                {'id': match_id, **updates} for match_id, updates in league_match_updates.items()
+            ])
 
-        # Batch update cup matches
         if cup_match_updates:
             from models import CupMatch
-            for match_id, updates in cup_match_updates.items():
-                db.session.execute(
-                    db.update(CupMatch)
-                    .where(CupMatch.id == match_id)
-                    .values(**updates)
-                )
-
-        # Batch create performances - separate league and cup performances
-        if all_performances:
-            # Separate performances by type
-            league_performances = []
-            cup_performances = []
-
-            # Create mappings for both league and cup matches
-            league_match_mapping = {}
-            cup_match_mapping = {}
-
-            for result in results:
-                match_id = result.get('match_id')
-                is_cup_match = result.get('is_cup_match', False)
-
-                if match_id:
-                    if is_cup_match:
-                        # Get cup match to find team IDs
-                        from models import CupMatch
-                        cup_match = CupMatch.query.get(match_id)
-                        if cup_match:
-                            cup_match_mapping[match_id] = {
-                                'home_team_id': cup_match.home_team_id,
-                                'away_team_id': cup_match.away_team_id
-                            }
-                    else:
-                        # Get league match to find team IDs
-                        match = Match.query.get(match_id)
-                        if match:
-                            league_match_mapping[match_id] = {
-                                'home_team_id': match.home_team_id,
-                                'away_team_id': match.away_team_id
-                            }
-
-            # Process each performance and categorize by type
-            for i, perf in enumerate(all_performances):
-                if isinstance(perf, dict):
-                    perf_dict = perf.copy()
-
-                    # Check if this performance has a match_id
-                    match_id = perf_dict.get('match_id')
-                    if not match_id:
-                        continue
-
-                    # Determine if this is a cup match or league match
-                    # Check if match_id exists in cup_match_mapping or league_match_mapping
-                    is_cup_performance = match_id in cup_match_mapping
-                    is_league_performance = match_id in league_match_mapping
-
-                    if not is_cup_performance and not is_league_performance:
-                        continue
-
-                    # Validate required fields
-                    if not (perf_dict.get('player_id') and perf_dict.get('team_id')):
-                        continue
-
-                    if is_cup_performance:
-                        # Convert match_id to cup_match_id for cup performances
-                        perf_dict['cup_match_id'] = perf_dict.pop('match_id')
-                        cup_performances.append(perf_dict)
-                    else:
-                        # Keep as league performance
-                        league_performances.append(perf_dict)
-                else:
-                    # Convert object to dict if needed
-                    perf_dict = perf.__dict__.copy()
-                    match_id = perf_dict.get('match_id')
-
-                    if match_id in cup_match_mapping:
-                        perf_dict['cup_match_id'] = perf_dict.pop('match_id')
-                        cup_performances.append(perf_dict)
-                    elif match_id in league_match_mapping:
-                        league_performances.append(perf_dict)
-                    else:
-                        continue
-
-            # Create performances in their respective tables
-            if league_performances:
-                batch_create_performances(league_performances)
-
-            if cup_performances:
-                batch_create_cup_performances(cup_performances)
+            db.session.execute(db.update(CupMatch), [
+                {'id': match_id, **updates} for match_id, updates in cup_match_updates.items()
+            ])
 
         # Batch update player flags
         if all_player_updates:
             batch_update_player_flags(all_player_updates)
 
-        # Process lane records (this might need to be done individually due to complex logic)
-        if all_lane_records:
-            # Add match_id information to lane records from results
-            enhanced_lane_records = []
-            for i, result in enumerate(results):
-                match_id = result.get('match_id')
-                if match_id and 'lane_records' in result:
-                    for record in result['lane_records']:
-                        record['match_id'] = match_id
-                        enhanced_lane_records.append(record)
-
-            if enhanced_lane_records:
-                process_lane_records_batch(enhanced_lane_records)
+        # Performances, lane records and the journal entry are part of this commit
+        write_match_day_details(results, all_performances, next_match_day, calendar_date, season_id)
 
         # Single commit for all changes
         db.session.commit()
+        bump_world_version(f'match day {next_match_day}')
 
     except Exception as e:
         db.session.rollback()
@@ -1779,71 +1896,102 @@ def batch_commit_simulation_results(matches_data, cup_matches_data, results, all
         raise
 
 
+@performance_monitor
 def process_lane_records_batch(all_lane_records):
     """
     Process lane records in batch for better performance.
 
+    The current best scores of all clubs involved are loaded with one query and
+    the scores of the match day are compared in memory (a record set earlier on
+    the same day counts for the later matches), same rules as
+    LaneRecord.check_and_update_record. New records are added to the session,
+    the caller commits.
+
     Args:
         all_lane_records: List of lane record data
+
+    Returns:
+        int: Number of new records
     """
-    from models import LaneRecord, Player, Team
+    from models import LaneRecord
+    from sqlalchemy import func
 
     if not all_lane_records:
-        return
-
-    # Process each record individually to check for new records
-    records_processed = 0
-    new_records_set = 0
-
+        return 0
+
+    club_ids = {record_data['club_id'] for record_data in all_lane_records}
+    player_ids = {record_data['player_id'] for record_data in all_lane_records if 'player_id' in record_data}
+    team_ids = {record_data['team_id'] for record_data in all_lane_records
+                if 'player_id' not in record_data and 'team_id' in record_data}
+
+    player_ages = dict(
+        db.session.query(Player.id, Player.age).filter(Player.id.in_(player_ids)).all()
+    ) if player_ids else {}
+    existing_team_ids = {
+        team_id for (team_id,) in db.session.query(Team.id).filter(Team.id.in_(team_ids))
+    } if team_ids else set()
+
+    # Best individual score per (category, club), best team score per club
+    best_individual = {}
+    best_team = {}
+    best_scores = db.session.query(
+        LaneRecord.record_type, LaneRecord.category, LaneRecord.club_id, func.max(LaneRecord.score)
+    ).filter(
+        LaneRecord.club_id.in_(club_ids)
+    ).group_by(LaneRecord.record_type, LaneRecord.category, LaneRecord.club_id).all()
+    for record_type, category, club_id, score in best_scores:
+        if record_type == 'individual':
+            best_individual[(category, club_id)] = score
+        elif record_type == 'team':
+            best_team[club_id] = max(score, best_team.get(club_id, score))
+
+    new_records = []
     for record_data in all_lane_records:
         try:
             club_id = record_data['club_id']
             score = record_data['score']
+            match_id = record_data.get('match_id', None)
 
             # Handle player records
             if 'player_id' in record_data:
                 player_id = record_data['player_id']
-                player = Player.query.get(player_id)
-
-                if player:
-                    # Get match_id if available (might not be set yet during batch processing)
-                    match_id = record_data.get('match_id', None)
-
-                    # Check and update individual record (don't commit, will be committed in batch)
-                    if LaneRecord.check_and_update_record(
+                if player_id not in player_ages:
+                    continue
+                key = (LaneRecord.get_age_category(player_ages[player_id]), club_id)
+                if key not in best_individual or score > best_individual[key]:
+                    best_individual[key] = score
+                    new_records.append(LaneRecord(
+                        record_type='individual',
+                        category=key[0],
                         club_id=club_id,
+                        player_id=player_id,
                         score=score,
-                        player=player,
-                        match_id=match_id,
-                        commit=False
-                    ):
-                        new_records_set += 1
+                        match_id=match_id
+                    ))
 
             # Handle team records
             elif 'team_id' in record_data:
                 team_id = record_data['team_id']
-                team = Team.query.get(team_id)
-
-                if team:
-                    # Get match_id if available
-                    match_id = record_data.get('match_id', None)
-
-                    # Check and update team record (don't commit, will be committed in batch)
-                    if LaneRecord.check_and_update_record(
+                if team_id not in existing_team_ids:
+                    continue
+                if club_id not in best_team or score > best_team[club_id]:
+                    best_team[club_id] = score
+                    new_records.append(LaneRecord(
+                        record_type='team',
+                        category='Herren',  # Default category for team records
                         club_id=club_id,
+                        team_id=team_id,
                         score=score,
-                        team=team,
-                        match_id=match_id,
-                        commit=False
-                    ):
-                        new_records_set += 1
-
-            records_processed += 1
+                        match_id=match_id
+                    ))
 
         except Exception as e:
             print(f"Error processing lane record {record_data}: {str(e)}")
             continue
 
+    db.session.add_all(new_records)
+    return len(new_records)
+
 
 # Removed duplicate function - using the one below
 
@@ -1914,6 +2062,8 @@ def batch_update_player_flags(player_updates):
         print(f"Error in batch update: {str(e)}")
         raise
 
+@performance_monitor
+@use_storage_profile('bulk')
 def simulate_season(season, create_new_season=True):
     """Simulate all matches for a season by repeatedly calling simulate_match_day.
 
@@ -1921,6 +2071,27 @@ def simulate_season(season, create_new_season=True):
         season: The season to simulate
         create_new_season: Whether to create a new season after simulation (default: True)
     """
+    # Complete match days an interrupted run left unfinished (calendar flags, cup rounds)
+    repair_interrupted_match_days(season.id)
+
+    # An interrupted season transition continues directly (its teams may already be in the new leagues)
+    if create_new_season and is_transition_started(season.id):
+        print(f"Continuing the interrupted season transition of {season.name}")
+        new_season = None
+        try:
+            new_season = process_end_of_season(season)
+        except Exception as e:
+            print(f"Error creating new season: {str(e)}")
+            db.session.rollback()
+
+        return {
+            'season': season.name,
+            'matches_simulated': 0,
+            'results': [],
+            'new_season_created': new_season is not None,
+            'new_season_id': new_season.id if new_season else None
+        }
+
     # Get all leagues in the season
     leagues = season.leagues
 
@@ -1958,27 +2129,52 @@ def simulate_season(season, create_new_season=True):
         if len(teams_in_league) >= 2 and matches_in_league == 0:
             generate_fixtures(league, season)
 
+    # A run interrupted right after committing a cup day may not have drawn the next round yet
+    try:
+        advance_completed_cup_rounds(season.id, None)
+    except Exception as e:
+        print(f"Error advancing cup rounds: {str(e)}")
+
     # Track total results and matches simulated
     all_results = []
     total_matches_simulated = 0
     new_season_created = False
     new_season_id = None
 
+    # Remaining calendar days with matches (for progress reporting)
+    from models import SeasonCalendar
+    match_days_total = SeasonCalendar.query.filter(
+        SeasonCalendar.season_id == season.id,
+        SeasonCalendar.is_simulated == False,
+        SeasonCalendar.day_type != 'FREE_DAY'
+    ).count()
+
     # Simulate the season by repeatedly calling simulate_match_day until complete
     match_day_count = 0
-    while True:
-        match_day_count += 1
+    with phase('season.simulation', season_id=season.id, match_days_total=match_days_total) as season_phase:
+        while True:
+            match_day_count += 1
 
-        # Use the same logic as the single match day simulation
-        match_day_result = simulate_match_day(season)
+            # Use the same logic as the single match day simulation; interrupted days were repaired above
+            match_day_result = simulate_match_day(season, repair_interrupted=False)
 
-        # Check if simulation is complete
-        if match_day_result['matches_simulated'] == 0:
-            break
+            # Check if simulation is complete
+            if match_day_result['matches_simulated'] == 0:
+                break
+
+            # Add results to our total
+            all_results.extend(match_day_result.get('results', []))
+            total_matches_simulated += match_day_result['matches_simulated']
+
+            report_progress(
+                'season_progress',
+                season_id=season.id,
+                match_days_done=match_day_count,
+                match_days_total=max(match_days_total, match_day_count),
+                matches_simulated=total_matches_simulated
+            )
 
-        # Add results to our total
-        all_results.extend(match_day_result.get('results', []))
-        total_matches_simulated += match_day_result['matches_simulated']
+        season_phase.update(match_days=match_day_count - 1, matches_simulated=total_matches_simulated)
 
     # Check if season is complete and handle end-of-season processing
     from models import Cup, CupMatch
@@ -2008,6 +2204,20 @@ def simulate_season(season, create_new_season=True):
                 new_season_id = new_season.id
         except Exception as e:
             print(f"Error creating new season: {str(e)}")
+            # The completed steps are in the journal, the next run continues from there
+            db.session.rollback()
+
+    # Once per season run; a season transition refreshed the metadata already
+    if not new_season_created:
+        record_simulation()
+
+    # Keep the metrics of every season run when METRICS_DUMP_DIR is configured
+    metrics_dump_dir = os.environ.get('METRICS_DUMP_DIR')
+    if metrics_dump_dir:
+        metrics.dump_metrics_json(
+            os.path.join(metrics_dump_dir, f"metrics_season_{season.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"),
+            extra={'season': season.name, 'match_days': match_day_count - 1, 'matches_simulated': total_matches_simulated}
+        )
 
     return {
         'season': season.name,
@@ -2017,15 +2227,24 @@ def simulate_season(season, create_new_season=True):
         'new_season_id': new_season_id
     }
 
-def generate_fixtures(league, season):
-    """Generate fixtures (matches) for a league in a season using a round-robin tournament algorithm.
-    Ensures teams alternate between home and away matches as much as possible."""
-    # Use direct query instead of relationship to ensure we get updated team assignments
-    teams = list(Team.query.filter_by(league_id=league.id).all())
+def build_round_robin_fixtures(team_ids):
+    """
+    Build the double round-robin schedule of a league.
+
+    Teams alternate between home and away matches as much as possible; the
+    second half of the season mirrors the first one with home/away reversed.
+
+    Args:
+        team_ids: IDs of the teams of the league
+
+    Returns:
+        list: (home_team_id, away_team_id, match_day, round) tuples
+    """
+    teams = list(team_ids)
 
     # Need at least 2 teams to create fixtures
     if len(teams) < 2:
-        return
+        return []
 
     # If odd number of teams, add a dummy team (bye)
     if len(teams) % 2 != 0:
@@ -2037,10 +2256,10 @@ def generate_fixtures(league, season):
 
     # Dictionary to track the last match type for each team (True for home, False for away)
     # Initialize with None (no matches played yet)
-    last_match_type = {team.id: None for team in teams if team is not None}
+    last_match_type = {team_id: None for team_id in teams if team_id is not None}
 
     # Dictionary to track consecutive home/away matches for each team
-    consecutive_matches = {team.id: 0 for team in teams if team is not None}
+    consecutive_matches = {team_id: 0 for team_id in teams if team_id is not None}
 
     # List to store all matches before committing to database
     all_matches = []
@@ -2069,8 +2288,8 @@ def generate_fixtures(league, season):
             should_swap = False
 
             if teams[home_idx] and teams[away_idx]:
-                home_team_id = teams[home_idx].id
-                away_team_id = teams[away_idx].id
+                home_team_id = teams[home_idx]
+                away_team_id = teams[away_idx]
 
                 # If home team had a home match last time and away team had an away match last time,
                 # consider swapping to maintain alternation
@@ -2082,55 +2301,39 @@ def generate_fixtures(league, season):
 
             if should_swap:
                 # Swap home and away teams
-                match = Match(
-                    home_team_id=teams[away_idx].id,
-                    away_team_id=teams[home_idx].id,
-                    league_id=league.id,
-                    season_id=season.id,
-                    match_day=match_day,
-                    round=1,  # First half of season
-                    is_played=False
-                )
+                match = (teams[away_idx], teams[home_idx], match_day, 1)  # First half of season
 
                 # Update tracking dictionaries
-                last_match_type[teams[away_idx].id] = True
-                last_match_type[teams[home_idx].id] = False
+                last_match_type[teams[away_idx]] = True
+                last_match_type[teams[home_idx]] = False
 
-                if last_match_type[teams[away_idx].id] == True:
-                    consecutive_matches[teams[away_idx].id] += 1
+                if last_match_type[teams[away_idx]] == True:
+                    consecutive_matches[teams[away_idx]] += 1
                 else:
-                    consecutive_matches[teams[away_idx].id] = 1
+                    consecutive_matches[teams[away_idx]] = 1
 
-                if last_match_type[teams[home_idx].id] == False:
-                    consecutive_matches[teams[home_idx].id] += 1
+                if last_match_type[teams[home_idx]] == False:
+                    consecutive_matches[teams[home_idx]] += 1
                 else:
-                    consecutive_matches[teams[home_idx].id] = 1
+                    consecutive_matches[teams[home_idx]] = 1
             else:
                 # Create match normally
-                match = Match(
-                    home_team_id=teams[home_idx].id,
-                    away_team_id=teams[away_idx].id,
-                    league_id=league.id,
-                    season_id=season.id,
-                    match_day=match_day,
-                    round=1,  # First half of season
-                    is_played=False
-                )
+                match = (teams[home_idx], teams[away_idx], match_day, 1)  # First half of season
 
                 # Update tracking dictionaries
                 if teams[home_idx] and teams[away_idx]:
-                    last_match_type[teams[home_idx].id] = True
-                    last_match_type[teams[away_idx].id] = False
+                    last_match_type[teams[home_idx]] = True
+                    last_match_type[teams[away_idx]] = False
 
-                    if last_match_type[teams[home_idx].id] == True:
-                        consecutive_matches[teams[home_idx].id] += 1
+                    if last_match_type[teams[home_idx]] == True:
+                        consecutive_matches[teams[home_idx]] += 1
                     else:
-                        consecutive_matches[teams[home_idx].id] = 1
+                        consecutive_matches[teams[home_idx]] = 1
 
-                    if last_match_type[teams[away_idx].id] == False:
-                        consecutive_matches[teams[away_idx].id] += 1
+                    if last_match_type[teams[away_idx]] == False:
+                        consecutive_matches[teams[away_idx]] += 1
                     else:
-                        consecutive_matches[teams[away_idx].id] = 1
+                        consecutive_matches[teams[away_idx]] = 1
 
             round_matches.append(match)
 
@@ -2138,8 +2341,8 @@ def generate_fixtures(league, season):
         all_matches.extend(round_matches)
 
     # Reset tracking dictionaries for second half
-    last_match_type = {team.id: None for team in teams if team is not None}
-    consecutive_matches = {team.id: 0 for team in teams if team is not None}
+    last_match_type = {team_id: None for team_id in teams if team_id is not None}
+    consecutive_matches = {team_id: 0 for team_id in teams if team_id is not None}
 
     # Second half of the season (round 2) - reverse home/away
     for round_num in range(num_rounds):
@@ -2166,8 +2369,8 @@ def generate_fixtures(league, season):
             should_swap = False
 
             if teams[home_idx] and teams[away_idx]:
-                home_team_id = teams[home_idx].id
-                away_team_id = teams[away_idx].id
+                home_team_id = teams[home_idx]
+                away_team_id = teams[away_idx]
 
                 # If home team had a home match last time and away team had an away match last time,
                 # consider swapping to maintain alternation
@@ -2179,64 +2382,71 @@ def generate_fixtures(league, season):
 
             if should_swap:
                 # Swap home and away teams
-                match = Match(
-                    home_team_id=teams[away_idx].id,
-                    away_team_id=teams[home_idx].id,
-                    league_id=league.id,
-                    season_id=season.id,
-                    match_day=match_day,
-                    round=2,  # Second half of season
-                    is_played=False
-                )
+                match = (teams[away_idx], teams[home_idx], match_day, 2)  # Second half of season
 
                 # Update tracking dictionaries
-                last_match_type[teams[away_idx].id] = True
-                last_match_type[teams[home_idx].id] = False
+                last_match_type[teams[away_idx]] = True
+                last_match_type[teams[home_idx]] = False
 
-                if last_match_type[teams[away_idx].id] == True:
-                    consecutive_matches[teams[away_idx].id] += 1
+                if last_match_type[teams[away_idx]] == True:
+                    consecutive_matches[teams[away_idx]] += 1
                 else:
-                    consecutive_matches[teams[away_idx].id] = 1
+                    consecutive_matches[teams[away_idx]] = 1
 
-                if last_match_type[teams[home_idx].id] == False:
-                    consecutive_matches[teams[home_idx].id] += 1
+                if last_match_type[teams[home_idx]] == False:
+                    consecutive_matches[teams[home_idx]] += 1
                 else:
-                    consecutive_matches[teams[home_idx].id] = 1
+                    consecutive_matches[teams[home_idx]] = 1
             else:
                 # Create match normally
-                match = Match(
-                    home_team_id=teams[home_idx].id,
-                    away_team_id=teams[away_idx].id,
-                    league_id=league.id,
-                    season_id=season.id,
-                    match_day=match_day,
-                    round=2,  # Second half of season
-                    is_played=False
-                )
+                match = (teams[home_idx], teams[away_idx], match_day, 2)  # Second half of season
 
                 # Update tracking dictionaries
                 if teams[home_idx] and teams[away_idx]:
-                    last_match_type[teams[home_idx].id] = True
-                    last_match_type[teams[away_idx].id] = False
+                    last_match_type[teams[home_idx]] = True
+                    last_match_type[teams[away_idx]] = False
 
-                    if last_match_type[teams[home_idx].id] == True:
-                        consecutive_matches[teams[home_idx].id] += 1
+                    if last_match_type[teams[home_idx]] == True:
+                        consecutive_matches[teams[home_idx]] += 1
                     else:
-                        consecutive_matches[teams[home_idx].id] = 1
+                        consecutive_matches[teams[home_idx]] = 1
 
-                    if last_match_type[teams[away_idx].id] == False:
-                        consecutive_matches[teams[away_idx].id] += 1
+                    if last_match_type[teams[away_idx]] == False:
+                        consecutive_matches[teams[away_idx]] += 1
                     else:
-                        consecutive_matches[teams[away_idx].id] = 1
+                        consecutive_matches[teams[away_idx]] = 1
 
             round_matches.append(match)
 
         # Add all matches for this round
         all_matches.extend(round_matches)
 
+    return all_matches
+
+
+def generate_fixtures(league, season):
+    """Generate fixtures (matches) for a league in a season using a round-robin tournament algorithm.
+    Ensures teams alternate between home and away matches as much as possible."""
+    # Use direct query instead of relationship to ensure we get updated team assignments
+    teams = list(Team.query.filter_by(league_id=league.id).all())
+
+    # Need at least 2 teams to create fixtures
+    if len(teams) < 2:
+        return
+
+    fixtures = build_round_robin_fixtures([team.id for team in teams])
+
     # Add all matches to the database
-    for match in all_matches:
-        db.session.add(match)
+    for home_team_id, away_team_id, match_day, round_number in fixtures:
+        db.session.add(Match(
+            home_team_id=home_team_id,
+            away_team_id=away_team_id,
+            league_id=league.id,
+            season_id=season.id,
+            match_day=match_day,
+            round=round_number,
+            is_played=False
+        ))
 
     db.session.commit()
 
@@ -2290,22 +2500,33 @@ def generate_fixtures(league, season):
     db.session.commit()
 
 def process_end_of_season(season):
-    """Process end of season events like promotions and relegations."""
+    """
+    Process end of season events like promotions and relegations.
 
-    # Save final standings to league history before creating new season
-    save_league_history(season)
+    Every step is recorded in the transition journal of the season; steps that
+    were completed by an earlier, interrupted run are skipped.
+    """
+    ensure_journal_table()
+
+    # Checkpoint of the finished season, so the transition can be undone
+    with phase('transition.checkpoint', season_id=season.id):
+        run_step(season.id, 'checkpoint', create_transition_checkpoint)
 
-    # Save cup winners and finalists to cup history before creating new season
-    save_cup_history(season)
+    with phase('transition.history', season_id=season.id):
+        # Save final standings to league history before creating new season
+        run_step(season.id, 'league_history', save_league_history, season)
 
-    # Save team cup participation history before creating new season
-    save_team_cup_history(season)
+        # Save cup winners and finalists to cup history before creating new season
+        run_step(season.id, 'cup_history', save_cup_history, season)
 
-    # Save team achievements (league champions and cup winners) before creating new season
-    save_team_achievements(season)
+        # Save team cup participation history before creating new season
+        run_step(season.id, 'team_cup_history', save_team_cup_history, season)
+
+        # Save team achievements (league champions and cup winners) before creating new season
+        run_step(season.id, 'team_achievements', save_team_achievements, season)
 
     # Create new season (this will handle promotions/relegations internally)
-    create_new_season(season)
+    return create_new_season(season)
 
 def save_league_history(season):
     """Save the final standings of all leagues to the league history table."""
@@ -2328,6 +2549,9 @@ def save_league_history(season):
         leagues = League.query.filter_by(season_id=season.id).all()
         print(f"Found {len(leagues)} leagues for season {season.name}")
 
+        # Teams already saved by an earlier, interrupted run of the transition
+        saved_team_ids = {row.team_id for row in db.session.query(LeagueHistory.team_id).filter_by(season_id=season.id)}
+
         for league in leagues:
             print(f"Saving history for league: {league.name} (ID: {league.id})")
 
@@ -2339,6 +2563,8 @@ def save_league_history(season):
             for i, standing in enumerate(standings):
                 team = standing['team']
                 position = i + 1  # Position is index + 1
+                if team.id in saved_team_ids:
+                    continue
                 print(f"  Processing team {i+1}: {team.name} (Position: {position})")
 
                 # Get club information
@@ -2949,84 +3175,101 @@ def get_round_name(round_number, total_rounds):
 
 def calculate_standings(league):
     """Calculate the standings for a league."""
-    # Use direct query instead of relationship to ensure we get updated team assignments
-    teams = Team.query.filter_by(league_id=league.id).all()
-    standings = []
+    return calculate_standings_for_leagues([league]).get(league.id, [])
 
-    # Check if any matches have been played in this league
-    played_matches_count = Match.query.filter_by(league_id=league.id, is_played=True).count()
+def calculate_standings_for_leagues(leagues):
+    """
+    Calculate the standings of several leagues with two queries.
 
-    for team in teams:
-        # Get all matches for this team
-        home_matches = Match.query.filter_by(home_team_id=team.id, league_id=league.id).all()
-        away_matches = Match.query.filter_by(away_team_id=team.id, league_id=league.id).all()
-
-        table_points = 0
-        wins = 0
-        draws = 0
-        losses = 0
-        match_points_for = 0
-        match_points_against = 0
-        pins_for = 0
-        pins_against = 0
-
-        # Calculate points from home matches
-        for match in home_matches:
-            if match.is_played:
-                pins_for += match.home_score
-                pins_against += match.away_score
-                match_points_for += match.home_match_points
-                match_points_against += match.away_match_points
-
-                if match.home_match_points > match.away_match_points:
-                    table_points += 3  # Win = 3 points in table
-                    wins += 1
-                elif match.home_match_points == match.away_match_points:
-                    table_points += 1  # Draw = 1 point in table
-                    draws += 1
-                else:
-                    losses += 1
-
-        # Calculate points from away matches
-        for match in away_matches:
-            if match.is_played:
-                pins_for += match.away_score
-                pins_against += match.home_score
-                match_points_for += match.away_match_points
-                match_points_against += match.home_match_points
-
-                if match.away_match_points > match.home_match_points:
-                    table_points += 3  # Win = 3 points in table
-                    wins += 1
-                elif match.away_match_points == match.home_match_points:
-                    table_points += 1  # Draw = 1 point in table
-                    draws += 1
-                else:
-                    losses += 1
+    Produces the same entries and ordering as calculate_standings() for each league,
+    but loads the teams and the played matches of all leagues at once instead of
+    querying the matches of every team separately.
+
+    Args:
+        leagues: List of League objects
+
+    Returns:
+        dict: Mapping from league ID to the sorted standings list
+    """
+    league_ids = [league.id for league in leagues]
+    if not league_ids:
+        return {}
 
-        # Create the standings entry for this team
-        standings.append({
+    # Use direct query instead of relationship to ensure we get updated team assignments
+    teams = Team.query.filter(Team.league_id.in_(league_ids)).order_by(Team.id).all()
+
+    entries_by_league = {league_id: [] for league_id in league_ids}
+    entry_by_team = {}
+    for team in teams:
+        entry = {
             'team': team,
-            'points': table_points,  # Renamed from table_points to match what's used in the frontend
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'match_points_for': match_points_for,
-            'match_points_against': match_points_against,
-            'match_point_difference': match_points_for - match_points_against,
-            'goals_for': pins_for,  # Renamed from pins_for to match what's used in the frontend
-            'goals_against': pins_against,  # Renamed from pins_against to match what's used in the frontend
-            'goal_difference': pins_for - pins_against  # Renamed from pin_difference to match what's used in the frontend
-        })
+            'points': 0,  # Renamed from table_points to match what's used in the frontend
+            'wins': 0,
+            'draws': 0,
+            'losses': 0,
+            'match_points_for': 0,
+            'match_points_against': 0,
+            'match_point_difference': 0,
+            'goals_for': 0,  # Renamed from pins_for to match what's used in the frontend
+            'goals_against': 0,  # Renamed from pins_against to match what's used in the frontend
+            'goal_difference': 0  # Renamed from pin_difference to match what's used in the frontend
+        }
+        entries_by_league[team.league_id].append(entry)
+        entry_by_team[team.id] = entry
+
+    played_matches = db.session.query(
+        Match.league_id,
+        Match.home_team_id,
+        Match.away_team_id,
+        Match.home_score,
+        Match.away_score,
+        Match.home_match_points,
+        Match.away_match_points
+    ).filter(
+        Match.league_id.in_(league_ids),
+        Match.is_played == True
+    ).all()
+
+    played_leagues = set()
+    for league_id, home_team_id, away_team_id, home_score, away_score, home_mp, away_mp in played_matches:
+        played_leagues.add(league_id)
+
+        for team_id, pins_for, pins_against, mp_for, mp_against in (
+            (home_team_id, home_score, away_score, home_mp, away_mp),
+            (away_team_id, away_score, home_score, away_mp, home_mp)
+        ):
+            entry = entry_by_team.get(team_id)
+            # Only count matches of the league the team currently plays in
+            if entry is None or entry['team'].league_id != league_id:
+                continue
+
+            entry['goals_for'] += pins_for
+            entry['goals_against'] += pins_against
+            entry['match_points_for'] += mp_for
+            entry['match_points_against'] += mp_against
+
+            if mp_for > mp_against:
+                entry['points'] += 3  # Win = 3 points in table
+                entry['wins'] += 1
+            elif mp_for == mp_against:
+                entry['points'] += 1  # Draw = 1 point in table
+                entry['draws'] += 1
+            else:
+                entry['losses'] += 1
+
+    for league_id, standings in entries_by_league.items():
+        for entry in standings:
+            entry['match_point_difference'] = entry['match_points_for'] - entry['match_points_against']
+            entry['goal_difference'] = entry['goals_for'] - entry['goals_against']
 
-    # Sort standings by table points, then match point difference, then total pins
-    # Only sort if matches have been played, otherwise keep the original team order
-    if played_matches_count > 0:
-        standings.sort(key=lambda x: (x['points'], x['match_point_difference'], x['goal_difference']), reverse=True)
+        # Sort standings by table points, then match point difference, then total pins
+        # Only sort if matches have been played, otherwise keep the original team order
+        if league_id in played_leagues:
+            standings.sort(key=lambda x: (x['points'], x['match_point_difference'], x['goal_difference']), reverse=True)
 
-    return standings
+    return entries_by_league
 
-def select_target_league_id(available_league_ids, old_to_new_mapping, new_leagues, distribution_tracker=None):
+def select_target_league_id(available_league_ids, old_to_new_mapping, new_league_ids, distribution_tracker=None):
     """
     Select the best target league ID from available options with load balancing.
     Distributes teams evenly across available leagues to prevent overcrowding.
@@ -3034,14 +3277,14 @@ def select_target_league_id(available_league_ids, old_to_new_mapping, new_league
     Args:
         available_league_ids: List of possible target league IDs
         old_to_new_mapping: Mapping from old to new league IDs
-        new_leagues: List of new league objects
+        new_league_ids: Set (or dict keyed by ID) of the new league IDs
         distribution_tracker: Dict tracking team counts per league for load balancing
     """
     # Get valid target league IDs
     valid_target_ids = []
     for old_league_id in available_league_ids:
         new_league_id = old_to_new_mapping.get(old_league_id)
-        if new_league_id and any(nl.id == new_league_id for nl in new_leagues):
+        if new_league_id and new_league_id in new_league_ids:
             valid_target_ids.append(new_league_id)
 
     if not valid_target_ids:
@@ -3077,54 +3320,148 @@ def select_target_league_id(available_league_ids, old_to_new_mapping, new_league
     return best_league_id
 
 
+def resolve_league_assignments(old_leagues, standings_by_league, graph, old_to_new_mapping):
+    """
+    Decide the new league and the previous-season fields of every team of the old season.
+
+    Works only on dicts keyed by league ID, so the cost grows linearly with the
+    number of teams. Nothing is written to the database here.
+
+    Args:
+        old_leagues: League objects of the old season
+        standings_by_league: Mapping from old league ID to its final standings
+        graph: LeagueGraph of the old season
+        old_to_new_mapping: Mapping from old league IDs to new league IDs
+
+    Returns:
+        tuple: (assignments, distribution_tracker, summary) where assignments is a list of
+               Team update mappings, distribution_tracker maps new league ID to team count
+               and summary counts promoted/relegated/champion/stayed teams and holds warnings
+    """
+    new_league_ids = set(old_to_new_mapping.values())
+    levels = [league.level for league in old_leagues]
+    top_level = min(levels) if levels else None
+    bottom_level = max(levels) if levels else None
+
+    def promotion_zone(league, position):
+        return position < league.anzahl_aufsteiger and league.level > top_level
+
+    def relegation_zone(league, position, team_count):
+        return position >= team_count - league.anzahl_absteiger and league.level < bottom_level
+
+    # Initialize distribution tracker for load balancing
+    # Pre-populate with the teams that stay in their league (not promoted/relegated)
+    distribution_tracker = {new_league_id: 0 for new_league_id in new_league_ids}
+    for old_league in old_leagues:
+        new_league_id = old_to_new_mapping.get(old_league.id)
+        if new_league_id is None:
+            continue
+        standings = standings_by_league.get(old_league.id, [])
+        distribution_tracker[new_league_id] = sum(
+            1 for j in range(len(standings))
+            if not promotion_zone(old_league, j)
+            and not relegation_zone(old_league, j, len(standings))
+        )
+
+    assignments = []
+    summary = {'promoted': 0, 'relegated': 0, 'champion': 0, 'stayed': 0, 'warnings': []}
+
+    for old_league in old_leagues:
+        standings = standings_by_league.get(old_league.id, [])
+        same_league_id = old_to_new_mapping.get(old_league.id)
+
+        for j, standing in enumerate(standings):
+            team = standing['team']
+            status = None
+            target_new_league_id = same_league_id
+
+            # Apply promotions/relegations based on standings and set status
+            if promotion_zone(old_league, j):
+                direction, target_ids = 'promoted', graph.get_promotion_targets(old_league.id)
+            elif relegation_zone(old_league, j, len(standings)):
+                direction, target_ids = 'relegated', graph.get_relegation_targets(old_league.id)
+            else:
+                direction, target_ids = None, None
+
+            if direction:
+                selected_id = None
+                if target_ids:
+                    selected_id = select_target_league_id(
+                        target_ids,
+                        old_to_new_mapping,
+                        new_league_ids,
+                        distribution_tracker
+                    )
+                if selected_id:
+                    # Only mark as promoted/relegated if we actually found a target league
+                    target_new_league_id = selected_id
+                    status = direction
+                else:
+                    # If no valid target league found, team stays in same league
+                    summary['warnings'].append(
+                        f"No valid {'promotion' if direction == 'promoted' else 'relegation'} league for "
+                        f"{team.name} from {old_league.name} - team stays in same league"
+                    )
+            elif j == 0 and old_league.level == 1:  # Champion of top league
+                status = 'champion'
+
+            summary[status or 'stayed'] += 1
+
+            if target_new_league_id is None:
+                summary['warnings'].append(f"Could not determine target league for team {team.name}")
+                continue
+
+            assignments.append({
+                'id': team.id,
+                'league_id': target_new_league_id,
+                'previous_season_position': j + 1,
+                'previous_season_league_level': old_league.level,
+                'previous_season_status': status
+            })
+
+    return assignments, distribution_tracker, summary
+
 
 
-def balance_promotion_relegation_spots(season_id, old_to_new_league_mapping=None):
+
+def balance_promotion_relegation_spots(season_id, old_to_new_league_mapping=None, graph=None):
     """
     Balance promotion and relegation spots between league levels.
 
     For each league level, check how many leagues from the next lower level
-    feed into it, and adjust relegation spots accordingly.
+    feed into it, and adjust relegation spots accordingly. Uses the indexed
+    league graph, so every league is visited once.
 
     Args:
         season_id: The season ID to balance leagues for
         old_to_new_league_mapping: Optional mapping from old league IDs to new league IDs
                                   (used during season transitions)
+        graph: Optional preloaded LeagueGraph of the season
     """
+    from league_graph import LeagueGraph
+
     print("Balancing promotion and relegation spots...")
 
-    leagues = League.query.filter_by(season_id=season_id).order_by(League.level).all()
-    leagues_by_level = {}
+    if graph is None:
+        graph = LeagueGraph.load(season_id)
+    leagues_by_level = graph.leagues_by_level()
 
-    # Group leagues by level
-    for league in leagues:
-        if league.level not in leagues_by_level:
-            leagues_by_level[league.level] = []
-        leagues_by_level[league.level].append(league)
+    changes_made = 0
 
-    # Note: League references are now updated in create_new_season before this function is called
-    # For first season (old_to_new_league_mapping is None), league references are already correct
+    if not leagues_by_level:
+        print("No changes needed for promotion/relegation spots")
+        return
 
-    changes_made = 0
+    top_level = graph.top_level
+    bottom_level = graph.bottom_level
 
     # Process each league level
     for level in sorted(leagues_by_level.keys()):
-        current_level_leagues = leagues_by_level[level]
-
-        # For each league in this level, check how many lower-level leagues feed into it
-        for league in current_level_leagues:
-            # Get leagues that can be promoted to this league
-            feeding_leagues = []
-
-            # Check all leagues in lower levels (higher level numbers)
-            for lower_level in range(level + 1, max(leagues_by_level.keys()) + 1):
-                if lower_level in leagues_by_level:
-                    for lower_league in leagues_by_level[lower_level]:
-                        # Check if this lower league can promote to our current league
-                        promotion_league_ids = lower_league.get_aufstieg_liga_ids()
-
-                        if league.id in promotion_league_ids:
-                            feeding_leagues.append(lower_league)
+        for league in leagues_by_level[level]:
+            # Leagues in lower levels (higher level numbers) that promote into this league
+            feeding_leagues = [feeding_league for feeding_league in graph.get_feeding_leagues(league.id)
+                               if feeding_league.level > level]
+            has_relegation_targets = bool(graph.get_relegation_targets(league.id))
 
             # Calculate required relegation spots
             required_relegation_spots = len(feeding_leagues)
@@ -3132,14 +3469,12 @@ def balance_promotion_relegation_spots(season_id, old_to_new_league_mapping=None
             # Only adjust if there are feeding leagues and the current spots don't match
             # Also check if the league has valid relegation targets before setting relegation spots
             if required_relegation_spots > 0:
-                # Only set relegation spots if the league has valid relegation targets
-                valid_relegation_targets = league.get_abstieg_liga_ids()
-                if valid_relegation_targets and league.anzahl_absteiger != required_relegation_spots:
+                if has_relegation_targets and league.anzahl_absteiger != required_relegation_spots:
                     old_spots = league.anzahl_absteiger
                     league.anzahl_absteiger = required_relegation_spots
                     changes_made += 1
                     print(f"  {league.name} (Level {league.level}): Changed relegation spots from {old_spots} to {required_relegation_spots}")
-                elif not valid_relegation_targets and league.anzahl_absteiger > 0:
+                elif not has_relegation_targets and league.anzahl_absteiger > 0:
                     # League has relegation spots but no valid targets - remove spots
                     old_spots = league.anzahl_absteiger
                     league.anzahl_absteiger = 0
@@ -3152,38 +3487,32 @@ def balance_promotion_relegation_spots(season_id, old_to_new_league_mapping=None
                     if feeding_league.anzahl_aufsteiger < 1:
                         feeding_league.anzahl_aufsteiger = 1
                         print(f"    {feeding_league.name} (Level {feeding_league.level}): Set promotion spots to 1")
-            elif required_relegation_spots == 0 and level < max(leagues_by_level.keys()):
+            elif level < bottom_level:
                 # This league has no feeding leagues but is not the bottom level
                 # Only set relegation spots if the league has valid relegation targets
-                if league.anzahl_absteiger == 0 and league.get_abstieg_liga_ids():
+                if league.anzahl_absteiger == 0 and has_relegation_targets:
                     league.anzahl_absteiger = 1
                     changes_made += 1
                     print(f"  {league.name} (Level {league.level}): Set minimum 1 relegation spot (no feeding leagues, but has relegation targets)")
-                elif league.anzahl_absteiger > 0 and not league.get_abstieg_liga_ids():
+                elif league.anzahl_absteiger > 0 and not has_relegation_targets:
                     # League has relegation spots but no valid targets - remove spots
                     league.anzahl_absteiger = 0
                     changes_made += 1
                     print(f"  {league.name} (Level {league.level}): Removed relegation spots (no valid relegation targets)")
 
-    # Special case: Check if top-level leagues have promotion spots when they shouldn't
-    top_level = min(leagues_by_level.keys()) if leagues_by_level else 1
-    if top_level in leagues_by_level:
-        for league in leagues_by_level[top_level]:
-            # Top level leagues should not have promotion spots
-            if league.anzahl_aufsteiger > 0:
-                league.anzahl_aufsteiger = 0
-                changes_made += 1
-                print(f"  {league.name} (Level {league.level}): Removed promotion spots (top level)")
-
-    # Special case: Check if bottom-level leagues have relegation spots when they shouldn't
-    bottom_level = max(leagues_by_level.keys()) if leagues_by_level else 10
-    if bottom_level in leagues_by_level:
-        for league in leagues_by_level[bottom_level]:
-            # Bottom level leagues should not have relegation spots
-            if league.anzahl_absteiger > 0:
-                league.anzahl_absteiger = 0
-                changes_made += 1
-                print(f"  {league.name} (Level {league.level}): Removed relegation spots (bottom level)")
+    # Special case: Top level leagues should not have promotion spots
+    for league in leagues_by_level[top_level]:
+        if league.anzahl_aufsteiger > 0:
+            league.anzahl_aufsteiger = 0
+            changes_made += 1
+            print(f"  {league.name} (Level {league.level}): Removed promotion spots (top level)")
+
+    # Special case: Bottom level leagues should not have relegation spots
+    for league in leagues_by_level[bottom_level]:
+        if league.anzahl_absteiger > 0:
+            league.anzahl_absteiger = 0
+            changes_made += 1
+            print(f"  {league.name} (Level {league.level}): Removed relegation spots (bottom level)")
 
     if changes_made > 0:
         db.session.commit()
@@ -3192,298 +3521,143 @@ def balance_promotion_relegation_spots(season_id, old_to_new_league_mapping=None
         print("No changes needed for promotion/relegation spots")
 
 
-def create_new_season(old_season):
-    """Create a new season based on the old one."""
-    print("Creating new season...")
-
-    # Reset the call counter for league selection to ensure fair distribution
-    if hasattr(select_target_league_id, '_call_counter'):
-        select_target_league_id._call_counter = 0
-
-    # Keep the old season as current for now
-    # We'll only change it after everything is set up
-    new_season = Season(
-        name=f"Season {int(old_season.name.split()[-1]) + 1}",
-        start_date=old_season.end_date + timedelta(days=30),  # Start 30 days after previous season
-        end_date=old_season.end_date + timedelta(days=30 + 365),  # End roughly a year later
-        is_current=False  # Start as not current, will set to current at the end
-    )
-
-    db.session.add(new_season)
-    db.session.commit()
-    print(f"Created new season: {new_season.name} (ID: {new_season.id})")
-
-    # Create leagues for the new season
-    old_leagues = League.query.filter_by(season_id=old_season.id).order_by(League.level).all()
-    new_leagues = []
-    old_to_new_league_mapping = {}  # Maps old league ID to new league ID
-
-    print(f"Creating {len(old_leagues)} leagues for the new season...")
-    for old_league in old_leagues:
-        new_league = League(
-            name=old_league.name,
-            level=old_league.level,
-            season_id=new_season.id,
-            bundesland=old_league.bundesland,
-            landkreis=old_league.landkreis,
-            altersklasse=old_league.altersklasse,
-            anzahl_aufsteiger=old_league.anzahl_aufsteiger,
-            anzahl_absteiger=old_league.anzahl_absteiger,
-            aufstieg_liga_id=old_league.aufstieg_liga_id,
-            abstieg_liga_id=old_league.abstieg_liga_id
-        )
-        new_leagues.append(new_league)
-        db.session.add(new_league)
-
-    db.session.commit()
-
-    # Create mapping from old league IDs to new league IDs
-    for i, old_league in enumerate(old_leagues):
-        old_to_new_league_mapping[old_league.id] = new_leagues[i].id
-
-    # CRITICAL: Update all aufstieg_liga_id and abstieg_liga_id references to use new league IDs
-    # This must happen BEFORE team assignments to ensure correct promotion/relegation targets
-    print("Updating league references to new season IDs...")
-    for new_league in new_leagues:
-        # Update promotion league IDs
-        if new_league.aufstieg_liga_id:
-            old_ids = new_league.get_aufstieg_liga_ids()
-            new_ids = []
-            for old_id in old_ids:
-                if old_id in old_to_new_league_mapping:
-                    new_ids.append(old_to_new_league_mapping[old_id])
-                else:
-                    print(f"WARNING: Could not map promotion league ID {old_id} for league {new_league.name}")
-            if new_ids:
-                new_league.aufstieg_liga_id = ';'.join(map(str, new_ids))
-                print(f"Updated promotion targets for {new_league.name}: {new_ids}")
-            else:
-                # If no valid new IDs found, clear the field
-                new_league.aufstieg_liga_id = None
-                print(f"WARNING: No valid promotion targets found for {new_league.name}, cleared aufstieg_liga_id")
-
-        # Update relegation league IDs
-        if new_league.abstieg_liga_id:
-            old_ids = new_league.get_abstieg_liga_ids()
-            new_ids = []
-            for old_id in old_ids:
-                if old_id in old_to_new_league_mapping:
-                    new_ids.append(old_to_new_league_mapping[old_id])
-                else:
-                    print(f"WARNING: Could not map relegation league ID {old_id} for league {new_league.name}")
-            if new_ids:
-                new_league.abstieg_liga_id = ';'.join(map(str, new_ids))
-                print(f"Updated relegation targets for {new_league.name}: {new_ids}")
-            else:
-                # If no valid new IDs found, clear the field
-                new_league.abstieg_liga_id = None
-                print(f"WARNING: No valid relegation targets found for {new_league.name}, cleared abstieg_liga_id")
-
-    db.session.commit()
-    print("Successfully updated all league references to new season IDs")
-
-    # Balance promotion and relegation spots for the new season
-    balance_promotion_relegation_spots(new_season.id, old_to_new_league_mapping)
-
-    print(f"Created {len(new_leagues)} leagues for the new season")
-    print(f"League ID mapping: {old_to_new_league_mapping}")
-
-    # Create a mapping of teams to their new leagues
-    team_to_new_league = {}
-
-    # Initialize distribution tracker for load balancing
-    # Pre-populate with current team counts to ensure proper load balancing
-    league_distribution_tracker = {}
-    for new_league in new_leagues:
-        # Count teams that will stay in this league (mapped from old leagues)
-        corresponding_old_league_id = None
-        for old_id, new_id in old_to_new_league_mapping.items():
-            if new_id == new_league.id:
-                corresponding_old_league_id = old_id
-                break
+@performance_monitor
+@use_storage_profile('bulk')
+def move_teams_to_new_leagues(old_leagues, new_leagues, old_league_graph, old_to_new_league_mapping, new_season):
+    """
+    Move all teams into the leagues of the new season (promotion/relegation).
 
-        if corresponding_old_league_id:
-            # Count teams in the old league that will stay (not promoted/relegated)
-            old_league = next((ol for ol in old_leagues if ol.id == corresponding_old_league_id), None)
-            if old_league:
-                standings = calculate_standings(old_league)
-                staying_teams = 0
-                for j, standing in enumerate(standings):
-                    # Count teams that are not promoted or relegated
-                    is_promoted = j < old_league.anzahl_aufsteiger and old_league.level > 1
-                    is_relegated = j >= len(standings) - old_league.anzahl_absteiger and old_league.level < max(ol.level for ol in old_leagues)
-                    if not is_promoted and not is_relegated:
-                        staying_teams += 1
-                league_distribution_tracker[new_league.id] = staying_teams
-            else:
-                league_distribution_tracker[new_league.id] = 0
-        else:
-            league_distribution_tracker[new_league.id] = 0
+    All teams are moved with one bulk UPDATE and one commit.
 
-    # First, get the final standings for each old league
-    for i, old_league in enumerate(old_leagues):
-        standings = calculate_standings(old_league)
-        print(f"Old league {old_league.name} (Level {old_league.level}) has {len(standings)} teams")
+    Args:
+        old_leagues: Leagues of the finished season (ordered by level)
+        new_leagues: Leagues of the new season
+        old_league_graph: LeagueGraph of the finished season
+        old_to_new_league_mapping: Mapping from old league IDs to new league IDs
+        new_season: The new season
 
-        # Map each team to its corresponding new league and set status flags
-        for j, standing in enumerate(standings):
-            team = standing['team']
-            target_new_league_id = None
+    Returns:
+        dict: Summary with promoted, relegated, champion and stayed counts
+    """
+    # Resolve promotions/relegations from the final standings (computed once for all leagues)
+    new_leagues_by_id = {new_league.id: new_league for new_league in new_leagues}
+    standings_by_league = calculate_standings_for_leagues(old_leagues)
+    team_assignments, league_distribution_tracker, summary = resolve_league_assignments(
+        old_leagues,
+        standings_by_league,
+        old_league_graph,
+        old_to_new_league_mapping
+    )
 
-            # Store previous season information
-            team.previous_season_position = j + 1
-            team.previous_season_league_level = old_league.level
-            team.previous_season_status = None  # Reset status first
-
-            # Apply promotions/relegations based on standings and set status
-            if j < old_league.anzahl_aufsteiger and i > 0:  # Promotion (except for top league)
-                # Get promotion league IDs from the old league
-                promotion_league_ids = old_league.get_aufstieg_liga_ids()
-                if promotion_league_ids:
-                    target_new_league_id = select_target_league_id(
-                        promotion_league_ids,
-                        old_to_new_league_mapping,
-                        new_leagues,
-                        league_distribution_tracker
-                    )
-                    if target_new_league_id:
-                        # Only mark as promoted if we actually found a target league
-                        team.previous_season_status = 'promoted'
-                        target_league_name = next((nl.name for nl in new_leagues if nl.id == target_new_league_id), "Unknown")
-                        print(f"Team {team.name} promoted from {old_league.name} to {target_league_name}")
-                    else:
-                        # If no valid promotion league found, team stays in same league
-                        target_new_league_id = old_to_new_league_mapping.get(old_league.id)
-                        print(f"WARNING: Could not find valid promotion league for {team.name} from {old_league.name} - team stays in same league")
-                else:
-                    # If no promotion leagues defined, team stays in same league
-                    target_new_league_id = old_to_new_league_mapping.get(old_league.id)
-                    print(f"WARNING: No promotion leagues defined for {old_league.name} - team {team.name} stays in same league")
-            elif j >= len(standings) - old_league.anzahl_absteiger and i < len(old_leagues) - 1:  # Relegation (except for bottom league)
-                # Get relegation league IDs from the old league
-                relegation_league_ids = old_league.get_abstieg_liga_ids()
-                if relegation_league_ids:
-                    target_new_league_id = select_target_league_id(
-                        relegation_league_ids,
-                        old_to_new_league_mapping,
-                        new_leagues,
-                        league_distribution_tracker
-                    )
-                    if target_new_league_id:
-                        # Only mark as relegated if we actually found a target league
-                        team.previous_season_status = 'relegated'
-                        target_league_name = next((nl.name for nl in new_leagues if nl.id == target_new_league_id), "Unknown")
-                        print(f"Team {team.name} relegated from {old_league.name} to {target_league_name}")
-                    else:
-                        # If no valid relegation league found, team stays in same league
-                        target_new_league_id = old_to_new_league_mapping.get(old_league.id)
-                        print(f"WARNING: Could not find valid relegation league for {team.name} from {old_league.name} - team stays in same league")
-                else:
-                    # If no relegation leagues defined, team stays in same league
-                    target_new_league_id = old_to_new_league_mapping.get(old_league.id)
-                    print(f"WARNING: No relegation leagues defined for {old_league.name} - team {team.name} stays in same league")
-            elif j == 0 and old_league.level == 1:  # Champion of top league
-                team.previous_season_status = 'champion'
-                print(f"Team {team.name} is champion of level {old_league.level}")
-                # Champions stay in the same league
-                target_new_league_id = old_to_new_league_mapping.get(old_league.id)
-                # Note: Distribution tracker already accounts for staying teams in initialization
-            else:
-                # Team stays in the same league
-                target_new_league_id = old_to_new_league_mapping.get(old_league.id)
-                # Note: Distribution tracker already accounts for staying teams in initialization
-
-            # Map team to the target league
-            if target_new_league_id:
-                team_to_new_league[team.id] = target_new_league_id
-                target_league_name = next((nl.name for nl in new_leagues if nl.id == target_new_league_id), "Unknown")
-                print(f"Team {team.name} (ID: {team.id}) mapped to new league {target_league_name} (ID: {target_new_league_id})")
-            else:
-                print(f"WARNING: Could not determine target league for team {team.name}")
+    print(f"Promotion/relegation resolved for {len(team_assignments)} teams: "
+          f"{summary['promoted']} promoted, {summary['relegated']} relegated, "
+          f"{summary['champion']} champions, {summary['stayed']} stayed")
+    for warning in summary['warnings'][:10]:
+        print(f"WARNING: {warning}")
+    if len(summary['warnings']) > 10:
+        print(f"WARNING: ... and {len(summary['warnings']) - 10} more warnings")
 
     # Print distribution summary
     print("\n=== LEAGUE DISTRIBUTION SUMMARY ===")
     for league_id, team_count in league_distribution_tracker.items():
-        league_name = next((nl.name for nl in new_leagues if nl.id == league_id), f"League {league_id}")
+        league = new_leagues_by_id.get(league_id)
+        league_name = league.name if league else f"League {league_id}"
         print(f"{league_name}: {team_count} teams")
 
-    # Now update all teams to point to their new leagues
-    teams = Team.query.all()
-    updated_teams = 0
-    unmapped_teams = []
+    # Teams outside the old season's leagues: new teams added via cheat function
+    # (league_id is NULL) or teams with a stale league reference
+    old_league_ids = list(old_to_new_league_mapping.keys())
+    other_teams = Team.query.filter(
+        db.or_(Team.league_id.is_(None), Team.league_id.notin_(old_league_ids))
+    ).all()
 
-    for team in teams:
-        if team.id in team_to_new_league:
-            old_league_id = team.league_id
-            team.league_id = team_to_new_league[team.id]
-            updated_teams += 1
-            print(f"Team {team.name} moved from league {old_league_id} to league {team.league_id}")
-        elif team.target_league_level is not None:
-            # This is a new team added via cheat function - assign to target league
-            target_league = None
-            for new_league in new_leagues:
-                if (new_league.level == team.target_league_level and
-                    new_league.bundesland == team.target_league_bundesland and
-                    new_league.landkreis == team.target_league_landkreis and
-                    new_league.altersklasse == team.target_league_altersklasse):
-                    target_league = new_league
-                    break
+    stale_league_ids = {team.league_id for team in other_teams if team.league_id is not None}
+    stale_league_levels = dict(
+        db.session.query(League.id, League.level).filter(League.id.in_(stale_league_ids)).all()
+    ) if stale_league_ids else {}
 
+    new_league_by_target = {}
+    new_league_by_level = {}
+    for new_league in new_leagues:
+        new_league_by_target.setdefault(
+            (new_league.level, new_league.bundesland, new_league.landkreis, new_league.altersklasse),
+            new_league
+        )
+        new_league_by_level.setdefault(new_league.level, new_league)
+
+    unmapped_teams = []
+    for team in other_teams:
+        if team.target_league_level is not None:
+            # This is a new team added via cheat function - assign to target league
+            target_league = new_league_by_target.get((
+                team.target_league_level,
+                team.target_league_bundesland,
+                team.target_league_landkreis,
+                team.target_league_altersklasse
+            ))
             if target_league:
-                team.league_id = target_league.id
                 # Clear the temporary fields
-                team.target_league_level = None
-                team.target_league_bundesland = None
-                team.target_league_landkreis = None
-                team.target_league_altersklasse = None
-                updated_teams += 1
+                team_assignments.append({
+                    'id': team.id,
+                    'league_id': target_league.id,
+                    'target_league_level': None,
+                    'target_league_bundesland': None,
+                    'target_league_landkreis': None,
+                    'target_league_altersklasse': None
+                })
                 print(f"New team {team.name} assigned to target league {target_league.name}")
             else:
                 unmapped_teams.append(team)
-                print(f"WARNING: Could not find target league for new team {team.name}")
-        else:
-            # If for some reason we don't have a mapping, try to map to the same league
-            old_league = League.query.get(team.league_id)
-            if old_league:
-                # Try to find the corresponding new league using the mapping
-                new_league_id = old_to_new_league_mapping.get(old_league.id)
-                if new_league_id:
-                    team.league_id = new_league_id
-                    updated_teams += 1
-                    new_league_name = next((nl.name for nl in new_leagues if nl.id == new_league_id), "Unknown")
-                    print(f"Team {team.name} mapped to corresponding league {new_league_name} using ID mapping")
-                else:
-                    # Fallback: find a league with the same level
-                    for new_league in new_leagues:
-                        if new_league.level == old_league.level:
-                            team.league_id = new_league.id
-                            updated_teams += 1
-                            print(f"Team {team.name} mapped to same level league {new_league.name} (fallback)")
-                            break
-                    else:
-                        unmapped_teams.append(team)
-                        print(f"WARNING: Could not find new league for team {team.name} (old level: {old_league.level})")
+        elif team.league_id in stale_league_levels:
+            # Fallback: find a league with the same level
+            target_league = new_league_by_level.get(stale_league_levels[team.league_id])
+            if target_league:
+                team_assignments.append({'id': team.id, 'league_id': target_league.id})
             else:
                 unmapped_teams.append(team)
-                print(f"WARNING: Team {team.name} has invalid old league reference")
+        else:
+            unmapped_teams.append(team)
 
+    # Now move all teams to their new leagues with one bulk UPDATE
+    db.session.bulk_update_mappings(Team, team_assignments)
     db.session.commit()
-    print(f"Updated {updated_teams} teams to point to their new leagues")
+    print(f"Updated {len(team_assignments)} teams to point to their new leagues")
 
     if unmapped_teams:
-        print(f"WARNING: {len(unmapped_teams)} teams could not be mapped to new leagues")
+        print(f"WARNING: {len(unmapped_teams)} teams could not be mapped to new leagues: "
+              f"{', '.join(team.name for team in unmapped_teams[:10])}")
+
+    report_progress(
+        'promotion_relegation',
+        season_id=new_season.id,
+        promoted=summary['promoted'],
+        relegated=summary['relegated'],
+        champions=summary['champion'],
+        stayed=summary['stayed']
+    )
+    return summary
 
-    # Refresh the session to ensure relationships are updated
-    db.session.expire_all()
 
-    # Generate fixtures for the new season
+def create_fixtures_and_cups(new_season, new_leagues):
+    """
+    Generate the fixtures, cups and the calendar of a new season.
+
+    Leagues that already have fixtures and cups that already exist (e.g. from an
+    interrupted transition) are kept, so the step can be repeated.
+
+    Args:
+        new_season: The new season
+        new_leagues: Leagues of the new season
+    """
     total_fixtures_generated = 0
     for new_league in new_leagues:
         # Verify that the league has teams before generating fixtures
         league_teams = Team.query.filter_by(league_id=new_league.id).all()
         print(f"League {new_league.name} (Level {new_league.level}) has {len(league_teams)} teams")
 
-        if len(league_teams) >= 2:
+        if Match.query.filter_by(league_id=new_league.id, season_id=new_season.id).count() > 0:
+            print(f"League {new_league.name} already has fixtures")
+        elif len(league_teams) >= 2:
             generate_fixtures(new_league, new_season)
             fixtures_count = Match.query.filter_by(league_id=new_league.id, season_id=new_season.id).count()
             total_fixtures_generated += fixtures_count
@@ -3510,23 +3684,8 @@ def create_new_season(old_season):
     # Recalculate cup match days now that season calendar exists
     print("Recalculating cup match days...")
     try:
-        from models import Cup, CupMatch
-        cups = Cup.query.filter_by(season_id=new_season.id).all()
-
-        for cup in cups:
-            print(f"Recalculating match days for {cup.name}...")
-            cup_matches = CupMatch.query.filter_by(cup_id=cup.id).all()
-
-            for match in cup_matches:
-                # Recalculate cup match day using the new logic
-                new_cup_match_day = cup.calculate_cup_match_day(match.round_number, cup.total_rounds)
-                if new_cup_match_day != match.cup_match_day:
-                    print(f"  Updated match {match.id}: {match.cup_match_day} -> {new_cup_match_day}")
-                    match.cup_match_day = new_cup_match_day
-
-            db.session.commit()
-            print(f"Recalculated match days for {cup.name}")
-
+        from cup_engine import reschedule_cup_match_days
+        reschedule_cup_match_days(new_season.id)
     except Exception as e:
         print(f"Error recalculating cup match days: {e}")
 
@@ -3540,113 +3699,271 @@ def create_new_season(old_season):
 
     print(f"Total fixtures generated: {total_fixtures_generated}")
 
-    print("Generated fixtures for all leagues and cups in the new season")
 
-    # STEP 1: Age all players by 1 year
-    print("\n" + "="*60)
-    print("STEP 1: AGING PLAYERS")
-    print("="*60)
-    players = Player.query.filter_by(is_retired=False).all()
-    for player in players:
-        player.age += 1
+def process_retirements(new_season):
+    """
+    Retire all players that reached their retirement age, with one commit.
+
+    Args:
+        new_season: The new season (the retirement season of the players)
+
+    Returns:
+        list: Rows (id, name, age, club_id) of the retired players
+    """
+    retirees = retire_players(new_season.id)
+
+    # Create retirement notification messages for the manager's club
+    create_retirement_messages(retirees)
     db.session.commit()
-    print(f"Aged {len(players)} players by 1 year")
 
-    # STEP 2: Handle retirements (but don't generate replacements yet)
-    print("\n" + "="*60)
-    print("STEP 2: PROCESSING RETIREMENTS")
-    print("="*60)
-    players = Player.query.filter_by(is_retired=False).all()
-    retired_count = 0
-    retired_clubs = []  # Track clubs that need replacement players
+    if retirees:
+        print(f"{len(retirees)} players retired this season "
+              f"(average age {sum(retiree.age for retiree in retirees) / len(retirees):.1f})")
+    else:
+        print("No players retired this season")
+    return retirees
+
 
-    for player in players:
-        # Check if player should retire
-        if player.retirement_age and player.age >= player.retirement_age:
-            # Mark player as retired
-            player.is_retired = True
-            player.retirement_season_id = new_season.id
+def generate_replacements(new_season):
+    """
+    Generate one replacement player per player that retired for a club, with one commit.
+
+    The retirees are read from the database (retirement_season_id), so the step
+    also works when the retirements were done by an earlier run.
+
+    Args:
+        new_season: The new season
 
-            # Remove player from all teams
-            player.teams.clear()
+    Returns:
+        list: The generated players
+    """
+    from sqlalchemy import func
 
-            # Remove club association (optional - keep for history)
-            # player.club_id = None
+    # Track clubs that need replacement players (one replacement per retiree)
+    replacements_per_club = dict(
+        db.session.query(Player.club_id, func.count(Player.id)).filter(
+            Player.is_retired == True,
+            Player.retirement_season_id == new_season.id,
+            Player.club_id.isnot(None)
+        ).group_by(Player.club_id).all()
+    )
 
-            retired_count += 1
-            print(f"  Player {player.name} retired at age {player.age}")
+    new_players = generate_replacement_players(replacements_per_club)
+    db.session.add_all(new_players)
+    db.session.flush()  # Assign IDs for the notification links
 
-            # Create retirement notification message for the player's club
-            if player.club_id:
-                create_retirement_message(player)
-                retired_clubs.append(player.club_id)
+    # Create notifications for new players if club is managed
+    create_new_player_messages(new_players)
 
     db.session.commit()
-    if retired_count > 0:
-        print(f"{retired_count} players retired this season")
+    return new_players
+
+
+def create_new_season(old_season):
+    """
+    Create a new season based on the old one.
+
+    Each step is journaled under the old season (see transition_journal.py), so an
+    interrupted transition continues where it stopped when it is started again.
+    """
+    print("Creating new season...")
+
+    # Reset the call counter for league selection to ensure fair distribution
+    if hasattr(select_target_league_id, '_call_counter'):
+        select_target_league_id._call_counter = 0
+
+    # Keep the old season as current for now
+    # We'll only change it after everything is set up
+    new_season_params = get_step_params(old_season.id, 'new_season')
+    if new_season_params:
+        new_season = Season.query.get(new_season_params['new_season_id'])
+        print(f"Continuing with new season: {new_season.name} (ID: {new_season.id})")
     else:
-        print("No players retired this season")
+        new_season = Season(
+            name=f"Season {int(old_season.name.split()[-1]) + 1}",
+            start_date=old_season.end_date + timedelta(days=30),  # Start 30 days after previous season
+            end_date=old_season.end_date + timedelta(days=30 + 365),  # End roughly a year later
+            is_current=False  # Start as not current, will set to current at the end
+        )
+
+        db.session.add(new_season)
+        db.session.flush()
+        record_step(old_season.id, 'new_season', new_season_id=new_season.id)
+        db.session.commit()
+        print(f"Created new season: {new_season.name} (ID: {new_season.id})")
+
+    # Create leagues for the new season
+    with phase('transition.leagues', season_id=new_season.id):
+        old_leagues = League.query.filter_by(season_id=old_season.id).order_by(League.level).all()
+        leagues_params = get_step_params(old_season.id, 'leagues')
+
+        if leagues_params:
+            # Maps old league ID to new league ID (JSON keys are strings)
+            old_to_new_league_mapping = {int(old_id): new_id for old_id, new_id in leagues_params['league_mapping'].items()}
+            new_leagues_by_id = {league.id: league for league in League.query.filter_by(season_id=new_season.id)}
+            new_leagues = [new_leagues_by_id[old_to_new_league_mapping[old_league.id]] for old_league in old_leagues]
+        else:
+            new_leagues = []
+            old_to_new_league_mapping = {}  # Maps old league ID to new league ID
+
+            print(f"Creating {len(old_leagues)} leagues for the new season...")
+            for old_league in old_leagues:
+                new_league = League(
+                    name=old_league.name,
+                    level=old_league.level,
+                    season_id=new_season.id,
+                    bundesland=old_league.bundesland,
+                    landkreis=old_league.landkreis,
+                    altersklasse=old_league.altersklasse,
+                    anzahl_aufsteiger=old_league.anzahl_aufsteiger,
+                    anzahl_absteiger=old_league.anzahl_absteiger
+                )
+                new_leagues.append(new_league)
+                db.session.add(new_league)
+
+            db.session.flush()
+
+            # Create mapping from old league IDs to new league IDs
+            for i, old_league in enumerate(old_leagues):
+                old_to_new_league_mapping[old_league.id] = new_leagues[i].id
+
+            record_step(old_season.id, 'leagues', league_mapping=old_to_new_league_mapping)
+            db.session.commit()
+
+        # CRITICAL: Carry the promotion/relegation graph over to the new league IDs
+        # This must happen BEFORE team assignments to ensure correct promotion/relegation targets
+        from league_graph import LeagueGraph, copy_league_graph, sync_legacy_columns
+        from models import LeagueLink
+        old_league_graph = LeagueGraph.load(old_season.id)
+        if is_step_completed(old_season.id, 'league_graph'):
+            new_league_graph = LeagueGraph.load(new_season.id)
+        else:
+            if LeagueLink.query.filter_by(season_id=new_season.id).first():
+                # Copied by an interrupted run
+                new_league_graph = LeagueGraph.load(new_season.id)
+            else:
+                print("Copying league graph to new season IDs...")
+                new_league_graph = copy_league_graph(old_league_graph, new_season.id, old_to_new_league_mapping)
+            sync_legacy_columns(new_league_graph)
+            print("Successfully updated all league references to new season IDs")
+
+            # Balance promotion and relegation spots for the new season
+            balance_promotion_relegation_spots(new_season.id, old_to_new_league_mapping, graph=new_league_graph)
+            record_step(old_season.id, 'league_graph')
+            db.session.commit()
+
+        print(f"Created {len(new_leagues)} leagues for the new season")
+        print(f"League ID mapping: {old_to_new_league_mapping}")
+
+    with phase('transition.promotion_relegation', season_id=new_season.id):
+        run_step(old_season.id, 'promotion_relegation', move_teams_to_new_leagues,
+                 old_leagues, new_leagues, old_league_graph, old_to_new_league_mapping, new_season, atomic=True)
+
+    # Refresh the session to ensure relationships are updated
+    db.session.expire_all()
+
+    # Generate fixtures for the new season
+    with phase('transition.fixtures_and_cups', season_id=new_season.id):
+        run_step(old_season.id, 'fixtures_and_cups', create_fixtures_and_cups, new_season, new_leagues)
+        print("Generated fixtures for all leagues and cups in the new season")
+
+    # STEP 1: Age all players by 1 year
+    print("\n" + "="*60)
+    print("STEP 1: AGING PLAYERS")
+    print("="*60)
+    report_progress('transition_step', step=1, total_steps=5, name='aging', season_id=new_season.id)
+    with phase('transition.aging', season_id=new_season.id):
+        aged_count = run_step(old_season.id, 'aging', age_all_players, atomic=True)
+        if aged_count is not None:
+            print(f"Aged {aged_count} players by 1 year")
+
+    # STEP 2: Handle retirements (but don't generate replacements yet)
+    print("\n" + "="*60)
+    print("STEP 2: PROCESSING RETIREMENTS")
+    print("="*60)
+    report_progress('transition_step', step=2, total_steps=5, name='retirements', season_id=new_season.id)
+    with phase('transition.retirements', season_id=new_season.id):
+        run_step(old_season.id, 'retirements', process_retirements, new_season, atomic=True)
+
+        # The ORM objects loaded so far do not know about the set-based updates
+        db.session.expire_all()
 
     # STEP 3: Develop all existing (non-retired) players based on age, talent, and club quality
     # This happens BEFORE new players are generated, so new players won't be developed immediately
     print("\n" + "="*60)
     print("STEP 3: DEVELOPING EXISTING PLAYERS")
     print("="*60)
-    try:
-        from player_development import develop_all_players, save_player_history_snapshot
-        development_stats = develop_all_players()
-        print("Player development completed successfully")
+    report_progress('transition_step', step=3, total_steps=5, name='development', season_id=new_season.id)
+    with phase('transition.development', season_id=new_season.id):
+        try:
+            from player_development import develop_all_players, save_player_history_snapshot
+            run_step(old_season.id, 'development', develop_all_players, atomic=True)
+            print("Player development completed successfully")
 
-        # Save player history snapshot after development
-        print("\nSaving player development history...")
-        save_player_history_snapshot()
-    except Exception as e:
-        print(f"Warning: Player development failed: {str(e)}")
-        # Don't fail the season transition if development fails
-        import traceback
-        traceback.print_exc()
+            # Save player history snapshot after development
+            print("\nSaving player development history...")
+            run_step(old_season.id, 'history_snapshot', save_player_history_snapshot)
+        except Exception as e:
+            print(f"Warning: Player development failed: {str(e)}")
+            # Don't fail the season transition if development fails
+            db.session.rollback()
+            import traceback
+            traceback.print_exc()
 
     # STEP 4: Generate replacement players for retired players
     # These new players will NOT be developed in this season transition
     print("\n" + "="*60)
     print("STEP 4: GENERATING REPLACEMENT PLAYERS")
     print("="*60)
-    new_players_generated = 0
-    for club_id in retired_clubs:
-        new_player = generate_replacement_player(club_id)
-        if new_player:
-            db.session.add(new_player)
-            new_players_generated += 1
-
-            # Create notification for new player if club is managed
-            create_new_player_message(new_player)
-
-    db.session.commit()
-    if new_players_generated > 0:
-        print(f"{new_players_generated} new players generated to replace retired players")
-    else:
-        print("No new players generated")
+    report_progress('transition_step', step=4, total_steps=5, name='replacements', season_id=new_season.id)
+    with phase('transition.replacements', season_id=new_season.id):
+        new_players = run_step(old_season.id, 'replacements', generate_replacements, new_season, atomic=True)
+        if new_players:
+            print(f"{len(new_players)} new players generated to replace retired players")
+        elif new_players is not None:
+            print("No new players generated")
 
     # STEP 5: Redistribute players based on their new age and strength
     # This ensures players are moved to age-appropriate teams after aging and development
     print("\n" + "="*60)
     print("STEP 5: REDISTRIBUTING PLAYERS TO TEAMS")
     print("="*60)
-    try:
-        from player_redistribution import redistribute_players_by_strength_and_age
-        redistribute_players_by_strength_and_age()
-        print("Player redistribution completed successfully")
-    except Exception as e:
-        print(f"Warning: Player redistribution failed: {str(e)}")
-        # Don't fail the season transition if redistribution fails
-        import traceback
-        traceback.print_exc()
+    report_progress('transition_step', step=5, total_steps=5, name='redistribution', season_id=new_season.id)
+    with phase('transition.redistribution', season_id=new_season.id):
+        try:
+            from player_redistribution import redistribute_players_by_strength_and_age
+            run_step(old_season.id, 'redistribution', redistribute_players_by_strength_and_age)
+            print("Player redistribution completed successfully")
+        except Exception as e:
+            print(f"Warning: Player redistribution failed: {str(e)}")
+            # Don't fail the season transition if redistribution fails
+            db.session.rollback()
+            import traceback
+            traceback.print_exc()
 
     # Now that everything is set up, make the new season current
-    old_season.is_current = False
-    new_season.is_current = True
-    db.session.commit()
+    if not is_step_completed(old_season.id, 'activation'):
+        old_season.is_current = False
+        new_season.is_current = True
+        record_step(old_season.id, 'activation')
+        db.session.commit()
+        bump_world_version('season transition')
+
+    # Move the performances of the finished season out of the hot tables
+    with phase('transition.archive', season_id=new_season.id):
+        try:
+            from season_archive import archive_completed_seasons
+            run_step(old_season.id, 'archive', archive_completed_seasons)
+        except Exception as e:
+            print(f"Warning: Season archive failed: {str(e)}")
+            # Don't fail the season transition if archiving fails, the rows stay in the hot tables
+            db.session.rollback()
+            import traceback
+            traceback.print_exc()
+
+    record_simulation()
     print(f"Set {new_season.name} as the current season")
+    report_progress('season_created', old_season_id=old_season.id, season_id=new_season.id, season_name=new_season.name)
 
     print(f"Created new season: {new_season.name} (ID: {new_season.id})")
     return new_season
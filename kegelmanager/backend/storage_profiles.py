@@ -0,0 +1,224 @@
+"""
+SQLite storage profiles: journal mode, memory-mapped I/O and tuned pragmas.
+
+Every SQLite connection gets the BASE_PRAGMAS when it is opened (WAL journal,
+busy timeout) plus the pragmas of a profile:
+
+- interactive: Default for the web app. WAL with synchronous=NORMAL (no fsync
+  per commit), so UI reads run concurrently with simulation writes instead of
+  waiting for them.
+- bulk: Simulation and season transition. Large page cache, large memory map
+  and fewer WAL checkpoints. synchronous stays NORMAL: in WAL mode a crash of
+  the operating system or a power loss can only lose the latest commits, never
+  damage the database, so the transition journal can resume long unattended
+  runs.
+- analytics: Read-only queries (query_only), large cache and memory map.
+
+Bulk phases switch their thread to another profile temporarily with
+use_storage_profile('bulk') (context manager and decorator). Connections are
+re-tuned when they are checked out of the pool and the active profile of the
+thread differs; the connection that is in use when the profile changes is
+re-tuned immediately. Connections created with a pinned connection class
+(pinned_connection_class, e.g. the read-only pools of save_registry.py)
+always keep their profile.
+
+Throughput and latency of the profiles are measured with
+"python benchmarks.py --storage".
+
+MAIN FUNCTIONS:
+- install_storage_profiles(default): Register the connect/checkout events (idempotent)
+- use_storage_profile(name): Switch the profile of the current thread temporarily
+- apply_storage_profile(dbapi_connection, name): Apply a profile to a raw sqlite3 connection
+- get_active_profile(): Name of the profile of the current thread
+- pinned_connection_class(name): sqlite3 connection class that always uses one profile
+"""
+
+import sqlite3
+import threading
+from contextlib import ContextDecorator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Applied once per connection, independent of the profile
+BASE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('busy_timeout', 30000),
+)
+
+# Pragmas that can be changed on an open connection
+PROFILES = {
+    'interactive': (
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -32000),          # 32 MB
+        ('temp_store', 'MEMORY'),
+        ('mmap_size', 268435456),        # 256 MB
+        ('wal_autocheckpoint', 1000),
+        ('query_only', 0),
+    ),
+    'bulk': (
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -262144),         # 256 MB
+        ('temp_store', 'MEMORY'),
+        ('mmap_size', 1073741824),       # 1 GB
+        ('wal_autocheckpoint', 10000),
+        ('query_only', 0),
+    ),
+    'analytics': (
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -131072),         # 128 MB
+        ('temp_store', 'MEMORY'),
+        ('mmap_size', 1073741824),
+        ('wal_autocheckpoint', 1000),
+        ('query_only', 1),
+    ),
+}
+
+DEFAULT_PROFILE = 'interactive'
+
+_local = threading.local()
+_installed = False
+_default_profile = DEFAULT_PROFILE
+_pinned_classes = {}
+
+
+def _is_sqlite(dbapi_connection):
+    return isinstance(dbapi_connection, sqlite3.Connection)
+
+
+def pinned_connection_class(name):
+    """
+    Get a sqlite3 connection class whose connections always use one profile.
+
+    Pass it as connect_args={'factory': ...} when creating an engine.
+
+    Args:
+        name: Profile name (key of PROFILES)
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Unknown storage profile: {name}")
+    if name not in _pinned_classes:
+        _pinned_classes[name] = type(f"{name.capitalize()}Connection", (sqlite3.Connection,), {'storage_profile': name})
+    return _pinned_classes[name]
+
+
+def _profile_for(dbapi_connection):
+    return getattr(dbapi_connection, 'storage_profile', None) or get_active_profile()
+
+
+def _execute_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def apply_storage_profile(dbapi_connection, name, include_base=False):
+    """
+    Apply the pragmas of a profile to a DBAPI (sqlite3) connection.
+
+    Args:
+        dbapi_connection: The sqlite3 connection
+        name: Profile name (key of PROFILES)
+        include_base: Also apply BASE_PRAGMAS (new connections)
+    """
+    if include_base:
+        try:
+            _execute_pragmas(dbapi_connection, BASE_PRAGMAS)
+        except Exception as e:
+            # e.g. read-only files or network drives without WAL support
+            print(f"Warning: Could not enable WAL journal: {str(e)}")
+    _execute_pragmas(dbapi_connection, PROFILES[name])
+
+
+def get_active_profile():
+    """Get the storage profile of the current thread."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else _default_profile
+
+
+def _on_connect(dbapi_connection, connection_record):
+    if not _is_sqlite(dbapi_connection):
+        return
+    profile = _profile_for(dbapi_connection)
+    apply_storage_profile(dbapi_connection, profile, include_base=True)
+    connection_record.info['storage_profile'] = profile
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    if not _is_sqlite(dbapi_connection):
+        return
+    profile = _profile_for(dbapi_connection)
+    if connection_record.info.get('storage_profile') != profile:
+        apply_storage_profile(dbapi_connection, profile)
+        connection_record.info['storage_profile'] = profile
+
+
+def install_storage_profiles(default=DEFAULT_PROFILE):
+    """
+    Apply storage profiles to all SQLite connections of this process (idempotent).
+
+    Args:
+        default: Profile used outside of use_storage_profile blocks
+    """
+    global _installed, _default_profile
+    _default_profile = default
+    if _installed:
+        return
+    event.listen(Engine, 'connect', _on_connect)
+    event.listen(Engine, 'checkout', _on_checkout)
+    _installed = True
+
+
+def _retune_session_connection(profile):
+    """Re-tune the connection the session of this thread currently holds (if any)."""
+    try:
+        from models import db
+        session = db.session()
+        if not session.in_transaction():
+            return
+        connection = session.connection().connection
+    except RuntimeError:
+        # No app context: there is no session connection to re-tune
+        return
+    if (_is_sqlite(connection.dbapi_connection) and not hasattr(connection.dbapi_connection, 'storage_profile')
+            and connection.info.get('storage_profile') != profile):
+        apply_storage_profile(connection.dbapi_connection, profile)
+        connection.info['storage_profile'] = profile
+
+
+class use_storage_profile(ContextDecorator):
+    """
+    Use another storage profile on the current thread for a block or function.
+
+    Usage:
+        with use_storage_profile('bulk'):
+            ...
+
+        @use_storage_profile('bulk')
+        def simulate_match_day(season):
+            ...
+    """
+
+    def __init__(self, name):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown storage profile: {name}")
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        if _installed:
+            _retune_session_connection(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.stack.pop()
+        if _installed:
+            _retune_session_connection(get_active_profile())
+        return False
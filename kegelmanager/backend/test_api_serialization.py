@@ -0,0 +1,187 @@
+"""
+Test script for the fast JSON provider and the response compression.
+
+A minimal Flask app with init_api_serialization() must encode the same JSON as
+Flask's default provider, negotiate gzip/brotli from Accept-Encoding and close
+the iterables of streamed responses when the client goes away.
+"""
+
+import sys
+import os
+import gzip
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, Response, jsonify
+from flask.json.provider import DefaultJSONProvider
+import api_serialization
+from api_serialization import init_api_serialization, stream_json_array
+
+
+PAYLOAD = {
+    'season': 'Season 2025',
+    'created_at': datetime(2025, 8, 1, 18, 30, 5),
+    'match_date': date(2025, 9, 13),
+    'salary': Decimal('1234.50'),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'big': 2 ** 70,
+    'players': [{'name': 'Spieler 1', 'strength': 70, 'form': 1.5, 'retired': None}],
+    'zebra': 1,
+    'alpha': 2,
+}
+
+
+class EndlessChunks:
+    """Endless iterable with a close() method, like a stream_with_context wrapper or a cursor."""
+
+    def __init__(self, closed):
+        self.closed = closed
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.count += 1
+        return json.dumps({'chunk': self.count, 'padding': 'x' * 200}) + '\n'
+
+    def close(self):
+        self.closed.append(True)
+
+
+def _create_app():
+    app = Flask(__name__)
+    init_api_serialization(app)
+    closed = []
+
+    @app.route('/payload')
+    def payload():
+        return jsonify(PAYLOAD)
+
+    @app.route('/large')
+    def large():
+        response = jsonify([{'name': f'Spieler {i}', 'strength': i % 100} for i in range(200)])
+        response.set_etag('large-v1')
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/stream')
+    def stream():
+        return stream_json_array(range(1000), lambda i: {'id': i})
+
+    @app.route('/endless')
+    def endless():
+        return Response(EndlessChunks(closed), mimetype='application/x-ndjson')
+
+    @app.route('/events')
+    def events():
+        return Response(iter(['retry: 3000\n\n', 'event: ping\ndata: {}\n\n' * 100]), mimetype='text/event-stream')
+
+    return app, closed
+
+
+def test_json_matches_default_provider():
+    """orjson output decodes to the same data as Flask's default provider, keys sorted."""
+    app, _ = _create_app()
+    assert isinstance(app.json, api_serialization.FastJSONProvider)
+
+    with app.app_context():
+        expected = DefaultJSONProvider(app).dumps(PAYLOAD)
+        encoded = app.json.dumps(PAYLOAD)
+    assert json.loads(encoded) == json.loads(expected)
+    decoded = json.loads(encoded)
+    assert decoded['created_at'] == 'Fri, 01 Aug 2025 18:30:05 GMT'
+    assert decoded['match_date'] == 'Sat, 13 Sep 2025 00:00:00 GMT'
+    assert decoded['salary'] == '1234.50'
+    assert decoded['big'] == 2 ** 70
+
+    # Without the 64-bit integer orjson encodes it, with sorted keys
+    small_payload = {key: value for key, value in PAYLOAD.items() if key != 'big'}
+    with app.app_context():
+        encoded = app.json.dumps(small_payload)
+        assert json.loads(encoded) == json.loads(DefaultJSONProvider(app).dumps(small_payload))
+    assert list(json.loads(encoded)) == sorted(small_payload)
+
+    response = app.test_client().get('/payload')
+    assert response.status_code == 200 and response.mimetype == 'application/json'
+    assert response.get_json() == json.loads(expected)
+    assert api_serialization.dumps({'when': date(2025, 9, 13)}) == '{"when":"Sat, 13 Sep 2025 00:00:00 GMT"}'
+
+
+def test_encoding_negotiation():
+    """gzip is used when accepted, br only with the brotli package, small bodies stay as they are."""
+    app, _ = _create_app()
+
+    original_brotli = api_serialization.brotli
+    api_serialization.brotli = None
+    try:
+        for accept, expected in (('gzip, deflate, br', 'gzip'), ('br', None), ('identity', None), ('', None)):
+            with app.test_request_context(headers={'Accept-Encoding': accept}):
+                assert api_serialization._accepted_encoding() == expected, accept
+    finally:
+        api_serialization.brotli = original_brotli
+    if original_brotli is not None:
+        with app.test_request_context(headers={'Accept-Encoding': 'gzip, br'}):
+            assert api_serialization._accepted_encoding() == 'br'
+
+    client = app.test_client()
+    plain = client.get('/large')
+    compressed = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    assert len(compressed.get_data()) < len(plain.get_data())
+    # The compressed body is another representation: the ETag becomes weak
+    assert plain.headers['ETag'] == '"large-v1"'
+    assert compressed.headers['ETag'] == 'W/"large-v1"'
+
+    small = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers and small.get_json() == {'ok': True}
+
+    # Server-sent events are never compressed
+    events = client.get('/events', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in events.headers
+    assert events.get_data(as_text=True).startswith('retry: 3000')
+
+    stats = api_serialization.get_payload_stats()['endpoints']
+    assert stats['large']['compressed'] == 1 and stats['large']['requests'] == 2
+
+
+def test_streamed_responses():
+    """Streamed arrays are compressed chunk by chunk, inner iterables are closed on disconnect."""
+    app, closed = _create_app()
+    client = app.test_client()
+
+    expected = [{'id': i} for i in range(1000)]
+    assert client.get('/stream').get_json() == expected
+    compressed = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip' and 'Content-Length' not in compressed.headers
+    assert json.loads(gzip.decompress(compressed.get_data())) == expected
+
+    # The client reads a few chunks of an endless stream and goes away
+    for headers in ({}, {'Accept-Encoding': 'gzip'}):
+        del closed[:]
+        response = client.get('/endless', headers=headers, buffered=False)
+        assert response.headers.get('Content-Encoding') == headers.get('Accept-Encoding')
+        chunks = response.iter_encoded()
+        for _ in range(50):
+            next(chunks)
+        assert closed == []
+        response.close()
+        assert closed == [True], headers
+
+
+if __name__ == "__main__":
+    test_json_matches_default_provider()
+    test_encoding_negotiation()
+    test_streamed_responses()
+    print("All API serialization tests passed")
@@ -0,0 +1,124 @@
+"""
+Test script for the /api/batch endpoint.
+
+Sub-requests run against a temporary save through the API app; every
+response must match the response of the same request sent on its own, and
+invalid sub-requests fail one by one without failing the batch.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import response_cache
+import save_registry
+from save_fixtures import create_save, import_app
+
+
+def _batch(client, sub_requests):
+    response = client.post('/api/batch', json={'requests': sub_requests})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()['responses']
+
+
+def test_batch_dispatches_get_requests():
+    """GET sub-requests are answered in request order with the bodies of the single requests."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = create_save(os.path.join(directory, 'batch.db'), clubs=3, players=6)
+        client = import_app(db_path).test_client()
+
+        paths = ['/api/clubs/2', '/api/health', '/api/clubs', '/api/players/4', '/api/clubs/1']
+        responses = _batch(client, [{'id': f'r{i}', 'path': path} for i, path in enumerate(paths)])
+
+        assert [response['id'] for response in responses] == [f'r{i}' for i in range(len(paths))]
+        assert [response['status'] for response in responses] == [200] * len(paths)
+        for path, response in zip(paths, responses):
+            assert response['body'] == client.get(path).get_json(), path
+        assert [club['name'] for club in responses[2]['body']] == ['Verein 0', 'Verein 1', 'Verein 2']
+        assert responses[3]['body']['name'] == 'Spieler 3'
+
+        # Plain paths are accepted, their ID is the position in the batch
+        responses = _batch(client, ['/api/health', {'path': '/api/clubs/3', 'method': 'get'}])
+        assert [(response['id'], response['status']) for response in responses] == [(0, 200), (1, 200)]
+        save_registry.evict_save(db_path)
+
+
+def test_batch_errors():
+    """Invalid, non-GET, missing and failing sub-requests get their own status; the batch is answered."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = create_save(os.path.join(directory, 'batch.db'), clubs=2)
+        app = import_app(db_path)
+        client = app.test_client()
+
+        def failing_view():
+            raise RuntimeError("Datenbank nicht erreichbar")
+
+        original_view = app.view_functions['health_check']
+        app.view_functions['health_check'] = failing_view
+        try:
+            responses = _batch(client, [
+                {'id': 'club', 'path': '/api/clubs/1'},
+                {'id': 'post', 'path': '/api/clubs/1', 'method': 'PATCH'},
+                {'id': 'delete', 'path': '/api/debug/query-stats', 'method': 'DELETE'},
+                {'id': 'nested', 'path': '/api/batch'},
+                {'id': 'nested-query', 'path': '/api/batch/?x=1'},
+                {'id': 'outside', 'path': '/index.html'},
+                {'id': 'no-path'},
+                {'id': 'missing-club', 'path': '/api/clubs/99'},
+                {'id': 'unknown-route', 'path': '/api/does-not-exist'},
+                {'id': 'failing', 'path': '/api/health'},
+                {'id': 'after', 'path': '/api/clubs/2'},
+            ])
+        finally:
+            app.view_functions['health_check'] = original_view
+
+        statuses = {response['id']: response['status'] for response in responses}
+        assert statuses == {
+            'club': 200, 'post': 405, 'delete': 405, 'nested': 400, 'nested-query': 400, 'outside': 400,
+            'no-path': 400, 'missing-club': 404, 'unknown-route': 404, 'failing': 500, 'after': 200
+        }
+        bodies = {response['id']: response['body'] for response in responses}
+        assert bodies['failing'] == {'error': 'Datenbank nicht erreichbar'}
+        assert bodies['nested'] == {'error': 'Ungültiger Pfad'}
+        assert bodies['after']['name'] == 'Verein 1'
+
+        # The batch itself is rejected if the list is missing, empty or too long
+        assert client.post('/api/batch', json={}).status_code == 400
+        assert client.post('/api/batch', json={'requests': []}).status_code == 400
+        assert client.post('/api/batch', json={'requests': '/api/health'}).status_code == 400
+        too_many = ['/api/health'] * 51
+        assert client.post('/api/batch', json={'requests': too_many}).status_code == 400
+        assert client.post('/api/batch', json={'requests': too_many[:50]}).status_code == 200
+        save_registry.evict_save(db_path)
+
+
+def test_batch_keeps_cached_responses():
+    """A batch only reads: it does not bump the world version, cached GETs stay hits."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = create_save(os.path.join(directory, 'batch.db'), clubs=2)
+        client = import_app(db_path).test_client()
+
+        assert client.get('/api/clubs/1').headers['X-Cache'] == 'MISS'
+        assert client.get('/api/clubs/1').headers['X-Cache'] == 'HIT'
+        version = response_cache.get_world_version()
+
+        _batch(client, ['/api/clubs/1', '/api/clubs/2'])
+        assert client.delete('/api/debug/query-stats').status_code == 200
+        assert response_cache.get_world_version() == version
+        assert client.get('/api/clubs/1').headers['X-Cache'] == 'HIT'
+
+        # A write request still invalidates the cache
+        assert client.patch('/api/clubs/1', json={'fans': 500}).status_code == 200
+        assert response_cache.get_world_version() == version + 1
+        assert client.get('/api/clubs/1').headers['X-Cache'] == 'MISS'
+        save_registry.evict_save(db_path)
+
+
+if __name__ == "__main__":
+    test_batch_dispatches_get_requests()
+    test_batch_errors()
+    test_batch_keeps_cached_responses()
+    print("All batch request tests passed")
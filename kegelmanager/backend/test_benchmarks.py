@@ -0,0 +1,69 @@
+"""
+Test script for the benchmark comparison and baseline handling.
+
+Only the pure parts of benchmarks.py are tested here; the suite itself is run
+with "python benchmarks.py".
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmarks
+
+
+BASELINE = {
+    'small': {
+        'simulate_match_day': {'seconds': 2.0, 'queries': 1000, 'peak_rss_mb': 100.0},
+        'api_players': {'seconds': 0.01, 'queries': 20, 'peak_rss_mb': 80.0}
+    }
+}
+
+
+def test_compare_results_thresholds():
+    """Increases above threshold and noise tolerance are regressions, others are not."""
+    results = {
+        'small': {
+            'simulate_match_day': {'seconds': 2.6, 'queries': 1050, 'peak_rss_mb': 140.0},
+            # +100% but below the absolute noise tolerance
+            'api_players': {'seconds': 0.02, 'queries': 22, 'peak_rss_mb': 80.0},
+            # Not in the baseline
+            'develop_all_players': {'seconds': 9.0, 'queries': 1, 'peak_rss_mb': 50.0}
+        }
+    }
+
+    regressions = benchmarks.compare_results(results, BASELINE)
+    found = {(r['benchmark'], r['metric']) for r in regressions}
+    assert found == {('simulate_match_day', 'seconds'), ('simulate_match_day', 'peak_rss_mb')}
+
+    # A stricter query threshold also flags the +5% queries
+    regressions = benchmarks.compare_results(results, BASELINE, {'queries': 0.01})
+    assert ('simulate_match_day', 'queries') in {(r['benchmark'], r['metric']) for r in regressions}
+
+
+def test_baseline_merge():
+    """Saving a baseline keeps other benchmarks and skips failed runs."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'baseline.json')
+        assert benchmarks.load_baseline(path) is None
+
+        benchmarks.save_baseline(path, BASELINE)
+        benchmarks.save_baseline(path, {
+            'small': {
+                'simulate_match_day': {'seconds': 1.5, 'queries': 900, 'peak_rss_mb': 90.0},
+                'api_players': {'error': 'RuntimeError: failed'}
+            }
+        })
+
+        baseline = benchmarks.load_baseline(path)
+        assert baseline['small']['simulate_match_day']['seconds'] == 1.5
+        assert baseline['small']['api_players'] == BASELINE['small']['api_players']
+
+
+if __name__ == "__main__":
+    test_compare_results_thresholds()
+    test_baseline_merge()
+    print("All benchmark tests passed")
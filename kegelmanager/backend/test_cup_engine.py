@@ -0,0 +1,210 @@
+"""
+Test script for the set-based cup engine.
+
+Checks the in-memory parts of cup setup and advancement (bracket sizes, byes,
+pairings, the distribution of cup rounds over the CUP_DAYs) and the grouped
+SQL of advance_cup_rounds on a temporary save: which rounds are complete,
+their winners, the inserted next round and the end of a cup after its final.
+"""
+
+import sys
+import os
+import random
+from datetime import date, datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, Season, Club, Team, Cup, CupMatch, SeasonCalendar
+from save_fixtures import temporary_save
+from cup_engine import (
+    advance_cup_rounds,
+    build_first_round,
+    collect_round_winners,
+    compute_cup_match_day,
+    draw_pairings,
+    find_completed_cup_rounds,
+    get_cup_eligibility_key
+)
+
+
+def test_first_round_byes():
+    """Byes fill the field up to the next power of two."""
+    # teams: (total rounds, first-round matches, byes)
+    expected = {2: (1, 1, 0), 3: (2, 1, 1), 5: (3, 1, 3), 8: (3, 4, 0), 20: (5, 4, 12), 100: (7, 36, 28),
+                257: (9, 1, 255)}
+
+    for num_teams, (rounds, matches, bye_count) in expected.items():
+        team_ids = list(range(1, num_teams + 1))
+        total_rounds, pairings, byes = build_first_round(team_ids)
+        assert (total_rounds, len(pairings), len(byes)) == (rounds, matches, bye_count), num_teams
+
+        # Every team appears exactly once
+        seen = [team_id for pair in pairings for team_id in pair] + byes
+        assert sorted(seen) == team_ids
+
+        # After round 1 the field is a power of two
+        assert len(pairings) + len(byes) == 2 ** (total_rounds - 1)
+
+
+def test_pairings():
+    """Winners are paired without repetition; an odd team is dropped."""
+    pairings = draw_pairings([1, 2, 3, 4, 5, 6, 7, 8])
+    assert len(pairings) == 4
+    assert sorted(team_id for pair in pairings for team_id in pair) == list(range(1, 9))
+
+    assert len(draw_pairings([1, 2, 3])) == 1
+    assert draw_pairings([]) == []
+
+
+def test_cup_match_day_distribution():
+    """Cup rounds are spread over the available CUP_DAYs."""
+    cup_days = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+
+    # Without a calendar the round number is used as fallback
+    assert compute_cup_match_day("DKBC", 3, 2, 5, []) == 2
+
+    # DKBC cup 3 has offset 0, so round r is played on CUP_DAY r
+    assert [compute_cup_match_day("DKBC", 3, r, 5, cup_days) for r in range(1, 6)] == [1, 2, 3, 4, 5]
+
+    # Landespokal starts one CUP_DAY later, and the cup ID adds another offset
+    assert compute_cup_match_day("Landespokal", 3, 1, 5, cup_days) == 2
+    assert compute_cup_match_day("Landespokal", 4, 1, 5, cup_days) == 5
+
+    # Offsets wrap around the list of CUP_DAYs
+    assert compute_cup_match_day("Kreispokal", 2, 6, 7, cup_days) == 4
+
+
+def test_eligibility_keys():
+    """Teams are assigned to the cup matching their league's region."""
+    assert get_cup_eligibility_key(None, None) == ("DKBC", None)
+    assert get_cup_eligibility_key('', '') == ("DKBC", None)
+    assert get_cup_eligibility_key("Sachsen", None) == ("Landespokal", "Sachsen")
+    assert get_cup_eligibility_key("Sachsen", "Harz") == ("Kreispokal", "Harz")
+
+
+def _cup_day_date(day):
+    """Wednesdays from September on, one per CUP_DAY."""
+    return date(2025, 9, 3) + timedelta(weeks=day)
+
+
+def _played(cup, round_number, home, away, home_score, away_score, winner, cup_match_day):
+    """A played cup match; winner is set like the simulation does, also after a tie-break."""
+    return CupMatch(cup_id=cup.id, home_team_id=home.id, away_team_id=away.id if away else None,
+                    round_name=cup.get_round_name(round_number, cup.total_rounds), round_number=round_number,
+                    cup_match_day=cup_match_day, is_played=True, home_score=home_score, away_score=away_score,
+                    winner_team_id=winner.id)
+
+
+def _build_cups():
+    """A season with four CUP_DAYs and cups in different states, plus a cup of another season."""
+    season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31), is_current=True)
+    other_season = Season(name='Season 2024', start_date=date(2024, 8, 1), end_date=date(2025, 5, 31))
+    club = Club(name='KSV Pokal')
+    db.session.add_all([season, other_season, club])
+    db.session.flush()
+
+    db.session.add_all([
+        SeasonCalendar(season_id=season.id, week_number=day, calendar_date=_cup_day_date(day),
+                       weekday='Wednesday', day_type='CUP_DAY', match_day_number=day)
+        for day in range(1, 5)
+    ])
+    teams = [Team(name=f'Team {i}', club_id=club.id) for i in range(16)]
+    db.session.add_all(teams)
+
+    cups = {
+        # Round 1 of three complete, played on two CUP_DAYs: home and away wins, ties decided both ways
+        'quarter': Cup(name='DKBC-Pokal', cup_type='DKBC', season_id=season.id, total_rounds=3),
+        # Round 1 of two complete, one team had a bye
+        'bye': Cup(name='Sachsen-Pokal', cup_type='Landespokal', season_id=season.id, total_rounds=2),
+        # Final played, the semi-finals were played on an earlier CUP_DAY
+        'final': Cup(name='Landkreis Harz-Pokal', cup_type='Kreispokal', season_id=season.id, total_rounds=2,
+                     current_round='Finale', current_round_number=2),
+        # One match of round 1 is still open
+        'open': Cup(name='Thüringen-Pokal', cup_type='Landespokal', season_id=season.id, total_rounds=2),
+        # Complete, but not part of the season or not active
+        'other_season': Cup(name='DKBC-Pokal', cup_type='DKBC', season_id=other_season.id, total_rounds=2),
+        'inactive': Cup(name='Bayern-Pokal', cup_type='Landespokal', season_id=season.id, total_rounds=2,
+                        is_active=False),
+    }
+    db.session.add_all(cups.values())
+    db.session.flush()
+
+    quarter, bye, final, open_cup = cups['quarter'], cups['bye'], cups['final'], cups['open']
+    t = teams
+    db.session.add_all([
+        _played(quarter, 1, t[0], t[1], 3000, 2900, t[0], 1),
+        _played(quarter, 1, t[2], t[3], 2800, 2950, t[3], 1),
+        _played(quarter, 1, t[4], t[5], 3010, 3010, t[4], 2),
+        _played(quarter, 1, t[6], t[7], 2990, 2990, t[7], 2),
+        _played(bye, 1, t[8], t[9], 2700, 2750, t[9], 1),
+        _played(bye, 1, t[10], None, 0, 0, t[10], 1),
+        _played(final, 1, t[11], t[12], 2900, 2800, t[11], 1),
+        _played(final, 1, t[13], t[14], 2900, 3000, t[14], 1),
+        _played(final, 2, t[11], t[14], 3100, 3000, t[11], 3),
+        _played(open_cup, 1, t[12], t[13], 2900, 2800, t[12], 2),
+        CupMatch(cup_id=open_cup.id, home_team_id=t[14].id, away_team_id=t[15].id, round_name='Halbfinale',
+                 round_number=1, cup_match_day=2, is_played=False),
+        _played(cups['other_season'], 1, t[0], t[1], 3000, 2900, t[0], 1),
+        _played(cups['inactive'], 1, t[2], t[3], 3000, 2900, t[2], 1),
+    ])
+    db.session.commit()
+    return season, cups, teams
+
+
+def test_advance_cup_rounds():
+    """Completed rounds are found with their winners, the next round is inserted and finals end their cup."""
+    random.seed(11)
+    with temporary_save('cups.db'):
+        season, cups, teams = _build_cups()
+        t = teams
+        quarter, bye, final, open_cup = cups['quarter'], cups['bye'], cups['final'], cups['open']
+
+        assert sorted(find_completed_cup_rounds(season.id)) == sorted([quarter.id, bye.id, final.id])
+        assert find_completed_cup_rounds(season.id, [bye.id, open_cup.id]) == [bye.id]
+        assert collect_round_winners([quarter.id, bye.id]) == {
+            quarter.id: [t[0].id, t[3].id, t[4].id, t[7].id],
+            bye.id: [t[9].id, t[10].id]
+        }
+
+        summary = advance_cup_rounds(season.id)
+        db.session.expire_all()
+
+        assert sorted(summary['advanced']) == sorted([quarter.id, bye.id])
+        assert summary['finished'] == [final.id]
+        assert summary['matches_created'] == 3
+
+        cup_days = [1, 2, 3, 4]
+        for cup, winners in ((quarter, {t[0].id, t[3].id, t[4].id, t[7].id}), (bye, {t[9].id, t[10].id})):
+            assert cup.current_round_number == 2 and cup.is_active
+            assert cup.current_round == cup.get_round_name(2, cup.total_rounds)
+            matches = CupMatch.query.filter_by(cup_id=cup.id, round_number=2).all()
+            assert len(matches) == len(winners) // 2
+            assert {team_id for match in matches for team_id in (match.home_team_id, match.away_team_id)} == winners
+            cup_match_day = compute_cup_match_day(cup.cup_type, cup.id, 2, cup.total_rounds, cup_days)
+            for match in matches:
+                assert (match.round_name, match.cup_match_day, match.is_played) == \
+                    (cup.current_round, cup_match_day, False)
+                assert match.match_date == datetime.combine(_cup_day_date(cup_match_day), datetime.min.time())
+                assert match.winner_team_id is None
+        assert quarter.current_round == 'Halbfinale' and bye.current_round == 'Finale'
+
+        # The final ended its cup, the open and the other cups are unchanged
+        assert not final.is_active and final.current_round_number == 2
+        assert CupMatch.query.filter_by(cup_id=final.id).count() == 3
+        assert open_cup.current_round_number == 1 and open_cup.is_active
+        for cup in (open_cup, cups['other_season'], cups['inactive']):
+            assert CupMatch.query.filter_by(cup_id=cup.id, round_number=2).count() == 0
+
+        # Nothing is complete any more until the new round is played
+        assert find_completed_cup_rounds(season.id) == []
+        assert advance_cup_rounds(season.id) == {'advanced': [], 'finished': [], 'matches_created': 0}
+
+
+if __name__ == "__main__":
+    test_first_round_byes()
+    test_pairings()
+    test_cup_match_day_distribution()
+    test_eligibility_keys()
+    test_advance_cup_rounds()
+    print("All cup engine tests passed")
@@ -0,0 +1,215 @@
+"""
+Test script for the background jobs, the /api/jobs routes and the progress stream.
+
+Jobs run against a small generated world in a temporary directory, in the
+spawned worker process like on the server: a match day is submitted through
+the API and polled until it completed, a queued and a running season
+simulation are cancelled, and the progress stream of a job is read until it
+closes.
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import Season, Match
+import job_runner
+import save_registry
+from save_fixtures import create_test_app, open_save, import_app
+from world_generator import create_world_database
+
+
+# Seconds a job may take before the test gives up (spawning the worker takes a moment)
+JOB_TIMEOUT = 120
+
+
+def _create_world(directory):
+    db_path = os.path.join(directory, 'jobs.db')
+    create_world_database(db_path, seed=5, levels=1, branching=1, teams_per_league=4, youth_levels=0, regions=1)
+    return db_path
+
+
+def _wait_for(job_id, condition):
+    """Poll a job until condition(job) holds."""
+    deadline = time.time() + JOB_TIMEOUT
+    while time.time() < deadline:
+        job = job_runner.get_job(job_id)
+        if condition(job):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} timed out in state {job_runner.get_job(job_id)['state']}")
+
+
+def _finished(job):
+    return job['state'] in (job_runner.COMPLETED, job_runner.FAILED, job_runner.CANCELLED)
+
+
+def _played_matches(db_path):
+    with open_save(create_test_app(db_path)):
+        season = Season.query.filter_by(is_current=True).first()
+        return (Match.query.filter_by(season_id=season.id, is_played=True).count(),
+                Match.query.filter_by(season_id=season.id).count(),
+                season.id)
+
+
+def test_background_match_day():
+    """A match day submitted through the API is queued, run by the worker and polled until it completed."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = _create_world(directory)
+        client = import_app(db_path).test_client()
+
+        response = client.post('/api/simulate/match_day?background=1')
+        assert response.status_code == 202
+        job = response.get_json()['job']
+        assert response.headers['Location'] == response.get_json()['status_url'] == f"/api/jobs/{job['id']}"
+        assert job['type'] == 'simulate_match_day' and job['state'] in ('queued', 'running')
+        assert 'database_uri' not in job
+
+        # The save is busy while the job is queued or running
+        conflict = client.post('/api/simulate/match_day', json={'background': True})
+        assert conflict.status_code == 409
+        assert conflict.get_json()['job']['id'] == job['id']
+        assert [listed['id'] for listed in client.get('/api/jobs').get_json()['jobs']][0] == job['id']
+
+        deadline = time.time() + JOB_TIMEOUT
+        while True:
+            polled = client.get(response.headers['Location']).get_json()
+            if polled['state'] not in ('queued', 'running'):
+                break
+            assert time.time() < deadline, "Job timed out"
+            time.sleep(0.1)
+
+        assert polled['state'] == 'completed', polled['error']
+        assert polled['started_at'] and polled['finished_at'] and polled['error'] is None
+
+        # The progress events of the worker were folded into the job record
+        played, _, _ = _played_matches(db_path)
+        assert played > 0
+        assert polled['progress']['match_days_done'] == 1
+        assert polled['progress']['matches_simulated'] == played
+        assert polled['progress']['last_match_day'] == 1
+        assert polled['result']['matches_simulated'] == played
+
+        assert client.get('/api/jobs/unknown').status_code == 404
+        assert client.post('/api/jobs/unknown/cancel').status_code == 404
+        save_registry.evict_save(db_path)
+
+
+def _open_stream(client, job_id):
+    """
+    Open the progress stream of a job and read its first chunk.
+
+    The stream has subscribed to the progress events once its retry line was sent.
+
+    Returns:
+        tuple: (response, chunk iterator, list of the chunks read so far)
+    """
+    response = client.get(f"/api/progress/stream?job_id={job_id}", buffered=False)
+    assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+    chunks = response.iter_encoded()
+    return response, chunks, [next(chunks)]
+
+
+def _read_stream(response, chunks, received):
+    """
+    Read a progress stream until the server closes it.
+
+    Returns:
+        tuple: (retry line, list of events as dicts with id, event and data)
+    """
+    reader = threading.Thread(target=lambda: received.extend(chunks), daemon=True)
+    reader.start()
+    reader.join(JOB_TIMEOUT)
+    assert not reader.is_alive(), "Progress stream was not closed"
+    response.close()
+
+    blocks = b''.join(received).decode('utf-8').split('\n\n')
+    assert blocks[-1] == ''
+    events = []
+    for block in blocks[1:-1]:
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        if fields:
+            events.append({'id': int(fields['id']) if 'id' in fields else None, 'event': fields['event'],
+                           'data': json.loads(fields['data'])})
+    return blocks[0], events
+
+
+def test_progress_stream_of_a_job():
+    """The stream of a job delivers its events in order and closes after its final job_state."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = _create_world(directory)
+        client = import_app(db_path).test_client()
+
+        job = client.post('/api/simulate/match_day', json={'background': True}).get_json()['job']
+        retry, events = _read_stream(*_open_stream(client, job['id']))
+
+        assert retry == 'retry: 3000'
+        assert all(event['data']['job_id'] == job['id'] for event in events)
+        ids = [event['id'] for event in events]
+        assert ids == sorted(ids) and len(set(ids)) == len(ids)
+
+        names = [event['event'] for event in events]
+        assert events[-1]['event'] == 'job_state' and events[-1]['data']['state'] == 'completed'
+        assert 'match_day_simulated' in names
+        assert names.index('phase_start') < names.index('match_day_simulated') < len(names) - 1
+        # The running state is only missed if the worker started before the stream subscribed
+        states = [event['data']['state'] for event in events if event['event'] == 'job_state']
+        assert states in (['running', 'completed'], ['completed'])
+
+        # A stream opened after the job finished gets its final state and closes at once
+        _, events = _read_stream(*_open_stream(client, job['id']))
+        assert [(event['event'], event['data']['state']) for event in events] == [('job_state', 'completed')]
+
+        assert client.get('/api/progress/stream?job_id=unknown').status_code == 404
+        save_registry.evict_save(db_path)
+
+
+def test_cancel_queued_and_running_jobs():
+    """A queued job is dropped at once, a running one stops after a committed match day."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = _create_world(directory)
+        client = import_app(db_path).test_client()  # simulate_season uses app.auto_initialize_cups
+        database_uri = create_test_app(db_path).config['SQLALCHEMY_DATABASE_URI']
+        _, total, season_id = _played_matches(db_path)
+
+        running = job_runner.submit_job('simulate_season', {'season_id': season_id, 'create_new_season': False},
+                                        database_uri)
+        queued = job_runner.submit_job('simulate_match_day', None, database_uri)
+        stream = _open_stream(client, queued['id'])
+
+        cancelled = client.post(f"/api/jobs/{queued['id']}/cancel").get_json()
+        assert cancelled['state'] == 'cancelled' and cancelled['cancel_requested']
+        assert cancelled['finished_at'] is not None
+
+        # The stream of the dropped job ends with its cancellation
+        _, events = _read_stream(*stream)
+        assert [(event['event'], event['data']['state']) for event in events] == [('job_state', 'cancelled')]
+
+        _wait_for(running['id'], lambda job: job['state'] != 'queued')
+        assert job_runner.cancel_job(running['id'])['cancel_requested']
+        job = _wait_for(running['id'], _finished)
+
+        assert job['state'] == 'cancelled', job['error']
+        assert job['result'] is None
+        # Stopped at a match day boundary: what was simulated is complete, the rest is left
+        played, _, _ = _played_matches(db_path)
+        assert played == job['progress'].get('matches_simulated', 0)
+        assert played < total
+
+        # The queued job never ran
+        assert job_runner.get_job(queued['id'])['started_at'] is None
+        assert job_runner.get_active_job() is None
+        save_registry.evict_save(db_path)
+
+
+if __name__ == "__main__":
+    test_background_match_day()
+    test_progress_stream_of_a_job()
+    test_cancel_queued_and_running_jobs()
+    print("All job runner tests passed")
@@ -0,0 +1,107 @@
+"""
+Test script for the promotion/relegation league graph.
+
+Builds a small league pyramid in memory and checks the indexed lookups
+that balancing and season transitions rely on.
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import parse_league_id_list
+from league_graph import LeagueGraph, PROMOTION, RELEGATION
+from simulation import resolve_league_assignments
+
+
+def build_pyramid():
+    """Level 1: league 1, level 2: league 2, level 3: leagues 3 and 4."""
+    leagues = [
+        SimpleNamespace(id=1, name='Bundesliga', level=1, anzahl_aufsteiger=0, anzahl_absteiger=2),
+        SimpleNamespace(id=2, name='Zweite Liga', level=2, anzahl_aufsteiger=2, anzahl_absteiger=2),
+        SimpleNamespace(id=3, name='Landesliga Nord', level=3, anzahl_aufsteiger=1, anzahl_absteiger=0),
+        SimpleNamespace(id=4, name='Landesliga Sued', level=3, anzahl_aufsteiger=1, anzahl_absteiger=0)
+    ]
+    links = [
+        (1, 2, RELEGATION),
+        (2, 1, PROMOTION),
+        (2, 3, RELEGATION),
+        (2, 4, RELEGATION),
+        (3, 2, PROMOTION),
+        (4, 2, PROMOTION)
+    ]
+    return LeagueGraph(season_id=1, leagues=leagues, links=links)
+
+
+def test_lookups():
+    """Promotion/relegation targets and feeding leagues are indexed per league."""
+    graph = build_pyramid()
+
+    assert graph.get_promotion_targets(3) == [2]
+    assert graph.get_promotion_targets(1) == []
+    assert graph.get_relegation_targets(2) == [3, 4]
+    assert [league.id for league in graph.get_feeding_leagues(2)] == [3, 4]
+    assert [league.id for league in graph.get_feeding_leagues(1)] == [2]
+    assert graph.get_feeding_leagues(4) == []
+
+    assert graph.top_level == 1
+    assert graph.bottom_level == 3
+    assert sorted(len(leagues) for leagues in graph.leagues_by_level().values()) == [1, 1, 2]
+
+
+def test_resolve_league_assignments():
+    """Teams are moved along the graph according to their final position."""
+    graph = build_pyramid()
+    leagues = sorted(graph.leagues.values(), key=lambda league: league.id)
+    old_to_new_mapping = {1: 11, 2: 12, 3: 13, 4: 14}
+
+    # Four teams per league, team IDs 10*league_id + position
+    standings_by_league = {
+        league.id: [{'team': SimpleNamespace(id=10 * league.id + pos, name=f"Team {league.id}.{pos}")}
+                    for pos in range(1, 5)]
+        for league in leagues
+    }
+
+    assignments, tracker, summary = resolve_league_assignments(
+        leagues, standings_by_league, graph, old_to_new_mapping
+    )
+    by_team = {assignment['id']: assignment for assignment in assignments}
+
+    assert len(assignments) == 16
+    assert by_team[11]['previous_season_status'] == 'champion'
+    assert by_team[11]['league_id'] == 11
+    assert by_team[13]['previous_season_status'] == 'relegated'
+    assert by_team[14]['league_id'] == 12
+    assert by_team[21]['previous_season_status'] == 'promoted'
+    assert by_team[21]['league_id'] == 11
+
+    # Relegated teams of league 2 are spread over both level 3 leagues
+    assert sorted([by_team[23]['league_id'], by_team[24]['league_id']]) == [13, 14]
+
+    # Winners of the level 3 leagues go up, bottom level has no relegation
+    assert by_team[31]['previous_season_status'] == 'promoted'
+    assert by_team[44]['previous_season_status'] is None
+    assert by_team[44]['previous_season_league_level'] == 3
+
+    assert tracker == {11: 4, 12: 4, 13: 4, 14: 4}
+    assert summary['promoted'] == 4 and summary['relegated'] == 4 and summary['champion'] == 1
+    assert summary['warnings'] == []
+
+
+def test_legacy_id_parsing():
+    """The legacy semicolon columns are parsed into integer IDs."""
+    assert parse_league_id_list(None) == []
+    assert parse_league_id_list('') == []
+    assert parse_league_id_list('12') == [12]
+    assert parse_league_id_list('12; 13.0;') == [12, 13]
+    assert parse_league_id_list('12;abc') == [12]
+
+
+if __name__ == "__main__":
+    test_lookups()
+    test_resolve_league_assignments()
+    test_legacy_id_parsing()
+    print("\nAll league graph tests passed ✓")
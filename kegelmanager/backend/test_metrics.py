@@ -0,0 +1,81 @@
+"""
+Test script for the metrics registry.
+
+Checks counters, histograms, the timing helpers, the Prometheus export and
+the JSON dump without a database.
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import metrics
+from metrics import increment, observe, timed, time_block, render_prometheus, get_metrics_snapshot, reset_metrics
+
+
+def test_counters_and_histograms():
+    """Counters add up per label set, histograms count values into cumulative buckets."""
+    reset_metrics()
+    increment('matches_simulated_total', 5)
+    increment('matches_simulated_total', 3)
+    observe('phase_duration_seconds', 0.02, phase='match_day.commit')
+    observe('phase_duration_seconds', 0.3, phase='match_day.commit')
+
+    snapshot = get_metrics_snapshot()
+    assert snapshot['matches_simulated_total'][0]['value'] == 8
+    phase = snapshot['phase_duration_seconds'][0]
+    assert phase['labels'] == {'phase': 'match_day.commit'}
+    assert phase['count'] == 2
+    assert abs(phase['sum'] - 0.32) < 1e-9
+
+    text = render_prometheus()
+    assert '# TYPE kegelmanager_phase_duration_seconds histogram' in text
+    assert 'kegelmanager_phase_duration_seconds_bucket{phase="match_day.commit",le="0.025"} 1' in text
+    assert 'kegelmanager_phase_duration_seconds_bucket{phase="match_day.commit",le="+Inf"} 2' in text
+    assert 'kegelmanager_matches_simulated_total 8' in text
+
+
+def test_timing_helpers():
+    """timed() and time_block() record one observation per call."""
+    reset_metrics()
+
+    @timed('function_duration_seconds', function='work')
+    def work():
+        return 42
+
+    assert work() == 42
+    assert work.__name__ == 'work'
+    with time_block('function_duration_seconds', function='block'):
+        pass
+
+    functions = {entry['labels']['function']: entry for entry in get_metrics_snapshot()['function_duration_seconds']}
+    assert functions['work']['count'] == 1
+    assert functions['block']['count'] == 1
+
+
+def test_progress_events_and_dump():
+    """Progress events become metrics; the registry can be dumped to JSON."""
+    reset_metrics()
+    metrics.record_progress_event('phase_end', {'phase': 'transition.aging', 'duration_ms': 120.0})
+    metrics.record_progress_event('match_day_simulated', {'day_type': 'LEAGUE_DAY', 'matches_simulated': 4, 'duration_ms': 800.0})
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = metrics.dump_metrics_json(os.path.join(directory, 'run', 'metrics.json'), extra={'season': 'Season 2025'})
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+    assert data['extra']['season'] == 'Season 2025'
+    assert data['metrics']['phase_duration_seconds'][0]['labels'] == {'phase': 'transition.aging'}
+    assert data['metrics']['matches_simulated_total'][0]['value'] == 4
+    assert data['metrics']['match_days_simulated_total'][0]['labels'] == {'day_type': 'LEAGUE_DAY'}
+
+
+if __name__ == "__main__":
+    test_counters_and_histograms()
+    test_timing_helpers()
+    test_progress_events_and_dump()
+    print("All metrics tests passed!")
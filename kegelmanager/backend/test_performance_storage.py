@@ -0,0 +1,149 @@
+"""
+Test script for the compact storage format of the performance tables.
+
+A temporary save is converted to the compact format and back; the models must
+read the same performances in both formats and new performances must be
+stored through the view.
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date, datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from models import db, Season, League, Club, Team, Player, Match, PlayerMatchPerformance
+import performance_storage
+from save_fixtures import create_test_app, open_save
+
+
+def _performance(match, team, player, lanes, volle_score, set_points):
+    return {
+        'match_id': match.id, 'player_id': player.id, 'team_id': team.id, 'is_home_team': True,
+        'position_number': 1, 'is_substitute': False,
+        'lane1_score': lanes[0], 'lane2_score': lanes[1], 'lane3_score': lanes[2], 'lane4_score': lanes[3],
+        'total_score': sum(lanes), 'volle_score': volle_score, 'raeumer_score': sum(lanes) - volle_score,
+        'fehler_count': 4, 'set_points': set_points, 'match_points': 1
+    }
+
+
+def _build_save(path):
+    """A save with one match and two classic performances."""
+    app = create_test_app(path)
+
+    with open_save(app):
+        db.create_all()
+        season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31), is_current=True)
+        db.session.add(season)
+        db.session.flush()
+        league = League(name='Kreisliga', level=1, season_id=season.id)
+        club = Club(name='KSV Test')
+        db.session.add_all([league, club])
+        db.session.flush()
+        team = Team(name='KSV Test', club_id=club.id, league_id=league.id)
+        players = [Player(name=f'Spieler {i}', age=25, strength=60, talent=5, club_id=club.id) for i in range(2)]
+        db.session.add_all([team] + players)
+        db.session.flush()
+        match = Match(home_team_id=team.id, away_team_id=team.id, league_id=league.id, season_id=season.id,
+                      match_date=datetime(2025, 9, 1), is_played=True, match_day=1)
+        db.session.add(match)
+        db.session.flush()
+
+        performance_storage.insert_performances(PlayerMatchPerformance, [
+            _performance(match, team, players[0], (150, 141, 162, 139), 390, 2.5),
+            _performance(match, team, players[1], (133, 128, 140, 151), 372, 1.5)
+        ])
+        db.session.commit()
+    return app
+
+
+def _performance_dicts():
+    return [performance.to_dict() for performance in PlayerMatchPerformance.query.order_by(PlayerMatchPerformance.id)]
+
+
+def test_lane_packing():
+    """Four lane scores fit into one integer, missing lanes included."""
+    for lanes in ([150, 141, 162, 139], [0, 270, None, 1], [None] * 4):
+        assert performance_storage.unpack_lane_scores(performance_storage.pack_lane_scores(lanes)) == lanes
+    assert performance_storage.pack_lane_scores([None] * 4) is None
+
+    try:
+        performance_storage.pack_lane_scores([150, 1023, 140, 140])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError expected")
+
+
+def test_conversion_keeps_performances():
+    """Models read the same performances before, in and after the compact format."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'save.db')
+        app = _build_save(path)
+
+        with open_save(app):
+            classic = _performance_dicts()
+            assert classic[0]['total_score'] == 592 and classic[0]['raeumer_score'] == 202
+
+        assert performance_storage.convert_performance_storage(path, performance_storage.COMPACT) == [
+            'player_match_performance', 'player_cup_match_performance']
+
+        with open_save(app):
+            db.create_all()  # the view counts as existing table
+            assert performance_storage.get_performance_storage() == performance_storage.COMPACT
+            assert performance_storage.storage_table() == 'player_match_performance_packed'
+            assert _performance_dicts() == classic
+            assert db.session.execute(text(
+                "SELECT SUM(total_score), SUM(raeumer_score) FROM player_match_performance")).one() == (1144, 382)
+
+            # Bulk inserts and ORM objects are stored through the view
+            match = Match.query.first()
+            team = Team.query.first()
+            players = Player.query.order_by(Player.id).all()
+            performance_storage.insert_performances(PlayerMatchPerformance, [
+                _performance(match, team, players[0], (120, 130, 140, 150), 350, 0.5)])
+            added = PlayerMatchPerformance(**_performance(match, team, players[1], (160, 150, 140, 130), 400, 0.0))
+            db.session.add(added)
+            db.session.commit()
+            assert added.id == 4
+            assert [(p['id'], p['total_score'], p['set_points']) for p in _performance_dicts()[2:]] == [
+                (3, 540, 0.5), (4, 580, 0.0)]
+
+            # Rows that cannot be stored losslessly are rejected
+            lossy = _performance(match, team, players[0], (120, 130, 140, 150), 350, 1.0)
+            lossy['total_score'] = 541
+            try:
+                performance_storage.insert_performances(PlayerMatchPerformance, [lossy])
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("ValueError expected")
+            try:
+                db.session.add(PlayerMatchPerformance(**lossy))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                assert 'compact format' in str(e)
+            else:
+                raise AssertionError("Lossy row accepted")
+
+            PlayerMatchPerformance.query.filter_by(id=4).update({'match_points': 0}, synchronize_session=False)
+            PlayerMatchPerformance.query.filter_by(id=3).delete(synchronize_session=False)
+            db.session.commit()
+            compact = _performance_dicts()
+            assert [p['id'] for p in compact] == [1, 2, 4] and compact[-1]['match_points'] == 0
+
+        performance_storage.convert_performance_storage(path, performance_storage.CLASSIC)
+
+        with open_save(app):
+            assert performance_storage.get_performance_storage() == performance_storage.CLASSIC
+            assert _performance_dicts() == compact
+
+
+if __name__ == "__main__":
+    test_lane_packing()
+    test_conversion_keeps_performances()
+    print("All performance storage tests passed")
@@ -0,0 +1,145 @@
+"""
+Test script for aging, retirement and replacement players at the season transition.
+
+age_all_players, retire_players and generate_replacements work with a few
+set-based statements; on a small fixture save their results must be the same
+as the rules of the former per-player loops:
+- every active player gets one year older, retired players keep their age
+- a player retires if he has a retirement age (> 0) and reached it
+- retired players leave their teams but stay with their club
+- every club gets one replacement per retiree, aged for its youngest team
+"""
+
+import sys
+import os
+import random
+from datetime import date
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, Season, League, Club, Team, Player, player_team
+from save_fixtures import temporary_save
+from simulation import age_all_players, process_retirements, generate_replacements, get_age_range_for_altersklasse
+
+
+# (name, age, retirement_age, is_retired, club) - club 0 has a youth team, club 1 only adults
+PLAYERS = [
+    ('Ohne Ruhestandsalter', 30, None, False, 0),
+    ('Ruhestandsalter 0', 34, 0, False, 0),
+    ('Erreicht Ruhestandsalter', 36, 37, False, 0),
+    ('Über Ruhestandsalter', 40, 38, False, 0),
+    ('Noch aktiv', 35, 40, False, 1),
+    ('Erreicht Ruhestandsalter B', 39, 40, False, 1),
+    ('Schon im Ruhestand', 70, 65, True, 1),
+    ('Vereinslos', 50, 45, False, None),
+]
+
+
+def _build_save():
+    """Two seasons, two clubs with teams and the players of PLAYERS."""
+    old_season = Season(name='Season 2024', start_date=date(2024, 8, 1), end_date=date(2025, 5, 31))
+    new_season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31),
+                        is_current=True)
+    clubs = [Club(name='KSV Jugend'), Club(name='SKC Herren')]
+    db.session.add_all([old_season, new_season] + clubs)
+    db.session.flush()
+
+    herren = League(name='Kreisliga', level=1, season_id=new_season.id, altersklasse='Herren')
+    jugend = League(name='Kreisliga B-Jugend', level=1, season_id=new_season.id, altersklasse='B-Jugend')
+    db.session.add_all([herren, jugend])
+    db.session.flush()
+
+    teams = [Team(name='KSV Jugend', club_id=clubs[0].id, league_id=herren.id),
+             Team(name='KSV Jugend B', club_id=clubs[0].id, league_id=jugend.id),
+             Team(name='SKC Herren', club_id=clubs[1].id, league_id=herren.id)]
+    db.session.add_all(teams)
+
+    players = []
+    for name, age, retirement_age, is_retired, club in PLAYERS:
+        player = Player(name=name, age=age, strength=60, talent=5, retirement_age=retirement_age,
+                        is_retired=is_retired, club_id=clubs[club].id if club is not None else None,
+                        retirement_season_id=old_season.id if is_retired else None)
+        if not is_retired and club is not None:
+            player.teams.append(teams[0] if club == 0 else teams[2])
+        players.append(player)
+    db.session.add_all(players)
+    db.session.commit()
+    return new_season, clubs, teams
+
+
+def _expected(clubs):
+    """Ages, retirees and replacements per club by the rules of the per-player loops."""
+    ages = {}
+    retirees = set()
+    replacements = {}
+    for name, age, retirement_age, is_retired, club in PLAYERS:
+        if is_retired:
+            ages[name] = age
+            continue
+        ages[name] = age + 1
+        if retirement_age and ages[name] >= retirement_age:
+            retirees.add(name)
+            if club is not None:
+                replacements[clubs[club].id] = replacements.get(clubs[club].id, 0) + 1
+    return ages, retirees, replacements
+
+
+def test_aging_and_retirement():
+    """Ages, retirement selection and team memberships after the transition steps."""
+    with temporary_save('lifecycle.db'):
+        new_season, clubs, teams = _build_save()
+        club_of = {player.name: player.club_id for player in Player.query}
+        expected_ages, expected_retirees, _ = _expected(clubs)
+
+        assert age_all_players() == len([p for p in PLAYERS if not p[3]])
+        assert {player.name: player.age for player in Player.query} == expected_ages
+
+        retirees = process_retirements(new_season)
+        db.session.expire_all()
+
+        assert {retiree.name for retiree in retirees} == expected_retirees
+        assert {player.name for player in Player.query.filter_by(retirement_season_id=new_season.id)} == \
+            expected_retirees
+        assert all(player.is_retired for player in Player.query.filter(Player.name.in_(expected_retirees)))
+        assert Player.query.filter_by(name='Schon im Ruhestand').one().retirement_season_id != new_season.id
+
+        # Retirees left their teams but not their clubs
+        members = {name for (name,) in db.session.query(Player.name).join(
+            player_team, player_team.c.player_id == Player.id)}
+        assert members == {'Ohne Ruhestandsalter', 'Ruhestandsalter 0', 'Noch aktiv'}
+        assert {player.name: player.club_id for player in Player.query} == club_of
+
+        # The step is idempotent - nobody retires twice
+        assert process_retirements(new_season) == []
+
+
+def test_one_replacement_per_retiree():
+    """Each club gets one replacement per retiree, in the age range of its youngest team."""
+    random.seed(3)
+    with temporary_save('lifecycle.db'):
+        new_season, clubs, teams = _build_save()
+        _, _, expected_replacements = _expected(clubs)
+        existing = {player.id for player in Player.query}
+
+        age_all_players()
+        process_retirements(new_season)
+        new_players = generate_replacements(new_season)
+
+        replacements = {}
+        for player in new_players:
+            replacements[player.club_id] = replacements.get(player.club_id, 0) + 1
+        assert replacements == expected_replacements == {clubs[0].id: 2, clubs[1].id: 1}
+        assert {player.id for player in Player.query} == existing | {player.id for player in new_players}
+
+        age_ranges = {clubs[0].id: get_age_range_for_altersklasse('B-Jugend'), clubs[1].id: (17, 18)}
+        for player in new_players:
+            min_age, max_age = age_ranges[player.club_id]
+            assert min_age <= player.age <= max_age, (player.club_id, player.age)
+            assert not player.is_retired and player.retirement_age
+
+
+if __name__ == "__main__":
+    test_aging_and_retirement()
+    test_one_replacement_per_retiree()
+    print("All player lifecycle tests passed")
@@ -0,0 +1,78 @@
+"""
+Test script for the on-demand profiler.
+
+Profiles are written to a temporary directory; a minimal Flask app checks
+the request flag and the X-Profile-Id header.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+import profiling
+
+
+def busy_work():
+    """Some CPU work that shows up in the profile."""
+    total = 0
+    for i in range(300000):
+        total += i % 7
+    return total
+
+
+def test_profiler_outputs():
+    """A profile can be listed and read as pstats and collapsed stacks."""
+    with tempfile.TemporaryDirectory() as directory:
+        profiling.PROFILE_DIR = directory
+
+        profiler = profiling.Profiler('unit test', kind='job').start()
+        busy_work()
+        profile_id = profiler.stop(job_id='abc')
+
+        profiles = profiling.list_profiles()
+        assert [profile['id'] for profile in profiles] == [profile_id]
+        assert profiles[0]['job_id'] == 'abc'
+
+        assert 'busy_work' in profiling.render_pstats(profile_id, sort='tottime', limit=5)
+        collapsed = profiling.read_collapsed_stacks(profile_id)
+        for line in collapsed.splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0
+
+        assert profiling.render_pstats('../etc/passwd') is None
+        assert profiling.delete_profile(profile_id)
+        assert profiling.list_profiles() == []
+
+
+def test_request_flag():
+    """Only flagged requests are profiled."""
+    with tempfile.TemporaryDirectory() as directory:
+        profiling.PROFILE_DIR = directory
+
+        app = Flask(__name__)
+        profiling.init_profiling(app)
+
+        @app.route('/work')
+        def work():
+            return jsonify({'total': busy_work()})
+
+        client = app.test_client()
+        assert 'X-Profile-Id' not in client.get('/work').headers
+
+        response = client.get('/work?profile=1')
+        profile_id = response.headers['X-Profile-Id']
+        assert profiling.get_profile_metadata(profile_id)['path'] == '/work?profile=1'
+
+        response = client.get('/work', headers={'X-Profile': 'true'})
+        assert 'X-Profile-Id' in response.headers
+        assert len(profiling.list_profiles()) == 2
+
+
+if __name__ == "__main__":
+    test_profiler_outputs()
+    test_request_flag()
+    print("All profiling tests passed!")
@@ -0,0 +1,135 @@
+"""
+Test script for the SQL query instrumentation.
+
+Uses a minimal Flask app with an in-memory SQLite engine to check the
+per-request counters and headers, the N+1 detector and the phase statistics.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+import query_stats
+from query_stats import init_query_stats, get_query_stats, reset_query_stats, N_PLUS_ONE_THRESHOLD
+import metrics
+from progress import phase, add_progress_listener, remove_progress_listener
+
+
+engine = create_engine('sqlite://')
+
+
+def create_test_app():
+    app = Flask(__name__)
+    init_query_stats(app)
+
+    @app.route('/single')
+    def single():
+        with engine.connect() as conn:
+            value = conn.execute(text('SELECT 1')).scalar()
+        return jsonify({'value': value})
+
+    @app.route('/loop')
+    def loop():
+        with engine.connect() as conn:
+            values = [conn.execute(text('SELECT :x'), {'x': i}).scalar() for i in range(N_PLUS_ONE_THRESHOLD + 2)]
+        return jsonify({'values': values})
+
+    return app
+
+
+def test_request_headers_and_stats():
+    """Every request reports its query count; aggregates are kept per endpoint."""
+    reset_query_stats()
+    client = create_test_app().test_client()
+
+    response = client.get('/single')
+    assert response.headers['X-Query-Count'] == '1'
+    assert response.headers['X-Query-N-Plus-One'] == '0'
+
+    stats = get_query_stats()
+    assert stats['endpoints']['single']['queries_total'] == 1
+    assert stats['endpoints']['single']['count'] == 1
+
+
+def test_n_plus_one_detection():
+    """Repeated statements of the same shape are flagged with their code location."""
+    reset_query_stats()
+    client = create_test_app().test_client()
+
+    response = client.get('/loop')
+    assert response.headers['X-Query-Count'] == str(N_PLUS_ONE_THRESHOLD + 2)
+    assert response.headers['X-Query-N-Plus-One'] == '1'
+
+    finding = get_query_stats()['n_plus_one'][0]
+    assert finding['request'] == 'loop'
+    assert finding['location'].startswith('test_query_stats.py')
+
+
+def test_phase_stats():
+    """Queries inside a phase are counted for it, also when the phase raises; its duration reaches the metrics."""
+    reset_query_stats()
+    metrics.reset_metrics()
+    query_stats.install_phase_tracking()
+    metrics.install_progress_metrics()
+
+    with phase('test.phase'):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT 2'))
+
+    stats = get_query_stats()['phases']['test.phase']
+    assert stats['queries_total'] == 2
+    assert query_stats.get_last_phase_summary('test.phase')['queries'] == 2
+
+    # A failing phase is ended all the same, no collector stays open
+    events = []
+    listener = lambda event, data: events.append((event, data))
+    add_progress_listener(listener)
+    try:
+        with phase('test.failing', season_id=1):
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            raise ValueError("Abbruch")
+    except ValueError:
+        pass
+    assert query_stats._collectors() == []
+    assert get_query_stats()['phases']['test.failing']['queries_total'] == 1
+    assert events[-1][0] == 'phase_end'
+    assert events[-1][1]['error'] == 'ValueError' and events[-1][1]['season_id'] == 1
+
+    # Decorated functions are a phase per call, with payload added at the end
+    @phase('test.decorated')
+    def decorated():
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+    decorated()
+    decorated()
+    assert get_query_stats()['phases']['test.decorated']['count'] == 2
+
+    with phase('test.payload') as payload_phase:
+        payload_phase.update(matches=3)
+    assert events[-1][1]['matches'] == 3 and events[-1][1]['duration_ms'] >= 0
+    remove_progress_listener(listener)
+
+    durations = {entry['labels']['phase']: entry['count']
+                 for entry in metrics.get_metrics_snapshot()['phase_duration_seconds']}
+    assert durations == {'test.phase': 1, 'test.failing': 1, 'test.decorated': 2, 'test.payload': 1}
+
+
+def test_statement_shape():
+    """IN-lists of different length map to the same shape."""
+    assert query_stats.statement_shape('SELECT * FROM t WHERE id IN (?, ?, ?)') == \
+        query_stats.statement_shape('SELECT *  FROM t\nWHERE id IN (?, ?)')
+
+
+if __name__ == "__main__":
+    test_request_headers_and_stats()
+    test_n_plus_one_detection()
+    test_phase_stats()
+    test_statement_shape()
+    print("All query stats tests passed!")
@@ -0,0 +1,94 @@
+"""
+Test script for the versioned response cache.
+
+Uses a minimal Flask app without database to check cache hits, ETag/304
+handling, invalidation through the world version and the LRU bound.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify
+import response_cache
+from response_cache import cached_response, bump_world_version, get_cache_stats, clear_response_cache
+
+
+calls = {'count': 0}
+
+
+def create_test_app():
+    app = Flask(__name__)
+
+    @app.route('/items/<int:item_id>')
+    @cached_response
+    def get_item(item_id):
+        calls['count'] += 1
+        return jsonify({'id': item_id, 'calls': calls['count']})
+
+    return app
+
+
+def test_hits_and_etags():
+    """Repeated GETs are served from the cache, a matching ETag gives 304."""
+    clear_response_cache()
+    client = create_test_app().test_client()
+    calls['count'] = 0
+
+    first = client.get('/items/1')
+    second = client.get('/items/1')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert first.get_json() == second.get_json()
+    assert calls['count'] == 1
+
+    not_modified = client.get('/items/1', headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert calls['count'] == 1
+
+    # Different arguments and query strings are cached separately
+    client.get('/items/2')
+    client.get('/items/1?season=3')
+    assert calls['count'] == 3
+
+
+def test_world_version_invalidates():
+    """Bumping the world version makes old entries and ETags stale."""
+    clear_response_cache()
+    client = create_test_app().test_client()
+    calls['count'] = 0
+
+    first = client.get('/items/1')
+    bump_world_version('test')
+    second = client.get('/items/1', headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.status_code == 200
+    assert second.headers['X-Cache'] == 'MISS'
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert calls['count'] == 2
+
+
+def test_lru_bound():
+    """The cache never holds more than MAX_ENTRIES responses."""
+    clear_response_cache()
+    client = create_test_app().test_client()
+    old_max_entries = response_cache.MAX_ENTRIES
+    response_cache.MAX_ENTRIES = 3
+    try:
+        evictions_before = get_cache_stats()['evictions']
+        for item_id in range(5):
+            client.get(f'/items/{item_id}')
+        stats = get_cache_stats()
+        assert stats['entries'] == 3
+        assert stats['evictions'] - evictions_before == 2
+    finally:
+        response_cache.MAX_ENTRIES = old_max_entries
+
+
+if __name__ == "__main__":
+    test_hits_and_etags()
+    test_world_version_invalidates()
+    test_lru_bound()
+    print("\nAll response cache tests passed ✓")
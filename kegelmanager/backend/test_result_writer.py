@@ -0,0 +1,116 @@
+"""
+Test script for the match day details.
+
+Match days are committed like batch_commit_simulation_results commits them;
+every day must be journaled with its performances and the lane records it
+set, records of earlier days counting for later ones.
+"""
+
+import sys
+import os
+from datetime import date, datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, Season, League, Club, Team, Player, Match, LaneRecord, PlayerMatchPerformance
+import result_writer
+import transition_journal
+from save_fixtures import temporary_save
+
+
+# Scores of the two players on the three match days
+DAYS = [(500, 480), (490, 520), (530, 400)]
+
+
+def _build_world():
+    """One league with two teams of one player each and three match days."""
+    season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31), is_current=True)
+    db.session.add(season)
+    db.session.flush()
+    league = League(name='Kreisliga', level=1, season_id=season.id)
+    clubs = [Club(name='KSV Heim'), Club(name='SKC Gast')]
+    db.session.add_all([league] + clubs)
+    db.session.flush()
+    teams = [Team(name=club.name, club_id=club.id, league_id=league.id) for club in clubs]
+    players = [Player(name=f'Spieler {i}', age=age, strength=60, talent=5, club_id=clubs[i].id)
+               for i, age in enumerate((25, 17))]
+    db.session.add_all(teams + players)
+    db.session.flush()
+    matches = [Match(home_team_id=teams[0].id, away_team_id=teams[1].id, league_id=league.id, season_id=season.id,
+                     match_date=datetime(2025, 9, day), is_played=False, match_day=day) for day in (1, 2, 3)]
+    db.session.add_all(matches)
+    db.session.commit()
+    return season, clubs, teams, players, matches
+
+
+def _match_day(match, clubs, teams, players, scores):
+    """Result and performances of one match day as simulate_match produces them."""
+    performances = []
+    lane_records = []
+    for i, (player, team) in enumerate(zip(players, teams)):
+        performances.append({
+            'match_id': match.id, 'player_id': player.id, 'team_id': team.id, 'is_home_team': i == 0,
+            'position_number': 1, 'is_substitute': False,
+            'lane1_score': scores[i] // 4, 'lane2_score': scores[i] // 4, 'lane3_score': scores[i] // 4,
+            'lane4_score': scores[i] - 3 * (scores[i] // 4), 'total_score': scores[i],
+            'volle_score': scores[i] - 180, 'raeumer_score': 180, 'fehler_count': 2,
+            'set_points': 2.0, 'match_points': 1 if i == 0 else 0
+        })
+        # Records on the lanes of the home club
+        lane_records.append({'club_id': clubs[0].id, 'score': scores[i], 'player_id': player.id})
+    lane_records += [{'club_id': clubs[0].id, 'score': score, 'team_id': team.id} for score, team in zip(scores, teams)]
+    result = {'match_id': match.id, 'is_cup_match': False, 'home_score': scores[0], 'away_score': scores[1],
+              'performances': performances, 'lane_records': lane_records}
+    return [result], performances
+
+
+def _commit_match_day(match, clubs, teams, players, scores, season_id):
+    """Commit a match day like batch_commit_simulation_results."""
+    results, performances = _match_day(match, clubs, teams, players, scores)
+    match.home_score, match.away_score, match.is_played = scores[0], scores[1], True
+    step = result_writer.write_match_day_details(results, performances, match.match_day, match.match_date.date(),
+                                                 season_id)
+    db.session.commit()
+    return step, results, performances
+
+
+def _records():
+    return sorted((record.record_type, record.category, record.score, record.match_id) for record in LaneRecord.query)
+
+
+def _expected_records(matches):
+    # Herren: 500, 530 - U19: 480, 520 - team: 500, 520, 530 (490 and 480 on later days are no records)
+    return sorted([('individual', 'Herren', 500, matches[0].id), ('individual', 'Herren', 530, matches[2].id),
+                   ('individual', 'U19', 480, matches[0].id), ('individual', 'U19', 520, matches[1].id),
+                   ('team', 'Herren', 500, matches[0].id), ('team', 'Herren', 520, matches[1].id),
+                   ('team', 'Herren', 530, matches[2].id)])
+
+
+def test_match_day_details():
+    """Days are committed with their performances and lane records and journaled in order."""
+    with temporary_save('details.db'):
+        season, clubs, teams, players, matches = _build_world()
+
+        steps = []
+        for match, scores in zip(matches, DAYS):
+            step, results, performances = _commit_match_day(match, clubs, teams, players, scores, season.id)
+            steps.append(step)
+            assert len(result_writer.collect_lane_records(results)) == 4
+
+        assert PlayerMatchPerformance.query.count() == 6
+        assert _records() == _expected_records(matches)
+
+        journal = transition_journal.get_journal(season.id)
+        assert [entry['step'] for entry in journal] == steps == [
+            transition_journal.match_day_step(match.match_day, match.match_date.date()) for match in matches]
+        assert [entry['params'] for entry in journal] == [
+            {'matches': 1, 'performances': 2, 'new_lane_records': new} for new in (3, 2, 2)]
+
+        # The performances returned to the caller are not changed
+        assert 'cup_match_id' not in performances[0] and performances[0]['match_id'] == matches[2].id
+
+
+if __name__ == "__main__":
+    test_match_day_details()
+    print("All result writer tests passed")
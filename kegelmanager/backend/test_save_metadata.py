@@ -0,0 +1,90 @@
+"""
+Test script for the cached save metadata.
+
+A temporary save is listed repeatedly; it must only be opened again after it
+was changed. A season run refreshes the sidecar once, not per match day.
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import Season
+import save_metadata
+import save_registry
+import simulation
+from save_fixtures import create_save, create_test_app, open_save, import_app
+from world_generator import create_world_database
+
+
+def test_metadata_is_cached_until_the_save_changes():
+    """Unchanged saves are served from the sidecar, changed saves are read again."""
+    with tempfile.TemporaryDirectory() as directory:
+        # The connection stays open like the engine of the running app
+        db_path = create_save(os.path.join(directory, 'career.db'), clubs=3, players=30)
+        live = sqlite3.connect(db_path)
+
+        metadata = save_metadata.get_save_metadata(db_path)
+        assert metadata['current_season'] == 'Season 2025'
+        assert metadata['club_count'] == 3 and metadata['player_count'] == 30
+        assert os.path.exists(save_metadata.get_metadata_path(db_path))
+
+        original_read = save_metadata._read_save_stats
+        reads = []
+        save_metadata._read_save_stats = lambda path: reads.append(path) or original_read(path)
+        try:
+            save_metadata.get_save_metadata(db_path)
+            assert reads == []
+
+            live.execute("DELETE FROM player WHERE id = 1")
+            live.commit()
+            assert save_metadata.get_save_metadata(db_path)['player_count'] == 29
+            assert len(reads) == 1
+        finally:
+            save_metadata._read_save_stats = original_read
+
+        # The time of the last simulation survives a re-validation
+        simulated = save_metadata.refresh_save_metadata(db_path, simulated=True)
+        live.execute("UPDATE season SET name = 'Season 2026'")
+        live.commit()
+        metadata = save_metadata.get_save_metadata(db_path)
+        assert metadata['current_season'] == 'Season 2026'
+        assert metadata['last_simulated'] == simulated['last_simulated'] is not None
+
+        live.close()
+        save_metadata.delete_save_metadata(db_path)
+        assert not os.path.exists(save_metadata.get_metadata_path(db_path))
+
+
+def test_season_run_refreshes_metadata_once():
+    """A season run refreshes the sidecar once at its end, not after every match day."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'season.db')
+        create_world_database(db_path, seed=5, levels=1, branching=1, teams_per_league=4, youth_levels=0, regions=1)
+        import_app(db_path)  # simulate_season uses app.auto_initialize_cups
+
+        original_refresh = save_metadata.refresh_save_metadata
+        refreshes = []
+        save_metadata.refresh_save_metadata = lambda path, simulated=False: (
+            refreshes.append(simulated) or original_refresh(path, simulated=simulated))
+        try:
+            with open_save(create_test_app(db_path)):
+                season = Season.query.filter_by(is_current=True).first()
+                result = simulation.simulate_season(season, create_new_season=False)
+        finally:
+            save_metadata.refresh_save_metadata = original_refresh
+
+        assert result['matches_simulated'] > 0
+        assert refreshes == [True]
+        assert save_metadata.get_save_metadata(db_path)['last_simulated'] is not None
+        save_registry.evict_save(db_path)
+
+
+if __name__ == "__main__":
+    test_metadata_is_cached_until_the_save_changes()
+    test_season_run_refreshes_metadata_once()
+    print("All save metadata tests passed")
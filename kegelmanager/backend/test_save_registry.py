@@ -0,0 +1,137 @@
+"""
+Test script for runtime save switching.
+
+Two temporary saves are created; a minimal Flask app switches between them
+without being recreated.
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sqlite3
+
+from flask import jsonify
+from models import db, Season
+import save_registry
+import storage_profiles
+from save_fixtures import create_test_app, create_save
+
+
+def _current_season_name():
+    return Season.query.filter_by(is_current=True).first().name
+
+
+def test_switch_saves():
+    """Requests follow the active save, a running app context keeps its save."""
+    with tempfile.TemporaryDirectory() as directory:
+        first = create_save(os.path.join(directory, 'first.db'), 'Season 2025')
+        second = create_save(os.path.join(directory, 'second.db'), 'Season 2030')
+
+        app = create_test_app(first)
+        save_registry.init_save_registry(app, first)
+
+        with app.app_context():
+            assert _current_season_name() == 'Season 2025'
+
+            switch = save_registry.activate_save(app, second)
+            assert switch['name'] == 'second.db'
+
+            # Pinned to the save the context started with
+            assert _current_season_name() == 'Season 2025'
+            db.session.remove()
+
+        with app.app_context():
+            assert _current_season_name() == 'Season 2030'
+            assert str(db.engine.url).endswith('second.db')
+            db.session.remove()
+
+        assert app.config['SQLALCHEMY_DATABASE_URI'].endswith('second.db')
+
+        for db_path in (first, second):
+            save_registry.evict_save(db_path)
+
+
+def test_lru_eviction():
+    """Engines beyond MAX_OPEN_SAVES are disposed, the active save is kept."""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [create_save(os.path.join(directory, f'save{i}.db'), f'Season {2020 + i}') for i in range(4)]
+
+        app = create_test_app(paths[0])
+        save_registry.init_save_registry(app, paths[0])
+
+        original_max = save_registry.MAX_OPEN_SAVES
+        save_registry.MAX_OPEN_SAVES = 2
+        try:
+            for db_path in paths[1:]:
+                save_registry.activate_save(app, db_path)
+
+            open_paths = [engine['path'] for engine in save_registry.get_registry_stats()['engines']]
+            assert len(open_paths) == 2
+            assert os.path.abspath(paths[-1]) in open_paths
+            assert os.path.abspath(paths[0]) not in open_paths
+
+            # An evicted save can be activated again
+            save_registry.activate_save(app, paths[0])
+            with app.app_context():
+                assert _current_season_name() == 'Season 2020'
+                db.session.remove()
+        finally:
+            save_registry.MAX_OPEN_SAVES = original_max
+            for db_path in paths:
+                save_registry.evict_save(db_path)
+
+
+def test_read_write_split():
+    """GET requests read one snapshot through the read-only pool, @uses_writer views may write."""
+    # Readers and the writer only run concurrently with the WAL journal
+    storage_profiles.install_storage_profiles('interactive')
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = create_save(os.path.join(directory, 'split.db'))
+
+        app = create_test_app(db_path)
+        save_registry.init_save_registry(app, db_path)
+
+        @app.route('/snapshot')
+        def snapshot():
+            before = Season.query.count()
+            # A commit of another connection (e.g. the simulation) during the request
+            connection = sqlite3.connect(db_path)
+            connection.execute("INSERT INTO season (name, start_date, end_date, is_current) "
+                               "VALUES ('Season 2026', '2026-08-01', '2027-05-31', 0)")
+            connection.commit()
+            connection.close()
+            return jsonify(before=before, after=Season.query.count())
+
+        @app.route('/write-in-get')
+        def write_in_get():
+            db.session.add(Season(name='Season 2040', start_date=date(2040, 8, 1), end_date=date(2041, 5, 31)))
+            db.session.commit()
+            return jsonify(ok=True)
+
+        @app.route('/write-with-writer')
+        @save_registry.uses_writer
+        def write_with_writer():
+            return write_in_get()
+
+        client = app.test_client()
+        assert client.get('/snapshot').get_json() == {'before': 1, 'after': 1}
+        # The next request sees the new commit
+        assert client.get('/snapshot').get_json()['before'] == 2
+
+        assert client.get('/write-in-get').status_code == 500
+        assert client.get('/write-with-writer').status_code == 200
+
+        save_registry.evict_save(db_path)
+
+
+if __name__ == "__main__":
+    test_switch_saves()
+    test_lru_eviction()
+    test_read_write_split()
+    print("All save registry tests passed")
@@ -0,0 +1,104 @@
+"""
+Test script for save cloning, checkpoints and restore.
+
+The saves are small temporary SQLite databases in WAL mode; an open
+connection keeps using the save while it is copied and restored.
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import save_snapshots
+from save_fixtures import create_save
+from progress import add_progress_listener, remove_progress_listener
+
+
+def _open_save(directory):
+    """A save with 2000 players and a connection whose last commit is still in the WAL."""
+    db_path = create_save(os.path.join(directory, 'career.db'), clubs=4, players=2000)
+    connection = sqlite3.connect(db_path)
+    connection.execute("UPDATE player SET strength = strength + 1")
+    connection.commit()
+    return db_path, connection
+
+
+def _player_count(db_path, where="1"):
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(f"SELECT COUNT(*) FROM player WHERE {where}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_save_as_with_progress():
+    """A save in use is cloned step by step, uncheckpointed WAL pages included."""
+    events = []
+    listener = lambda event, data: events.append(data) if event == 'backup_progress' else None
+    add_progress_listener(listener)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            db_path, live = _open_save(directory)
+            target_path = os.path.join(directory, 'career_copy.db')
+
+            result = save_snapshots.backup_database(db_path, target_path, pages_per_step=10)
+            live.close()
+
+            assert _player_count(target_path) == 2000
+            assert _player_count(target_path, "strength = 0") == 0  # the update in the WAL
+            assert result['steps'] > 1
+            assert not os.path.exists(f"{target_path}.partial")
+            assert events[-1]['remaining_pages'] == 0 and events[-1]['percent'] == 100.0
+
+            try:
+                save_snapshots.save_as(db_path, target_path)
+            except FileExistsError:
+                pass
+            else:
+                raise AssertionError("FileExistsError expected")
+    finally:
+        remove_progress_listener(listener)
+
+
+def test_checkpoint_retention_and_restore():
+    """Automatic checkpoints are pruned, manual ones kept; restore brings back the old state."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path, live = _open_save(directory)
+
+        manual = save_snapshots.create_checkpoint(db_path, reason='manual', label='Vor dem Transfer')
+        assert manual['season'] == 'Season 2025'
+        for _ in range(save_snapshots.MAX_AUTO_CHECKPOINTS + 2):
+            save_snapshots.create_checkpoint(db_path, reason='pre_transition')
+
+        checkpoints = save_snapshots.list_checkpoints(db_path)
+        reasons = [checkpoint['reason'] for checkpoint in checkpoints]
+        assert reasons.count('pre_transition') == save_snapshots.MAX_AUTO_CHECKPOINTS
+        assert reasons.count('manual') == 1
+
+        live.execute("DELETE FROM player WHERE id > 500")
+        live.commit()
+        assert _player_count(db_path) == 500
+
+        result = save_snapshots.restore_checkpoint(db_path, manual['name'])
+        assert result['safety_checkpoint'] is not None
+
+        # The connection that was open during the restore sees the restored save
+        assert live.execute("SELECT COUNT(*) FROM player").fetchone()[0] == 2000
+        live.close()
+
+        try:
+            save_snapshots.restore_checkpoint(db_path, '../career.db')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("ValueError expected")
+
+
+if __name__ == "__main__":
+    test_save_as_with_progress()
+    test_checkpoint_retention_and_restore()
+    print("All save snapshot tests passed")
@@ -0,0 +1,157 @@
+"""
+Test script for the cold-season archive.
+
+A small save with a completed and a current season is built in a temporary
+database; statistics and match details must be the same before and after the
+completed season is archived.
+"""
+
+import sys
+import os
+import random
+from datetime import date, datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import (db, Season, League, Club, Team, Player, Match, Cup, CupMatch, PlayerMatchPerformance,
+                    PlayerCupMatchPerformance, PlayerSeasonStats)
+import season_archive
+from save_fixtures import temporary_save
+
+
+def _performance(model, match_field, match_id, player, team_id, is_home, position, rng):
+    lanes = [rng.randint(110, 160) for _ in range(4)]
+    return model(**{
+        match_field: match_id,
+        'player_id': player.id,
+        'team_id': team_id,
+        'is_home_team': is_home,
+        'position_number': position,
+        'is_substitute': False,
+        'lane1_score': lanes[0], 'lane2_score': lanes[1], 'lane3_score': lanes[2], 'lane4_score': lanes[3],
+        'total_score': sum(lanes),
+        'volle_score': sum(lanes) - 180,
+        'raeumer_score': 180,
+        'fehler_count': rng.randint(0, 6),
+        'set_points': rng.choice([0.0, 0.5, 1.0, 2.0]),
+        'match_points': rng.randint(0, 1)
+    })
+
+
+def _build_world():
+    """Two seasons with one league (two teams of two players) and a cup match each."""
+    rng = random.Random(3)
+    old_season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31), is_current=False)
+    new_season = Season(name='Season 2026', start_date=date(2026, 8, 1), end_date=date(2027, 5, 31), is_current=True)
+    db.session.add_all([old_season, new_season])
+    db.session.flush()
+
+    club = Club(name='KSV Test')
+    db.session.add(club)
+    db.session.flush()
+
+    old_league = League(name='Kreisliga', level=1, season_id=old_season.id)
+    new_league = League(name='Kreisliga', level=1, season_id=new_season.id)
+    db.session.add_all([old_league, new_league])
+    db.session.flush()
+
+    teams = [Team(name=f'KSV Test {i}', club_id=club.id, league_id=new_league.id) for i in (1, 2)]
+    db.session.add_all(teams)
+    players = [Player(name=f'Spieler {i}', age=25, strength=60, talent=5, club_id=club.id) for i in range(4)]
+    db.session.add_all(players)
+    db.session.flush()
+    teams[0].players.extend(players[:2])
+    teams[1].players.extend(players[2:])
+
+    for season, league in ((old_season, old_league), (new_season, new_league)):
+        for match_day in (1, 2):
+            home, away = (teams[0], teams[1]) if match_day == 1 else (teams[1], teams[0])
+            match = Match(home_team_id=home.id, away_team_id=away.id, league_id=league.id, season_id=season.id,
+                          match_date=datetime(season.start_date.year, 9, match_day), is_played=True, match_day=match_day)
+            db.session.add(match)
+            db.session.flush()
+            for team, is_home in ((home, True), (away, False)):
+                for position, player in enumerate(team.players, start=1):
+                    db.session.add(_performance(PlayerMatchPerformance, 'match_id', match.id, player, team.id,
+                                                is_home, position, rng))
+
+        cup = Cup(name='Kreispokal', cup_type='Kreispokal', season_id=season.id)
+        db.session.add(cup)
+        db.session.flush()
+        cup_match = CupMatch(cup_id=cup.id, home_team_id=teams[0].id, away_team_id=teams[1].id,
+                             round_name='Finale', round_number=1, is_played=True)
+        db.session.add(cup_match)
+        db.session.flush()
+        for team, is_home in ((teams[0], True), (teams[1], False)):
+            for position, player in enumerate(team.players, start=1):
+                db.session.add(_performance(PlayerCupMatchPerformance, 'cup_match_id', cup_match.id, player, team.id,
+                                            is_home, position, rng))
+
+    db.session.commit()
+    return old_season, old_league, teams, players
+
+
+def _snapshot(old_season, old_league, teams, players):
+    old_match = Match.query.filter_by(season_id=old_season.id, match_day=1).first()
+    old_cup_match = CupMatch.query.join(Cup).filter(Cup.season_id == old_season.id).first()
+
+    def without_ids(performances):
+        return sorted((tuple(sorted((k, v) for k, v in p.items() if k != 'id')) for p in performances))
+
+    return {
+        'career': [player.calculate_stats() for player in players],
+        'team': [player.calculate_team_specific_stats(teams[0].id) for player in players[:2]],
+        'team_season': [player.calculate_team_specific_stats(teams[0].id, old_season.id) for player in players[:2]],
+        'league': sorted(old_league.get_player_statistics(), key=lambda stats: stats['player_id']),
+        'match': without_ids(old_match.to_dict()['performances']),
+        'cup_match': without_ids(old_cup_match.to_dict()['performances'])
+    }
+
+
+def test_archive_keeps_statistics():
+    """Archiving moves the old season's rows out of the hot tables without changing any statistic."""
+    with temporary_save('archive.db'):
+        PlayerSeasonStats.__table__.drop(db.engine)  # like a save from before the archive
+        old_season, old_league, teams, players = _build_world()
+
+        before = _snapshot(old_season, old_league, teams, players)
+        assert before['career'][0]['total_matches'] == 4
+        assert len(before['match']) == 4
+
+        results = season_archive.archive_completed_seasons()
+        assert [result['season_id'] for result in results] == [old_season.id]
+        assert results[0]['league_performances'] == 8 and results[0]['cup_performances'] == 4
+        db.session.expire_all()
+
+        # Only the current season is left in the hot tables
+        assert PlayerMatchPerformance.query.count() == 8
+        assert PlayerCupMatchPerformance.query.count() == 4
+        assert season_archive.archive_completed_seasons() == []
+
+        after = _snapshot(old_season, old_league, teams, players)
+        for key in before:
+            assert before[key] == after[key], key
+
+        record = season_archive.find_archived_performance(players[0].id, Match.query.filter_by(
+            season_id=old_season.id, match_day=1).first().id)
+        assert record['team_id'] == teams[0].id and record['team_name'] == 'KSV Test 1'
+
+
+def test_columnar_encoding_round_trip():
+    """Missing values survive the columnar encoding."""
+    columns = {name: [1, None] for name, _ in season_archive.ARCHIVE_COLUMNS}
+    columns['set_points'] = [0.5, None]
+    columns['is_home_team'] = [True, False]
+    decoded = season_archive.decode_performances(season_archive.encode_performances(columns))
+
+    first = season_archive._row_values(decoded, 0)
+    second = season_archive._row_values(decoded, 1)
+    assert first['set_points'] == 0.5 and first['is_home_team'] is True
+    assert second['lane1_score'] is None and second['set_points'] is None and second['is_home_team'] is False
+
+
+if __name__ == "__main__":
+    test_archive_keeps_statistics()
+    test_columnar_encoding_round_trip()
+    print("All season archive tests passed")
@@ -0,0 +1,123 @@
+"""
+Test script for the streaming season export.
+
+The save of the season archive test is exported in every format; all formats
+must contain the same rows, also after the completed season was archived.
+"""
+
+import sys
+import os
+import csv
+import gzip
+import io
+import json
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, Match, Cup, CupMatch, LeagueHistory, PlayerHistory
+import season_archive
+import season_export
+from save_fixtures import temporary_save
+from test_season_archive import _build_world
+
+
+def _export(dataset, season_ids, export_format, compress=False):
+    stats = {}
+    data = b''.join(season_export.export_dataset(dataset, season_ids, export_format, compress, stats))
+    if compress and export_format != 'columnar':
+        data = gzip.decompress(data)
+    return data, stats['rows']
+
+
+def _rows(dataset, season_ids, export_format):
+    """Exported rows as lists of strings (missing values as '')."""
+    data, count = _export(dataset, season_ids, export_format)
+    if export_format == 'csv':
+        rows = list(csv.reader(io.StringIO(data.decode('utf-8'))))[1:]
+    elif export_format == 'ndjson':
+        rows = [['' if value is None else str(value) for value in json.loads(line).values()]
+                for line in data.decode('utf-8').splitlines()]
+    else:
+        rows = []
+        for row_group in season_export.read_columnar(io.BytesIO(data)):
+            columns = list(row_group.values())
+            for index in range(len(columns[0])):
+                row = []
+                for column in columns:
+                    value = column[index].item()
+                    if value is None or (column.dtype.kind == 'i' and value == -1) or value != value:
+                        value = ''  # NaT, -1, NaN
+                    elif column.dtype.kind == 'M':
+                        value = value.isoformat()
+                    elif column.dtype.kind == 'i' and column.dtype.itemsize == 1:
+                        value = bool(value)
+                    row.append(str(value))
+                rows.append(row)
+    assert len(rows) == count
+    return rows
+
+
+def test_formats_and_archive():
+    """csv, ndjson and columnar contain the same rows, hot and archived."""
+    with temporary_save('export.db'):
+        old_season, old_league, teams, players = _build_world()
+        Match.query.update({'home_score': 1100, 'away_score': 1050, 'home_match_points': 2, 'away_match_points': 0})
+        current_cup = Cup.query.filter(Cup.season_id != old_season.id).first()
+        db.session.add(CupMatch(cup_id=current_cup.id, home_team_id=teams[0].id, away_team_id=None,
+                                round_name='1. Runde', round_number=1, is_played=True, winner_team_id=teams[0].id))
+        db.session.add(LeagueHistory(league_name='Kreisliga', league_level=1, season_id=old_season.id,
+                                     season_name=old_season.name, team_id=teams[0].id, team_name=teams[0].name,
+                                     position=1, games_played=2, wins=2, table_points=6))
+        db.session.add_all([PlayerHistory(player_id=player.id, season_id=old_season.id, season_name=old_season.name,
+                                          player_name=player.name, age=24, strength=58, talent=5)
+                            for player in players])
+        db.session.commit()
+
+        assert season_export.resolve_season_ids('all') == [1, 2]
+        assert season_export.resolve_season_ids('current') == [2]
+        assert season_export.resolve_season_ids('2, 1') == [1, 2]
+        try:
+            season_export.resolve_season_ids('3')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("ValueError expected")
+
+        # Several row groups per file
+        original_chunk_rows = season_export.EXPORT_CHUNK_ROWS
+        season_export.EXPORT_CHUNK_ROWS = 3
+        try:
+            for dataset in season_export.DATASETS:
+                exported = [_rows(dataset, [1, 2], export_format) for export_format in season_export.EXPORT_FORMATS]
+                assert exported[0] == exported[1] == exported[2], dataset
+
+            assert len(_rows('performances', [1, 2], 'csv')) == 16
+            assert len(_rows('player_history', [1], 'csv')) == 4
+            # Final table of the old season, live table of the current season
+            standings = _rows('standings', [1, 2], 'csv')
+            assert [(row[0], row[3]) for row in standings] == [('1', '1'), ('2', '1'), ('2', '2')]
+            # The bye has no away team
+            assert ['', ''] in [row[11:13] for row in _rows('cup_matches', [2], 'csv')]
+
+            csv_data, _ = _export('performances', [1, 2], 'csv')
+            assert _export('performances', [1, 2], 'csv', compress=True)[0] == csv_data
+            assert list(season_export.read_columnar(io.BytesIO(
+                _export('performances', [1], 'columnar', compress=True)[0])))[0]['total_score'].size == 3
+
+            # Archived performances are exported like hot ones
+            hot = {dataset: sorted(_rows(dataset, [1], 'csv')) for dataset in ('performances', 'cup_performances')}
+            season_archive.archive_season(old_season.id)
+            for dataset, rows in hot.items():
+                for export_format in season_export.EXPORT_FORMATS:
+                    assert sorted(_rows(dataset, [1], export_format)) == rows, (dataset, export_format)
+        finally:
+            season_export.EXPORT_CHUNK_ROWS = original_chunk_rows
+
+        assert season_export.export_filename('performances', [1, 2], 'csv', True) == 'performances_seasons_1-2.csv.gz'
+        assert season_export.export_filename('matches', [2], 'columnar', True) == 'matches_season_2.npz'
+
+
+if __name__ == "__main__":
+    test_formats_and_archive()
+    print("All season export tests passed")
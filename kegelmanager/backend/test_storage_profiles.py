@@ -0,0 +1,61 @@
+"""
+Test script for the SQLite storage profiles.
+
+A temporary database is opened through a minimal Flask app; the pragmas of the
+session connection are checked inside and outside of a bulk block.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from models import db
+import storage_profiles
+from save_fixtures import temporary_save
+
+
+def _pragma(name):
+    return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_profiles_on_session_connection():
+    """New connections use WAL; use_storage_profile re-tunes the connection in use."""
+    storage_profiles.install_storage_profiles('interactive')
+
+    with temporary_save('profiles.db'):
+        assert _pragma('journal_mode') == 'wal'
+        assert _pragma('synchronous') == 1      # NORMAL
+        assert _pragma('query_only') == 0
+
+        with storage_profiles.use_storage_profile('bulk'):
+            assert storage_profiles.get_active_profile() == 'bulk'
+            assert _pragma('synchronous') == 1  # NORMAL, a crash must not damage the save
+            assert _pragma('cache_size') == -262144
+
+        assert storage_profiles.get_active_profile() == 'interactive'
+        assert _pragma('synchronous') == 1
+
+        @storage_profiles.use_storage_profile('analytics')
+        def read_only_work():
+            return _pragma('query_only')
+
+        assert read_only_work() == 1
+        assert _pragma('query_only') == 0
+
+
+def test_unknown_profile():
+    """Unknown profile names are rejected."""
+    try:
+        storage_profiles.use_storage_profile('turbo')
+    except ValueError:
+        return
+    raise AssertionError("ValueError expected")
+
+
+if __name__ == "__main__":
+    test_profiles_on_session_connection()
+    test_unknown_profile()
+    print("All storage profile tests passed")
@@ -0,0 +1,218 @@
+"""
+Test script for the checkpoint journal of the season simulation and transition.
+
+Steps and match days are run against temporary saves and interrupted on
+purpose; a second run must skip exactly the steps whose changes were committed
+and complete what an interrupted match day left unfinished.
+"""
+
+import sys
+import os
+import re
+import tempfile
+from datetime import date
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError
+from models import (db, Season, Club, Team, Player, Match, CupMatch, SeasonCalendar, LaneRecord,
+                    PlayerMatchPerformance, PlayerCupMatchPerformance, TransitionJournal, LeagueHistory)
+import season_calendar
+import simulation
+import transition_journal
+from save_fixtures import create_test_app, open_save, temporary_save, import_app
+from world_generator import create_world_database
+
+
+class SimulatedCrash(Exception):
+    pass
+
+
+def _age_players(crash_after_commit=False, crash_before_commit=False):
+    """A non-idempotent step with one commit, like age_all_players."""
+    db.session.execute(text("UPDATE player SET age = age + 1"))
+    if crash_before_commit:
+        raise SimulatedCrash()
+    db.session.commit()
+    if crash_after_commit:
+        raise SimulatedCrash()
+    return Player.query.count()
+
+
+def _ages():
+    return [age for (age,) in db.session.query(Player.age).order_by(Player.id)]
+
+
+def test_steps_run_once():
+    """Atomic steps are recorded with their own commit, idempotent steps after they finished."""
+    with temporary_save('journal.db'):
+        TransitionJournal.__table__.drop(db.engine)  # like a save from before the journal
+        transition_journal.ensure_journal_table()
+
+        season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31), is_current=True)
+        club = Club(name='KSV Test')
+        db.session.add_all([season, club])
+        db.session.flush()
+        db.session.add_all([Player(name=f'Spieler {i}', age=20 + i, strength=60, talent=5, club_id=club.id) for i in range(3)])
+        db.session.commit()
+
+        # Interrupted before the commit: neither the aging nor the journal entry survive
+        try:
+            transition_journal.run_step(season.id, 'aging', _age_players, crash_before_commit=True, atomic=True)
+        except SimulatedCrash:
+            pass
+        assert _ages() == [20, 21, 22]
+        assert not transition_journal.is_step_completed(season.id, 'aging')
+
+        # Interrupted right after the commit: the step is done and recorded
+        try:
+            transition_journal.run_step(season.id, 'aging', _age_players, crash_after_commit=True, atomic=True)
+        except SimulatedCrash:
+            pass
+        assert _ages() == [21, 22, 23]
+        assert transition_journal.is_step_completed(season.id, 'aging')
+
+        # The resumed run skips it
+        assert transition_journal.run_step(season.id, 'aging', _age_players, atomic=True) is None
+        assert _ages() == [21, 22, 23]
+
+        calls = []
+        assert transition_journal.run_step(season.id, 'league_history', lambda: calls.append(1) or 'done') == 'done'
+        transition_journal.run_step(season.id, 'league_history', lambda: calls.append(1))
+        assert calls == [1]
+
+        # Parameters for a resumed run; recording a step again updates its entry
+        transition_journal.record_step(season.id, 'leagues', league_mapping={1: 7})
+        transition_journal.record_step(season.id, 'leagues', league_mapping={1: 8})
+        db.session.commit()
+        assert transition_journal.get_step_params(season.id, 'leagues') == {'league_mapping': {'1': 8}}
+        assert transition_journal.get_step_params(season.id, 'new_season') is None
+
+        assert transition_journal.is_transition_started(season.id) is False
+        pending = transition_journal.get_pending_transition_steps(season.id)
+        assert 'aging' not in pending and 'leagues' not in pending and pending[0] == 'checkpoint'
+        assert [entry['step'] for entry in transition_journal.get_journal(season.id)] == [
+            'aging', 'league_history', 'leagues']
+
+
+def _best_scores_on_lanes():
+    """Best individual and team score played on the lanes of every club (hot tables)."""
+    best = {}
+    for match_model, performance_model, match_column in (
+            (Match, PlayerMatchPerformance, PlayerMatchPerformance.match_id),
+            (CupMatch, PlayerCupMatchPerformance, PlayerCupMatchPerformance.cup_match_id)):
+        for club_id, score in db.session.query(Team.club_id, func.max(performance_model.total_score)).join(
+                match_model, match_model.id == match_column).join(
+                Team, Team.id == match_model.home_team_id).group_by(Team.club_id):
+            best[('individual', club_id)] = max(score, best.get(('individual', club_id), 0))
+        for club_id, home_score, away_score in db.session.query(
+                Team.club_id, func.max(match_model.home_score), func.max(match_model.away_score)).join(
+                Team, Team.id == match_model.home_team_id).filter(match_model.is_played == True).group_by(Team.club_id):
+            best[('team', club_id)] = max(home_score, away_score, best.get(('team', club_id), 0))
+    return best
+
+
+def _best_lane_records():
+    return {(record_type, club_id): score for record_type, club_id, score in db.session.query(
+        LaneRecord.record_type, LaneRecord.club_id, func.max(LaneRecord.score)).group_by(
+        LaneRecord.record_type, LaneRecord.club_id)}
+
+
+def test_league_history_key_in_older_saves():
+    """The unique key of league_history is added to older saves, duplicates are removed first."""
+    with temporary_save('journal.db'):
+        # Like a save from before the key: the table without its constraint, a transition saved twice
+        create_sql = db.session.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'league_history'")).scalar()
+        db.session.execute(text("DROP TABLE league_history"))
+        db.session.execute(text(re.sub(r",\s*CONSTRAINT uq_league_history_season_team UNIQUE \(season_id, team_id\)",
+                                       "", create_sql)))
+        season = Season(name='Season 2025', start_date=date(2025, 8, 1), end_date=date(2026, 5, 31))
+        db.session.add(season)
+        db.session.flush()
+        for team_id, position in ((1, 1), (2, 2), (1, 1), (2, 2), (3, 3)):
+            db.session.add(LeagueHistory(league_name='Kreisliga', league_level=1, season_id=season.id,
+                                         season_name=season.name, team_id=team_id, team_name=f'Team {team_id}',
+                                         position=position))
+        db.session.commit()
+        first_ids = [history_id for (history_id,) in db.session.query(func.min(LeagueHistory.id)).group_by(
+            LeagueHistory.team_id).order_by(LeagueHistory.team_id)]
+
+        transition_journal._checked_databases.discard(str(db.engine.url))
+        transition_journal.ensure_journal_table()
+
+        assert [history_id for (history_id,) in db.session.query(LeagueHistory.id).order_by(
+            LeagueHistory.team_id)] == first_ids
+        db.session.add(LeagueHistory(league_name='Kreisliga', league_level=1, season_id=season.id,
+                                     season_name=season.name, team_id=3, team_name='Team 3', position=3))
+        try:
+            db.session.commit()
+            raise AssertionError("Duplicate league history entry was saved")
+        except IntegrityError:
+            db.session.rollback()
+
+    # New saves have the key from create_all and get no second index
+    with temporary_save('journal.db'):
+        transition_journal._checked_databases.discard(str(db.engine.url))
+        transition_journal.ensure_journal_table()
+        indexes = db.inspect(db.engine).get_indexes('league_history')
+        assert 'uq_league_history_season_team' not in [index['name'] for index in indexes]
+
+
+def test_resume_repairs_interrupted_match_day():
+    """A run stopped between a match day commit and its calendar flag is completed on resume."""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'resume.db')
+        create_world_database(db_path, seed=5, levels=1, branching=1, teams_per_league=4, youth_levels=0, regions=1)
+        import_app(db_path)  # simulate_season uses app.auto_initialize_cups
+
+        with open_save(create_test_app(db_path)):
+            season = Season.query.filter_by(is_current=True).first()
+
+            def crash(*args, **kwargs):
+                raise SimulatedCrash()
+
+            # The simulation stops right after committing the first match day, before the calendar day is marked
+            original_mark = season_calendar.mark_calendar_day_simulated
+            season_calendar.mark_calendar_day_simulated = crash
+            try:
+                simulation.simulate_season(season, create_new_season=False)
+            except SimulatedCrash:
+                db.session.rollback()
+            else:
+                raise AssertionError("Interrupted run expected")
+            finally:
+                season_calendar.mark_calendar_day_simulated = original_mark
+
+            # The first match day is committed completely: results, performances, lane records and journal entry
+            journal = transition_journal.get_journal(season.id)
+            assert len(journal) == 1
+            first_day = journal[0]['params']
+            played = Match.query.filter_by(is_played=True).count() + CupMatch.query.filter_by(is_played=True).count()
+            assert played == first_day['matches'] > 0
+            assert PlayerMatchPerformance.query.count() + PlayerCupMatchPerformance.query.count() == first_day['performances'] > 0
+            assert LaneRecord.query.count() == first_day['new_lane_records'] > 0
+            # ... but not its calendar flag
+            assert SeasonCalendar.query.filter_by(season_id=season.id, is_simulated=True).count() == 0
+
+            # Resuming repairs the first match day and plays the rest of the season
+            result = simulation.simulate_season(season, create_new_season=False)
+            assert result['matches_simulated'] > 0
+            assert Match.query.filter_by(season_id=season.id, is_played=False).count() == 0
+
+            journal = transition_journal.get_journal(season.id)
+            first_date = journal[0]['step'].split(':')[2]
+            assert SeasonCalendar.query.filter_by(season_id=season.id, is_simulated=False).filter(
+                SeasonCalendar.calendar_date == date.fromisoformat(first_date)).count() == 0
+
+            # The best records are the best scores ever played on every club's lanes
+            assert _best_lane_records() == _best_scores_on_lanes()
+
+
+if __name__ == "__main__":
+    test_steps_run_once()
+    test_league_history_key_in_older_saves()
+    test_resume_repairs_interrupted_match_day()
+    print("All transition journal tests passed")
@@ -0,0 +1,98 @@
+"""
+Test script for the synthetic world generator.
+
+Small worlds are generated into temporary save files; the same seed must
+produce the same world, every league must get a complete double round robin
+and a world of a few thousand players must be built within its budget. The
+100k-player world is measured by benchmarks.py (world_build, size xlarge).
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+from collections import Counter
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation import build_round_robin_fixtures
+from world_generator import create_world_database
+
+
+WORLD_OPTIONS = dict(levels=3, branching=2, teams_per_league=6, youth_levels=1, regions=2)
+
+# 40 leagues, 400 teams, ~4k players
+TIMED_WORLD_OPTIONS = dict(levels=4, branching=3, teams_per_league=10)
+
+# Budgets for the timed world; measured 0.33-0.42 s in total and 0.08-0.13 s for the bulk inserts
+TIMED_WORLD_SECONDS = 1.0
+TIMED_WORLD_INSERT_SECONDS = 0.3
+
+
+def _read_world(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        return {
+            'players': connection.execute("SELECT name, talent, strength FROM player ORDER BY id").fetchall(),
+            'teams': connection.execute("SELECT name, league_id FROM team ORDER BY id").fetchall(),
+            'matches': connection.execute(
+                "SELECT league_id, home_team_id, away_team_id, match_day FROM match ORDER BY id").fetchall()
+        }
+    finally:
+        connection.close()
+
+
+def test_round_robin_fixtures():
+    """Every pair meets twice, once at home, and every team plays once per match day."""
+    team_ids = [11, 12, 13, 14, 15]
+    fixtures = build_round_robin_fixtures(team_ids)
+
+    pairs = Counter((home, away) for home, away, _, _ in fixtures)
+    assert len(pairs) == len(team_ids) * (len(team_ids) - 1)
+    assert set(pairs.values()) == {1}
+
+    for match_day in {day for _, _, day, _ in fixtures}:
+        playing = [team for home, away, day, _ in fixtures if day == match_day for team in (home, away)]
+        assert len(playing) == len(set(playing))
+
+
+def test_world_is_deterministic():
+    """The same seed produces the same world, a different seed a different one."""
+    with tempfile.TemporaryDirectory() as directory:
+        first = os.path.join(directory, 'first.db')
+        second = os.path.join(directory, 'second.db')
+        other = os.path.join(directory, 'other.db')
+
+        summary = create_world_database(first, seed=3, **WORLD_OPTIONS)
+        create_world_database(second, seed=3, **WORLD_OPTIONS)
+        create_world_database(other, seed=4, **WORLD_OPTIONS)
+
+        world = _read_world(first)
+        assert world == _read_world(second)
+        assert world['players'] != _read_world(other)['players']
+
+        # 7 Herren leagues plus 1 youth league with 6 teams each
+        assert summary['leagues'] == 8
+        assert summary['teams'] == len(world['teams']) == 48
+        assert summary['players'] == len(world['players'])
+
+        matches_per_league = Counter(league_id for league_id, _, _, _ in world['matches'])
+        assert set(matches_per_league.values()) == {6 * 5}
+
+
+def test_world_build_time():
+    """A world with a few thousand players is built within the time budgets."""
+    with tempfile.TemporaryDirectory() as directory:
+        summary = create_world_database(os.path.join(directory, 'timed.db'), seed=1, **TIMED_WORLD_OPTIONS)
+
+        assert summary['players'] > 3000
+        assert summary['insert_s'] < TIMED_WORLD_INSERT_SECONDS, summary
+        assert summary['duration_s'] < TIMED_WORLD_SECONDS, summary
+
+
+if __name__ == "__main__":
+    test_round_robin_fixtures()
+    test_world_is_deterministic()
+    test_world_build_time()
+    print("All world generator tests passed")
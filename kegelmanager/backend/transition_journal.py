@@ -0,0 +1,358 @@
+"""
+Checkpoint journal of the season simulation and the season transition.
+
+Every simulated match day and every step of the season transition is recorded
+in the transition_journal table (one entry per season and step, with the
+parameters a later run needs, e.g. the ID of the new season). A run that was
+interrupted - a crash, a closed window, a killed process - continues from the
+last completed step instead of starting over:
+
+- Steps that cannot run twice (aging, retirements, promotion/relegation, player
+  development, replacement players, activating the new season) commit their
+  journal entry together with their own changes, so they either happened and
+  are recorded, or neither.
+- All other steps are idempotent (they skip what already exists) and are
+  recorded after they finished.
+
+A match day is journaled in the transaction that commits its results,
+performances and lane records, so it is either played completely or not at
+all. The next cup rounds and the simulated flag of the calendar day follow
+after that commit and may be missing after an interruption.
+repair_interrupted_match_days() compares the match-day entries with the
+calendar and completes such days; simulate_season() runs it before it
+continues with the first unplayed match day, so resuming a save is simply
+simulating its current season again.
+
+MAIN FUNCTIONS:
+- ensure_journal_table(): Create the transition_journal table and the league_history key in older saves
+- is_step_completed(season_id, step): Check whether a step is in the journal
+- get_step_params(season_id, step): Parameters recorded with a step
+- record_step(season_id, step, **params): Add a journal entry to the current transaction
+- run_step(season_id, step, func, *args, atomic=False): Run a step unless it was completed before
+- is_transition_started(season_id): Check whether the transition of a season was started
+- get_journal(season_id): All journal entries of a season
+- repair_interrupted_match_days(season_id): Complete match days an interrupted run left unfinished
+- resume_simulation(seasons): Continue the simulation of the current save
+"""
+
+import json
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+
+from models import db, Season, LeagueHistory, TransitionJournal
+
+
+# Steps of the season transition in the order they run (journaled under the finished season)
+TRANSITION_STEPS = (
+    'checkpoint',
+    'league_history',
+    'cup_history',
+    'team_cup_history',
+    'team_achievements',
+    'new_season',
+    'leagues',
+    'league_graph',
+    'promotion_relegation',
+    'fixtures_and_cups',
+    'aging',
+    'retirements',
+    'development',
+    'history_snapshot',
+    'replacements',
+    'redistribution',
+    'activation',
+    'archive'
+)
+
+# Databases (engine URLs) already checked for the transition_journal table
+_checked_databases = set()
+
+
+def ensure_journal_table():
+    """
+    Create the transition_journal table in older saves that do not have it yet.
+
+    Older saves also lack the unique key on league_history (season_id,
+    team_id) that makes a repeated league_history step harmless, because
+    create_all() does not alter existing tables; it is added here, after
+    duplicate entries were removed.
+
+    The table is created on a connection of its own, so this has to be called
+    before the first write of a transaction (simulate_match_day and
+    process_end_of_season do this).
+    """
+    database_url = str(db.engine.url)
+    if database_url in _checked_databases:
+        return
+
+    inspector = db.inspect(db.engine)
+    table_names = inspector.get_table_names()
+    if TransitionJournal.__tablename__ not in table_names:
+        print("TransitionJournal table does not exist yet. Creating it...")
+        TransitionJournal.__table__.create(db.engine)
+    if LeagueHistory.__tablename__ in table_names:
+        _ensure_league_history_key(inspector)
+
+    _checked_databases.add(database_url)
+
+
+def _ensure_league_history_key(inspector):
+    """Add the unique key of league_history (season_id, team_id) if the table was created without it."""
+    key_columns = ['season_id', 'team_id']
+    unique_keys = inspector.get_unique_constraints('league_history') + [
+        index for index in inspector.get_indexes('league_history') if index['unique']]
+    if any(sorted(key['column_names']) == key_columns for key in unique_keys):
+        return
+
+    with db.engine.begin() as connection:
+        # Keep the first entry of a team and season, a repeated transition only added copies
+        removed = connection.execute(text(
+            "DELETE FROM league_history WHERE id NOT IN "
+            "(SELECT MIN(id) FROM league_history GROUP BY season_id, team_id)")).rowcount
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_league_history_season_team "
+            "ON league_history (season_id, team_id)"))
+    print(f"Added the unique key of league_history, removed {removed} duplicate entries")
+
+
+def match_day_step(match_day_number, calendar_date=None):
+    """Journal step name of a simulated match day."""
+    return f"match_day:{match_day_number}:{calendar_date.isoformat() if calendar_date else '-'}"
+
+
+def _get_entry(season_id, step):
+    ensure_journal_table()
+    return TransitionJournal.query.filter_by(season_id=season_id, step=step).first()
+
+
+def is_step_completed(season_id, step):
+    """
+    Check whether a step is recorded in the journal.
+
+    Args:
+        season_id: The season the step belongs to
+        step: Name of the step
+
+    Returns:
+        bool: True if the step was completed before
+    """
+    return _get_entry(season_id, step) is not None
+
+
+def get_step_params(season_id, step):
+    """
+    Get the parameters recorded with a step.
+
+    Returns:
+        dict: The parameters, or None if the step is not in the journal
+    """
+    entry = _get_entry(season_id, step)
+    if entry is None:
+        return None
+    return json.loads(entry.params) if entry.params else {}
+
+
+def record_step(season_id, step, **params):
+    """
+    Add the journal entry of a step to the current transaction.
+
+    Nothing is committed here: the entry becomes durable with the next commit,
+    which is the commit of the step's own changes.
+
+    Args:
+        season_id: The season the step belongs to
+        step: Name of the step
+        **params: JSON-serializable parameters of the step
+    """
+    entry = _get_entry(season_id, step)
+    if entry is None:
+        entry = TransitionJournal(season_id=season_id, step=step)
+        db.session.add(entry)
+    entry.params = json.dumps(params, default=str) if params else None
+    entry.completed_at = datetime.utcnow()
+
+
+def run_step(season_id, step, func, *args, atomic=False, **kwargs):
+    """
+    Run one step unless the journal shows it as completed.
+
+    Args:
+        season_id: The season the step belongs to
+        step: Name of the step
+        func: The function doing the step
+        *args, **kwargs: Arguments for func
+        atomic: func commits its changes with exactly one commit (e.g. one UPDATE of
+                all players). The journal entry is added before and committed together
+                with them, so the step can never run twice. Otherwise func must be
+                idempotent; its entry is committed after it finished.
+
+    Returns:
+        The result of func, None if the step was skipped
+    """
+    if is_step_completed(season_id, step):
+        print(f"Skipping step '{step}' of season {season_id}: already completed")
+        return None
+
+    if not atomic:
+        result = func(*args, **kwargs)
+        record_step(season_id, step)
+        db.session.commit()
+        return result
+
+    record_step(season_id, step)
+    try:
+        result = func(*args, **kwargs)
+        # Nothing left to commit if func committed as expected
+        db.session.commit()
+    except Exception:
+        # Drop the journal entry together with the half-done step
+        db.session.rollback()
+        raise
+    return result
+
+
+def is_transition_started(season_id):
+    """Check whether the season transition of a season was started (and maybe interrupted)."""
+    return is_step_completed(season_id, TRANSITION_STEPS[0])
+
+
+def get_journal(season_id):
+    """
+    Get all journal entries of a season in the order they were completed.
+
+    Returns:
+        list: Dicts with step, params and completed_at
+    """
+    ensure_journal_table()
+    entries = TransitionJournal.query.filter_by(season_id=season_id).order_by(TransitionJournal.id).all()
+    return [{
+        'step': entry.step,
+        'params': json.loads(entry.params) if entry.params else {},
+        'completed_at': entry.completed_at.isoformat() if entry.completed_at else None
+    } for entry in entries]
+
+
+def get_pending_transition_steps(season_id):
+    """Transition steps of a season that are not in the journal yet."""
+    completed = {entry['step'] for entry in get_journal(season_id)}
+    return [step for step in TRANSITION_STEPS if step not in completed]
+
+
+def repair_interrupted_match_days(season_id):
+    """
+    Complete the match days of a season that an interrupted run left unfinished.
+
+    Journaled match days whose calendar day is not marked as simulated get
+    their next cup rounds drawn and their calendar day marked.
+
+    Args:
+        season_id: The season to check
+
+    Returns:
+        dict: Number of repaired days (calendar_days)
+    """
+    from models import SeasonCalendar
+    from season_calendar import mark_calendar_day_simulated
+
+    ensure_journal_table()
+    entries = TransitionJournal.query.filter(
+        TransitionJournal.season_id == season_id,
+        TransitionJournal.step.like('match_day:%')
+    ).order_by(TransitionJournal.id).all()
+
+    journaled_steps = {entry.step for entry in entries}
+
+    unmarked = [
+        day for day in SeasonCalendar.query.filter_by(season_id=season_id, is_simulated=False)
+        if day.match_day_number and match_day_step(day.match_day_number, day.calendar_date) in journaled_steps
+    ]
+    if any(day.day_type == 'CUP_DAY' for day in unmarked):
+        from simulation import advance_completed_cup_rounds
+        advance_completed_cup_rounds(season_id, None)
+    for day in unmarked:
+        print(f"Marking calendar day {day.calendar_date} (match day {day.match_day_number}) as simulated")
+        mark_calendar_day_simulated(day.id)
+
+    if unmarked:
+        from response_cache import bump_world_version
+        bump_world_version(f"repaired match days of season {season_id}")
+    return {'calendar_days': len(unmarked)}
+
+
+def resume_simulation(seasons=1):
+    """
+    Continue the simulation of the current save from its last completed step.
+
+    Unplayed match days of the current season are simulated, then the season
+    transition runs (or continues); this is repeated for the given number of
+    seasons, so an interrupted unattended run can simply be started again.
+
+    Args:
+        seasons: Number of seasons to finish
+
+    Returns:
+        list: Summaries (season, matches_simulated, new_season_id) of the finished seasons
+    """
+    from simulation import simulate_season
+
+    summaries = []
+    for _ in range(seasons):
+        season = Season.query.filter_by(is_current=True).first()
+        if not season:
+            print("No current season found, nothing to resume")
+            break
+
+        pending = get_pending_transition_steps(season.id)
+        if len(pending) < len(TRANSITION_STEPS):
+            print(f"Resuming the transition of {season.name} at step '{pending[0]}'")
+        else:
+            print(f"Resuming {season.name}")
+
+        result = simulate_season(season)
+        summaries.append({
+            'season': result['season'],
+            'matches_simulated': result['matches_simulated'],
+            'new_season_id': result.get('new_season_id')
+        })
+        if result.get('error') or not result.get('new_season_created'):
+            print(f"Stopping: {result.get('error') or 'no new season was created'}")
+            break
+
+    return summaries
+
+
+if __name__ == "__main__":
+    # Continue an interrupted (or run an unattended) simulation of a save:
+    #   python transition_journal.py path/to/save.db [--seasons N]
+    import argparse
+    import os
+    from flask import Flask
+    from storage_profiles import install_storage_profiles
+
+    parser = argparse.ArgumentParser(description="Resume the season simulation of a save")
+    parser.add_argument('database', help="Path of the save")
+    parser.add_argument('--seasons', type=int, default=1, help="Number of seasons to finish")
+    parser.add_argument('--status', action='store_true', help="Only show the journal of the current season")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"Database not found: {args.database}")
+        sys.exit(1)
+
+    install_storage_profiles('interactive')
+    resume_app = Flask(__name__)
+    resume_app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.abspath(args.database)}"
+    resume_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(resume_app)
+    with resume_app.app_context():
+        if args.status:
+            season = Season.query.filter_by(is_current=True).first()
+            for entry in get_journal(season.id) if season else []:
+                print(f"{entry['completed_at']}  {entry['step']}")
+        else:
+            for summary in resume_simulation(args.seasons):
+                print(f"{summary['season']}: {summary['matches_simulated']} matches simulated, "
+                      f"new season {summary['new_season_id']}")
+        db.engine.dispose()
@@ -0,0 +1,675 @@
+"""
+Offline synthetic world generator for scale tests and benchmarks.
+
+init_db.create_sample_data needs Daten.xls and scrapes real club rosters over
+HTTP. This module builds a complete save (season, league pyramid with
+promotion/relegation links, clubs with second and youth teams, players,
+finances, fixtures, cups and the season calendar) from a few parameters and a
+seed, without any network access or input files. The same seed always gives
+the same world.
+
+Players follow the rules of init_db.calculate_player_attribute_by_league_level
+and init_db.generate_retirement_age, drawn with numpy for all players at once;
+the strength rules of player_development are evaluated once per distinct
+age/talent combination. All rows are written with bulk inserts and explicit
+IDs, so the target database must be empty.
+
+A world with ~106k players (levels=7, branching=3, teams_per_league=12) takes
+about 9 s: about 4 s for the bulk inserts (including ~145k league matches),
+most of the rest for the cups and the season calendar. benchmarks.py measures
+it (world_build).
+
+Usage:
+    python world_generator.py --output instance/synthetic.db --seed 1 --levels 7 --branching 3
+
+MAIN FUNCTIONS:
+- generate_world(seed, levels, branching, ...): Fill the (empty) database of the current app
+- create_world_database(db_path, **options): Create a new save file with a synthetic world
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from models import (db, Season, League, Club, Team, Player, Match, Finance, GameSettings,
+                    NotificationSettings, player_team)
+from config.config import get_config
+
+
+FIRST_NAMES = (
+    'Andreas', 'Bernd', 'Christian', 'Daniel', 'Dirk', 'Florian', 'Frank', 'Jan', 'Jens', 'Jörg',
+    'Jürgen', 'Kai', 'Klaus', 'Lars', 'Lukas', 'Marco', 'Markus', 'Martin', 'Matthias', 'Michael',
+    'Niklas', 'Oliver', 'Patrick', 'Peter', 'Ralf', 'Sebastian', 'Stefan', 'Sven', 'Thomas', 'Timo',
+    'Tobias', 'Torsten', 'Uwe', 'Volker', 'Werner', 'Wolfgang', 'Maximilian', 'Felix', 'Paul', 'Jonas'
+)
+
+LAST_NAMES = (
+    'Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker', 'Schulz', 'Hoffmann',
+    'Schäfer', 'Koch', 'Bauer', 'Richter', 'Klein', 'Wolf', 'Schröder', 'Neumann', 'Schwarz', 'Zimmermann',
+    'Braun', 'Krüger', 'Hofmann', 'Hartmann', 'Lange', 'Schmitt', 'Werner', 'Schmitz', 'Krause', 'Meier',
+    'Lehmann', 'Schmid', 'Schulze', 'Maier', 'Köhler', 'Herrmann', 'König', 'Walter', 'Mayer', 'Huber',
+    'Kaiser', 'Fuchs', 'Peters', 'Lang', 'Scholz', 'Möller', 'Weiß', 'Jung', 'Hahn', 'Vogel'
+)
+
+CLUB_PREFIXES = ('KSV', 'SKK', 'KV', 'SG', 'TSV', 'ESV', 'SV', 'KC', 'BSV', 'Post SV')
+
+TOWNS = (
+    'Altdorf', 'Bergheim', 'Birkenau', 'Buchholz', 'Dornstadt', 'Eichenau', 'Falkenberg', 'Grünwald',
+    'Hainburg', 'Hohenfels', 'Kirchberg', 'Lindau', 'Marienthal', 'Neustadt', 'Oberhausen', 'Rosenheim',
+    'Sandhausen', 'Schönberg', 'Steinbach', 'Talheim', 'Unterau', 'Waldkirch', 'Weidenberg', 'Wiesental'
+)
+
+ROMAN_NUMERALS = ("", "I", "II", "III")
+
+YOUTH_ALTERSKLASSE = 'A-Jugend'
+
+# Slots of the season calendar (see season_calendar.create_season_calendar)
+CALENDAR_SLOTS = 104
+
+
+def _club_name(index):
+    """Deterministic, unique club name for a running club number."""
+    town = TOWNS[index % len(TOWNS)]
+    prefix = CLUB_PREFIXES[(index // len(TOWNS)) % len(CLUB_PREFIXES)]
+    cycle = index // (len(TOWNS) * len(CLUB_PREFIXES))
+    return f"{prefix} {town}" if cycle == 0 else f"{prefix} {town} {cycle + 1}"
+
+
+def _team_strength(level):
+    """Team strength by league level (same formula as create_sample_data)."""
+    league_base = int(max(25, 75 - (level - 1) * 5.56))
+    return random.randint(max(30, league_base - 10), min(99, league_base + 10))
+
+
+def _players_per_team(level, config):
+    """Number of players of a team by league level (team_generation config)."""
+    if level <= 4:
+        key = 'level_1_4'
+        default_min, default_max = 8, 10
+    elif level <= 8:
+        key = 'level_5_8'
+        default_min, default_max = 7, 9
+    else:
+        key = 'level_9_plus'
+        default_min, default_max = 7, 8
+    return random.randint(
+        config.get(f'team_generation.players_per_team.{key}_min', default_min),
+        config.get(f'team_generation.players_per_team.{key}_max', default_max)
+    )
+
+
+ATTRIBUTE_NAMES = ('ausdauer', 'konstanz', 'drucksicherheit', 'volle', 'raeumer', 'sicherheit', 'auswaerts',
+                   'start', 'mitte', 'schluss')
+
+
+def _lookup(func, *columns):
+    """
+    Apply a scalar function to columns of values, calling it once per distinct combination.
+
+    The strength rules of player_development depend on a few small integers
+    (age, talent, peak strength); the players are mapped onto the results of
+    their distinct combinations instead of calling the functions per player.
+    """
+    keys, inverse = np.unique(np.column_stack(columns), axis=0, return_inverse=True)
+    results = np.array([func(*map(int, key)) for key in keys])
+    return results[inverse.reshape(-1)]
+
+
+def _generate_players(team_rows, config):
+    """
+    Generate the players of all teams with numpy, drawing every column at once.
+
+    Same rules as init_db.calculate_player_attribute_by_league_level and
+    init_db.generate_retirement_age with the same configuration values: players
+    under 27 get a random talent and the strength of their talent and age,
+    older players a strength around the team strength, aged from that peak,
+    and a talent derived from it. The other attributes scatter around the
+    current strength. Removes the _level and _altersklasse keys of the teams.
+
+    Args:
+        team_rows: Team row dicts with id, club_id, staerke, _level and _altersklasse
+        config: The game configuration
+
+    Returns:
+        tuple: (player_rows, player_team_rows)
+    """
+    from init_db import get_age_range_for_altersklasse
+    from player_development import (calculate_age_adjusted_strength, calculate_current_strength_from_talent_and_age,
+                                    calculate_talent_from_peak_strength)
+
+    base_std_dev = config.get('player_generation.attributes.base_std_dev', 5.0)
+    league_factor = config.get('player_generation.attributes.league_level_factor', 0.5)
+    min_attr = config.get('player_generation.attributes.min_attribute_value', 1)
+    max_attr = config.get('player_generation.attributes.max_attribute_value', 99)
+    talent_min = config.get('player_generation.talent.min', 1)
+    talent_max = config.get('player_generation.talent.max', 10)
+    attr_base_offset = config.get('player_generation.attributes.attr_base_value_offset', 60)
+    attr_strength_factor = config.get('player_generation.attributes.attr_strength_factor', 0.6)
+    attr_std_dev_base = config.get('player_generation.attributes.attr_std_dev_base', 5.0)
+    attr_std_dev_league_factor = config.get('player_generation.attributes.attr_std_dev_league_factor', 0.3)
+    retirement_mean = config.get('player_generation.retirement.mean_age', 37.5)
+    retirement_std_dev = config.get('player_generation.retirement.std_dev', 1.95)
+    retirement_min = config.get('player_generation.retirement.min_age', 30)
+    retirement_max = config.get('player_generation.retirement.max_age', 45)
+    contract_min = config.get('player_generation.contract.min_years', 1)
+    contract_max = config.get('player_generation.contract.max_years', 4)
+    salary_multiplier = config.get('player_generation.salary.base_multiplier', 100)
+    prime_age_min = config.get('player_generation.salary.prime_age_min', 25)
+    prime_age_max = config.get('player_generation.salary.prime_age_max', 30)
+    prime_factor = config.get('player_generation.salary.prime_age_factor', 1.5)
+    normal_factor = config.get('player_generation.salary.normal_age_factor', 1.0)
+    positions = config.get('player_generation.positions', ["Angriff", "Mittelfeld", "Abwehr"])
+
+    # One entry per player with the values of its team
+    counts = [_players_per_team(team['_level'], config) for team in team_rows]
+    age_ranges = [get_age_range_for_altersklasse(team.pop('_altersklasse')) for team in team_rows]
+    team_index = np.repeat(np.arange(len(team_rows)), counts)
+    levels = np.array([team.pop('_level') for team in team_rows])[team_index]
+    staerke = np.array([team['staerke'] for team in team_rows])[team_index]
+    ages = np.random.randint(np.array([low for low, _ in age_ranges])[team_index],
+                             np.array([high for _, high in age_ranges])[team_index] + 1)
+    count = len(ages)
+
+    # Players under 27: strength from a random talent and the age (randomized again below 14)
+    young = ages < 27
+    talents = np.random.randint(talent_min, talent_max + 1, size=count)
+    strengths = np.zeros(count, dtype=np.int64)
+    child = young & (ages <= 13)
+    teen = young & ~child
+    if teen.any():
+        strengths[teen] = _lookup(lambda talent, age: calculate_current_strength_from_talent_and_age(
+            talent, age, club_bonus=1.1), talents[teen], ages[teen])
+    strengths[child] = [calculate_current_strength_from_talent_and_age(int(talent), int(age), club_bonus=1.1)
+                        for talent, age in zip(talents[child], ages[child])]
+
+    # Older players: peak strength around the team strength, talent from the peak, decline with age
+    old = ~young
+    std_dev = base_std_dev + (levels[old] - 1) * league_factor
+    peaks = np.clip(np.random.normal(staerke[old], std_dev).astype(np.int64), min_attr, max_attr)
+    if old.any():
+        talents[old] = _lookup(calculate_talent_from_peak_strength, peaks)
+        strengths[old] = np.where(ages[old] > 27, _lookup(
+            lambda peak, age: calculate_age_adjusted_strength(
+                peak, age, calculate_talent_from_peak_strength(peak), club_bonus=1.1),
+            peaks, ages[old]), peaks)
+
+    # The other attributes scatter around the current strength
+    base_attr_value = attr_base_offset + (strengths - 50) * attr_strength_factor
+    attr_std_dev = attr_std_dev_base + (levels - 1) * attr_std_dev_league_factor
+    attributes = {
+        name: np.clip(np.random.normal(base_attr_value, attr_std_dev).astype(np.int64), min_attr, max_attr).tolist()
+        for name in ATTRIBUTE_NAMES
+    }
+
+    retirement_ages = np.clip(np.random.normal(retirement_mean, retirement_std_dev, size=count).astype(np.int64),
+                              retirement_min, retirement_max)
+    salaries = strengths * salary_multiplier * np.where(
+        (ages >= prime_age_min) & (ages <= prime_age_max), prime_factor, normal_factor)
+    first_names = np.random.randint(len(FIRST_NAMES), size=count)
+    last_names = np.random.randint(len(LAST_NAMES), size=count)
+    position_indexes = np.random.randint(len(positions), size=count)
+    contract_years = np.random.randint(contract_min, contract_max + 1, size=count)
+    now = datetime.now()
+    contract_ends = {years: (now + timedelta(days=365 * years)).date()
+                     for years in range(contract_min, contract_max + 1)}
+
+    team_ids = [team_rows[index]['id'] for index in team_index.tolist()]
+    club_ids = [team_rows[index]['club_id'] for index in team_index.tolist()]
+    player_rows = [
+        {
+            'id': player_id,
+            'name': f"{FIRST_NAMES[first]} {LAST_NAMES[last]}",
+            'age': age,
+            'position': positions[position],
+            'salary': salary,
+            'contract_end': contract_ends[years],
+            'club_id': club_id,
+            'retirement_age': retirement_age,
+            'is_retired': False,
+            'nationalitaet': 'Deutsch',
+            'strength': strength,
+            'talent': talent,
+            **{name: values[i] for name, values in attributes.items()}
+        }
+        for i, (player_id, first, last, age, position, salary, years, club_id, retirement_age, strength, talent)
+        in enumerate(zip(range(1, count + 1), first_names.tolist(), last_names.tolist(), ages.tolist(),
+                         position_indexes.tolist(), salaries.tolist(), contract_years.tolist(), club_ids,
+                         retirement_ages.tolist(), strengths.tolist(), talents.tolist()))
+    ]
+    player_team_rows = [{'player_id': player_id, 'team_id': team_id}
+                        for player_id, team_id in zip(range(1, count + 1), team_ids)]
+    return player_rows, player_team_rows
+
+
+def _build_league_tree(season_id, levels, branching, altersklasse, first_id, name_prefix,
+                       regions, districts_per_region):
+    """
+    Build the league rows of one pyramid (Herren or youth).
+
+    Level n has branching ** (n - 1) leagues. Every league promotes into its
+    parent league and relegates into its child leagues. From level 3 on the
+    leagues of a level are split into `regions` Bundesländer, from level 5 on
+    additionally into `districts_per_region` Landkreise each (one cup per
+    Bundesland/Landkreis).
+
+    Returns:
+        list: League row dicts with explicit IDs
+    """
+    rows = []
+    ids_by_position = {}
+    league_id = first_id
+
+    for level in range(1, levels + 1):
+        league_count = branching ** (level - 1)
+        for index in range(league_count):
+            bundesland = None
+            landkreis = None
+            if level >= 3:
+                bundesland = f"Region {index * regions // league_count + 1}"
+            if level >= 5:
+                landkreis = f"Kreis {index * regions * districts_per_region // league_count + 1}"
+
+            name = f"{name_prefix}Bundesliga" if level == 1 else f"{name_prefix}Liga {level}-{index + 1}"
+            ids_by_position[(level, index)] = league_id
+            rows.append({
+                'id': league_id,
+                'name': name,
+                'level': level,
+                'season_id': season_id,
+                'bundesland': bundesland,
+                'landkreis': landkreis,
+                'altersklasse': altersklasse,
+                'anzahl_aufsteiger': 1,
+                'anzahl_absteiger': 1,
+                'aufstieg_liga_id': None,
+                'abstieg_liga_id': None,
+                '_position': (level, index)
+            })
+            league_id += 1
+
+    for row in rows:
+        level, index = row.pop('_position')
+        if level > 1:
+            row['aufstieg_liga_id'] = str(ids_by_position[(level - 1, index // branching)])
+        if level < levels:
+            children = [ids_by_position[(level + 1, index * branching + offset)] for offset in range(branching)]
+            row['abstieg_liga_id'] = ';'.join(map(str, children))
+
+    return rows
+
+
+def _cup_days_needed(league_rows, team_rows):
+    """Number of cup days the cups of the world need (one day per round of every cup)."""
+    from cup_engine import get_cup_eligibility_key
+
+    leagues = {league['id']: league for league in league_rows}
+    teams_per_cup = {}
+    for team in team_rows:
+        league = leagues[team['league_id']]
+        key = get_cup_eligibility_key(league['bundesland'], league['landkreis'])
+        teams_per_cup[key] = teams_per_cup.get(key, 0) + 1
+
+    return sum(math.ceil(math.log2(count)) for count in teams_per_cup.values() if count >= 2)
+
+
+def _insert_rows(table, rows):
+    """
+    Insert row dicts into a table with one executemany on the driver connection.
+
+    Same rows as db.session.execute(table.insert(), rows), but the column
+    defaults and bind processors (dates, booleans) are applied here column by
+    column instead of by SQLAlchemy for every single parameter set, which was
+    most of the time of the large inserts. Callable defaults (created_at) are
+    evaluated once per table. All rows must have the same keys and hashable
+    values in the columns with a bind processor.
+
+    Args:
+        table: The Table to insert into
+        rows: List of row dicts
+
+    Returns:
+        float: Duration in seconds
+    """
+    start_time = time.perf_counter()
+    if not rows:
+        return 0.0
+
+    connection = db.session.connection()
+    dialect = connection.dialect
+    preparer = dialect.identifier_preparer
+
+    columns = []
+    values = []
+    for column in table.columns:
+        if column.key in rows[0]:
+            column_values = [row[column.key] for row in rows]
+        elif column.default is not None and (column.default.is_scalar or column.default.is_callable):
+            default = column.default.arg(None) if column.default.is_callable else column.default.arg
+            column_values = [default] * len(rows)
+        else:
+            continue
+
+        processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+        if processor is not None:
+            # Dates and flags have few distinct values: process each of them once
+            processed = {value: processor(value) for value in set(column_values)}
+            column_values = [processed[value] for value in column_values]
+        columns.append(column)
+        values.append(column_values)
+
+    statement = "INSERT INTO {} ({}) VALUES ({})".format(
+        preparer.format_table(table),
+        ', '.join(preparer.quote(column.name) for column in columns),
+        ', '.join('?' for _ in columns)
+    )
+    connection.exec_driver_sql(statement, list(zip(*values)))
+    return time.perf_counter() - start_time
+
+
+def generate_world(seed=42, levels=5, branching=2, teams_per_league=10, second_team_share=0.2,
+                   youth_levels=2, regions=3, districts_per_region=1, with_fixtures=True,
+                   with_cups=True, season_year=2025):
+    """
+    Generate a complete synthetic world in the database of the current app context.
+
+    Args:
+        seed: Seed for random and numpy.random
+        levels: Number of league levels of the Herren pyramid
+        branching: Number of leagues below every league (level n has branching ** (n - 1) leagues)
+        teams_per_league: Teams per league
+        second_team_share: Share of team slots from level 3 on that are filled with the
+                           second/third team of a club from a higher level
+        youth_levels: Number of levels of the A-Jugend pyramid (0 for none)
+        regions: Bundesländer per level from level 3 on (one Landespokal each)
+        districts_per_region: Landkreise per Bundesland from level 5 on (one Kreispokal each)
+        with_fixtures: Generate the league fixtures
+        with_cups: Create the cups (skipped with a warning if they do not fit into the calendar)
+        season_year: Year the first season starts in
+
+    Returns:
+        dict: Counts of the generated rows, the duration and the time of the bulk inserts (insert_s)
+    """
+    from init_db import calculate_lane_quality_for_club
+
+    if Season.query.first() is not None:
+        raise ValueError("Die Datenbank ist nicht leer - der Weltgenerator braucht eine leere Datenbank")
+
+    start_time = time.perf_counter()
+    random.seed(seed)
+    np.random.seed(seed)
+    config = get_config()
+
+    season = Season(
+        name=f"Season {season_year}",
+        start_date=datetime(season_year, 8, 1).date(),
+        end_date=datetime(season_year + 1, 5, 31).date(),
+        is_current=True
+    )
+    db.session.add(season)
+    db.session.commit()
+
+    # Leagues
+    league_rows = _build_league_tree(season.id, levels, branching, 'Herren', 1, '',
+                                     regions, districts_per_region)
+    if youth_levels:
+        league_rows += _build_league_tree(season.id, youth_levels, branching, YOUTH_ALTERSKLASSE,
+                                          len(league_rows) + 1, 'A-Jugend ', regions, districts_per_region)
+    insert_seconds = _insert_rows(League.__table__, league_rows)
+
+    # Clubs and teams
+    club_rows = []
+    club_team_counts = {}       # club_id -> number of Herren teams
+    club_best_level = {}        # club_id -> best Herren league level
+    senior_club_ids = []        # clubs that can field another team further down
+    team_rows = []
+
+    def new_club():
+        club_id = len(club_rows) + 1
+        club_rows.append({
+            'id': club_id,
+            'name': _club_name(club_id - 1),
+            'founded': random.randint(config.get('club_generation.founded_year_min', 1900),
+                                      config.get('club_generation.founded_year_max', 1980)),
+            'reputation': random.randint(config.get('club_generation.reputation_min', 50),
+                                         config.get('club_generation.reputation_max', 90)),
+            'fans': random.randint(config.get('club_generation.fans_min', 500),
+                                   config.get('club_generation.fans_max', 10000)),
+            'training_facilities': random.randint(config.get('club_generation.training_facilities_min', 30),
+                                                  config.get('club_generation.training_facilities_max', 90)),
+            'coaching': random.randint(config.get('club_generation.coaching_min', 30),
+                                       config.get('club_generation.coaching_max', 90)),
+            'verein_id': None,
+            'lane_quality': 1.0
+        })
+        club_team_counts[club_id] = 0
+        return club_id
+
+    for league in league_rows:
+        if league['altersklasse'] != 'Herren':
+            continue
+        level = league['level']
+        for _ in range(teams_per_league):
+            club_id = None
+            if level >= 3 and senior_club_ids and random.random() < second_team_share:
+                candidate = random.choice(senior_club_ids)
+                if club_team_counts[candidate] < len(ROMAN_NUMERALS) - 1 and club_best_level[candidate] < level:
+                    club_id = candidate
+            if club_id is None:
+                club_id = new_club()
+                club_best_level[club_id] = level
+                senior_club_ids.append(club_id)
+
+            club_team_counts[club_id] += 1
+            club_name = club_rows[club_id - 1]['name']
+            team_number = club_team_counts[club_id]
+            team_rows.append({
+                'id': len(team_rows) + 1,
+                'name': club_name if team_number == 1 else f"{club_name} {ROMAN_NUMERALS[team_number]}",
+                'club_id': club_id,
+                'league_id': league['id'],
+                'is_youth_team': False,
+                'staerke': _team_strength(level),
+                '_level': level,
+                '_altersklasse': 'Herren'
+            })
+
+    # Youth teams: at most one per club, taken from the existing clubs first
+    youth_candidates = list(senior_club_ids)
+    random.shuffle(youth_candidates)
+    for league in league_rows:
+        if league['altersklasse'] != YOUTH_ALTERSKLASSE:
+            continue
+        for _ in range(teams_per_league):
+            if youth_candidates:
+                club_id = youth_candidates.pop()
+            else:
+                club_id = new_club()
+                club_best_level[club_id] = None
+            team_rows.append({
+                'id': len(team_rows) + 1,
+                'name': f"{club_rows[club_id - 1]['name']} {YOUTH_ALTERSKLASSE}",
+                'club_id': club_id,
+                'league_id': league['id'],
+                'is_youth_team': True,
+                'staerke': _team_strength(league['level']),
+                '_level': league['level'],
+                '_altersklasse': YOUTH_ALTERSKLASSE
+            })
+
+    # Lane quality by best league level (same calculation as for real clubs)
+    for club in club_rows:
+        best_level = club_best_level.get(club['id'])
+        club['lane_quality'] = calculate_lane_quality_for_club(
+            SimpleNamespace(get_best_league_level=lambda best_level=best_level: best_level)
+        )
+
+    insert_seconds += _insert_rows(Club.__table__, club_rows)
+
+    today = datetime.now().date()
+    insert_seconds += _insert_rows(Finance.__table__, [
+        {
+            'club_id': club['id'],
+            'balance': random.randint(config.get('club_generation.initial_balance_min', 500000),
+                                      config.get('club_generation.initial_balance_max', 2000000)),
+            'income': random.randint(config.get('club_generation.initial_income_min', 50000),
+                                     config.get('club_generation.initial_income_max', 200000)),
+            'expenses': random.randint(config.get('club_generation.initial_expenses_min', 40000),
+                                       config.get('club_generation.initial_expenses_max', 180000)),
+            'date': today,
+            'description': "Initial balance"
+        }
+        for club in club_rows
+    ])
+
+    # Players
+    player_rows, player_team_rows = _generate_players(team_rows, config)
+
+    insert_seconds += _insert_rows(Team.__table__, team_rows)
+    insert_seconds += _insert_rows(Player.__table__, player_rows)
+    insert_seconds += _insert_rows(player_team, player_team_rows)
+    db.session.commit()
+    print(f"World generator: {len(league_rows)} leagues, {len(club_rows)} clubs, "
+          f"{len(team_rows)} teams, {len(player_rows)} players ({time.perf_counter() - start_time:.1f}s)")
+
+    # Promotion/relegation spots and the league graph
+    from simulation import balance_promotion_relegation_spots, build_round_robin_fixtures
+    from league_graph import LeagueGraph
+    balance_promotion_relegation_spots(season.id)
+    LeagueGraph.load(season.id)
+
+    # Fixtures
+    match_count = 0
+    if with_fixtures:
+        team_ids_by_league = {}
+        for team in team_rows:
+            team_ids_by_league.setdefault(team['league_id'], []).append(team['id'])
+
+        match_rows = []
+        for league_id, team_ids in team_ids_by_league.items():
+            for home_team_id, away_team_id, match_day, round_number in build_round_robin_fixtures(team_ids):
+                match_rows.append({
+                    'home_team_id': home_team_id,
+                    'away_team_id': away_team_id,
+                    'league_id': league_id,
+                    'season_id': season.id,
+                    'match_day': match_day,
+                    'round': round_number,
+                    'is_played': False
+                })
+        if match_rows:
+            insert_seconds += _insert_rows(Match.__table__, match_rows)
+            db.session.commit()
+        match_count = len(match_rows)
+
+    # Cups and season calendar (same order as create_sample_data)
+    from cup_engine import initialize_season_cups, reschedule_cup_match_days
+    from season_calendar import create_season_calendar, set_all_match_dates_unified
+
+    if with_cups:
+        league_days = 2 * (teams_per_league - 1)
+        cup_days = _cup_days_needed(league_rows, team_rows)
+        if league_days + cup_days > CALENDAR_SLOTS:
+            print(f"WARNING: The cups need {cup_days} cup days, only {CALENDAR_SLOTS - league_days} are free - "
+                  f"creating the world without cups (use fewer regions/districts)")
+            with_cups = False
+
+    if with_cups:
+        initialize_season_cups(season.id)
+    create_season_calendar(season.id)
+    set_all_match_dates_unified(season.id)
+    if with_cups:
+        reschedule_cup_match_days(season.id)
+
+    db.session.add(GameSettings(manager_club_id=None))
+    db.session.add(NotificationSettings())
+    db.session.commit()
+
+    summary = {
+        'seed': seed,
+        'season_id': season.id,
+        'leagues': len(league_rows),
+        'clubs': len(club_rows),
+        'teams': len(team_rows),
+        'players': len(player_rows),
+        'matches': match_count,
+        'insert_s': round(insert_seconds, 2),
+        'duration_s': round(time.perf_counter() - start_time, 2)
+    }
+    print(f"World generator finished: {summary}")
+    return summary
+
+
+def create_world_database(db_path, **options):
+    """
+    Create a new save file and fill it with a synthetic world.
+
+    Args:
+        db_path: Path of the new database file (must not exist)
+        **options: Parameters of generate_world()
+
+    Returns:
+        dict: Summary returned by generate_world()
+    """
+    from flask import Flask
+
+    if os.path.exists(db_path):
+        raise FileExistsError(f"Datenbank '{db_path}' existiert bereits")
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.abspath(db_path)}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    from storage_profiles import install_storage_profiles, use_storage_profile
+    install_storage_profiles('interactive')
+
+    with app.app_context():
+        db.create_all()
+        with use_storage_profile('bulk'):
+            summary = generate_world(**options)
+        # Closing the connections checkpoints the WAL, so the file can be copied on its own
+        db.session.remove()
+        db.engine.dispose()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Kegelmanager world (offline, seeded).")
+    parser.add_argument('--output', required=True, help="Path of the new database file")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--levels', type=int, default=5, help="League levels of the Herren pyramid")
+    parser.add_argument('--branching', type=int, default=2, help="Leagues below every league")
+    parser.add_argument('--teams-per-league', type=int, default=10)
+    parser.add_argument('--second-team-share', type=float, default=0.2)
+    parser.add_argument('--youth-levels', type=int, default=2, help="Levels of the A-Jugend pyramid (0 = none)")
+    parser.add_argument('--regions', type=int, default=3, help="Bundesländer (Landespokale) per level from level 3 on")
+    parser.add_argument('--districts-per-region', type=int, default=1, help="Landkreise (Kreispokale) per Bundesland")
+    parser.add_argument('--no-fixtures', action='store_true')
+    parser.add_argument('--no-cups', action='store_true', help="Skip the cups")
+    args = parser.parse_args(argv)
+
+    create_world_database(
+        args.output,
+        seed=args.seed,
+        levels=args.levels,
+        branching=args.branching,
+        teams_per_league=args.teams_per_league,
+        second_team_share=args.second_team_share,
+        youth_levels=args.youth_levels,
+        regions=args.regions,
+        districts_per_region=args.districts_per_region,
+        with_fixtures=not args.no_fixtures,
+        with_cups=not args.no_cups
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -125,24 +125,10 @@ const MainMenu = () => {
         localStorage.setItem('selectedDatabase', finalDbName);
         console.log(`Datenbank "${finalDbName}" in localStorage gespeichert`);
 
-        // Zeige einen Hinweis an, dass die Anwendung neu gestartet werden muss
+        // Das Backend verwendet die neue Datenbank sofort - nur die Ansicht neu laden
         setTimeout(() => {
-          const confirmRestart = window.confirm(
-            `Die Datenbank "${finalDbName}" wurde ausgewählt. Um die Änderungen zu übernehmen, muss die Anwendung neu gestartet werden. Möchten Sie die Anwendung jetzt neu starten?`
-          );
-
-          if (confirmRestart) {
-            console.log('Neustart der Anwendung bestätigt');
-
-            // Navigiere zur Hauptseite, was einen "Neustart" simuliert
-            navigate('/');
-
-            // Lade die Seite neu, um die Änderungen zu übernehmen
-            console.log('Lade die Seite neu...');
-            window.location.reload();
-          } else {
-            console.log('Neustart der Anwendung abgebrochen');
-          }
+          navigate('/');
+          window.location.reload();
         }, extendDatabase ? 2000 : 500);
       } else {
         console.error('Fehler bei der Datenbankauswahl:', result.message);
@@ -220,6 +206,7 @@ const MainMenu = () => {
                           <p><strong>Spieler:</strong> {db.player_count}</p>
                           <p><strong>Größe:</strong> {db.size_mb} MB</p>
                           <p><strong>Zuletzt geändert:</strong> {db.modified}</p>
+                          {db.last_simulated && <p><strong>Zuletzt simuliert:</strong> {db.last_simulated}</p>}
                         </div>
                       </div>
                       <div className="database-actions">